@@ -8,11 +8,11 @@ history:
 """
 import logging
 import numpy as np
-import numexpr as ne
 from pandas import DataFrame, Series
-from scipy import signal
 from DataProcessor.AuvProcessor.auvProcessor import auvProcessor
+from DataProcessor.profileSegmenter import profileSegmenter
 from common.constants import OCEAN_DEPTH_M
+from legacy.gliderdac.ooidac.processing import oxygen_kernels
 from gsw import SP_from_C, SA_from_SP, CT_from_t, rho, z_from_p, p_from_z
 
 
@@ -118,14 +118,8 @@ class remus600Processor( auvProcessor ) :
         :return: times and depths with smoothing applied
         """
 
-        window = signal.windows.boxcar(windowSize)
-        smoothedDepths = signal.convolve(depths, window, 'same') / windowSize
-
-        # remove the extra points with filter edge effects
-        smoothedDepths = smoothedDepths[windowSize:-(windowSize+1)]
-        timesOut = times[windowSize:-(windowSize+1)]
-
-        return timesOut, smoothedDepths
+        segmenter = profileSegmenter( smoothingWindowSize=windowSize )
+        return segmenter.smoothDepths( times, depths )
 
     def computeInflectionTimes(self, times, depths, missionStartTime, minDeltaD,
                                minDeltaTSecs, maxTimeGapSecs):
@@ -143,50 +137,17 @@ class remus600Processor( auvProcessor ) :
         logging.info("computeInflectionTimes")
         logging.info( "Mission start time: " + str(missionStartTime))
 
-        minDeltaTMillisecs = 1000 * minDeltaTSecs
-
-        # compute rate of depth change and direction
-        # note: have seen consecutive, duplicate times; handle it
-        # to avoid divide by zero
-        dt = np.diff( times )
-        dt = np.where( dt == 0, 1, dt )
-        dZdT = np.diff( depths ) / dt
-        updownlevel = np.sign( dZdT )
-
-        # init return array of [start, end] items
-        profileBounds = []
-
-        # traverse time/depth looking for direction changes and time gaps
-        start = 0
-        end = 1
-        while end < len(updownlevel):
-
-            if (times[end] - times[end - 1] > 1000 * self.MAX_TIME_GAP_SECONDS):
-                logging.info(" gap between " + str(end-1) + ' and ' + str(end))
-
-            # if time gap too large or direction changes, end current profile here
-
-            if (times[end] - times[end-1] > 1000 * self.MAX_TIME_GAP_SECONDS) or \
-                    (updownlevel[end] != 0 and updownlevel[end] != updownlevel[end - 1]):
-                if np.fabs(depths[end-1] - depths[start]) >= minDeltaD and \
-                    times[end-1] - times[start] >= minDeltaTMillisecs:
-                    profileBounds.append( [ times[start], times[end-1] ] )
-                    logging.info("profile between " + str(start) + ' and ' + str(end-1))
-
-                start = end
-            end = end + 1
-
-        # if incomplete profile at end of data, complete it
-
-        if start < len(depths)-1:
-            if np.fabs(depths[end - 1] - depths[start]) >= minDeltaD and \
-                    times[end - 1] - times[start] >= minDeltaTMillisecs:
-                profileBounds.append( [ times[start], times[end-1] ] )
-                logging.info("profile between " + str(start) + ' and ' + str(end - 1))
+        # split on direction changes and time gaps, keep long enough runs
+        segmenter = profileSegmenter( minProfileDepth=minDeltaD,
+                                      minProfileTime=minDeltaTSecs,
+                                      maxTimeGap=maxTimeGapSecs,
+                                      timeUnitsPerSecond=1000 )
+        starts, ends = segmenter.findProfileRuns( times, depths )
 
         # Convert profile bounds back to unixtime UTC
 
-        profileBoundsRA = np.asarray(profileBounds,dtype=int)
+        profileBoundsRA = np.column_stack(
+            ( times[starts], times[ends] ) ).astype( int )
         return self.offsetTimesToEpochSecs( missionStartTime, profileBoundsRA )
 
 
@@ -296,27 +257,12 @@ class remus600Processor( auvProcessor ) :
         # depth to pressure
         pressure = p_from_z( -raDepth , raLat)
 
-        # density calculation from GSW toolbox
-        SA = SA_from_SP( raSalinity, pressure, raLon, raLat)
-        CT = CT_from_t(SA, raTemp, pressure)
-        pdens = rho(SA, CT, pref)  # potential referenced to p=0
-
-        # Convert from volume to mass units:
-        DO = ne.evaluate('1000*raRawO2Concentration/pdens')
-
-        # Pressure correction:
-        DO = ne.evaluate('(1 + (0.032*pressure)/1000) * DO')
-
-        # Salinity correction (Garcia and Gordon, 1992, combined fit):
-        S0 = 0
-        ts = ne.evaluate('log((298.15-raTemp)/(273.15+raTemp))')
-        B0 = -6.24097e-3
-        B1 = -6.93498e-3
-        B2 = -6.90358e-3
-        B3 = -4.29155e-3
-        C0 = -3.11680e-7
-        Bts = ne.evaluate('B0 + B1*ts + B2*ts**2 + B3*ts**3')
-        DO = ne.evaluate('exp((raSalinity-S0)*Bts + C0*(raSalinity**2-S0**2)) * DO')
+        # density calculation from GSW toolbox, then the volume to mass units
+        # conversion, pressure and salinity corrections in one fused pass,
+        # shared with the Slocum glider oxygen processing
+        DO = oxygen_kernels.s_and_p_compensation(
+            raRawO2Concentration, raSalinity, pressure, raTemp, raLat, raLon,
+            pref=pref )
 
         # convert back to volume
         # DO = ne.evaluate('DO*pdens/1000')
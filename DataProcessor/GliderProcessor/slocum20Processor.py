@@ -11,6 +11,7 @@ history:
 import logging
 
 from DataProcessor.GliderProcessor.gliderProcessor import gliderProcessor
+from DataProcessor.profileSegmenter import profileSegmenter
 import legacy.gliderdac.ooidac.processing as processing
 from legacy.gliderdac.ooidac.data_checks import check_file_goodness
 from legacy.gliderdac.ooidac.constants import SCI_CTD_SENSORS
@@ -24,12 +25,30 @@ class slocum20Processor( gliderProcessor ) :
     and updated data values
     """
 
-    def __init__( self ) :
+    def __init__( self, minProfileDepth=2, profileGridInterval=2,
+                  smoothingWindowSize=10 ) :
         super().__init__()
 
         self._cfgSensorDefs = {}
         self._dataFiles = []
         self._dataFile = None
+        self._dbaCache = None
+
+        # profile discovery: inflections at least minProfileDepth (m) apart
+        # in depth found on a profileGridInterval (secs) grid smoothed over
+        # smoothingWindowSize points, no time gap breaks
+        self._profileSegmenter = profileSegmenter(
+            minProfileDepth=minProfileDepth, minProfileTime=0, maxTimeGap=None,
+            smoothingWindowSize=smoothingWindowSize )
+        self._profileGridInterval = profileGridInterval
+
+        # correct underwater dead-reckoned positions for drift between GPS
+        # fixes, instead of interpolating between the fixes
+        self._drCorrection = False
+
+        # gap fill method per sensor name, from the sensor_defs.json
+        # processing blocks, see ooidac.fill
+        self._fillMethods = {}
 
     @property
     def cfgSensorDefs(self):
@@ -55,6 +74,62 @@ class slocum20Processor( gliderProcessor ) :
     def dataFile(self, dataFile):
         self._dataFile = dataFile
 
+    @property
+    def dbaCache(self):
+        return self._dbaCache
+
+    @dbaCache.setter
+    def dbaCache(self, cache):
+        self._dbaCache = cache
+
+    @property
+    def profileSegmenter(self):
+        return self._profileSegmenter
+
+    @profileSegmenter.setter
+    def profileSegmenter(self, segmenter):
+        self._profileSegmenter = segmenter
+
+    @property
+    def profileGridInterval(self):
+        return self._profileGridInterval
+
+    @profileGridInterval.setter
+    def profileGridInterval(self, secs):
+        self._profileGridInterval = secs
+
+    @property
+    def drCorrection(self):
+        return self._drCorrection
+
+    @drCorrection.setter
+    def drCorrection(self, useDrCorrection):
+        self._drCorrection = useDrCorrection
+
+    @property
+    def fillMethods(self):
+        return self._fillMethods
+
+    @fillMethods.setter
+    def fillMethods(self, methods):
+        self._fillMethods = methods
+
+    def findProfiles(self, dba, depthSensor='m_depth'):
+        """
+        Discover the profiles in a segment with Profiles.find_profiles_by_depth
+        run on the profile segmenter. Profiles are truncated to where science
+        data exists.
+        :param dba: Slocum 2.0 DbaData object
+        :param depthSensor: m_depth or CTD pressure derived depth
+        :return: Profiles with indices set
+        """
+
+        profiles = Profiles(dba)
+        profiles.find_profiles_by_depth(
+            depth_sensor=depthSensor, tsint=self.profileGridInterval,
+            segmenter=self.profileSegmenter)
+        return profiles
+
     # virtual function, implemented here
     def processData(self, dba, scalars, varsToCalculate):
         """
@@ -95,18 +170,20 @@ class slocum20Processor( gliderProcessor ) :
         # This step is required before the other processing module steps.  The
         # variable llat_time is derived from `m_present_time`,
         # llat_latitude/longitude are filled by linear interpolation from
-        # `m_gps_lat/lon`, llat_pressure is derived from converting
+        # `m_gps_lat/lon` (or from drift corrected `m_lat/lon` between fixes
+        # with drCorrection), llat_pressure is derived from converting
         # `sci_water_pressure` to dbar, and llat_depth is derived from
         # `llat_pressure` converted to depth using the Python TEOS-10 GSW
         # package
-        dba = processing.create_llat_sensors(dba)
+        dba = processing.create_llat_sensors(
+            dba, dr_correction=self.drCorrection)
         if dba is None:
             return None
 
         # Convert m_pitch and m_roll variables to degrees, and add back to
         # the data instance with metadata attributes
         if 'm_pitch' in dba.sensor_names and 'm_roll' in dba.sensor_names:
-            dba = processing.pitch_and_roll(dba)
+            dba = processing.pitch_and_roll(dba, fill=self.fillMethods)
             if dba is None:
                 return None
 
@@ -127,12 +204,13 @@ class slocum20Processor( gliderProcessor ) :
                     'calculation_type'],
                 cal_dict= varsToCalculate['corrected_oxygen']['cal_coefs']
             )
-            dba = processing.o2_s_and_p_comp(dba, 'temp_corrected_oxygen')
+            dba = processing.o2_s_and_p_comp(
+                dba, 'temp_corrected_oxygen', fills=self.fillMethods)
             oxy = dba['oxygen']
             oxy['sensor_name'] = 'corrected_oxygen'
             dba['corrected_oxygen'] = oxy
         elif 'sci_oxy4_oxygen' in dba.sensor_names:
-            dba = processing.o2_s_and_p_comp(dba)
+            dba = processing.o2_s_and_p_comp(dba, fills=self.fillMethods)
             if dba is None:
                 return None
 
@@ -228,7 +306,8 @@ class slocum20Processor( gliderProcessor ) :
             # segement file.
             dba_index = self.dataFiles.index(self.dataFile)
             next2files = self.dataFiles[dba_index + 1:dba_index + 3]
-            vx, vy = processing.get_u_and_v(dba, check_files=next2files)
+            vx, vy = processing.get_u_and_v(
+                dba, check_files=next2files, cache=self.dbaCache)
 
             scalars.extend([seg_time, seg_lat, seg_lon, vx, vy])
 
@@ -236,9 +315,7 @@ class slocum20Processor( gliderProcessor ) :
         # user configurable filters written in profile_filters.py (Instructions
         # found in the module) and returns each profile as a new GliderData
         # instance that is the data subset of the main data instance
-        profiles = Profiles(dba)
-
-        profiles.find_profiles_by_depth()
+        profiles = self.findProfiles(dba)
 
         # See profile_filters.py for which filters are applied
         profiles.filter_profiles()
@@ -0,0 +1,212 @@
+"""
+class: profileSegmenter
+
+description: Vectorized profile segmentation shared by the AUV and glider
+data processors. A depth time series is split into profiles using sign
+changes of the depth rate, time gap masks and run length reductions, with
+no per sample Python loops.
+
+Two strategies are provided:
+- findProfileRuns: runs of constant vertical direction, broken by
+  direction changes and time gaps, kept if they span enough depth and time
+  (Remus 600)
+- findInflectionTimes: zero crossings of the rate of a smoothed, regularly
+  gridded depth, with wiggle and mid profile inflections removed (Slocum 2.0)
+
+The inflection search wraps the kernels of the legacy gliderdac
+ooidac.segmentation module, which Profiles.find_profiles_by_depth runs on
+too, so there is a single implementation that the standalone legacy
+package can use without this package.
+
+history:
+10/19/2026 created
+10/19/2026 inflection kernels moved to the legacy ooidac.segmentation
+"""
+import logging
+import numpy as np
+from legacy.gliderdac.ooidac import boxcar_smooth_dataset
+from legacy.gliderdac.ooidac import segmentation
+
+
+class profileSegmenter( ) :
+
+    def __init__( self, minProfileDepth=10, minProfileTime=120,
+                  maxTimeGap=30, smoothingWindowSize=10,
+                  timeUnitsPerSecond=1 ) :
+
+        # min depth change (m) for a valid profile, or between inflections
+        self._minProfileDepth = minProfileDepth
+
+        # min duration (secs) for a valid profile
+        self._minProfileTime = minProfileTime
+
+        # max time gap (secs) within a profile, None disables gap breaks
+        self._maxTimeGap = maxTimeGap
+
+        # boxcar smoothing window (samples)
+        self._smoothingWindowSize = smoothingWindowSize
+
+        # scale of the passed times (1: seconds, 1000: milliseconds)
+        self._timeUnitsPerSecond = timeUnitsPerSecond
+
+    @property
+    def minProfileDepth(self):
+        return self._minProfileDepth
+
+    @minProfileDepth.setter
+    def minProfileDepth(self, depth):
+        self._minProfileDepth = depth
+
+    @property
+    def minProfileTime(self):
+        return self._minProfileTime
+
+    @minProfileTime.setter
+    def minProfileTime(self, secs):
+        self._minProfileTime = secs
+
+    @property
+    def maxTimeGap(self):
+        return self._maxTimeGap
+
+    @maxTimeGap.setter
+    def maxTimeGap(self, secs):
+        self._maxTimeGap = secs
+
+    @property
+    def smoothingWindowSize(self):
+        return self._smoothingWindowSize
+
+    @smoothingWindowSize.setter
+    def smoothingWindowSize(self, size):
+        self._smoothingWindowSize = size
+
+    @property
+    def timeUnitsPerSecond(self):
+        return self._timeUnitsPerSecond
+
+    @timeUnitsPerSecond.setter
+    def timeUnitsPerSecond(self, units):
+        self._timeUnitsPerSecond = units
+
+    def boxcarSmooth(self, values):
+        """
+        Boxcar filter values with smoothingWindowSize, same length output
+        :param values:
+        :return: smoothed values (edges affected by the filter)
+        """
+        return boxcar_smooth_dataset(values, self.smoothingWindowSize)
+
+    def smoothDepths(self, times, depths):
+        """
+        Boxcar smooth depths, dropping the samples with filter edge effects
+        :param times:
+        :param depths:
+        :return: times and depths with smoothing applied
+        """
+        windowSize = self.smoothingWindowSize
+        smoothedDepths = self.boxcarSmooth(depths)
+
+        # remove the extra points with filter edge effects
+        smoothedDepths = smoothedDepths[windowSize:-(windowSize+1)]
+        timesOut = times[windowSize:-(windowSize+1)]
+
+        return timesOut, smoothedDepths
+
+    def findRuns(self, times, depths):
+        """
+        Split the series into runs of constant vertical direction. A run
+        ends where the sign of the depth rate changes to a new non-zero
+        direction, or where the time step exceeds maxTimeGap.
+        :param times: sample times (timeUnitsPerSecond)
+        :param depths: meters
+        :return: run start and end sample indices (inclusive), time gap count
+        """
+
+        if len(depths) < 2:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, 0
+
+        # rate of depth change and direction
+        # note: have seen consecutive, duplicate times; handle it
+        # to avoid divide by zero
+        timeSteps = np.diff( times )
+        dt = np.where( timeSteps == 0, 1, timeSteps )
+        updownlevel = np.sign( np.diff( depths ) / dt )
+        numRates = len( updownlevel )
+
+        # a run breaks before rate sample i on a time gap or a direction change
+        breaks = np.zeros( numRates, dtype=bool )
+        directionChange = np.logical_and(
+            updownlevel[1:] != 0, updownlevel[1:] != updownlevel[:-1] )
+        breaks[1:] = directionChange
+        gaps = np.zeros( numRates, dtype=bool )
+        if self.maxTimeGap is not None:
+            gaps[1:] = timeSteps[:numRates - 1] > \
+                self.timeUnitsPerSecond * self.maxTimeGap
+            breaks |= gaps
+
+        breakIndices = np.flatnonzero( breaks[1:] ) + 1
+        starts = np.concatenate( ([0], breakIndices) )
+        # the last run ends one sample short of the final depth, since the
+        # final rate sample has no successor to confirm its direction
+        ends = np.concatenate( (breakIndices - 1, [numRates - 1]) )
+
+        return starts, ends, int( np.count_nonzero( gaps ) )
+
+    def findProfileRuns(self, times, depths):
+        """
+        Find the runs spanning at least minProfileDepth meters and
+        minProfileTime seconds
+        :param times: sample times (timeUnitsPerSecond)
+        :param depths: meters
+        :return: profile start and end sample indices (inclusive)
+        """
+
+        starts, ends, numGaps = self.findRuns( times, depths )
+
+        valid = np.logical_and(
+            np.fabs( depths[ends] - depths[starts] ) >= self.minProfileDepth,
+            times[ends] - times[starts] >=
+            self.timeUnitsPerSecond * self.minProfileTime )
+
+        logging.info( '{:d} profiles from {:d} runs, {:d} time gaps'.format(
+            int( np.count_nonzero(valid) ), len(starts), numGaps ))
+
+        return starts[valid], ends[valid]
+
+    def findInflectionTimes(self, times, depths, startTime, endTime,
+                            gridInterval=2):
+        """
+        Profile switch times from the zero crossings of the rate of the
+        smoothed depth interpolated onto a regular time grid, bounded by
+        startTime and endTime and cleaned with cleanInflections
+        :param times: times (secs) of the finite depths to use
+        :param depths: meters
+        :param startTime: time of the first profile start
+        :param endTime: time of the last profile end
+        :param gridInterval: regular grid interval (secs)
+        :return: array of profile switch times, including start and end
+        """
+
+        return segmentation.find_inflection_times(
+            times, depths, startTime, endTime,
+            winsize=self.smoothingWindowSize, tsint=gridInterval )
+
+    def cleanInflections(self, inflectionTimes, times, depths):
+        """
+        Remove false inflections: wiggles with less than minProfileDepth
+        change from the previous kept inflection, then mid profile breaks
+        that do not change the vertical direction
+        :param inflectionTimes:
+        :param times: sample times (secs)
+        :param depths: meters, may contain NaNs
+        :return: kept inflection times
+        """
+
+        return segmentation.clean_inflections(
+            inflectionTimes, times, depths, threshold=self.minProfileDepth )
+
+    # the legacy kernels, under the names used by this class
+    depthChangeChain = staticmethod( segmentation.depth_change_chain )
+    timeRangesToIndices = staticmethod( segmentation.time_ranges_to_indices )
@@ -15,12 +15,22 @@ class slocum20DataReader( gliderDataReader ) :
 
     def __init__( self ) :
         super().__init__()
-        # TODO
+
+        # optional run-level cache of parsed dba files (DbaCache)
+        self._dbaCache = None
+
+    @property
+    def dbaCache(self):
+        return self._dbaCache
+
+    @dbaCache.setter
+    def dbaCache(self, cache):
+        self._dbaCache = cache
 
     def readIntoDbaData(self, dataFilePath ):
 
         # Parse the dba file
-        dba = DbaData( dataFilePath )
+        dba = DbaData( dataFilePath, cache=self.dbaCache )
         if dba is None or dba.N == 0:
             logging.warning('Empty data file: {:s}'.format( dataFilePath ))
 
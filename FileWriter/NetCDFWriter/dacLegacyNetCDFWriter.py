@@ -6,6 +6,9 @@ NetCDF format output files (ie: NetCDF syntax, IOOS-DAC content)
 
 history:
 09/21/2021 ppw created
+10/19/2026 build profiles in memory and write each file once, atomically
+10/19/2026 geospatial and time_coverage attributes from the accumulated extents
+10/19/2026 profiles written are added to the profile catalog
 """
 import logging
 import datetime
@@ -16,11 +19,19 @@ import numpy as np
 import tempfile
 import uuid
 from FileWriter.NetCDFWriter import netCDFWriter
-from netCDF4 import Dataset, stringtoarr
+from netCDF4 import stringtoarr
 from shapely.geometry import Polygon
 
 from legacy.gliderdac.ooidac.constants import REQUIRED_SENSOR_DEFS_KEYS, NC_FILL_VALUES
 from FileWriter.NetCDFWriter.netCDFWriter import netCDFWriter
+from FileWriter.extentAccumulator import extentAccumulator
+
+# Profile sensors of the geospatial and time_coverage global attributes, by
+# extent variable name
+EXTENT_SENSORS = {'llat_time': 'time',
+                  'llat_latitude': 'lat',
+                  'llat_longitude': 'lon',
+                  'llat_depth': 'depth'}
 
 class dacLegacyNetCDFWriter(netCDFWriter) :
     """
@@ -42,6 +53,13 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         self._cdm_data_type = 'Profile'
         self._trajectory = None
 
+        # profiles are built in memory and written to file when finished
+        self.diskless = True
+
+        # time, lat, lon and depth extents of the profiles written, fed
+        # with the data inserted
+        self.extents = extentAccumulator()
+
     @property
     def fileType(self):
         return self._fileType
@@ -108,8 +126,7 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
             return
 
         try:
-            self.nc = Dataset(
-                tmp_out_nc, mode='w', clobber=True, format=self.writeFormat)
+            self.nc = self.createDataset(tmp_out_nc, clobber=True)
         except OSError as e:
             logging.critical(
                 'Error initializing {:s} ({})'.format(tmp_out_nc, e)
@@ -164,7 +181,10 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         # Generate and add a UUID global attribute
         self.nc.setncattr('uuid', '{:s}'.format(str(uuid.uuid4())))
 
-        self.nc.close()
+        # An in-memory dataset cannot be reopened for appending, it stays
+        # open until finish_nc
+        if not self.buildsInMemory():
+            self.nc.close()
 
     def open_nc(self):
         """Open the current NetCDF file (self._nc) in append mode and set the
@@ -176,6 +196,9 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
             logging.error('The NetCDF file has not been initialized')
             return
 
+        if self.buildsInMemory() and self.nc and self.nc.isopen():
+            return
+
         if self.nc and self.nc.isopen():
             logging.error(
                 'netCDF4.Dataset is already open: {:s}'.format(self._nc)
@@ -186,7 +209,7 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
             #   )
 
         # Open the NetCDF in append mode
-        self.nc = Dataset(self._out_nc, mode='a')
+        self.nc = self.openDataset(self._out_nc)
 
     def finish_nc(self):
         """Close the NetCDF file permanently, updates some global attributes and
@@ -196,7 +219,8 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         (unfortunately duplicated from legacy code)
         """
 
-        if not self._out_nc or not os.path.isfile(self._out_nc):
+        if not self._out_nc or \
+                not (self.buildsInMemory() or os.path.isfile(self._out_nc)):
             logging.error('No output NetCDF file specified')
             return
 
@@ -217,7 +241,8 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         # Update global time_coverage attributes
         self._update_time_coverage_global_attributes()
 
-        self.nc.close()
+        self.closeDataset()
+        self.extents.endProfile(self.profileId)
 
         self.nc = None
 
@@ -227,13 +252,15 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         """
         create a temporary directory to hold temporary files during writing
         these are moved to the final output directory upon completion without
-        errors
+        errors (not needed by diskless profiles, built in memory)
         """
-        self.tempDir = os.path.join(self.outputPath, "tempfiles")
-        if not os.path.isdir(self.tempDir):
-            os.mkdir(self.tempDir)
-        logging.debug('Temporary NetCDF directory: {:s}'.format(
-            self.tempDir))
+        self.tempDir = None
+        if not self.diskless:
+            self.tempDir = os.path.join(self.outputPath, "tempfiles")
+            if not os.path.isdir(self.tempDir):
+                os.mkdir(self.tempDir)
+            logging.debug('Temporary NetCDF directory: {:s}'.format(
+                self.tempDir))
 
         # Set trajectory name from deployment attributes
         # Use the trajectory_name, if present, in deployment.json.
@@ -269,6 +296,9 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         :return:
         """
 
+        if self.tempDir is None:
+            return
+
         try:
             logging.debug('Removing temporary files:')
             shutil.rmtree(self.tempDir)
@@ -311,16 +341,22 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         profile_filename = '{:s}_{:s}_{:s}'.format(
             self.deploymentAttributes['glider'], prof_start_ts,
             self.fileType)
-        # Path to temporarily hold file while we create it
-        tmp_fid, tmp_nc = tempfile.mkstemp(
-            dir=self.tempDir, suffix='.nc',
-            prefix=os.path.basename(profile_filename)
-        )
-        os.close(tmp_fid)  # comment why this is necessary?
-
         out_nc_file = os.path.join(self.outputPath, '{:s}.nc'.format(
             profile_filename))
-        if os.path.isfile(out_nc_file):
+
+        # Path to temporarily hold file while we create it. Built in memory,
+        # the dataset is named by the output file, and written to it in one
+        # piece when finished
+        if self.buildsInMemory():
+            tmp_nc = out_nc_file
+        else:
+            tmp_fid, tmp_nc = tempfile.mkstemp(
+                dir=self.tempDir, suffix='.nc',
+                prefix=os.path.basename(profile_filename)
+            )
+            os.close(tmp_fid)  # comment why this is necessary?
+
+        if os.path.isfile(out_nc_file) and not self.inMemory:
             if self.overwriteExistingFiles:
                 logging.info(
                     'Clobbering existing NetCDF: {:s}'.format(out_nc_file))
@@ -341,7 +377,8 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
 
         except (OSError, IOError) as e:
             logging.error('Error opening {:s}: {}'.format(tmp_nc, e))
-            os.unlink(tmp_nc)
+            if not self.buildsInMemory():
+                os.unlink(tmp_nc)
             return
 
         # Create and set the trajectory
@@ -372,6 +409,7 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
         self.set_container_variables()
 
         # Create variables and add data
+        self.extents.resetProfile()
         nc_sensor_names = list(self.sensors.keys())
         sensors_to_write = np.intersect1d(
             profile.sensor_names, nc_sensor_names)
@@ -385,7 +423,7 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
 
         nc_file = self.finish_nc()
 
-        if nc_file:
+        if nc_file and not self.buildsInMemory():
             try:
                 shutil.move(tmp_nc, out_nc_file)
                 # --Removing the chmod line because it is bad form to presume
@@ -399,6 +437,12 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
                 )
                 return
 
+        if nc_file:
+            self.catalogOutput(
+                self._trajectory, self.profileId,
+                self.extents.profileExtents.get(self.profileId),
+                os.path.basename(profile.source_file))
+
         # If all is successful, and profile_id is sequential, increment
         if self.startProfileId > 0:
             self.profileId += 1
@@ -635,6 +679,38 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
                     '(missing {:s} variable)'.format(lat_var_name)
                 )
 
+    def _update_extent(self, var_name, ncVar, var_data):
+        """
+        Widen the profile extent of an llat sensor with the data inserted
+        in its NetCDF variable, ignoring the values netCDF4 would mask when
+        reading the variable back (fill and out of valid range values)
+        :param var_name: profile sensor name (e.g. llat_time)
+        :param ncVar: NetCDF variable the data was inserted in
+        :param var_data: data inserted
+        :return: None
+        """
+
+        if var_name not in EXTENT_SENSORS:
+            return
+
+        values = np.asarray(var_data)
+        if ncVar.dtype.kind == 'f' and values.dtype != ncVar.dtype:
+            values = values.astype(ncVar.dtype)
+
+        attrs = ncVar.ncattrs()
+        fill_value = ncVar.getncattr('_FillValue') \
+            if '_FillValue' in attrs else None
+        valid_min = valid_max = None
+        if 'valid_range' in attrs:
+            valid_min, valid_max = ncVar.getncattr('valid_range')[0:2]
+        if 'valid_min' in attrs:
+            valid_min = ncVar.getncattr('valid_min')
+        if 'valid_max' in attrs:
+            valid_max = ncVar.getncattr('valid_max')
+
+        self.extents.update(EXTENT_SENSORS[var_name], values,
+                            fill_value, valid_min, valid_max)
+
     def _update_time_coverage_global_attributes(self):
         """Update all global time_coverage attributes.  The following global
         attributes are created/updated:
@@ -651,13 +727,20 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
             return
 
         time_var_name = time_sensor_def['nc_var_name']
-        min_timestamp = self._nc.variables[time_var_name][:].min()
-        max_timestamp = self._nc.variables[time_var_name][:].max()
+        time_extent = self.extents.profileExtent('time')
+        if time_extent is None:
+            logging.warning(
+                'Failed to set global time_coverage_start/end attributes '
+                '(missing {:s} data)'.format(time_var_name))
+            return
+
+        min_timestamp = time_extent.min
+        max_timestamp = time_extent.max
         try:
             dt0 = datetime.datetime.utcfromtimestamp(min_timestamp)
         except ValueError as e:
             logging.error(
-                'Error parsing min {:s}: {:s} ({:s})'.format(
+                'Error parsing min {:s}: {} ({})'.format(
                     time_var_name, min_timestamp, e)
             )
             logging.error('If it made it this far with '
@@ -668,7 +751,7 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
             dt1 = datetime.datetime.utcfromtimestamp(max_timestamp)
         except ValueError as e:
             logging.error(
-                'Error parsing max {:s}: {:s} ({:s})'.format(
+                'Error parsing max {:s}: {} ({})'.format(
                     time_var_name, max_timestamp, e)
             )
             return
@@ -720,12 +803,15 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
             lat_var_name = lat_sensor_def['nc_var_name']
             lon_var_name = lon_sensor_def['nc_var_name']
 
+            lat_extent = self.extents.profileExtent('lat')
+            lon_extent = self.extents.profileExtent('lon')
             if (lat_var_name in self._nc.variables
-                    and lon_var_name in self._nc.variables):
-                min_lat = self._nc.variables[lat_var_name][:].min()
-                max_lat = self._nc.variables[lat_var_name][:].max()
-                min_lon = self._nc.variables[lon_var_name][:].min()
-                max_lon = self._nc.variables[lon_var_name][:].max()
+                    and lon_var_name in self._nc.variables
+                    and lat_extent is not None and lon_extent is not None):
+                min_lat = lat_extent.min
+                max_lat = lat_extent.max
+                min_lon = lon_extent.min
+                max_lon = lon_extent.max
 
                 # Make sure we have non-Nan for all values
                 if not np.any(np.isnan([min_lat, max_lat, min_lon, max_lon])):
@@ -751,10 +837,12 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
                 'Failed to set global geospatial_vertical attributes')
         else:
             depth_var_name = depth_sensor_def['nc_var_name']
-            if depth_var_name in self.nc.variables:
+            depth_extent = self.extents.profileExtent('depth')
+            if depth_var_name in self.nc.variables and \
+                    depth_extent is not None:
                 try:
-                    min_depth = np.nanmin(self.nc.variables[depth_var_name][:])
-                    max_depth = np.nanmax(self.nc.variables[depth_var_name][:])
+                    min_depth = depth_extent.min
+                    max_depth = depth_extent.max
                     depth_resolution = (
                             (max_depth - min_depth)
                             / self.nc.variables[depth_var_name].size
@@ -1034,7 +1122,9 @@ class dacLegacyNetCDFWriter(netCDFWriter) :
 
         # Add the variable data
         try:
-            self._nc.variables[datatype['nc_var_name']][:] = var_data
+            ncVar = self._nc.variables[datatype['nc_var_name']]
+            ncVar[:] = var_data
+            self._update_extent(var_name, ncVar, var_data)
             self.insert_qc_var( datatype['nc_var_name'], var_data, datatype['dimension'] )
 
         except TypeError as e:
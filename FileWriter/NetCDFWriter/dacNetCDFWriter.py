@@ -1,4 +1,5 @@
 import logging
+import copy
 import datetime
 from dateutil import parser
 import os
@@ -6,8 +7,10 @@ import shutil
 import numpy as np
 import tempfile
 import uuid
-from netCDF4 import Dataset, stringtoarr
+from netCDF4 import stringtoarr
 from FileWriter.NetCDFWriter.netCDFWriter import netCDFWriter
+from FileWriter.extentAccumulator import extentAccumulator
+import common.constants as cc
 
 class dacNetCDFWriter(netCDFWriter) :
     """
@@ -37,6 +40,14 @@ class dacNetCDFWriter(netCDFWriter) :
 
         self._globalAttrs = {}
 
+        # profiles are built in memory and written to file on cleanupOutput,
+        # never partly written
+        self.diskless = True
+
+        # time, lat, lon and depth extents of the profiles written, shared
+        # by the profile copies, which are written one at a time
+        self.extents = extentAccumulator()
+
     @property
     def vars(self):
         return self._vars
@@ -117,6 +128,19 @@ class dacNetCDFWriter(netCDFWriter) :
         self.vars.clear()
         self.nc = None
 
+    def profileCopy(self):
+        """
+        Copy of the writer holding the current profile's variables and
+        attributes, which writes the profile while this writer is reset
+        and filled with the next one
+        :return: dacNetCDFWriter
+        """
+
+        profile = copy.copy( self )
+        profile._vars = list( self.vars )
+        profile._globalAttrs = dict( self.globalAttrs )
+        return profile
+
     def addVariable(self, name, vartype, dimensionVar, attrDict, values, times):
         """
         Store date elements defining an output variable
@@ -156,12 +180,12 @@ class dacNetCDFWriter(netCDFWriter) :
 
         # Open the netCDF file
         filePath = os.path.join( self.outputPath, self.fileName)
-        if os.path.exists(filePath):
+        if os.path.exists(filePath) and not self.inMemory:
             if self.overwriteExistingFiles == False:
                 logging.warning("File exists, overwrite not selected " + self.fileName)
                 return
 
-        self.nc = Dataset( filePath, mode='w', format=self.writeFormat)
+        self.nc = self.createDataset( filePath )
 
         # Create dimensions: time (unlimited), traj_strlen, source_file_strlen
 
@@ -193,12 +217,14 @@ class dacNetCDFWriter(netCDFWriter) :
         # Write global attributes
 
         self.writeAttributes()
+        self.extents.resetProfile()
 
         # Create time var on 1/10 sec cadence
 
         times = np.arange( self.profileStartTime, self.profileEndTime, 0.1 )
         timeVar = self.nc.createVariable('time', np.float64, ('time',), fill_value=float('NaN'))
         timeVar[:] = times
+        self.extents.update( 'time', times )
 
         # add the passed time attributes to the time variable
         for var in self.vars:
@@ -227,9 +253,10 @@ class dacNetCDFWriter(netCDFWriter) :
 
         # Close netCDF file
 
-        self.nc.close()
+        self.closeDataset()
 
-        pass
+        extents = self.extents.endProfile( self.profileId )
+        self.catalogOutput( self.trajectory, self.profileId, extents, self.sourceFile )
 
     def writeAttributes(self):
         """
@@ -263,6 +290,8 @@ class dacNetCDFWriter(netCDFWriter) :
 
             timeIndices = ((var['times'] - self.profileStartTime) / 0.1).astype(int)
             ncVar[ timeIndices ] = var['values']
+            if var['name'] in cc.EXTENT_VARIABLES:
+                self.extents.update( var['name'], var['values'], varFillValue )
 
             # Set the variable's passed attributes
 
@@ -9,20 +9,60 @@ created using that class and converts them into a single output netCDF file
 representing the whole trajectory. This is implemented this way in order to
 also support Data Explorer output format for Glider data files, which use a
 legacy implementation that would otherwise require an additional formatter.
+The profile files may also be passed as in-memory datasets (inputBuffers),
+in which case no profile files need be written to disk. For rebuilding a
+trajectory from an archive of profile files, with readWorkers set, the
+files of each block of profiles are read into inputBuffers concurrently
+just before the block is assembled, and released after it is written, so
+memory is bounded by the block, not the archive.
 
 The input netCDF files use a single dimension, time. The output netCDF file
 utilizes three dimensions: trajectory, profile and observation. The output
 netCDF mimics NetCDF NetCDF files exported from the GliderDAC that are
 directly importable into Data Explorer.
 
+Two layouts of the time dimensioned variables are supported. The default,
+padded layout sizes the observation dimension to the longest profile and
+stores each variable as (trajectory, profile, obs), filling the unused
+observations of shorter profiles. The ragged layout is a CF contiguous
+ragged array: the observation dimension is the total number of observations
+in the trajectory, each variable is stored as (obs), with the observations
+of each profile following those of the previous profile, and the rowSize
+variable holds the number of observations of each profile.
+
 history:
 09/21/2021 ppw created
+10/19/2026 added contiguous ragged array layout
+10/19/2026 added in-memory profile inputs
+10/19/2026 added concurrent reading of profile input files, a block at a time
+10/19/2026 assemble variables in memory, one write per block of profiles
+10/19/2026 split input scan and extent attributes out for the Zarr writer
+10/19/2026 extents accumulated from the values copied, no longer re-read
 """
 from FileWriter.NetCDFWriter.netCDFWriter import netCDFWriter
+from FileWriter.extentAccumulator import extentAccumulator
+import common.constants as cc
 import logging
 import os
-from netCDF4 import Dataset, stringtoarr
+from netCDF4 import Dataset, stringtoarr, chartostring
 import datetime
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads reading profile input files, reads are I/O bound
+DEFAULT_READ_WORKERS = 8
+
+# Memory for assembling a block of profiles of all time dimensioned variables
+DEFAULT_MAX_CUBE_BYTES = 256 * 1024 * 1024
+
+# Target size of a chunk of a time dimensioned variable (NETCDF4 formats)
+CHUNK_BYTES = 1024 * 1024
+
+# Extent attribute values of a trajectory without values of the variable
+EMPTY_EXTENTS = { 'lat': (91.0, -91.0),
+                  'lon': (361.0, -361.0),
+                  'depth': (99999.0, -1.0),
+                  'time': (9999999999, 0) }
 
 class dataExplorerNetCDFWriter( netCDFWriter ) :
 
@@ -33,23 +73,24 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
         self._trajectoryName = ''
         self._trajectoryDateTime = ''
         self._sourceFile = ""
+        self._inputPath = None
         self._inputFiles = []
+        self._inputBuffers = {}
+        self._layout = cc.EXPLORER_PADDED_LAYOUT
+        self._maxCubeBytes = DEFAULT_MAX_CUBE_BYTES
+        self._readWorkers = 0
 
         # internal variables
         self.profileIdList = []
         self.maxObsPerProfile = 0
-
-        # geospatial extent
-        self.lonMin = 361.0
-        self.lonMax = -361.0
-        self.latMin = 91.0
-        self.latMax = -91.0
-        self.depthMin = 99999.0
-        self.depthMax = -1.0
-
-        # temporal extent
-        self.dateTimeMin = 9999999999
-        self.dateTimeMax = 0
+        self.profileObsCounts = []
+        self.profileObsOffsets = []
+        self.profileFiles = []
+        self.inputTrajectoryName = ''
+        self.inputSourceFile = ''
+
+        # geospatial and temporal extent
+        self.extents = extentAccumulator()
         self.timeResolution = 0.0
 
     @property
@@ -84,6 +125,16 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
     def sourceFile(self, name):
         self._sourceFile = name
 
+    @property
+    def inputPath(self):
+        if self._inputPath is None:
+            return self.outputPath
+        return self._inputPath
+
+    @inputPath.setter
+    def inputPath(self, path):
+        self._inputPath = path
+
     @property
     def inputFiles(self):
         return self._inputFiles
@@ -92,6 +143,42 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
     def inputFiles(self, fileList):
         self._inputFiles = fileList
 
+    @property
+    def inputBuffers(self):
+        return self._inputBuffers
+
+    @inputBuffers.setter
+    def inputBuffers(self, buffers):
+        self._inputBuffers = buffers
+
+    @property
+    def maxCubeBytes(self):
+        return self._maxCubeBytes
+
+    @maxCubeBytes.setter
+    def maxCubeBytes(self, nbytes):
+        self._maxCubeBytes = nbytes
+
+    @property
+    def readWorkers(self):
+        return self._readWorkers
+
+    @readWorkers.setter
+    def readWorkers(self, workers):
+        self._readWorkers = workers
+
+    @property
+    def layout(self):
+        return self._layout
+
+    @layout.setter
+    def layout(self, newlayout):
+        if newlayout in cc.EXPLORER_LAYOUTS:
+            self._layout = newlayout
+        else:
+            logging.error('Unsupported Explorer layout ' + str(newlayout) +
+                          ', ignored')
+
     # File naming requirement for Explorer "A####_R#####_YYYYMMDDTHHMMZ.nc"
     #def buildNCFilePath(self, path, trajectory, deployId):
 
@@ -105,35 +192,19 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
     # virtual method for preparing to write output
     def setupOutput(self):
         """
-        Open new NetCDF file and create dimensions
+        Open new NetCDF file and create dimensions. Unset trajectory and
+        source file names default to those found in the input files.
         :return:
         """
 
-        if len(self.trajectoryName) == 0 or \
-                len(self.trajectoryDateTime) == 0 or \
-                len(self.sourceFile) == 0 or \
-                len(self.inputFiles) == 0 :
-            logging.error("Uninitialized inputs in setupOutput")
+        if not self.scanInputFiles():
             return
 
-        # Find all profile ids and the profile
-        # having the most time steps for sizing
-        # the time and observations dimensions
-
-        # clear out computed geospatial and temporal extents
+        # Ragged layout: observations of each profile start where those
+        # of the previous profile end
 
-        self.lonMin = 361.0
-        self.lonMax = -361.0
-        self.latMin = 91.0
-        self.latMax = -91.0
-        self.depthMin = 99999.0
-        self.depthMax = -1.0
-        self.dateTimeMin = 9999999999
-        self.dateTimeMax = 0
-        self.timeResolution = 0.0
-
-
-        self.profileIdList, self.maxObsPerProfile = self.computeProfileDimensions()
+        self.profileObsOffsets = np.concatenate(
+            ([0], np.cumsum(self.profileObsCounts)[:-1])).astype(int)
 
         # Open output netcdf file for trajectory
 
@@ -148,12 +219,19 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
                 logging.warning("File exists, overwrite not selected " + filePath)
                 return
 
-        self.nc = Dataset( filePath, mode='w', format=self.writeFormat)
+        self.nc = self.createDataset( filePath )
+
+        # Every value is written from the assembled profile blocks, so
+        # variables need not be pre-filled
+        self.nc.set_fill_off()
 
         # Create dimensions: observations profiles, trajectory,
         # traj_strlen, and source_file_strlen
 
-        self.nc.createDimension( 'obs', self.maxObsPerProfile )
+        if self.layout == cc.EXPLORER_RAGGED_LAYOUT:
+            self.nc.createDimension( 'obs', int(sum(self.profileObsCounts)) )
+        else:
+            self.nc.createDimension( 'obs', self.maxObsPerProfile )
         self.nc.createDimension( 'profile', len( self.profileIdList ))
         self.nc.createDimension( 'trajectory', 1 )
         self.nc.createDimension( 'traj_strlen', len(self.trajectoryName) )
@@ -198,43 +276,98 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
 
         self.nc.close()
 
+    def scanInputFiles(self):
+        """
+        Find the profiles of the input files and their dimensions (see
+        computeProfileDimensions). Unset trajectory
+        and source file names default to those found in the input files.
+        :return: True if the inputs hold profiles, False otherwise
+        """
+
+        if len(self.inputFiles) == 0 :
+            logging.error("Uninitialized inputs in setupOutput")
+            return False
+
+        # Find all profile ids and the profile
+        # having the most time steps for sizing
+        # the time and observations dimensions
+
+        # clear out computed geospatial and temporal extents
+
+        self.extents.reset()
+        self.timeResolution = 0.0
+
+        self.profileIdList, self.maxObsPerProfile = self.computeProfileDimensions()
+
+        if len(self.trajectoryName) == 0:
+            self.trajectoryName = self.inputTrajectoryName
+        if len(self.trajectoryDateTime) == 0:
+            self.trajectoryDateTime = self.trajectoryName.split('-')[-1]
+        if len(self.sourceFile) == 0:
+            self.sourceFile = self.inputSourceFile
+
+        if len(self.trajectoryName) == 0 or \
+                len(self.trajectoryDateTime) == 0 or \
+                len(self.sourceFile) == 0 or \
+                len(self.profileFiles) == 0 :
+            logging.error("Uninitialized inputs in setupOutput")
+            return False
+
+        return True
+
     def computeProfileDimensions(self):
         """
         Gather all profile ids from input files and find the one with the
-        most time steps for creating the observations dimension
+        most time steps for creating the observations dimension. The number
+        of time steps in each profile is kept in profileObsCounts, the input
+        files holding a profile (time dimension and profile_id) in
+        profileFiles, and the trajectory and longest source file names in
+        inputTrajectoryName and inputSourceFile.
         :return: profileIdList, maxTimesPerProfile
         """
 
         profileIdList = []
         maxTimesPerProfile = 0
+        self.profileObsCounts = []
+        self.profileFiles = []
+        self.inputTrajectoryName = ''
+        self.inputSourceFile = ''
 
         # Find all profile ids and max time steps in any profile
 
         for filename in self.inputFiles :
 
             # Open the netCDF file
-            filePath = os.path.join(self.outputPath, filename)
-            if os.path.exists(filePath):
-                ds = Dataset(filePath, mode='r', format=self.writeFormat)
+            ds = self.openInputFile(filename)
+            if ds is not None and 'time' not in ds.dimensions:
+                logging.info('No time dimension, not a profile: ' + filename)
+                ds.close()
 
+            elif ds is not None:
+
+                obsCount = 0
                 for dim in ds.dimensions.values():
                     if dim.name == 'time':
+                        obsCount = dim.size
                         if dim.size > maxTimesPerProfile:
                             maxTimesPerProfile = dim.size
-                        if maxTimesPerProfile > 1:
-                            self.timeResolution = int(ds.variables['time'][1] - \
-                                                  ds.variables['time'][0])
-                        if ds.variables['time'][0] < self.dateTimeMin:
-                            self.dateTimeMin = int(ds.variables['time'][0])
-                        if ds.variables['time'][-1] > self.dateTimeMax:
-                            self.dateTimeMax = int(ds.variables['time'][-1])
                         break
 
                 for var in ds.variables.values():
                     if var.name == 'profile_id':
                         profileIdList.append( var.getValue() )
+                        self.profileObsCounts.append( obsCount )
+                        self.profileFiles.append( filename )
                         break
 
+                if len(self.inputTrajectoryName) == 0 and 'trajectory' in ds.variables:
+                    self.inputTrajectoryName = str(chartostring(ds.variables['trajectory'][:]))
+
+                if 'source_file' in ds.variables:
+                    sourceFile = str(chartostring(ds.variables['source_file'][:]))
+                    if len(sourceFile) > len(self.inputSourceFile):
+                        self.inputSourceFile = sourceFile
+
                 ds.close()
 
         return profileIdList, maxTimesPerProfile
@@ -248,9 +381,8 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
         """
 
         # Open the first input netCDF file
-        filePath = os.path.join(self.outputPath, self.inputFiles[0])
-        if os.path.exists(filePath):
-            dsIn = Dataset(filePath, mode='r', format=self.writeFormat)
+        dsIn = self.openInputFile(self.profileFiles[0])
+        if dsIn is not None:
 
             # Copy the global attributes to the output netcdf file
             inAttrs = dsIn.ncattrs()
@@ -280,6 +412,15 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
             profileIdVar.setncattr( 'valid_max', 2147483647 )
             profileIdVar.setncattr( 'valid_min', 1 )
 
+            if self.layout == cc.EXPLORER_RAGGED_LAYOUT:
+                # CF contiguous ragged array count variable
+                self.nc.setncattr( 'featureType', 'trajectoryProfile' )
+                rowSizeVar = self.nc.createVariable( 'rowSize', 'i4', ('profile',) )
+                rowSizeVar[:] = self.profileObsCounts
+                rowSizeVar.setncattr( 'ioos_category', 'Identifier')
+                rowSizeVar.setncattr( 'long_name', 'Number of Observations for this Profile')
+                rowSizeVar.setncattr( 'sample_dimension', 'obs')
+
             # Traverse input variables, correctly dimension each with
             # combinations of trajectory, profile and observation, as appropriate
             for inVarName, inVar in dsIn.variables.items():
@@ -296,7 +437,11 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
                         # scalar -> profile specific (trajectory, profile)
                         outDims = ('trajectory', 'profile',)
                 else:
-                    if 'time' in inVar.dimensions:
+                    if 'time' in inVar.dimensions and \
+                            self.layout == cc.EXPLORER_RAGGED_LAYOUT:
+                        # time -> (observation), profiles end to end
+                        outDims = ('obs',)
+                    elif 'time' in inVar.dimensions:
                         # time -> (trajectory, profile, observation)
                         outDims = ('trajectory', 'profile', 'obs',)
                     else:
@@ -310,10 +455,17 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
                 if "_FillValue" in inVar.ncattrs():
                     fillValue = inVar._FillValue
 
+                # time dimensioned variables are chunked to match the
+                # profile blocks they are written in
+                chunkSizes = None
+                if 'obs' in outDims:
+                    chunkSizes = self.temporalChunkSizes( outDims )
+
                 outVar = self.nc.createVariable( self.dacVarNameToOoiVarName(inVar.name),
                                                  inVar.dtype,
                                                  outDims,
-                                                 fill_value=fillValue )
+                                                 fill_value=fillValue,
+                                                 chunksizes=chunkSizes )
                 for attrName in inVar.ncattrs():
                     if attrName != "_FillValue":
                         if attrName != "ancillary_variables":
@@ -327,6 +479,64 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
         else:
             logging.error('No input files found, unable to create output attributes, variables')
 
+    def openInputFile(self, filename):
+        """
+        Open a profile input file, from inputBuffers if held in memory,
+        otherwise from the output path
+        :param filename:
+        :return: netCDF4.Dataset opened for reading, None if not found
+        """
+
+        if filename in self.inputBuffers:
+            return Dataset(filename, mode='r',
+                           memory=self.inputBuffers[filename])
+
+        filePath = os.path.join(self.inputPath, filename)
+        if os.path.exists(filePath):
+            return Dataset(filePath, mode='r', format=self.writeFormat)
+
+        return None
+
+    def readInputFiles(self, filenames, workers=DEFAULT_READ_WORKERS):
+        """
+        Read the contents of input files into inputBuffers on a pool of
+        threads. Only the file reads run concurrently, the datasets are
+        opened from the buffers one at a time, as the NetCDF library is
+        not thread safe. Files already in inputBuffers are not read.
+        :param filenames: input file names
+        :param workers: number of reading threads
+        :return: list of the file names read
+        """
+
+        def readFile(filename):
+            filePath = os.path.join(self.inputPath, filename)
+            try:
+                with open(filePath, 'rb') as f:
+                    return filename, f.read()
+            except OSError as e:
+                logging.warning('Unable to read ' + filePath + ': ' + str(e))
+                return filename, None
+
+        filenames = [f for f in filenames if f not in self.inputBuffers]
+        filesRead = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for filename, contents in pool.map(readFile, filenames):
+                if contents is not None:
+                    self.inputBuffers[filename] = contents
+                    filesRead.append(filename)
+
+        return filesRead
+
+    def releaseInputFiles(self, filenames):
+        """
+        Drop input files read by readInputFiles from inputBuffers
+        :param filenames: input file names
+        :return: None
+        """
+
+        for filename in filenames:
+            self.inputBuffers.pop(filename, None)
+
     def isScalarInExplorer(self, inVar ):
         """
         Only some DAC scalar vars remain scalar in Explorer
@@ -348,61 +558,213 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
         Inserts profile data values from corresponding variables in
         multiple input netCDF files, into a single, n dimensional
         netCDF output file variable containing a whole trajectory
-        of profiles.
+        of profiles. The values of each output variable are assembled in
+        memory for a block of profiles (see profileBlocks) and written with
+        one write per variable and block. Profiles are placed in input
+        file order. With readWorkers set, the input files of each block
+        are read concurrently before it is assembled and released after.
         :return:
         """
 
-        # Traverse input files to add variable values to output file
+        # Output variables by name, the trajectory and rowSize
+        # variables are complete
+
+        outVars = {}
+        for outVarName, outVar in self.nc.variables.items():
+            if outVarName != 'trajectory' and outVarName != 'rowSize':
+                outVars[outVarName] = outVar
+
+        for blockStart, blockEnd in self.profileBlocks():
+
+            obsStart = self.profileObsOffsets[blockStart]
+            obsEnd = self.profileObsOffsets[blockEnd - 1] + \
+                self.profileObsCounts[blockEnd - 1]
+
+            cubes = {}
+            scalars = {}
+            for outVarName, outVar in outVars.items():
+                if outVar.ndim > 0:
+                    cubes[outVarName] = self.allocateCube(
+                        outVar, blockEnd - blockStart, obsEnd - obsStart)
+
+            filesRead = []
+            if self.readWorkers > 0:
+                filesRead = self.readInputFiles(
+                    self.profileFiles[blockStart:blockEnd], self.readWorkers)
+            try:
+                self.insertBlockValues(blockStart, blockEnd, obsStart,
+                                       outVars, cubes, scalars)
+            finally:
+                self.releaseInputFiles(filesRead)
+
+            # Write the block of each variable at once
+
+            for outVarName, cube in cubes.items():
+                outVar = outVars[outVarName]
+                if outVar.dimensions == ('obs',):
+                    outVar[obsStart:obsEnd] = cube
+                else:
+                    outVar[0, blockStart:blockEnd] = cube
 
-        for filename in self.inputFiles :
+            for outVarName, value in scalars.items():
+                outVars[outVarName].assignValue( value )
 
-            # Open the netCDF file
-            filePath = os.path.join(self.outputPath, filename)
-            if os.path.exists(filePath):
-                ds = Dataset(filePath, mode='r', format=self.writeFormat)
-
-                # Retrieve the profile id for data in this file
-                for inVarName, inVar in ds.variables.items():
-                    if inVarName == 'profile_id':
-                        profileId = inVar.getValue()
-                        break
+    def insertBlockValues(self, blockStart, blockEnd, obsStart, outVars,
+                          cubes, scalars):
+        """
+        Add the variable values of a block of profiles to the cubes
+        :param blockStart: first profile index of the block
+        :param blockEnd: last profile index of the block + 1
+        :param obsStart: first observation of the block (ragged)
+        :param outVars: output variables by name
+        :param cubes: block values by output variable name, filled in
+        :param scalars: scalar values by output variable name, filled in
+        :return: None
+        """
+
+        # Traverse input files to add variable values to the cubes
 
-                # Insert data value(s), indexed by trajectory and profile
-                trajectoryIndex = 0
-                profileIndex = profileId - 1
+        for profileIndex in range(blockStart, blockEnd):
 
-                for inVarName, inVar in ds.variables.items():
+            ds = self.openInputFile(self.profileFiles[profileIndex])
+            if ds is None:
+                continue
 
-                    if inVarName == 'trajectory':
-                        continue
+            row = profileIndex - blockStart
+            obsOffset = self.profileObsOffsets[profileIndex] - obsStart
 
-                    for outVarName, outVar in self.nc.variables.items():
+            for inVarName, inVar in ds.variables.items():
 
-                        if outVarName == self.dacVarNameToOoiVarName( inVarName ):
+                if inVarName == 'trajectory':
+                    continue
 
-                            # string
-                            if outVar.dtype == 'S1':
-                                strlen = min(outVar.size, inVar.size)
-                                outVar[trajectoryIndex, profileIndex, 0:strlen] = \
-                                    stringtoarr( inVar[0:strlen], strlen)
+                isExtent = inVarName in cc.EXTENT_VARIABLES
+                outVarName = self.dacVarNameToOoiVarName( inVarName )
+                if outVarName not in outVars and not isExtent:
+                    continue
 
-                            # temporal
-                            elif outVar.ndim == 3:
-                                outVar[trajectoryIndex, profileIndex, 0:inVar.size] = inVar[:]
+                values = inVar[:]
+                if isExtent:
+                    self.updateExtents( inVarName, values )
 
-                            # profile specific
-                            elif outVar.ndim == 2:
-                                outVar[trajectoryIndex, profileIndex] = inVar[:]
+                if outVarName not in outVars:
+                    continue
+                outVar = outVars[outVarName]
 
-                            # scalar
-                            else:
-                                outVar.assignValue( inVar.getValue() )
-                            break
+                # scalar
+                if outVar.ndim == 0:
+                    scalars[outVarName] = inVar.getValue()
 
-                    if inVarName == 'lat' or inVarName == 'lon' or inVarName == 'depth':
-                        self.updateGeospatialExtent( inVar )
+                # string
+                elif outVar.dtype == 'S1':
+                    cube = cubes[outVarName]
+                    strlen = min(cube.shape[-1], inVar.size)
+                    cube[row, 0:strlen] = stringtoarr( values[0:strlen], strlen)
 
-                ds.close()
+                # temporal, ragged
+                elif outVar.dimensions == ('obs',):
+                    cubes[outVarName][obsOffset:obsOffset + inVar.size] = values
+
+                # temporal
+                elif outVar.ndim == 3:
+                    cubes[outVarName][row, 0:inVar.size] = values
+
+                # profile specific
+                else:
+                    cubes[outVarName][row] = values
+
+            ds.close()
+            self.extents.endProfile( int(self.profileIdList[profileIndex]) )
+
+    def allocateCube(self, outVar, profiles, observations):
+        """
+        Masked array holding the values of an output variable for a block
+        of profiles, values not set are written as fill values
+        :param outVar: output variable, dimensioned (obs) or
+            (trajectory, profile, ...)
+        :param profiles: number of profiles in the block
+        :param observations: number of observations in the block (ragged)
+        :return: masked array, (observations) or (profiles, ...)
+        """
+
+        # packed variables hold unpacked values until written
+        dtype = outVar.dtype
+        if 'scale_factor' in outVar.ncattrs() or 'add_offset' in outVar.ncattrs():
+            dtype = np.float64
+
+        if outVar.dimensions == ('obs',):
+            shape = (observations,)
+        else:
+            shape = (profiles,) + outVar.shape[2:]
+
+        return np.ma.masked_all(shape, dtype=dtype)
+
+    def profileBlocks(self):
+        """
+        Split the profiles into consecutive blocks whose time dimensioned
+        values fit in maxCubeBytes of memory. Padded blocks are a whole
+        number of profile chunks (see profileChunkSize).
+        :return: list of (first profile index, last profile index + 1)
+        """
+
+        profileCount = len(self.profileFiles)
+
+        # bytes per observation of all time dimensioned variables,
+        # including the mask
+        obsBytes = 0
+        for outVar in self.nc.variables.values():
+            if 'obs' in outVar.dimensions:
+                obsBytes += outVar.dtype.itemsize + 1
+        obsBytes = max(obsBytes, 1)
+
+        blocks = []
+        if self.layout == cc.EXPLORER_RAGGED_LAYOUT:
+            blockStart = 0
+            blockBytes = 0
+            for profileIndex in range(profileCount):
+                profileBytes = self.profileObsCounts[profileIndex] * obsBytes
+                if profileIndex > blockStart and \
+                        blockBytes + profileBytes > self.maxCubeBytes:
+                    blocks.append((blockStart, profileIndex))
+                    blockStart = profileIndex
+                    blockBytes = 0
+                blockBytes += profileBytes
+            blocks.append((blockStart, profileCount))
+
+        else:
+            chunk = self.profileChunkSize()
+            blockSize = self.maxCubeBytes // max(self.maxObsPerProfile * obsBytes, 1)
+            blockSize = max(chunk, blockSize // chunk * chunk)
+            for blockStart in range(0, profileCount, blockSize):
+                blocks.append((blockStart, min(blockStart + blockSize, profileCount)))
+
+        return blocks
+
+    def profileChunkSize(self):
+        """
+        Number of profiles in a chunk of a padded time dimensioned variable
+        :return: profiles per chunk
+        """
+
+        profiles = CHUNK_BYTES // max(self.maxObsPerProfile * 8, 1)
+        return int(max(1, min(profiles, len(self.profileFiles))))
+
+    def temporalChunkSizes(self, outDims):
+        """
+        Chunk shape of a time dimensioned output variable, None for
+        NetCDF3 formats or contiguous storage
+        :param outDims: output variable dimensions
+        :return: chunk sizes tuple or None
+        """
+
+        if not self.writeFormat.startswith('NETCDF4'):
+            return None
+
+        if outDims == ('obs',):
+            totalObs = int(sum(self.profileObsCounts))
+            return (int(max(1, min(CHUNK_BYTES // 8, totalObs))),)
+
+        return (1, self.profileChunkSize(), max(self.maxObsPerProfile, 1))
 
     def dacVarNameToOoiVarName(self, dacVarName):
         """
@@ -470,34 +832,33 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
 
         return ", ".join( outAttrVals )
 
-    def updateGeospatialExtent(self, geoVar ):
+    def updateExtents(self, varName, values):
         """
-        Computes geospatial extent for entire trajectory
-        :param geoVar:
+        Widen the extent of the profile being read with the values of one
+        of its time, lat, lon or depth variables, as read for copying
+        :param varName: input variable name
+        :param values: values of the variable
         :return: none
         """
 
-        # retrieve variable extent
-        varMin = geoVar[:].min()
-        varMax = geoVar[:].max()
+        self.extents.update( varName, values )
+        if varName == 'time' and values.size > 1:
+            self.timeResolution = int(values[1] - values[0])
 
-        if geoVar.name == 'lat':
-            if varMin < self.latMin:
-                self.latMin = varMin
-            if varMax > self.latMax:
-                self.latMax = varMax
-
-        elif geoVar.name == 'lon':
-            if varMin < self.lonMin:
-                self.lonMin = varMin
-            if varMax > self.lonMax:
-                self.lonMax = varMax
+    def extentLimits(self, varName):
+        """
+        Trajectory extent of a time, lat, lon or depth variable, time in
+        whole seconds
+        :param varName: extent variable name
+        :return: (min, max), EMPTY_EXTENTS values if no value was found
+        """
 
-        elif geoVar.name == 'depth':
-            if varMin < self.depthMin:
-                self.depthMin = varMin
-            if varMax > self.depthMax:
-                self.depthMax = varMax
+        extent = self.extents.trajectoryExtent( varName )
+        if extent is None or extent.empty:
+            return EMPTY_EXTENTS[varName]
+        if varName == 'time':
+            return int(extent.min), int(extent.max)
+        return extent.min, extent.max
 
     def setGeospatialExtentAttrs(self):
         """
@@ -505,39 +866,53 @@ class dataExplorerNetCDFWriter( netCDFWriter ) :
         :return: none
         """
 
-        self.nc.setncattr('Easternmost_Easting', self.lonMax)
-        self.nc.setncattr('Westernmost_Easting', self.lonMin)
-        self.nc.setncattr('Northernmost_Northing', self.latMax)
-        self.nc.setncattr('Southernmost_Northing', self.latMin)
-
-        self.nc.setncattr('geospatial_lat_max', self.latMax )
-        self.nc.setncattr('geospatial_lat_min', self.latMin )
-        self.nc.setncattr('geospatial_lat_units', "degrees_north")
-        self.nc.setncattr('geospatial_lon_max', self.lonMax )
-        self.nc.setncattr('geospatial_lon_min', self.lonMin )
-        self.nc.setncattr('geospatial_lon_units', "degrees_east" )
-        self.nc.setncattr('geospatial_vertical_max', self.depthMax )
-        self.nc.setncattr('geospatial_vertical_min', self.depthMin )
-        self.nc.setncattr('geospatial_vertical_positive', "down" )
-        self.nc.setncattr('geospatial_vertical_units', "m" )
-
-        boundsStr = 'POLYGON ((' + \
-            str(self.latMin) + ' ' + str(self.lonMin) + ', ' + \
-            str(self.latMax) + ' ' + str(self.lonMin) + ', ' + \
-            str(self.latMax) + ' ' + str(self.lonMax) + ', ' + \
-            str(self.latMin) + ' ' + str(self.lonMax) + ', ' + \
-            str(self.latMin) + ' ' + str(self.lonMin) + '))'
-
-        self.nc.setncattr('geospatial_bounds', boundsStr)
-        self.nc.setncattr('geospatial_bounds_crs', 'EPSG:4326')
-        self.nc.setncattr('geospatial_bounds_vertical_crs', 'EPSG:5831')
+        for attrName, attrValue in self.geospatialExtentAttrs().items():
+            self.nc.setncattr( attrName, attrValue )
+
+    def geospatialExtentAttrs(self):
+        """
+        Global attributes of the computed geospatial and temporal extent
+        :return: dictionary of attribute name to value
+        """
+
+        latMin, latMax = self.extentLimits( 'lat' )
+        lonMin, lonMax = self.extentLimits( 'lon' )
+        depthMin, depthMax = self.extentLimits( 'depth' )
+        dateTimeMin, dateTimeMax = self.extentLimits( 'time' )
+
+        attrs = {}
+        attrs['Easternmost_Easting'] = lonMax
+        attrs['Westernmost_Easting'] = lonMin
+        attrs['Northernmost_Northing'] = latMax
+        attrs['Southernmost_Northing'] = latMin
+
+        attrs['geospatial_lat_max'] = latMax
+        attrs['geospatial_lat_min'] = latMin
+        attrs['geospatial_lat_units'] = "degrees_north"
+        attrs['geospatial_lon_max'] = lonMax
+        attrs['geospatial_lon_min'] = lonMin
+        attrs['geospatial_lon_units'] = "degrees_east"
+        attrs['geospatial_vertical_max'] = depthMax
+        attrs['geospatial_vertical_min'] = depthMin
+        attrs['geospatial_vertical_positive'] = "down"
+        attrs['geospatial_vertical_units'] = "m"
+
+        boundsStr = self.extents.wktBounds()
+        if boundsStr is None:
+            boundsStr = 'POLYGON EMPTY'
+
+        attrs['geospatial_bounds'] = boundsStr
+        attrs['geospatial_bounds_crs'] = 'EPSG:4326'
+        attrs['geospatial_bounds_vertical_crs'] = 'EPSG:5831'
 
         # Insert time coverage attributes
-        self.nc.setncattr( 'time_coverage_start', \
-            datetime.datetime.fromtimestamp( self.dateTimeMin ).strftime('%Y%m%dT%H%MZ'))
-        self.nc.setncattr( 'time_coverage_end', \
-            datetime.datetime.fromtimestamp( self.dateTimeMax ).strftime('%Y%m%dT%H%MZ'))
-        self.nc.setncattr( 'time_coverage_duration', \
-            'PT' + str( self.dateTimeMax - self.dateTimeMin ) + 'S' )
-        self.nc.setncattr( 'time_coverage_resolution', \
-                           'PT' + str(self.timeResolution) + 'S' )
+        attrs['time_coverage_start'] = \
+            datetime.datetime.fromtimestamp( dateTimeMin ).strftime('%Y%m%dT%H%MZ')
+        attrs['time_coverage_end'] = \
+            datetime.datetime.fromtimestamp( dateTimeMax ).strftime('%Y%m%dT%H%MZ')
+        attrs['time_coverage_duration'] = \
+            'PT' + str( dateTimeMax - dateTimeMin ) + 'S'
+        attrs['time_coverage_resolution'] = \
+            'PT' + str(self.timeResolution) + 'S'
+
+        return attrs
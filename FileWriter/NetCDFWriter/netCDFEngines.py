@@ -0,0 +1,581 @@
+"""
+class: netCDFEngines
+
+description: NetCDF library engines behind the NetCDF writers. The writers
+use the netCDF4.Dataset API; openDataset returns a netCDF4.Dataset for the
+netcdf4 engine, and for the h5netcdf (NETCDF4 format) and scipy
+(scipy.io.netcdf_file, NETCDF3 formats) engines an engineDataset, which
+implements the part of the netCDF4.Dataset API used by the writers on top
+of the engine's own API:
+
+    createDimension, createVariable, variables, dimensions, setncattr,
+    getncattr, ncattrs, global attributes as Python attributes,
+    set_fill_off, isopen, close (returning the contents if in memory)
+
+and of netCDF4.Variable:
+
+    [] reads (masked at the fill value) and writes (masked values written
+    as the fill value, unlimited dimensions grown as needed), assignValue,
+    getValue, setncattr, getncattr, ncattrs, name, dtype, ndim, shape,
+    size, dimensions, chunking
+
+The netCDF4 engine reads and writes all formats. h5py based h5netcdf
+avoids the netCDF-C library open and define overhead for NETCDF4 files,
+and scipy's pure python NETCDF3 writer builds the file in memory and
+writes it in one pass on close. The auto engine picks the engine measured
+fastest for the format (see tests/benchmarks/bench_netcdf_engines.py).
+
+history:
+10/19/2026 created
+"""
+import io
+import os
+import logging
+import numpy as np
+from netCDF4 import Dataset, default_fillvals
+import common.constants as cc
+
+try:
+    import h5netcdf.legacyapi as h5legacy
+except ImportError:
+    h5legacy = None
+
+try:
+    from scipy.io import netcdf_file
+except ImportError:
+    netcdf_file = None
+
+# Initial size of in-memory netCDF4 datasets in bytes, grown as needed
+# (NetCDF3 only)
+IN_MEMORY_INITIAL_SIZE = 65536
+
+# Formats written by each engine
+ENGINE_FORMATS = { cc.NETCDF4_ENGINE: cc.OUTPUT_FORMATS,
+                   cc.H5NETCDF_ENGINE: [ 'NETCDF4' ],
+                   cc.SCIPY_ENGINE: [ 'NETCDF3_CLASSIC' ] }
+
+
+def engineAvailable(engine):
+    """
+    Is the library of an engine installed
+    :param engine: engine name, see common.constants.NETCDF_ENGINES
+    :return: True or False
+    """
+
+    if engine == cc.H5NETCDF_ENGINE:
+        return h5legacy is not None
+    if engine == cc.SCIPY_ENGINE:
+        return netcdf_file is not None
+    return engine == cc.NETCDF4_ENGINE
+
+
+def resolveEngine(engine, writeFormat):
+    """
+    Engine used to write a format. The auto engine is the fastest engine
+    for the format, an engine that is not installed or does not write the
+    format falls back to netcdf4.
+    :param engine: engine name, see common.constants.NETCDF_ENGINES
+    :param writeFormat: NetCDF file format
+    :return: engine name
+    """
+
+    if engine == cc.AUTO_ENGINE:
+        engine = cc.AUTO_ENGINES.get( writeFormat, cc.NETCDF4_ENGINE )
+        if not engineAvailable( engine ):
+            engine = cc.NETCDF4_ENGINE
+
+    if not engineAvailable( engine ):
+        logging.warning('NetCDF engine ' + str(engine) + ' not installed, '
+                        'using ' + cc.NETCDF4_ENGINE)
+        return cc.NETCDF4_ENGINE
+
+    if writeFormat not in ENGINE_FORMATS[engine]:
+        logging.warning('NetCDF engine ' + engine + ' does not write ' +
+                        str(writeFormat) + ', using ' + cc.NETCDF4_ENGINE)
+        return cc.NETCDF4_ENGINE
+
+    return engine
+
+
+def openDataset(engine, filePath, mode, writeFormat, clobber=True, memory=False):
+    """
+    Open a dataset for writing ('w') or appending ('a') with an engine
+    :param engine: engine name, see common.constants.NETCDF_ENGINES
+    :param filePath: file path, or dataset name if in memory
+    :param mode: 'w' or 'a'
+    :param writeFormat: NetCDF file format
+    :param clobber: overwrite an existing file
+    :param memory: hold the dataset in memory, close() returns its contents
+    :return: netCDF4.Dataset or engineDataset
+    """
+
+    engine = resolveEngine( engine, writeFormat )
+
+    if engine == cc.H5NETCDF_ENGINE:
+        return h5netcdfDataset( filePath, mode, clobber, memory )
+
+    if engine == cc.SCIPY_ENGINE:
+        return scipyDataset( filePath, mode, clobber, memory )
+
+    if mode == 'a':
+        return Dataset( filePath, mode='a' )
+
+    if memory:
+        return Dataset( filePath, mode='w', format=writeFormat,
+                        memory=IN_MEMORY_INITIAL_SIZE )
+
+    return Dataset( filePath, mode='w', clobber=clobber, format=writeFormat )
+
+
+def fillValueOf(dtype, fillValue=None):
+    """
+    Fill value of a variable, the netCDF default for the type if unset
+    :param dtype: numpy dtype
+    :param fillValue: _FillValue, or None
+    :return: fill value, None for types without a default
+    """
+
+    if fillValue is not None:
+        return fillValue
+    return default_fillvals.get( np.dtype(dtype).str[1:] )
+
+
+class engineDimension( ) :
+
+    def __init__(self, name, size, unlimited):
+        self.name = name
+        self.size = size
+        self._unlimited = unlimited
+
+    def isunlimited(self):
+        return self._unlimited
+
+    def __len__(self):
+        return self.size
+
+
+class engineVariable( ) :
+    """
+    netCDF4.Variable API over an engine variable, see the subclasses
+    """
+
+    def __init__(self, dataset, var, name):
+        object.__setattr__( self, '_dataset', dataset )
+        object.__setattr__( self, '_var', var )
+        object.__setattr__( self, '_name', name )
+
+    # engine specific, implement in subclass
+
+    def _attrs(self):
+        raise NotImplementedError()
+
+    def _setAttr(self, name, value):
+        raise NotImplementedError()
+
+    def _read(self, key):
+        raise NotImplementedError()
+
+    def _write(self, key, value):
+        raise NotImplementedError()
+
+    def _grow(self, size):
+        raise NotImplementedError()
+
+    def _isUnlimited(self):
+        raise NotImplementedError()
+
+    def chunking(self):
+        return 'contiguous'
+
+    # netCDF4.Variable API
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def dtype(self):
+        return self._var.dtype
+
+    @property
+    def shape(self):
+        return self._var.shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def dimensions(self):
+        return tuple(self._var.dimensions)
+
+    def ncattrs(self):
+        return list( self._attrs().keys() )
+
+    def getncattr(self, name):
+        return self._attrs()[name]
+
+    def setncattr(self, name, value):
+        self._setAttr( name, value )
+
+    def __getattr__(self, name):
+        attrs = self._attrs()
+        if name in attrs:
+            return attrs[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self._setAttr( name, value )
+
+    def fillValue(self):
+        return fillValueOf( self.dtype, self._attrs().get('_FillValue') )
+
+    def __getitem__(self, key):
+        values = np.asarray( self._read(key) )
+        fill = self.fillValue()
+        if fill is None or values.dtype.kind not in 'fiu':
+            return values
+        if np.isnan(fill):
+            mask = np.isnan(values)
+        else:
+            mask = values == fill
+        return np.ma.masked_array( values, mask=mask )
+
+    def __setitem__(self, key, value):
+        if np.ma.isMaskedArray(value):
+            value = value.filled( self.fillValue() )
+        value = np.asarray( value, dtype=self.dtype )
+
+        if self.ndim > 0 and self._isUnlimited():
+            size = engineVariable.requiredLength( key, value )
+            if size > self.shape[0]:
+                self._grow( size )
+
+        if engineVariable.isBasicKey( key ):
+            self._write( key, value )
+        else:
+            # index arrays, possibly unordered or repeated
+            values = np.array( self._read( slice(None) ))
+            values[key] = value
+            self._write( slice(None), values )
+
+    def assignValue(self, value):
+        self[...] = value
+
+    def getValue(self):
+        return self._read( () )
+
+    @staticmethod
+    def isBasicKey(key):
+        keys = key if isinstance(key, tuple) else (key,)
+        return all( k is Ellipsis or isinstance(k, (slice, int, np.integer))
+                    for k in keys )
+
+    @staticmethod
+    def requiredLength(key, value):
+        """
+        Length of the first dimension needed to write value at key
+        """
+
+        first = key[0] if isinstance(key, tuple) and len(key) > 0 else key
+        if first is Ellipsis:
+            first = slice(None)
+        if isinstance(first, (int, np.integer)):
+            return int(first) + 1
+        if isinstance(first, slice):
+            if first.stop is not None:
+                return first.stop
+            return (first.start or 0) + (value.shape[0] if value.ndim > 0 else 1)
+        indexes = np.asarray(first)
+        return int(indexes.max()) + 1 if indexes.size > 0 else 0
+
+
+class engineDataset( ) :
+    """
+    netCDF4.Dataset API over an engine dataset, see the subclasses
+    """
+
+    def __init__(self, filePath, memory):
+        object.__setattr__( self, '_filePath', filePath )
+        object.__setattr__( self, '_buffer', io.BytesIO() if memory else None )
+        object.__setattr__( self, '_variables', {} )
+        object.__setattr__( self, '_open', True )
+        object.__setattr__( self, '_nc', None )
+
+    # engine specific, implement in subclass
+
+    def _attrs(self):
+        raise NotImplementedError()
+
+    def _setAttr(self, name, value):
+        raise NotImplementedError()
+
+    def _createDimension(self, name, size):
+        raise NotImplementedError()
+
+    def _createVariable(self, name, dtype, dimensions, zlib, complevel,
+                        fillValue, chunksizes):
+        raise NotImplementedError()
+
+    def _dimensions(self):
+        raise NotImplementedError()
+
+    def _close(self):
+        raise NotImplementedError()
+
+    # netCDF4.Dataset API
+
+    def createDimension(self, dimname, size=None):
+        self._createDimension( dimname, size )
+        return self.dimensions[dimname]
+
+    def createVariable(self, varname, datatype, dimensions=(), zlib=False,
+                       complevel=4, fill_value=None, chunksizes=None, **kwargs):
+        if isinstance(dimensions, str):
+            dimensions = (dimensions,)
+        var = self._createVariable( varname, np.dtype(datatype), tuple(dimensions),
+                                    zlib, complevel, fill_value, chunksizes )
+        self._variables[varname] = var
+        return var
+
+    @property
+    def variables(self):
+        return self._variables
+
+    @property
+    def dimensions(self):
+        return self._dimensions()
+
+    def ncattrs(self):
+        return list( self._attrs().keys() )
+
+    def getncattr(self, name):
+        return self._attrs()[name]
+
+    def setncattr(self, name, value):
+        self._setAttr( name, value )
+
+    def __getattr__(self, name):
+        attrs = self._attrs()
+        if name in attrs:
+            return attrs[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self._setAttr( name, value )
+
+    def set_fill_off(self):
+        # values are always pre-filled
+        pass
+
+    def isopen(self):
+        return self._open
+
+    def close(self):
+        """
+        Close the dataset
+        :return: contents of an in-memory dataset, None otherwise
+        """
+
+        contents = self._close()
+        object.__setattr__( self, '_open', False )
+        return contents
+
+
+class h5netcdfVariable( engineVariable ) :
+
+    @property
+    def shape(self):
+        # the HDF5 dataset's, read and written directly, as h5netcdf
+        # computes unlimited dimension sizes from all the variables on each
+        # access. Dimensions are only grown by resize_dimension, which
+        # resizes all their variables.
+        return self._var._h5ds.shape
+
+    def _attrs(self):
+        return self._var.attrs
+
+    def _setAttr(self, name, value):
+        self._var.setncattr( name, value )
+
+    def _read(self, key):
+        return self._var._h5ds[key]
+
+    def _write(self, key, value):
+        self._var._h5ds[key] = value
+
+    def _grow(self, size):
+        self._dataset._nc.resize_dimension( self.dimensions[0], size )
+
+    def _isUnlimited(self):
+        return self._dataset._nc.dimensions[self.dimensions[0]].isunlimited()
+
+    def chunking(self):
+        chunks = self._var.chunking()
+        return 'contiguous' if chunks is None else list(chunks)
+
+
+class h5netcdfDataset( engineDataset ) :
+    """
+    NETCDF4 files written with h5netcdf, on h5py
+    """
+
+    def __init__(self, filePath, mode, clobber, memory):
+        super().__init__( filePath, memory )
+
+        if memory:
+            target = self._buffer
+        else:
+            target = filePath
+            if mode == 'w' and not clobber:
+                mode = 'w-'
+        object.__setattr__( self, '_nc', h5legacy.Dataset( target, mode=mode ))
+        for name, var in self._nc.variables.items():
+            self._variables[name] = h5netcdfVariable( self, var, name )
+
+    def _attrs(self):
+        return self._nc.attrs
+
+    def _setAttr(self, name, value):
+        self._nc.setncattr( name, value )
+
+    def _createDimension(self, name, size):
+        self._nc.createDimension( name, size )
+
+    def _createVariable(self, name, dtype, dimensions, zlib, complevel,
+                        fillValue, chunksizes):
+        var = self._nc.createVariable( name, dtype, dimensions,
+                                       zlib=zlib, complevel=complevel,
+                                       fill_value=fillValue,
+                                       chunksizes=chunksizes )
+        return h5netcdfVariable( self, var, name )
+
+    def _dimensions(self):
+        return { name: engineDimension( name, dim.size, dim.isunlimited() )
+                 for name, dim in self._nc.dimensions.items() }
+
+    def _close(self):
+        self._nc.close()
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        return None
+
+
+class scipyVariable( engineVariable ) :
+
+    @property
+    def dtype(self):
+        return self._var.data.dtype
+
+    def _attrs(self):
+        return self._var._attributes
+
+    def _setAttr(self, name, value):
+        if isinstance(value, (list, tuple)):
+            value = np.asarray(value)
+        setattr( self._var, name, value )
+
+    def _read(self, key):
+        return self._var.data[key]
+
+    def _write(self, key, value):
+        self._var.data[key] = value
+
+    def _grow(self, size):
+        data = self._var.data
+        grown = np.full( (size,) + data.shape[1:], self.fillValue() or 0,
+                         dtype=data.dtype )
+        grown[0:data.shape[0]] = data
+        # not setattr, which would also add a netCDF attribute
+        self._var.__dict__['data'] = grown
+
+    def _isUnlimited(self):
+        return self._var.isrec
+
+
+class scipyDataset( engineDataset ) :
+    """
+    NETCDF3_CLASSIC files written with scipy.io.netcdf_file, which holds
+    the whole file in memory and writes it in one pass on close. Unlimited
+    dimensions are written fixed to their length, see fixRecordDimensions.
+    """
+
+    def __init__(self, filePath, mode, clobber, memory):
+        super().__init__( filePath, memory )
+
+        if memory:
+            target = self._buffer
+        else:
+            target = filePath
+            if mode == 'w' and not clobber and os.path.exists(filePath):
+                raise OSError('File exists, clobber not set ' + filePath)
+        object.__setattr__( self, '_nc', netcdf_file( target, mode=mode,
+                                                      version=1, mmap=False ))
+        for name, var in self._nc.variables.items():
+            self._variables[name] = scipyVariable( self, var, name )
+
+    def _attrs(self):
+        return self._nc._attributes
+
+    def _setAttr(self, name, value):
+        if isinstance(value, (list, tuple)):
+            value = np.asarray(value)
+        setattr( self._nc, name, value )
+
+    def _createDimension(self, name, size):
+        self._nc.createDimension( name, size )
+
+    def _createVariable(self, name, dtype, dimensions, zlib, complevel,
+                        fillValue, chunksizes):
+        var = scipyVariable( self, self._nc.createVariable( name, dtype, dimensions ),
+                             name )
+        if fillValue is not None:
+            var.setncattr( '_FillValue', np.array( fillValue, dtype=dtype ))
+
+        # pre-fill, as the netCDF library does
+        fill = var.fillValue()
+        if fill is not None:
+            var._var.data[...] = fill
+        return var
+
+    def fixRecordDimensions(self):
+        """
+        Fix the unlimited dimensions to their length before writing.
+        netcdf_file writes the scalar variables after the record variables,
+        which the netCDF library cannot read, when the file has both.
+        :return: none
+        """
+
+        for name, dim in self._dimensions().items():
+            if dim.isunlimited() and dim.size > 0:
+                self._nc.dimensions[name] = dim.size
+                for var in self._variables.values():
+                    if var.ndim > 0 and var.dimensions[0] == name:
+                        if var.shape[0] < dim.size:
+                            var._grow( dim.size )
+                        var._var.__dict__['_shape'] = (dim.size,) + var.shape[1:]
+
+    def _dimensions(self):
+        dims = {}
+        for name, size in self._nc.dimensions.items():
+            if size is None:
+                size = max( [ var.shape[0] for var in self._variables.values()
+                              if var.ndim > 0 and var.dimensions[0] == name ],
+                            default=0 )
+                dims[name] = engineDimension( name, size, True )
+            else:
+                dims[name] = engineDimension( name, size, False )
+        return dims
+
+    def _close(self):
+        self.fixRecordDimensions()
+        contents = None
+        if self._buffer is not None:
+            self._nc.flush()
+            contents = self._buffer.getvalue()
+        self._nc.close()
+        return contents
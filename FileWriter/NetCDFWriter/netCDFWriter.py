@@ -5,11 +5,23 @@ description: Base class for all NetCDF output file writers/formatters
 
 history:
 09/21/2021 ppw created
+10/19/2026 added in-memory output datasets
+10/19/2026 added selectable NetCDF library engines
+10/19/2026 added diskless output datasets, written to file on close
+10/19/2026 added skipping of unchanged output files by content hash
+10/19/2026 added the profile catalog of the output files written
 """
 import logging
+import os
+import uuid
+import hashlib
+import numpy as np
+from netCDF4 import Dataset
 
-from common.constants import OUTPUT_FORMATS
+from common.constants import OUTPUT_FORMATS, NETCDF_ENGINES, NETCDF4_ENGINE
+from common.constants import VOLATILE_ATTRIBUTES
 from FileWriter.fileWriter import fileWriter
+from FileWriter.NetCDFWriter import netCDFEngines
 
 
 class netCDFWriter( fileWriter ) :
@@ -20,9 +32,22 @@ class netCDFWriter( fileWriter ) :
         # initialize object data
         self._compressionLevel = 0
         self._writeFormat = 'NETCDF4_CLASSIC'
+        self._engine = NETCDF4_ENGINE
         self._startProfileId = 0
         self._profileId = 0
         self._nc = None
+        self._inMemory = False
+        self._diskless = False
+        self._skipUnchanged = False
+        self._memoryBuffer = None
+        self._datasetPath = None
+        self._catalog = None
+
+        # internal variables, describing the last output file closed
+        self.outputUnchanged = False
+        self.outputFile = None
+        self.outputHash = None
+        self.outputVariables = []
 
     @property
     def compressionLevel(self):
@@ -44,6 +69,17 @@ class netCDFWriter( fileWriter ) :
         if format in OUTPUT_FORMATS:
             self._writeFormat = format
 
+    @property
+    def engine(self):
+        return self._engine
+
+    @engine.setter
+    def engine(self, engine):
+        if engine in NETCDF_ENGINES:
+            self._engine = engine
+        else:
+            logging.error('Unsupported NetCDF engine ' + str(engine) + ', ignored')
+
     @property
     def startProfileId(self):
         return self._startProfileId
@@ -68,6 +104,260 @@ class netCDFWriter( fileWriter ) :
     def nc(self, newnc):
         self._nc = newnc
 
+    @property
+    def inMemory(self):
+        return self._inMemory
+
+    @inMemory.setter
+    def inMemory(self, memory):
+        self._inMemory = memory
+
+    @property
+    def diskless(self):
+        return self._diskless
+
+    @diskless.setter
+    def diskless(self, memory):
+        self._diskless = memory
+
+    @property
+    def skipUnchanged(self):
+        return self._skipUnchanged
+
+    @skipUnchanged.setter
+    def skipUnchanged(self, skip):
+        self._skipUnchanged = skip
+
+    @property
+    def catalog(self):
+        return self._catalog
+
+    @catalog.setter
+    def catalog(self, newcatalog):
+        self._catalog = newcatalog
+
+    @property
+    def memoryBuffer(self):
+        return self._memoryBuffer
+
+    @memoryBuffer.setter
+    def memoryBuffer(self, buffer):
+        self._memoryBuffer = buffer
+
+    def buildsInMemory(self):
+        """
+        Is the output dataset built in memory, either kept there (inMemory)
+        or written to file when closed (diskless)
+        :return: True or False
+        """
+
+        return self.inMemory or self.diskless
+
+    def createDataset(self, filePath, clobber=True):
+        """
+        Open a new NetCDF output dataset with the writer's engine. With
+        inMemory set, the dataset is held in memory and nothing is written
+        to filePath. With diskless set, the dataset is built in memory and
+        written to filePath in one piece by closeDataset.
+        :param filePath: output file path, or dataset name if in memory
+        :param clobber: overwrite an existing file
+        :return: netCDF4.Dataset (or engine dataset) opened for writing
+        """
+
+        self._datasetPath = None
+        if self.diskless and not self.inMemory:
+            if not clobber and os.path.exists(filePath):
+                raise FileExistsError('File exists, clobber not set ' + filePath)
+            self._datasetPath = filePath
+
+        return netCDFEngines.openDataset( self.engine, filePath, 'w',
+                                          self.writeFormat, clobber=clobber,
+                                          memory=self.buildsInMemory() )
+
+    def openDataset(self, filePath):
+        """
+        Reopen an output file written by createDataset for appending
+        :param filePath: output file path
+        :return: netCDF4.Dataset (or engine dataset) opened for appending
+        """
+
+        return netCDFEngines.openDataset( self.engine, filePath, 'a',
+                                          self.writeFormat )
+
+    def closeDataset(self):
+        """
+        Close the output dataset. The contents of an in-memory dataset are
+        kept in memoryBuffer, readable with netCDF4.Dataset(name, memory=),
+        those of a diskless dataset written to its file. The file, its
+        content hash (with skipUnchanged or a catalog) and variables are
+        kept in outputFile, outputHash and outputVariables.
+        :return: None
+        """
+
+        self.outputUnchanged = False
+        self.outputFile = None
+        self.outputHash = None
+        self.outputVariables = list( self.nc.variables )
+        buffer = self.nc.close()
+        if self.inMemory:
+            self.memoryBuffer = bytes(buffer)
+        elif self._datasetPath is not None:
+            filePath = self._datasetPath
+            self._datasetPath = None
+
+            # with skipUnchanged, a file holding the same content is kept.
+            # With a catalog, the hash is stored in the catalog only, by
+            # catalogOutput, otherwise in the sidecar file
+            contentHash = None
+            if self.skipUnchanged or self.catalog is not None:
+                contentHash = netCDFWriter.contentHash( buffer )
+                self.outputHash = contentHash
+            if self.skipUnchanged and os.path.exists( filePath ):
+                if self.catalog is not None:
+                    storedHash = self.catalog.contentHash( filePath )
+                else:
+                    storedHash = netCDFWriter.storedHash( filePath )
+                if storedHash == contentHash:
+                    logging.info( 'Unchanged, not rewritten: ' + filePath )
+                    self.outputUnchanged = True
+                    self.outputFile = filePath
+                    return
+
+            # every rewrite refreshes the stored hash, a sidecar hash no
+            # longer describing the file is removed
+            netCDFWriter.writeFileAtomically( filePath, buffer )
+            self.outputFile = filePath
+            if self.skipUnchanged and self.catalog is None:
+                netCDFWriter.writeFileAtomically( netCDFWriter.hashPath( filePath ),
+                                                  contentHash.encode() )
+            else:
+                netCDFWriter.removeStoredHash( filePath )
+
+    def catalogOutput(self, trajectory, profileId, extents, sourceFile):
+        """
+        Add the last output file closed to the catalog, if any. Profiles
+        kept in memory are not cataloged.
+        :param trajectory: trajectory name
+        :param profileId: profile id
+        :param extents: dictionary of extent variable name to
+            variableExtent of the profile, see extentAccumulator
+        :param sourceFile: source data file name
+        :return: None
+        """
+
+        if self.catalog is None or self.outputFile is None:
+            return
+
+        self.catalog.addProfile( self.outputFile, trajectory, profileId, extents,
+                                 self.outputVariables, sourceFile, self.outputHash )
+
+    @staticmethod
+    def contentHash(contents):
+        """
+        SHA-256 of the data bearing content of a NetCDF file: format,
+        dimensions, variables with their attributes and values, and global
+        attributes other than the VOLATILE_ATTRIBUTES stamped on every run
+        :param contents: NetCDF file contents
+        :return: hex digest
+        """
+
+        sha = hashlib.sha256()
+
+        def update(name, value):
+            sha.update( name.encode() + b'\0' )
+            if isinstance(value, np.ndarray) or np.isscalar(value):
+                value = np.asarray(value)
+                if value.dtype.kind == 'O':
+                    value = np.asarray( [str(v) for v in value.ravel()] )
+                sha.update( value.dtype.str.encode() + b'\0' +
+                            str(value.shape).encode() + b'\0' )
+                sha.update( np.ascontiguousarray(value).tobytes() )
+            else:
+                sha.update( str(value).encode() )
+            sha.update( b'\0' )
+
+        nc = Dataset( 'contentHash', mode='r', memory=bytes(contents) )
+        try:
+            update( 'format', nc.data_model )
+            for name in sorted(nc.ncattrs()):
+                if name not in VOLATILE_ATTRIBUTES:
+                    update( 'attr:' + name, nc.getncattr(name) )
+            for name, dim in sorted(nc.dimensions.items()):
+                update( 'dim:' + name, len(dim) )
+            for name, var in sorted(nc.variables.items()):
+                var.set_auto_maskandscale( False )
+                update( 'var:' + name, str(var.dimensions) )
+                for attrName in sorted(var.ncattrs()):
+                    update( 'attr:' + name + ':' + attrName, var.getncattr(attrName) )
+                update( 'data:' + name, np.asarray(var[...]) )
+        finally:
+            nc.close()
+
+        return sha.hexdigest()
+
+    @staticmethod
+    def hashPath(filePath):
+        """
+        Path of the hidden sidecar file holding the content hash of a file
+        :param filePath: output file path
+        :return: sidecar file path
+        """
+
+        return os.path.join( os.path.dirname(filePath),
+                             '.' + os.path.basename(filePath) + '.sha256' )
+
+    @staticmethod
+    def storedHash(filePath):
+        """
+        Content hash stored with an output file
+        :param filePath: output file path
+        :return: hex digest, None if no hash is stored
+        """
+
+        try:
+            with open( netCDFWriter.hashPath(filePath), 'r' ) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    @staticmethod
+    def removeStoredHash(filePath):
+        """
+        Remove the content hash stored with an output file, if any
+        :param filePath: output file path
+        :return: None
+        """
+
+        try:
+            os.unlink( netCDFWriter.hashPath(filePath) )
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def writeFileAtomically(filePath, contents):
+        """
+        Write a file in one sequential write to a temporary file next to it,
+        then rename it into place, so the file is never seen partly written
+        :param filePath: output file path
+        :param contents: file contents
+        :return: None
+        """
+
+        tempPath = os.path.join( os.path.dirname(filePath),
+                                 '.' + os.path.basename(filePath) + '.' +
+                                 uuid.uuid4().hex[:8] + '.tmp' )
+        fd = os.open( tempPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666 )
+        try:
+            with os.fdopen( fd, 'wb' ) as f:
+                f.write( contents )
+                f.flush()
+                os.fsync( f.fileno() )
+            os.replace( tempPath, filePath )
+        except BaseException:
+            if os.path.exists(tempPath):
+                os.unlink(tempPath)
+            raise
+
     # abstract, implement in subclass
     def setupOutput(self):
         raise NotImplementedError()
@@ -0,0 +1,294 @@
+"""
+class: parquetWriter
+
+description: Output file writer for columnar Parquet datasets of profile
+data, for loading straight into dataframes. Like the dataExplorerNetCDFWriter,
+it takes as input the single profile netCDF files (or in-memory datasets)
+produced by the DAC writers, and writes one Parquet file per profile into a
+dataset partitioned by deployment and profile:
+
+    {trajectoryName}.parquet/deployment={deploymentId}/profile_id={id}/part-0.parquet
+
+Each row is one observation. The columns are the time dimensioned variables
+of the profile, the profile scalars (profile_time, profile_lat, profile_lon,
+u, v, ...) repeated on every row, and the trajectory and source file names,
+dictionary encoded. Variable attributes are kept in the field metadata and
+global attributes, platform and instrument variables in the schema metadata.
+
+Requires pyarrow.
+
+history:
+10/19/2026 created
+"""
+from FileWriter.fileWriter import fileWriter
+import logging
+import os
+import json
+import numpy as np
+from netCDF4 import Dataset, chartostring
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PARQUET_COMPRESSION = ['snappy', 'gzip', 'zstd', 'none']
+
+
+class parquetWriter( fileWriter ) :
+
+    def __init__( self ) :
+        super().__init__()
+
+        self._deploymentId = 'R00000'
+        self._trajectoryName = ''
+        self._inputPath = None
+        self._inputFiles = []
+        self._inputBuffers = {}
+        self._compression = 'snappy'
+
+        # internal variables
+        self.datasetPath = None
+        self.profileCount = 0
+
+    @property
+    def deploymentId(self):
+        return self._deploymentId
+
+    @deploymentId.setter
+    def deploymentId(self, id):
+        self._deploymentId = id
+
+    @property
+    def trajectoryName(self):
+        return self._trajectoryName
+
+    @trajectoryName.setter
+    def trajectoryName(self, name):
+        self._trajectoryName = name
+
+    @property
+    def inputPath(self):
+        if self._inputPath is None:
+            return self.outputPath
+        return self._inputPath
+
+    @inputPath.setter
+    def inputPath(self, path):
+        self._inputPath = path
+
+    @property
+    def inputFiles(self):
+        return self._inputFiles
+
+    @inputFiles.setter
+    def inputFiles(self, fileList):
+        self._inputFiles = fileList
+
+    @property
+    def inputBuffers(self):
+        return self._inputBuffers
+
+    @inputBuffers.setter
+    def inputBuffers(self, buffers):
+        self._inputBuffers = buffers
+
+    @property
+    def compression(self):
+        return self._compression
+
+    @compression.setter
+    def compression(self, codec):
+        if codec in PARQUET_COMPRESSION:
+            self._compression = codec
+        else:
+            logging.error('Unsupported Parquet compression ' + str(codec) +
+                          ', ignored')
+
+    # virtual method for preparing to write output
+    def setupOutput(self):
+        """
+        Create the partitioned dataset directory
+        :return:
+        """
+
+        self.datasetPath = None
+        self.profileCount = 0
+
+        if pa is None:
+            logging.error('pyarrow is required for Parquet output')
+            return
+
+        if len(self.trajectoryName) == 0 or len(self.inputFiles) == 0:
+            logging.error("Uninitialized inputs in setupOutput")
+            return
+
+        self.datasetPath = os.path.join( self.outputPath,
+                                         self.trajectoryName + '.parquet' )
+        os.makedirs( self.deploymentPath(), exist_ok=True )
+
+    # virtual method for writing output
+    def writeOutput(self):
+        """
+        Write one Parquet file per input profile
+        :return:
+        """
+
+        if self.datasetPath is None:
+            logging.error("WriteOutput called before setupOutput")
+            return
+
+        for filename in self.inputFiles:
+
+            ds = self.openInputFile( filename )
+            if ds is None:
+                continue
+
+            if 'time' in ds.dimensions and 'profile_id' in ds.variables:
+                self.writeProfile( ds )
+            else:
+                logging.info('No time dimension, not a profile: ' + filename)
+
+            ds.close()
+
+    # virtual method for output cleanup tasks
+    def cleanupOutput(self):
+        """
+        Nothing to close, each profile file is complete when written
+        :return:
+        """
+
+        logging.info( 'Wrote ' + str(self.profileCount) +
+                      ' Parquet profiles to ' + str(self.datasetPath) )
+
+    def deploymentPath(self):
+        return os.path.join( self.datasetPath,
+                             'deployment=' + str(self.deploymentId) )
+
+    def openInputFile(self, filename):
+        """
+        Open a profile input file, from inputBuffers if held in memory,
+        otherwise from the input path
+        :param filename:
+        :return: netCDF4.Dataset opened for reading, None if not found
+        """
+
+        if filename in self.inputBuffers:
+            return Dataset(filename, mode='r',
+                           memory=self.inputBuffers[filename])
+
+        filePath = os.path.join(self.inputPath, filename)
+        if os.path.exists(filePath):
+            return Dataset(filePath, mode='r')
+
+        return None
+
+    def writeProfile(self, ds):
+        """
+        Convert a single profile dataset to an Arrow table and write it to
+        the profile's partition
+        :param ds: netCDF4.Dataset of a DAC profile
+        :return: path of the Parquet file, None if skipped
+        """
+
+        profileId = int( ds.variables['profile_id'].getValue() )
+        profilePath = os.path.join( self.deploymentPath(),
+                                    'profile_id=' + str(profileId) )
+        filePath = os.path.join( profilePath, 'part-0.parquet' )
+        if os.path.exists(filePath) and self.overwriteExistingFiles == False:
+            logging.warning("File exists, overwrite not selected " + filePath)
+            return None
+
+        table = self.profileTable( ds )
+        os.makedirs( profilePath, exist_ok=True )
+        pq.write_table( table, filePath, compression=self.compression )
+        self.profileCount += 1
+
+        return filePath
+
+    def profileTable(self, ds):
+        """
+        Arrow table of a profile dataset, one row per observation
+        :param ds: netCDF4.Dataset of a DAC profile
+        :return: pyarrow.Table
+        """
+
+        rows = ds.dimensions['time'].size
+        fields = []
+        columns = []
+        containers = {}
+
+        for varName, var in ds.variables.items():
+
+            # partition key
+            if varName == 'profile_id':
+                continue
+
+            if var.dimensions == ('time',) and var.dtype.kind in 'fiub':
+                values = var[:]
+                column = pa.array( np.ma.getdata(values),
+                                   mask=np.ma.getmaskarray(values) )
+
+            elif var.ndim == 0 and parquetWriter.isContainer( var ):
+                containers[varName] = parquetWriter.attrsToStrings( var )
+                continue
+
+            elif var.ndim == 0 and var.dtype.kind in 'fiub':
+                # profile scalar, repeated on each row
+                value = var[...]
+                if np.ma.is_masked(value):
+                    column = pa.nulls( rows, type=pa.from_numpy_dtype(var.dtype) )
+                else:
+                    column = pa.array( np.full(rows, value, dtype=var.dtype) )
+
+            elif var.dtype == 'S1' and var.ndim == 1 and 'time' not in var.dimensions:
+                # string, dictionary encoded
+                column = pa.DictionaryArray.from_arrays(
+                    pa.array( np.zeros(rows, dtype=np.int32) ),
+                    pa.array( [str( chartostring(var[:]) )] ))
+
+            else:
+                logging.debug('Variable not written to Parquet: ' + varName)
+                continue
+
+            fields.append( pa.field( varName, column.type,
+                                     metadata=parquetWriter.attrsToStrings(var) ))
+            columns.append( column )
+
+        metadata = parquetWriter.attrsToStrings( ds )
+        metadata['deployment'] = str(self.deploymentId)
+        metadata['containers'] = json.dumps( containers )
+
+        return pa.Table.from_arrays( columns,
+                                     schema=pa.schema(fields, metadata=metadata) )
+
+    @staticmethod
+    def isContainer(var):
+        """
+        Platform, instrument and crs variables only hold attributes
+        :param var:
+        :return: True or False
+        """
+
+        return var.name == 'crs' or \
+            ('type' in var.ncattrs() and
+             var.getncattr('type') in ['platform', 'instrument'])
+
+    @staticmethod
+    def attrsToStrings(ncObject):
+        """
+        NetCDF attributes as a dictionary of strings, for Arrow metadata
+        :param ncObject: netCDF4 Dataset or Variable
+        :return: dictionary
+        """
+
+        attrs = {}
+        for attrName in ncObject.ncattrs():
+            if attrName != '_FillValue':
+                value = ncObject.getncattr(attrName)
+                if isinstance(value, np.ndarray):
+                    value = value.tolist()
+                attrs[attrName] = str(value)
+        return attrs
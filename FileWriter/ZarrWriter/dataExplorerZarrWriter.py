@@ -0,0 +1,434 @@
+"""
+class: dataExplorerZarrWriter
+
+description: Output file writer for a chunked Zarr directory store holding
+a whole trajectory, parallel to the dataExplorerNetCDFWriter. It takes the
+same inputs, the single profile netCDF files (or in-memory datasets) created
+by the DAC writers, and uses the same OOI Explorer variable names and
+trajectory, profile and observation dimensions (the padded layout):
+
+    {trajectoryName}.zarr/{variable}   (trajectory, profile, obs)
+
+Each profile is stored in chunks of its own, one chunk along the profile
+dimension, so the store is appendable: profiles of later runs are added to
+the end of the profile dimension (and the observation dimension grown to
+the longest profile) without rewriting those already stored. Profiles
+already in the store, by profile_id, are skipped unless overwriting.
+
+As no two profiles share a chunk, the profiles are written concurrently by
+a pool of worker threads. The input datasets are read one at a time, as
+the NetCDF library is not thread safe, and the reads overlap the writes.
+
+The store is written in Zarr format 2, with xarray's _ARRAY_DIMENSIONS
+attribute naming the dimensions of each array, and consolidated metadata.
+
+Requires zarr.
+
+history:
+10/19/2026 created
+10/19/2026 extents from the extent accumulator
+"""
+from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+import common.constants as cc
+import logging
+import os
+import numpy as np
+from netCDF4 import default_fillvals
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import zarr
+except ImportError:
+    zarr = None
+
+# Threads writing profile chunks, compression releases the GIL
+DEFAULT_WRITE_WORKERS = 4
+
+# Observations in a chunk of a time dimensioned variable
+DEFAULT_OBS_CHUNK_SIZE = 4096
+
+# Variables holding the trajectory extents, in actual_range attributes
+EXTENT_VARS = { 'time': 'time', 'precise_lat': 'lat',
+                'precise_lon': 'lon', 'depth': 'depth' }
+
+
+class dataExplorerZarrWriter( dataExplorerNetCDFWriter ) :
+
+    def __init__( self ) :
+        super().__init__()
+
+        self._workers = DEFAULT_WRITE_WORKERS
+        self._obsChunkSize = DEFAULT_OBS_CHUNK_SIZE
+
+        # internal variables
+        self.store = None
+        self.storePath = None
+        self.arrays = {}
+        self.profileIndexes = []
+        self.profileCount = 0
+        self.storedCount = 0
+        self.writtenCount = 0
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @workers.setter
+    def workers(self, count):
+        self._workers = max(1, count)
+
+    @property
+    def obsChunkSize(self):
+        return self._obsChunkSize
+
+    @obsChunkSize.setter
+    def obsChunkSize(self, size):
+        self._obsChunkSize = max(1, size)
+
+    # virtual method for preparing to write output
+    def setupOutput(self):
+        """
+        Open the trajectory store, creating it if needed, find where each
+        input profile goes in the profile dimension and create and size
+        the arrays
+        :return:
+        """
+
+        self.store = None
+        self.arrays = {}
+        self.writtenCount = 0
+
+        if zarr is None:
+            logging.error('zarr is required for Zarr output')
+            return
+
+        if not self.scanInputFiles():
+            return
+
+        self.storePath = os.path.join( self.outputPath,
+                                       self.trajectoryName + '.zarr' )
+        self.store = dataExplorerZarrWriter.openZarrGroup( self.storePath, 'a' )
+        for name, array in self.store.arrays():
+            self.arrays[name] = array
+
+        # Profiles already stored keep their place, new profiles are
+        # appended in input order
+
+        storedIndexes = {}
+        if 'profile_id' in self.arrays:
+            for index, profileId in enumerate( self.arrays['profile_id'][0, :] ):
+                storedIndexes[int(profileId)] = index
+
+        self.storedCount = len(storedIndexes)
+        self.profileCount = self.storedCount
+        self.profileIndexes = []
+        for profileId in self.profileIdList:
+            if int(profileId) not in storedIndexes:
+                self.profileIndexes.append( self.profileCount )
+                storedIndexes[int(profileId)] = self.profileCount
+                self.profileCount += 1
+            elif self.overwriteExistingFiles:
+                self.profileIndexes.append( storedIndexes[int(profileId)] )
+            else:
+                logging.warning('Profile ' + str(profileId) + ' in ' +
+                                self.storePath + ', overwrite not selected')
+                self.profileIndexes.append( None )
+
+        # The trajectory extent includes the profiles already stored
+
+        for outVarName, geoVarName in EXTENT_VARS.items():
+            if outVarName in self.arrays and \
+                    'actual_range' in self.arrays[outVarName].attrs:
+                self.extents.include( geoVarName,
+                                      *self.arrays[outVarName].attrs['actual_range'] )
+        self.extents.endProfile()
+
+        self.createArrays()
+        self.resizeArrays()
+
+    # virtual method for writing output
+    def writeOutput(self):
+        """
+        Write the input profiles to their chunks. Each profile is read in
+        this thread and written by a worker thread, with at most two
+        profiles per worker read ahead.
+        :return:
+        """
+
+        if self.store is None:
+            logging.error("WriteOutput called before setupOutput")
+            return
+
+        scalars = {}
+        with ThreadPoolExecutor( max_workers=self.workers ) as pool:
+            pending = set()
+            for filename, index, profileId in zip( self.profileFiles,
+                                                   self.profileIndexes,
+                                                   self.profileIdList ):
+                if index is None:
+                    continue
+
+                values = self.readProfile( filename, scalars )
+                if values is None:
+                    continue
+                self.extents.endProfile( int(profileId) )
+
+                pending.add( pool.submit( self.writeProfile, index, values ))
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait( pending, return_when=FIRST_COMPLETED )
+                    for future in done:
+                        future.result()
+                        self.writtenCount += 1
+
+            for future in pending:
+                future.result()
+                self.writtenCount += 1
+
+        for outVarName, value in scalars.items():
+            self.arrays[outVarName][...] = value
+
+    # virtual method for output cleanup tasks
+    def cleanupOutput(self):
+        """
+        Store the trajectory extents and consolidate the store metadata
+        :return:
+        """
+
+        if self.store is None:
+            return
+
+        if self.writtenCount > 0:
+            self.store.attrs.update( dataExplorerZarrWriter.jsonAttrs(
+                self.geospatialExtentAttrs() ))
+
+            for outVarName, geoVarName in EXTENT_VARS.items():
+                if outVarName in self.arrays:
+                    self.arrays[outVarName].attrs['actual_range'] = \
+                        dataExplorerZarrWriter.jsonAttrValue(
+                            self.extentLimits( geoVarName ))
+
+        if int(zarr.__version__.split('.')[0]) >= 3:
+            zarr.consolidate_metadata( self.storePath, zarr_format=2 )
+        else:
+            zarr.consolidate_metadata( self.storePath )
+
+        logging.info( 'Wrote ' + str(self.writtenCount) + ' profiles to ' +
+                      self.storePath + ', ' + str(self.profileCount) +
+                      ' profiles stored' )
+
+    def createArrays(self):
+        """
+        Use the first profile input file to create the global attributes
+        of a new store and any array not yet in the store
+        :return:
+        """
+
+        dsIn = self.openInputFile( self.profileFiles[0] )
+        if dsIn is None:
+            logging.error('No input files found, unable to create output arrays')
+            return
+
+        if len(self.arrays) == 0:
+            attrs = {}
+            for attrName in dsIn.ncattrs():
+                attrs[attrName] = dsIn.getncattr( attrName )
+            self.store.attrs.update( dataExplorerZarrWriter.jsonAttrs( attrs ))
+
+        if 'trajectory' not in self.arrays:
+            trajArray = self.createArray( 'trajectory', ('trajectory', 'traj_strlen',),
+                                          (1, len(self.trajectoryName)), 'S1', b'' )
+            trajArray.resize( (1, len(self.trajectoryName)) )
+            trajArray[0, :] = np.frombuffer( self.trajectoryName.encode(), dtype='S1' )
+            trajArray.attrs.update( { 'cf_role': 'trajectory_id',
+                                      'comment': 'A trajectory is one deployment',
+                                      'ioos_category': 'Identifier',
+                                      'long_name': 'Trajectory Name' } )
+
+        if 'profile_id' not in self.arrays:
+            profileIdArray = self.createArray( 'profile_id', ('trajectory', 'profile',),
+                                               (1, 1), 'i4', -999 )
+            profileIdArray.attrs.update( { 'ancillary_variables': 'time',
+                                           'cf_role': 'profile_id',
+                                           'comment': 'Sequential profile number within the trajectory',
+                                           'ioos_category': 'Identifier',
+                                           'long_name': 'Profile ID',
+                                           'valid_max': 2147483647,
+                                           'valid_min': 1 } )
+
+        for inVarName, inVar in dsIn.variables.items():
+
+            outVarName = self.dacVarNameToOoiVarName( inVarName )
+            if outVarName in self.arrays:
+                continue
+
+            if inVar.ndim == 0 and self.isScalarInExplorer( inVar ):
+                outDims = ()
+                chunks = ()
+            elif inVar.ndim == 0:
+                outDims = ('trajectory', 'profile',)
+                chunks = (1, 1)
+            elif 'time' in inVar.dimensions:
+                outDims = ('trajectory', 'profile', 'obs',)
+                chunks = (1, 1, self.obsChunkSize)
+            else:
+                outDims = ('trajectory', 'profile',) + inVar.dimensions
+                chunks = (1, 1) + inVar.shape
+
+            if "_FillValue" in inVar.ncattrs():
+                fillValue = inVar._FillValue
+            elif inVar.dtype == 'S1':
+                fillValue = b''
+            else:
+                fillValue = default_fillvals[inVar.dtype.str[1:]]
+
+            outArray = self.createArray( outVarName, outDims, chunks,
+                                         inVar.dtype, fillValue )
+            attrs = {}
+            for attrName in inVar.ncattrs():
+                if attrName == "ancillary_variables":
+                    attrs[attrName] = self.dacAttrValsToOoiAttrVals(
+                        inVar.getncattr(attrName) )
+                elif attrName != "_FillValue":
+                    attrs[attrName] = inVar.getncattr(attrName)
+            outArray.attrs.update( dataExplorerZarrWriter.jsonAttrs( attrs ))
+
+        dsIn.close()
+
+    def createArray(self, name, dims, chunks, dtype, fillValue):
+        """
+        Create an empty array, sized by resizeArrays
+        :param name: array name
+        :param dims: dimension names
+        :param chunks: chunk shape
+        :param dtype:
+        :param fillValue:
+        :return: zarr array
+        """
+
+        shape = tuple( 1 if dim == 'trajectory' else 0 for dim in dims )
+        if hasattr(self.store, 'create_array'):
+            array = self.store.create_array( name, shape=shape, chunks=chunks,
+                                             dtype=dtype, fill_value=fillValue )
+        else:
+            array = self.store.create_dataset( name, shape=shape, chunks=chunks,
+                                               dtype=dtype, fill_value=fillValue )
+        array.attrs['_ARRAY_DIMENSIONS'] = list(dims)
+        self.arrays[name] = array
+        return array
+
+    def resizeArrays(self):
+        """
+        Grow the profile and observation dimensions of all arrays to hold
+        the stored and input profiles, and the string dimensions to the
+        longest trajectory and source file names
+        :return:
+        """
+
+        dimSizes = { 'trajectory': 1,
+                     'profile': self.profileCount,
+                     'obs': self.maxObsPerProfile,
+                     'traj_strlen': len(self.trajectoryName),
+                     'source_file_strlen': len(self.sourceFile) }
+
+        for array in self.arrays.values():
+            dims = array.attrs['_ARRAY_DIMENSIONS']
+            shape = tuple( max(size, dimSizes.get(dim, size))
+                           for dim, size in zip(dims, array.shape) )
+            if shape != array.shape:
+                array.resize( shape )
+
+    def readProfile(self, filename, scalars):
+        """
+        Read the values of a profile input file for writing to its chunks.
+        Packed values are kept packed, missing values are set to the fill
+        value of the output array. The extents are updated.
+        :param filename: profile input file
+        :param scalars: dictionary of Explorer scalar values, updated
+        :return: dictionary of output array name to values, None if unread
+        """
+
+        ds = self.openInputFile( filename )
+        if ds is None:
+            return None
+        ds.set_auto_scale( False )
+
+        values = {}
+        for inVarName, inVar in ds.variables.items():
+
+            outVarName = self.dacVarNameToOoiVarName( inVarName )
+            if inVarName == 'trajectory' or outVarName not in self.arrays:
+                continue
+
+            outArray = self.arrays[outVarName]
+            inValues = inVar[:]
+
+            if inVarName in cc.EXTENT_VARIABLES:
+                self.updateExtents( inVarName, inValues )
+
+            if outArray.ndim == 0:
+                scalars[outVarName] = inVar.getValue()
+            else:
+                values[outVarName] = np.ma.filled( inValues, outArray.fill_value )
+
+        ds.close()
+        return values
+
+    def writeProfile(self, index, values):
+        """
+        Write the values of a profile to its chunks, runs on a worker thread.
+        A profile replacing a stored one is written over the whole
+        observation row, so that no values of the stored one are left.
+        :param index: profile index in the store
+        :param values: dictionary of output array name to values
+        :return: index
+        """
+
+        for outVarName, value in values.items():
+            outArray = self.arrays[outVarName]
+            if outArray.ndim == 2:
+                outArray[0, index] = value
+            elif index < self.storedCount:
+                row = np.full( outArray.shape[2], outArray.fill_value,
+                               dtype=outArray.dtype )
+                count = min( row.size, value.size )
+                row[0:count] = value[0:count]
+                outArray[0, index, :] = row
+            else:
+                count = min( outArray.shape[2], value.size )
+                outArray[0, index, 0:count] = value[0:count]
+
+        return index
+
+    @staticmethod
+    def openZarrGroup(path, mode):
+        """
+        Open a Zarr format 2 group, readable by zarr 2 and 3 and by xarray
+        :param path: directory store path
+        :param mode: zarr open mode
+        :return: zarr group
+        """
+
+        if int(zarr.__version__.split('.')[0]) >= 3:
+            return zarr.open_group( path, mode=mode, zarr_format=2 )
+        return zarr.open_group( path, mode=mode )
+
+    @staticmethod
+    def jsonAttrs(attrs):
+        """
+        NetCDF attribute values as JSON serializable values
+        :param attrs: dictionary of attribute name to value
+        :return: dictionary
+        """
+
+        return { attrName: dataExplorerZarrWriter.jsonAttrValue(value)
+                 for attrName, value in attrs.items() }
+
+    @staticmethod
+    def jsonAttrValue(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, tuple):
+            return [ dataExplorerZarrWriter.jsonAttrValue(v) for v in value ]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
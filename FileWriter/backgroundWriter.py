@@ -0,0 +1,128 @@
+"""
+class: backgroundWriter
+
+description: Writes output profiles on a dedicated thread, so the platform
+can compute the next profile while the last one is written. The platform
+submits each fully formatted profile along with the function that writes
+it. The writer thread writes them in order, from a bounded queue: submit
+blocks once queueSize profiles are waiting. The result, or the error, of
+each write is handed back with completed() and wait(), so the platform
+handles them on its own thread, profile by profile.
+
+With a queueSize of 0 no thread is started and each profile is written
+on submit.
+
+history:
+10/19/2026 created
+"""
+import queue
+import threading
+
+
+class backgroundWriter( ) :
+
+    def __init__( self, queueSize=2 ) :
+
+        self._queueSize = queueSize
+
+        # internal variables
+        self._pending = None
+        self._completions = queue.Queue()
+        self._writerThread = None
+
+    @property
+    def queueSize(self):
+        return self._queueSize
+
+    @queueSize.setter
+    def queueSize(self, size):
+        self._queueSize = size
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
+
+    def start(self):
+        """
+        Start the writer thread, unless writing on submit
+        :return: None
+        """
+
+        if self.queueSize <= 0 or self._writerThread is not None:
+            return
+
+        self._pending = queue.Queue( maxsize=self.queueSize )
+        self._writerThread = threading.Thread( target=self._writer,
+                                               name='profileWriter',
+                                               daemon=True )
+        self._writerThread.start()
+
+    def submit(self, key, writeFunction, *args):
+        """
+        Queue a profile for writing, blocking while the queue is full
+        :param key: identifies the profile in the completions
+        :param writeFunction: writes the profile, called with args
+        :param args:
+        :return: None
+        """
+
+        if self._writerThread is None:
+            self._completions.put( backgroundWriter._write( key, writeFunction, args ))
+        else:
+            self._pending.put( (key, writeFunction, args) )
+
+    def completed(self):
+        """
+        Writes completed since the last call, without waiting
+        :return: list of (key, result, error) tuples in submit order, error
+            is the exception raised by the write function, else None
+        """
+
+        completions = []
+        while True:
+            try:
+                completions.append( self._completions.get_nowait() )
+            except queue.Empty:
+                return completions
+
+    def wait(self):
+        """
+        Wait for all the queued profiles to be written
+        :return: list of (key, result, error) tuples, see completed
+        """
+
+        if self._writerThread is not None:
+            self._pending.join()
+        return self.completed()
+
+    def close(self):
+        """
+        Write the queued profiles and stop the writer thread. Completions
+        not yet collected remain available from completed().
+        :return: None
+        """
+
+        if self._writerThread is not None:
+            self._pending.put( None )
+            self._writerThread.join()
+            self._writerThread = None
+
+    def _writer(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                self._pending.task_done()
+                return
+            self._completions.put( backgroundWriter._write( *item ))
+            self._pending.task_done()
+
+    @staticmethod
+    def _write(key, writeFunction, args):
+        try:
+            return key, writeFunction( *args ), None
+        except Exception as e:
+            return key, None, e
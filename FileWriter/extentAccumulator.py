@@ -0,0 +1,210 @@
+"""
+class: extentAccumulator
+
+description: Running geospatial and temporal extents of the profiles of a
+trajectory, fed with the in-memory arrays of the time, lat, lon and depth
+variables while the writers format the profiles, so that no NetCDF
+variable need be read back to find them. For each variable the count of
+valid values and the min and max are kept: NaNs, masked values, the fill
+value and values outside the valid range are ignored, as they would be
+when reading the variable back with netCDF4. The extents of the profile
+being accumulated are folded into those of the trajectory by endProfile,
+which also keeps them by profile.
+
+history:
+10/19/2026 created
+"""
+import numpy as np
+
+
+class variableExtent( ) :
+
+    def __init__( self ) :
+
+        # count of valid values, min and max are NaN while there are none
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+
+    @property
+    def empty(self):
+        return bool(np.isnan(self.min))
+
+    def include(self, varMin, varMax, count=0):
+        """
+        Widen the extent to include the range [varMin, varMax]
+        :param varMin:
+        :param varMax:
+        :param count: valid values in the range
+        :return: None
+        """
+
+        empty = self.empty
+        self.count += count
+        if empty or varMin < self.min:
+            self.min = varMin
+        if empty or varMax > self.max:
+            self.max = varMax
+
+    def merge(self, extent):
+        """
+        Widen the extent to include another extent
+        :param extent: variableExtent
+        :return: None
+        """
+
+        if extent.empty:
+            self.count += extent.count
+        else:
+            self.include( extent.min, extent.max, extent.count )
+
+    def __repr__(self):
+        return "<variableExtent(count={:d}, min={}, max={})>".format(
+            self.count, self.min, self.max)
+
+
+class extentAccumulator( ) :
+
+    def __init__( self ) :
+
+        # internal variables
+        self._profile = {}
+        self._trajectory = {}
+        self._profileExtents = {}
+
+    @property
+    def profileExtents(self):
+        """Extents of each finished profile, by profile key"""
+        return self._profileExtents
+
+    def update(self, name, values, fillValue=None, validMin=None, validMax=None):
+        """
+        Widen the profile extent of a variable with its values. The min and
+        max keep the type of the values.
+        :param name: variable name
+        :param values: numeric array or masked array, or scalar
+        :param fillValue: values equal to it are ignored
+        :param validMin: values below it are ignored
+        :param validMax: values above it are ignored
+        :return: None
+        """
+
+        if values is None:
+            return
+
+        if np.ma.isMaskedArray(values):
+            data = np.ma.getdata(values)
+            valid = ~np.ma.getmaskarray(values)
+        else:
+            data = np.asarray(values)
+            valid = np.ones(data.shape, dtype=bool)
+        if data.dtype.kind not in 'iuf':
+            return
+
+        if data.dtype.kind == 'f':
+            valid &= np.isfinite(data)
+        if fillValue is not None:
+            valid &= data != fillValue
+        if validMin is not None:
+            valid &= data >= validMin
+        if validMax is not None:
+            valid &= data <= validMax
+
+        extent = self._profile.setdefault( name, variableExtent() )
+        count = int(np.count_nonzero(valid))
+        if count == 0:
+            return
+        if count < data.size:
+            data = data[valid]
+        extent.include( data.min(), data.max(), count )
+
+    def include(self, name, varMin, varMax, count=0):
+        """
+        Widen the profile extent of a variable with a range, such as the
+        stored extent of a trajectory being appended to
+        :param name: variable name
+        :param varMin:
+        :param varMax:
+        :param count: valid values in the range
+        :return: None
+        """
+
+        self._profile.setdefault( name, variableExtent() ).include(
+            varMin, varMax, count )
+
+    def endProfile(self, key=None):
+        """
+        Fold the profile extents into the trajectory extents and start the
+        next profile
+        :param key: keeps the profile extents in profileExtents if not None
+        :return: dictionary of variable name to variableExtent of the profile
+        """
+
+        profile = self._profile
+        for name, extent in profile.items():
+            self._trajectory.setdefault( name, variableExtent() ).merge( extent )
+        if key is not None:
+            self._profileExtents[key] = profile
+        self._profile = {}
+        return profile
+
+    def resetProfile(self):
+        """
+        Drop the extents of the profile being accumulated
+        :return: None
+        """
+
+        self._profile = {}
+
+    def reset(self):
+        """
+        Drop all extents
+        :return: None
+        """
+
+        self._profile = {}
+        self._trajectory = {}
+        self._profileExtents = {}
+
+    def profileExtent(self, name):
+        """
+        :param name: variable name
+        :return: variableExtent of the profile being accumulated, None if
+            the variable has not been seen
+        """
+
+        return self._profile.get( name )
+
+    def trajectoryExtent(self, name):
+        """
+        :param name: variable name
+        :return: variableExtent of the finished profiles, None if the
+            variable has not been seen
+        """
+
+        return self._trajectory.get( name )
+
+    def wktBounds(self, extents=None, latName='lat', lonName='lon'):
+        """
+        Well-known text polygon of the latitude/longitude extent, with
+        points in (lat lon) order
+        :param extents: dictionary of variable name to variableExtent, as
+            returned by endProfile, default the trajectory extents
+        :param latName: latitude variable name
+        :param lonName: longitude variable name
+        :return: polygon WKT string, None if either extent is empty
+        """
+
+        if extents is None:
+            extents = self._trajectory
+        lat = extents.get( latName )
+        lon = extents.get( lonName )
+        if lat is None or lon is None or lat.empty or lon.empty:
+            return None
+
+        return 'POLYGON ((' + \
+            str(lat.min) + ' ' + str(lon.min) + ', ' + \
+            str(lat.max) + ' ' + str(lon.min) + ', ' + \
+            str(lat.max) + ' ' + str(lon.max) + ', ' + \
+            str(lat.min) + ' ' + str(lon.max) + ', ' + \
+            str(lat.min) + ' ' + str(lon.min) + '))'
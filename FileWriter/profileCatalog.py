@@ -0,0 +1,332 @@
+"""
+class: profileCatalog
+
+description: Searchable catalog of the profile files produced, kept in a
+local SQLite database maintained by the profile writers as they write
+each file. A row per profile file holds its path, trajectory, profile id,
+start, end and mean time, lat/lon/depth extents (from the writer's extent
+accumulator), the variables present, the source data file and the content
+hash and modification time of the file. The hash of a file modified since
+it was cataloged, such as by a run without the catalog, is not used.
+
+The time and lat/lon extents are indexed in an R*Tree, when the SQLite
+library provides it, so that the profiles covering a time window and/or
+bounding box are found without opening any NetCDF file.
+
+The profile writers may run on the background writer thread, so the
+connection is shared between threads and serialized with a lock. Changes
+are committed in batches of batchSize rows and on close.
+
+history:
+10/19/2026 created
+"""
+import os
+import sqlite3
+import logging
+import datetime
+import threading
+
+# Profiles committed at once
+DEFAULT_BATCH_SIZE = 100
+
+# R*Tree bounds of a missing extent, matching any range
+UNBOUNDED = 1.0e38
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    trajectory TEXT,
+    profile_id INTEGER,
+    start_time REAL,
+    end_time REAL,
+    mean_time REAL,
+    lat_min REAL,
+    lat_max REAL,
+    lon_min REAL,
+    lon_max REAL,
+    depth_min REAL,
+    depth_max REAL,
+    variables TEXT,
+    source_file TEXT,
+    content_hash TEXT,
+    file_mtime INTEGER,
+    date_cataloged TEXT
+);
+CREATE INDEX IF NOT EXISTS profiles_trajectory
+    ON profiles (trajectory, profile_id);
+CREATE INDEX IF NOT EXISTS profiles_time
+    ON profiles (start_time, end_time);
+"""
+
+_BOUNDS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS profile_bounds USING rtree (
+    id, start_time, end_time, lat_min, lat_max, lon_min, lon_max
+);
+"""
+
+_COLUMNS = [ 'path', 'trajectory', 'profile_id', 'start_time', 'end_time',
+             'mean_time', 'lat_min', 'lat_max', 'lon_min', 'lon_max',
+             'depth_min', 'depth_max', 'variables', 'source_file',
+             'content_hash', 'file_mtime', 'date_cataloged' ]
+
+# Indexed ranges: query range name to the profile columns it overlaps
+_RANGES = { 'time': ('start_time', 'end_time'),
+            'lat': ('lat_min', 'lat_max'),
+            'lon': ('lon_min', 'lon_max'),
+            'depth': ('depth_min', 'depth_max') }
+
+
+class profileCatalog( ) :
+
+    def __init__( self, catalogPath, batchSize=DEFAULT_BATCH_SIZE ) :
+
+        self._catalogPath = catalogPath
+        self._batchSize = batchSize
+
+        # internal variables
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect( catalogPath, check_same_thread=False )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript( _SCHEMA )
+
+        # the R*Tree module is optional in SQLite builds, without it the
+        # time index alone is used
+        try:
+            self._conn.executescript( _BOUNDS_SCHEMA )
+            self.spatialIndex = True
+        except sqlite3.OperationalError as e:
+            logging.warning( 'Profile catalog without spatial index: ' + str(e) )
+            self.spatialIndex = False
+        self._conn.commit()
+
+    @property
+    def catalogPath(self):
+        return self._catalogPath
+
+    @property
+    def batchSize(self):
+        return self._batchSize
+
+    @batchSize.setter
+    def batchSize(self, size):
+        self._batchSize = size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
+
+    def write(self):
+        """
+        Commit the pending changes
+        :return: None
+        """
+
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        """
+        Commit the pending changes and close the catalog
+        :return: None
+        """
+
+        if self._conn is not None:
+            self.write()
+            self._conn.close()
+            self._conn = None
+
+    def addProfile(self, filePath, trajectory, profileId, extents,
+                   variables, sourceFile, contentHash=None):
+        """
+        Add or replace the row of a profile file
+        :param filePath: profile file path, stored as an absolute path
+        :param trajectory: trajectory name
+        :param profileId: profile id
+        :param extents: dictionary of extent variable name (time, lat,
+            lon, depth) to variableExtent, see extentAccumulator
+        :param variables: names of the variables in the file
+        :param sourceFile: source data file name
+        :param contentHash: content hash of the file
+        :return: None
+        """
+
+        row = { 'path': os.path.abspath(filePath),
+                'trajectory': trajectory,
+                'profile_id': None if profileId is None else int(profileId),
+                'variables': ','.join( variables ),
+                'source_file': sourceFile,
+                'content_hash': contentHash,
+                'file_mtime': profileCatalog.fileModified( filePath ),
+                'date_cataloged': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ') }
+        for name, (minColumn, maxColumn) in _RANGES.items():
+            row[minColumn], row[maxColumn] = \
+                profileCatalog.extentRange( extents, name )
+        row['mean_time'] = None
+        if row['start_time'] is not None:
+            row['mean_time'] = (row['start_time'] + row['end_time']) / 2.0
+
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO profiles (' + ', '.join(_COLUMNS) + ') VALUES (' +
+                ', '.join( ':' + column for column in _COLUMNS ) + ') ' +
+                'ON CONFLICT (path) DO UPDATE SET ' +
+                ', '.join( column + ' = excluded.' + column
+                           for column in _COLUMNS[1:] ), row )
+            if self.spatialIndex:
+                rowId = self._conn.execute( 'SELECT id FROM profiles WHERE path = ?',
+                                            (row['path'],) ).fetchone()[0]
+                bounds = [ rowId ]
+                for name in ('time', 'lat', 'lon'):
+                    minColumn, maxColumn = _RANGES[name]
+                    if row[minColumn] is None:
+                        bounds += [ -UNBOUNDED, UNBOUNDED ]
+                    else:
+                        bounds += [ row[minColumn], row[maxColumn] ]
+                self._conn.execute( 'INSERT OR REPLACE INTO profile_bounds '
+                                    'VALUES (?, ?, ?, ?, ?, ?, ?)', bounds )
+
+            self._pending += 1
+            if self._pending >= self.batchSize:
+                self._conn.commit()
+                self._pending = 0
+
+    def removeProfile(self, filePath):
+        """
+        Remove the row of a profile file
+        :param filePath: profile file path
+        :return: None
+        """
+
+        with self._lock:
+            path = os.path.abspath(filePath)
+            if self.spatialIndex:
+                self._conn.execute( 'DELETE FROM profile_bounds WHERE id IN '
+                                    '(SELECT id FROM profiles WHERE path = ?)', (path,) )
+            self._conn.execute( 'DELETE FROM profiles WHERE path = ?', (path,) )
+            self._pending += 1
+
+    def contentHash(self, filePath):
+        """
+        Content hash cataloged for a profile file
+        :param filePath: profile file path
+        :return: hex digest, None if the file is not cataloged or has been
+            modified since
+        """
+
+        with self._lock:
+            row = self._conn.execute( 'SELECT content_hash, file_mtime FROM profiles '
+                                      'WHERE path = ?',
+                                      (os.path.abspath(filePath),) ).fetchone()
+        if row is None or row[1] != profileCatalog.fileModified( filePath ):
+            return None
+        return row[0]
+
+    def query(self, startTime=None, endTime=None, latRange=None, lonRange=None,
+              depthRange=None, trajectory=None, variables=None, directory=None):
+        """
+        Profiles overlapping a time window and a lat/lon/depth box. Unset
+        limits are not constrained, profiles without an extent constrained
+        by a limit do not match.
+        :param startTime: window start, seconds since 1970-01-01
+        :param endTime: window end, seconds since 1970-01-01
+        :param latRange: (min, max) latitude
+        :param lonRange: (min, max) longitude
+        :param depthRange: (min, max) depth
+        :param trajectory: trajectory name
+        :param variables: names of variables the profiles must hold
+        :param directory: directory holding the profile files
+        :return: list of row dictionaries, by start time
+        """
+
+        ranges = { 'time': (startTime, endTime), 'lat': latRange or (None, None),
+                   'lon': lonRange or (None, None), 'depth': depthRange or (None, None) }
+
+        sql = 'SELECT p.* FROM profiles p'
+        clauses = []
+        params = []
+        if self.spatialIndex and any( ranges[name] != (None, None)
+                                      for name in ('time', 'lat', 'lon') ):
+            sql += ' JOIN profile_bounds b ON b.id = p.id'
+            for name in ('time', 'lat', 'lon'):
+                clauses, params = profileCatalog.overlapClauses(
+                    'b', _RANGES[name], ranges[name], clauses, params )
+
+        for name in ('time', 'lat', 'lon', 'depth'):
+            clauses, params = profileCatalog.overlapClauses(
+                'p', _RANGES[name], ranges[name], clauses, params )
+
+        if trajectory is not None:
+            clauses.append( 'p.trajectory = ?' )
+            params.append( trajectory )
+        if directory is not None:
+            clauses.append( 'p.path LIKE ? ESCAPE ?' )
+            directory = os.path.join( os.path.abspath(directory), '' )
+            params += [ directory.replace('\\', '\\\\').replace('%', '\\%').
+                        replace('_', '\\_') + '%', '\\' ]
+
+        if len(clauses) > 0:
+            sql += ' WHERE ' + ' AND '.join( clauses )
+        sql += ' ORDER BY p.start_time, p.path'
+
+        with self._lock:
+            rows = [ dict(row) for row in self._conn.execute( sql, params ) ]
+
+        if directory is not None:
+            rows = [ row for row in rows if os.path.dirname(row['path']) ==
+                     os.path.dirname(directory) ]
+        if variables:
+            rows = [ row for row in rows
+                     if set(variables).issubset( row['variables'].split(',') ) ]
+        return rows
+
+    @staticmethod
+    def overlapClauses(table, columns, limits, clauses, params):
+        """
+        SQL conditions of a range overlapping limits
+        :param table: table alias
+        :param columns: (min column, max column) of the range
+        :param limits: (min, max), either may be None
+        :param clauses: conditions, appended to
+        :param params: parameters, appended to
+        :return: clauses, params
+        """
+
+        low, high = limits
+        if low is not None:
+            clauses.append( table + '.' + columns[1] + ' >= ?' )
+            params.append( low )
+        if high is not None:
+            clauses.append( table + '.' + columns[0] + ' <= ?' )
+            params.append( high )
+        return clauses, params
+
+    @staticmethod
+    def fileModified(filePath):
+        """
+        :param filePath: file path
+        :return: modification time in nanoseconds, None if there is no file
+        """
+
+        try:
+            return os.stat( filePath ).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def extentRange(extents, name):
+        """
+        :param extents: dictionary of extent variable name to variableExtent
+        :param name: extent variable name
+        :return: (min, max) as floats, (None, None) if there is no extent
+        """
+
+        extent = None if extents is None else extents.get( name )
+        if extent is None or extent.empty:
+            return None, None
+        return float(extent.min), float(extent.max)
@@ -13,6 +13,9 @@ from FileReader.AuvReader.remus600SubsetDataReader import remus600SubsetDataRead
 from DataProcessor.AuvProcessor.remus600Processor import remus600Processor
 from FileWriter.NetCDFWriter.dacNetCDFWriter import dacNetCDFWriter
 from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+from FileWriter.ParquetWriter.parquetWriter import parquetWriter
+from FileWriter.ZarrWriter.dataExplorerZarrWriter import dataExplorerZarrWriter
+from FileWriter.backgroundWriter import backgroundWriter
 import common.constants as cc
 import tempfile
 import FileReader.AuvReader.remus600SubsetData as r600data
@@ -225,6 +228,16 @@ class remus600Platform( auvPlatform ) :
         self.outputFileWriter.overwriteExistingFiles = self.replaceOutputFiles
         self.outputFileWriter.outputCompressionLevel = self.outputCompression
         self.outputFileWriter.writeFormat = self.outputFormat
+        self.outputFileWriter.engine = self.outputEngine
+        self.outputFileWriter.skipUnchanged = self.skipUnchanged
+
+        # OOI Explorer only (or Parquet only), profiles are kept in memory,
+        # not written for DAC
+
+        self.outputFileWriter.inMemory = \
+            self.targetHost not in cc.DAC_FILE_TARGETS
+
+        self.openCatalog()
 
     def FormatData(self ):
         """
@@ -250,8 +263,13 @@ class remus600Platform( auvPlatform ) :
             logging.debug( 'Processing ' + dataFile )
 
             outputFiles = []
+            outputBuffers = {}
+
+            # profiles are written by a background writer thread while
+            # the next ones are formatted
 
-            with tempfile.TemporaryDirectory() as tempPath:
+            with tempfile.TemporaryDirectory() as tempPath, \
+                    backgroundWriter( self.writeQueue ) as profileWriter:
 
                 # read in the subset data file
 
@@ -321,33 +339,39 @@ class remus600Platform( auvPlatform ) :
 
                         # Generate an output file
 
-                        self.outputFileWriter.setupOutput()
-                        self.outputFileWriter.writeOutput()
-                        self.outputFileWriter.cleanupOutput()
+                        profileWriter.submit( (profileId, filename),
+                                              remus600Platform.writeProfile,
+                                              self.outputFileWriter.profileCopy() )
 
                     except Exception as e:
                         logging.warning( "Profile " + str(profileId) + " invalid, ignored ")
 
+                    self.profilesWritten( profileWriter.completed(), outputBuffers )
                     profileId = profileId + 1
 
+            self.profilesWritten( profileWriter.completed(), outputBuffers )
+
 
             # If output target is OOI Explorer, feed the output
             # files formatted for GliderDAC to the OOI Explorer
-            # file writer for reformatting.
+            # file writer for reformatting (in memory for Explorer only).
 
-            if self.targetHost == cc.OOI_EXPLORER_TARGET:
+            if self.targetHost in cc.EXPLORER_TARGETS:
                 if len(outputFiles) > 0:
                     deWriter = dataExplorerNetCDFWriter()
                     deWriter.outputPath = self.outputPath
                     deWriter.overwriteExistingFiles = self.replaceOutputFiles
                     deWriter.outputCompressionLevel = self.outputCompression
                     deWriter.writeFormat = self.outputFormat
+                    deWriter.engine = self.outputEngine
+                    deWriter.layout = self.explorerLayout
                     deWriter.deploymentId = 'R' + \
                        self.deploymentCfg['global_attributes']['deployment_number']
                     deWriter.trajectoryName = self.deploymentCfg['trajectory_name']
                     deWriter.trajectoryDateTime = self.deploymentCfg['trajectory_datetime']
                     deWriter.sourceFile = dataFile
                     deWriter.inputFiles = outputFiles
+                    deWriter.inputBuffers = outputBuffers
 
                     deWriter.setupOutput()
                     deWriter.writeOutput()
@@ -356,14 +380,89 @@ class remus600Platform( auvPlatform ) :
                     logging.warning('No output NetCDF files produced, conversion to OOI format skipped.')
                     ret = -1
 
+            # If Parquet is also targeted, write the same profiles to the
+            # partitioned Parquet dataset
+
+            if cc.PARQUET_TARGET in self.targetHosts:
+                if len(outputFiles) > 0:
+                    pqWriter = parquetWriter()
+                    pqWriter.outputPath = self.outputPath
+                    pqWriter.overwriteExistingFiles = self.replaceOutputFiles
+                    pqWriter.deploymentId = 'R' + \
+                       self.deploymentCfg['global_attributes']['deployment_number']
+                    pqWriter.trajectoryName = self.deploymentCfg['trajectory_name']
+                    pqWriter.inputFiles = outputFiles
+                    pqWriter.inputBuffers = outputBuffers
+
+                    pqWriter.setupOutput()
+                    pqWriter.writeOutput()
+                    pqWriter.cleanupOutput()
+                else:
+                    logging.warning('No output NetCDF files produced, conversion to Parquet skipped.')
+                    ret = -1
+
+            # If Zarr is also targeted, append the profiles to the
+            # trajectory Zarr store
+
+            if cc.ZARR_TARGET in self.targetHosts:
+                if len(outputFiles) > 0:
+                    zWriter = dataExplorerZarrWriter()
+                    zWriter.outputPath = self.outputPath
+                    zWriter.overwriteExistingFiles = self.replaceOutputFiles
+                    zWriter.deploymentId = 'R' + \
+                       self.deploymentCfg['global_attributes']['deployment_number']
+                    zWriter.trajectoryName = self.deploymentCfg['trajectory_name']
+                    zWriter.trajectoryDateTime = self.deploymentCfg['trajectory_datetime']
+                    zWriter.sourceFile = dataFile
+                    zWriter.inputFiles = outputFiles
+                    zWriter.inputBuffers = outputBuffers
+
+                    zWriter.setupOutput()
+                    zWriter.writeOutput()
+                    zWriter.cleanupOutput()
+                else:
+                    logging.warning('No output NetCDF files produced, conversion to Zarr skipped.')
+                    ret = -1
+
         return ret
 
+    @staticmethod
+    def writeProfile( profileWriter ):
+        """
+        Write a formatted profile, on the background writer thread
+        :param profileWriter: dacNetCDFWriter holding the profile
+        :return: contents of the profile if in memory, else None
+        """
+
+        profileWriter.setupOutput()
+        profileWriter.writeOutput()
+        profileWriter.cleanupOutput()
+        if profileWriter.inMemory:
+            return profileWriter.memoryBuffer
+        return None
+
+    def profilesWritten( self, completions, outputBuffers ):
+        """
+        Handle the profiles written by the background writer
+        :param completions: (key, result, error) tuples of the writer
+        :param outputBuffers: in-memory profile contents, by file name
+        :return: None
+        """
+
+        for (profileId, filename), buffer, error in completions:
+            if error is not None:
+                logging.warning( "Profile " + str(profileId) + " invalid, ignored ")
+            elif buffer is not None:
+                outputBuffers[filename] = buffer
+
     def cleanupFormatting(self):
         """
         Virtual method for performing post data formatting cleanup activities
         :return: 0
         """
 
+        self.closeCatalog()
+
         return 0
 
     def formatProfileData( self, profileId, profileStartTime,
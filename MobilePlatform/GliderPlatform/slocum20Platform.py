@@ -11,6 +11,9 @@ history:
 import os
 import logging
 import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 from MobilePlatform.GliderPlatform.gliderPlatform import gliderPlatform
@@ -19,11 +22,17 @@ from FileReader.GliderReader.slocum20DataReader import slocum20DataReader
 from DataProcessor.GliderProcessor.slocum20Processor import slocum20Processor
 from FileWriter.NetCDFWriter.dacLegacyNetCDFWriter import dacLegacyNetCDFWriter
 from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+from FileWriter.ParquetWriter.parquetWriter import parquetWriter
+from FileWriter.ZarrWriter.dataExplorerZarrWriter import dataExplorerZarrWriter
+from FileWriter.backgroundWriter import backgroundWriter
 from legacy.gliderdac.ooidac.constants import LLAT_SENSORS
 from legacy.gliderdac.dba_file_sorter import sort_function
 from legacy.gliderdac.ooidac.validate import validate_sensors, validate_ngdac_var_names
 from legacy.gliderdac.ooidac.data_classes import DbaData
+from legacy.gliderdac.ooidac.readers.slocum import DbaCache, parse_dba_header
 from legacy.gliderdac.ooidac.data_checks import check_file_goodness
+from legacy.gliderdac.ooidac.manifest import open_status
+from legacy.gliderdac.ooidac.fill import configured_fills
 import common.constants as cc
 
 class slocum20Platform( gliderPlatform ) :
@@ -46,8 +55,12 @@ class slocum20Platform( gliderPlatform ) :
         self._globalAttribs = None
         self._instrumentCfgs = None
         self._status = None
+        self._statusManifest = False
+        self._manifest = None
         self._ctdSensorPrefix = 'sci'
         self._startProfileId = 0
+        self._prefetchSegments = 2
+        self._prescanWorkers = 8
 
         # create Slocum 2.0 specific worker objects
 
@@ -56,6 +69,12 @@ class slocum20Platform( gliderPlatform ) :
         self.dataProcessor = slocum20Processor()
         self.outputFileWriter = dacLegacyNetCDFWriter()
 
+        # parsed segments are shared by the reader and the velocity look
+        # ahead in the processor so each file is only read once per run
+        self.dbaCache = DbaCache()
+        self.dataFileReader.dbaCache = self.dbaCache
+        self.dataProcessor.dbaCache = self.dbaCache
+
         # Any overrides of default file readers/writers/processors goes here
 
     @property
@@ -138,6 +157,22 @@ class slocum20Platform( gliderPlatform ) :
     def status(self, newstatus):
         self._status = newstatus
 
+    @property
+    def statusManifest(self):
+        return self._statusManifest
+
+    @statusManifest.setter
+    def statusManifest(self, useManifest):
+        self._statusManifest = useManifest
+
+    @property
+    def manifest(self):
+        return self._manifest
+
+    @manifest.setter
+    def manifest(self, newmanifest):
+        self._manifest = newmanifest
+
     @property
     def cdtSensorPrefix(self):
         return self._cdtSensorPrefix
@@ -154,6 +189,22 @@ class slocum20Platform( gliderPlatform ) :
     def startProfileId(self, id):
         self._startProfileId = id
 
+    @property
+    def prefetchSegments(self):
+        return self._prefetchSegments
+
+    @prefetchSegments.setter
+    def prefetchSegments(self, count):
+        self._prefetchSegments = count
+
+    @property
+    def prescanWorkers(self):
+        return self._prescanWorkers
+
+    @prescanWorkers.setter
+    def prescanWorkers(self, count):
+        self._prescanWorkers = count
+
     # virtual method, implemented here
     def validateSettings(self):
         """
@@ -168,7 +219,10 @@ class slocum20Platform( gliderPlatform ) :
 
         # Extract platform specific args into object vars
         # Platform specific args are passed in a dictionary
-        # Slocum 2.0 supports ctd_sensor_prefix and start_profile_id
+        # Slocum 2.0 supports ctd_sensor_prefix, start_profile_id,
+        # prefetch_segments, status_manifest, dr_correction and the profile
+        # discovery min_profile_depth, profile_grid_interval and
+        # smoothing_window_size
 
         if 'ctd_sensor_prefix' in self.platformArgs :
             self.ctdSensorPrefix = self.platformArgs['ctd_sensor_prefix']
@@ -176,6 +230,62 @@ class slocum20Platform( gliderPlatform ) :
         if 'start_profile_id' in self.platformArgs :
             self.startProfileId = self.platformArgs['start_profile_id']
 
+        if 'prefetch_segments' in self.platformArgs :
+            self.prefetchSegments = self.platformArgs['prefetch_segments']
+
+        if 'status_manifest' in self.platformArgs :
+            self.statusManifest = self.platformArgs['status_manifest']
+
+        if 'dr_correction' in self.platformArgs :
+            self.dataProcessor.drCorrection = self.platformArgs['dr_correction']
+
+        segmenter = self.dataProcessor.profileSegmenter
+        if 'min_profile_depth' in self.platformArgs :
+            segmenter.minProfileDepth = self.platformArgs['min_profile_depth']
+
+        if 'profile_grid_interval' in self.platformArgs :
+            self.dataProcessor.profileGridInterval = \
+                self.platformArgs['profile_grid_interval']
+
+        if 'smoothing_window_size' in self.platformArgs :
+            segmenter.smoothingWindowSize = self.platformArgs['smoothing_window_size']
+
+        # prefetchSegments must be a non-negative integer (0 disables)
+
+        if not isinstance(self.prefetchSegments, int) or self.prefetchSegments < 0:
+            logging.error( 'Slocum 2.0 glider platform requires a '
+                           'prefetch_segments value >= 0')
+            ret = -1
+
+        if not isinstance(self.statusManifest, bool):
+            logging.error( 'Slocum 2.0 glider platform requires a '
+                           'status_manifest value of true or false')
+            ret = -1
+
+        if not isinstance(self.dataProcessor.drCorrection, bool):
+            logging.error( 'Slocum 2.0 glider platform requires a '
+                           'dr_correction value of true or false')
+            ret = -1
+
+        # profile discovery thresholds must be positive numbers, the
+        # smoothing window a number of points
+
+        for name, value in (('min_profile_depth', segmenter.minProfileDepth),
+                            ('profile_grid_interval',
+                             self.dataProcessor.profileGridInterval)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                    or value <= 0:
+                logging.error( 'Slocum 2.0 glider platform requires a '
+                               '{:s} value > 0'.format(name))
+                ret = -1
+
+        if isinstance(segmenter.smoothingWindowSize, bool) or \
+                not isinstance(segmenter.smoothingWindowSize, int) or \
+                segmenter.smoothingWindowSize < 1:
+            logging.error( 'Slocum 2.0 glider platform requires a '
+                           'smoothing_window_size value >= 1')
+            ret = -1
+
         # ctdSensorPrefix must be 'sci' or 'm'
 
         if self.ctdSensorPrefix not in ['sci', 'm']:
@@ -247,8 +357,18 @@ class slocum20Platform( gliderPlatform ) :
 
         # Create a status.json file in the config directory to hold
         # information from the latest run
+        # With status_manifest, the status is kept in a SQLite manifest
+        # (status.db), seeded from status.json and exported to it after
+        # formatting
         status_path = os.path.join(self.cfgPath, 'status.json')
-        if not os.path.exists(status_path):
+        if self.statusManifest:
+            self.manifest = open_status(self.cfgPath, use_manifest=True)
+            self.status = self.manifest.info
+            if 'nc_directory' not in self.status:
+                self.status['raw_directory'] = os.path.dirname(
+                    os.path.realpath(self.dataFiles[0]))
+                self.status['nc_directory'] = self.outputPath
+        elif not os.path.exists(status_path):
             self.status = {
                 "history": "", "date_created": "", "date_modified": "",
                 "date_issued": "", "version": "", "uuid": "",
@@ -275,6 +395,8 @@ class slocum20Platform( gliderPlatform ) :
         self.outputFileWriter.overwriteExistingFiles = self.replaceOutputFiles
         self.outputFileWriter.compressionLevel = self.outputCompression
         self.outputFileWriter.outputFormat = self.outputFormat
+        self.outputFileWriter.engine = self.outputEngine
+        self.outputFileWriter.skipUnchanged = self.skipUnchanged
         self.outputFileWriter.startProfileId = self.startProfileId
         if self.startProfileId >= 1:
             self.outputFileWriter.profileId = self.startProfileId
@@ -282,6 +404,120 @@ class slocum20Platform( gliderPlatform ) :
         self.outputFileWriter.deploymentAttributes = self.deploymentDefs
         self.outputFileWriter.instrumentAttributes = self.instrumentCfgs
         self.outputFileWriter.setup()
+        self.openCatalog()
+
+        # OOI Explorer only (or Parquet only), profiles are kept in memory,
+        # not written for DAC
+        self.outputFileWriter.inMemory = \
+            self.targetHost not in cc.DAC_FILE_TARGETS
+
+    def _prescanDataFiles(self, dataFiles):
+        """
+        Read only the ASCII headers of the data files, in parallel, and drop
+        the files not worth parsing: missing or unreadable files, STATUS.MI,
+        LASTGASP.MI and INITIAL.MI missions, files without data rows and
+        repeats of a segment already listed.
+        :param dataFiles: sorted data files
+        :return: (files to process, list of (file, reason) skipped)
+        """
+
+        workers = max(1, min(self.prescanWorkers, len(dataFiles)))
+        with ThreadPoolExecutor( max_workers=workers ) as executor:
+            headers = list( executor.map(
+                lambda dataFile: parse_dba_header( dataFile, check_data=True ),
+                dataFiles ))
+
+        keep = []
+        skipped = []
+        segments = set()
+        for dataFile, header in zip( dataFiles, headers ):
+            if not os.path.isfile( dataFile ):
+                skipped.append( (dataFile, 'missing') )
+                continue
+            if header is None:
+                skipped.append( (dataFile, 'unreadable header') )
+                continue
+
+            mission = header.get( 'mission_name', '' ).upper()
+            if mission in ('STATUS.MI', 'LASTGASP.MI', 'INITIAL.MI'):
+                skipped.append( (dataFile, mission) )
+                continue
+            if not header['has_data']:
+                skipped.append( (dataFile, 'empty') )
+                continue
+
+            segment = header.get( 'filename_label', header['full_path'] )
+            if segment in segments:
+                skipped.append( (dataFile, 'duplicate') )
+                continue
+            segments.add( segment )
+            keep.append( dataFile )
+
+        return keep, skipped
+
+    def _readDataFiles(self, dataFiles):
+        """
+        Generator over the sorted data files, yielding (dataFile, dba) pairs.
+        dba is None for files that do not exist.  If prefetchSegments > 0,
+        a reader thread parses up to that many segments ahead of the one
+        being processed, overlapping file I/O with processing and writing.
+        Prefetched parses also land in dbaCache, where the velocity look
+        ahead finds them.
+        :return: generator of (dataFile, DbaData) tuples
+        """
+
+        if self.prefetchSegments <= 0:
+            for dataFile in dataFiles:
+                dba = None
+                if os.path.isfile( dataFile ):
+                    dba = self.dataFileReader.readIntoDbaData( dataFile )
+                yield dataFile, dba
+            return
+
+        # bounded queue, the reader blocks once prefetchSegments are waiting
+        segments = queue.Queue( maxsize=self.prefetchSegments )
+        done = threading.Event()
+        endOfFiles = object()
+
+        def reader():
+            try:
+                for dataFile in dataFiles:
+                    dba = None
+                    if os.path.isfile( dataFile ):
+                        dba = self.dataFileReader.readIntoDbaData( dataFile )
+                    item = (dataFile, dba)
+                    while not done.is_set():
+                        try:
+                            segments.put( item, timeout=0.5 )
+                            break
+                        except queue.Full:
+                            pass
+                    if done.is_set():
+                        return
+                item = endOfFiles
+            except Exception as e:
+                item = e
+            while not done.is_set():
+                try:
+                    segments.put( item, timeout=0.5 )
+                    return
+                except queue.Full:
+                    pass
+
+        readerThread = threading.Thread( target=reader, name='dbaPrefetch', daemon=True )
+        readerThread.start()
+        try:
+            while True:
+                item = segments.get()
+                if item is endOfFiles:
+                    break
+                if isinstance( item, Exception ):
+                    raise item
+                yield item
+        finally:
+            # release the reader if processing stopped early
+            done.set()
+            readerThread.join()
 
     # virtual method, implemented here
     def FormatData( self ):
@@ -298,6 +534,7 @@ class slocum20Platform( gliderPlatform ) :
 
         # Write one NetCDF file for each input file
         output_nc_files = []
+        output_nc_buffers = {}
         source_dba_files = []
         processed_dbas = []
         profile_to_data_map = []
@@ -311,103 +548,178 @@ class slocum20Platform( gliderPlatform ) :
                 var_processing[var_defs] = self.cfgSensorDefs[var_defs].pop(
                     "processing")
 
+        # per sensor gap fill methods (attitude, CTD), the "fill" entries of
+        # the processing blocks
+        try:
+            self.dataProcessor.fillMethods = configured_fills(var_processing)
+        except ValueError as e:
+            logging.error('Invalid sensor_defs.json fill method: {}'.format(e))
+            return -1
+
         # need slocum input files sorted by mission and segment
         self.dataFiles.sort(key=sort_function)
 
+        # drop excluded missions, empty files and duplicates from their
+        # headers before any table parsing; the processor keeps the full
+        # list for the velocity look ahead
+        dataFiles, skipped = self._prescanDataFiles( self.dataFiles )
+        for dataFile, reason in skipped:
+            if reason == 'missing':
+                logging.error('Invalid dba file specified: {:s}'.format(dataFile))
+                ret = -1
+            elif reason in ('unreadable header', 'empty'):
+                logging.warning('Skipping {:s} data file: {:s}'.format(reason, dataFile))
+                ret = -1
+            else:
+                logging.info('Skipping {:s} data file: {:s}'.format(reason, dataFile))
+                # skip source file in future runs by adding to status
+                if self.manifest is not None and reason != 'duplicate':
+                    self.manifest.add_src(dataFile)
+        if skipped:
+            logging.info('Pre-scan skipped {:d} of {:d} data files'.format(
+                len(skipped), len(self.dataFiles)))
+
+        # hold the prefetched segments plus the velocity look ahead
+        self.dbaCache.clear()
+        self.dbaCache.max_segments = max(4, self.prefetchSegments + 3)
+
         # setup multiple log formatters (for header, data logging)
         hdrFormat = logging.Formatter( cc.LOG_HEADER_FORMAT )
         dataFormat = logging.Formatter( cc.LOG_PROCESSING_FORMAT )
 
-        for dataFile in self.dataFiles:
+        # write the profiles on a background writer thread, overlapping
+        # their output with the processing of the following profiles; the
+        # results are handled here, on this thread, as they complete
+        def profilesWritten( completions ):
+            failures = 0
+            for (dataFile, profileIndex), written, error in completions:
+                if profileIndex is None:
+                    processed_dbas.append(os.path.basename(dataFile))
+                    if self.manifest is not None and not self.outputFileWriter.inMemory:
+                        self.manifest.add_src(dataFile)
+                    continue
+                if error is not None:
+                    logging.error('Profile {:d} of {:s} not written: {}'.format(
+                        profileIndex + 1, dataFile, error))
+                    failures += 1
+                    continue
+                if written is None:  # skipped
+                    continue
+                out_nc_file, buffer = written
+                if self.outputFileWriter.inMemory:
+                    # Explorer only, no DAC file written
+                    output_nc_files.append(os.path.basename(out_nc_file))
+                    output_nc_buffers[os.path.basename(out_nc_file)] = buffer
+                else:
+                    output_nc_files.append(os.path.basename(out_nc_file))
+                    source_dba_files.append(os.path.basename(dataFile))
+                    profile_to_data_map.append((out_nc_file, dataFile))
+                    if self.manifest is not None:
+                        self.manifest.add_nc(out_nc_file, dataFile)
+            return failures
 
-            # change to non-indented log format (see above)
-            logging.getLogger().handlers[0].setFormatter( hdrFormat )
+        with backgroundWriter( self.writeQueue ) as profileWriter:
 
-            if not os.path.isfile( dataFile):
-                logging.error('Invalid dba file specified: {:s}'.format(dataFile))
-                ret = -1
-                continue
+            for dataFile, dba in self._readDataFiles( dataFiles ):
 
-            logging.info('Processing data file: {:s}'.format(dataFile))
+                # change to non-indented log format (see above)
+                logging.getLogger().handlers[0].setFormatter( hdrFormat )
 
-            # change to indented log format (see above)
-            logging.getLogger().handlers[0].setFormatter( dataFormat )
+                if not os.path.isfile( dataFile):
+                    logging.error('Invalid dba file specified: {:s}'.format(dataFile))
+                    ret = -1
+                    continue
 
-            # Read the data file
-            dba = self.dataFileReader.readIntoDbaData( dataFile )
-            if dba is None or dba.N == 0:
-                logging.warning('Skipping empty data file: {:s}'.format(dataFile))
-                ret = -1
-                continue
+                logging.info('Processing data file: {:s}'.format(dataFile))
 
-            mission = dba.file_metadata['mission_name'].upper()
-            if ( mission == 'STATUS.MI'
-                 or mission == 'LASTGASP.MI'
-                 or mission == 'INITIAL.MI'):
-                logging.info('Skipping {:s} data file'.format(mission))
-                continue
+                # change to indented log format (see above)
+                logging.getLogger().handlers[0].setFormatter( dataFormat )
 
-            # init empty list of invariant data for processor to populate
-            scalars = []
+                if dba is None or dba.N == 0:
+                    logging.warning('Skipping empty data file: {:s}'.format(dataFile))
+                    ret = -1
+                    continue
 
-            # slocum processing needs sensor defs, data file list and
-            # data file being processed
-            self.dataProcessor.cfgSensorDefs = self.cfgSensorDefs
-            self.dataProcessor.dataFiles = self.dataFiles
-            self.dataProcessor.dataFile = dataFile
+                # init empty list of invariant data for processor to populate
+                scalars = []
 
-            # perform all sensor data calculations and updates
-            profiles = self.dataProcessor.processData( dba, scalars, var_processing )
-            if profiles is None:
-                logging.warning('No valid profiles found in data file: {:s}, skip processing.'.format(dataFile))
-                ret = -1
-                continue
+                # slocum processing needs sensor defs, data file list and
+                # data file being processed
+                self.dataProcessor.cfgSensorDefs = self.cfgSensorDefs
+                self.dataProcessor.dataFiles = self.dataFiles
+                self.dataProcessor.dataFile = dataFile
 
-            # write output netcdf files
-            longestSourceFile = ""
-            for profile in profiles:
+                # perform all sensor data calculations and updates
+                profiles = self.dataProcessor.processData( dba, scalars, var_processing )
+                if profiles is None:
+                    logging.warning('No valid profiles found in data file: {:s}, skip processing.'.format(dataFile))
+                    ret = -1
+                    continue
 
-                # Filters out excess data
-                profile = self.dataProcessor.reduceProfileToScienceData(profile)
+                # write output netcdf files
+                longestSourceFile = ""
+                for profileIndex, profile in enumerate(profiles):
 
-                # Merge datafile sensor definitions with configured sensor defs
-                allSensorDefs = self._mergeSensorDefs(self.cfgSensorDefs, profile.sensors)
-                self.outputFileWriter.sensors = allSensorDefs
+                    # Filters out excess data
+                    profile = self.dataProcessor.reduceProfileToScienceData(profile)
 
-                # Size data sets using sensor flagged in config
-                dimensionOnSensor = self._findDimensionSensor( allSensorDefs )
-                self.outputFileWriter.dimensionSensor = dimensionOnSensor
+                    # Merge datafile sensor definitions with configured sensor defs
+                    allSensorDefs = self._mergeSensorDefs(self.cfgSensorDefs, profile.sensors)
 
-                # ToDo: fix the history writer in NetCDFWriter - comment from legacy slocum 2.0 code
-                out_nc_file = self.outputFileWriter.write_profile(profile, scalars)
-                if out_nc_file:  # can be None if skipping
-                    output_nc_files.append(os.path.basename(out_nc_file))
-                    source_dba_files.append(os.path.basename(dataFile))
-                    profile_to_data_map.append((out_nc_file, dataFile))
+                    # Size data sets using sensor flagged in config
+                    dimensionOnSensor = self._findDimensionSensor( allSensorDefs )
+
+                    # ToDo: fix the history writer in NetCDFWriter - comment from legacy slocum 2.0 code
+                    profileWriter.submit( (dataFile, profileIndex), self._writeProfile,
+                                          profile, scalars, allSensorDefs,
+                                          dimensionOnSensor )
+
+                    # Gliders use source file per profile (need longest to dim explorer vars)
+                    if len(profile.file_metadata['filename_label']) > len(longestSourceFile):
+                        longestSourceFile = profile.file_metadata['filename_label']
+
+                    if profilesWritten( profileWriter.completed() ) > 0:
+                        ret = -1
 
-                # Gliders use source file per profile (need longest to dim explorer vars)
-                if len(profile.file_metadata['filename_label']) > len(longestSourceFile):
-                    longestSourceFile = profile.file_metadata['filename_label']
+                # the data file is done once all its profiles are written
+                profileWriter.submit( (dataFile, None), lambda: None )
 
-            processed_dbas.append(os.path.basename(dataFile))
+            if profilesWritten( profileWriter.wait() ) > 0:
+                ret = -1
 
         # change back to non-indented log format (see above)
         logging.getLogger().handlers[0].setFormatter( hdrFormat )
+        logging.debug('dba cache: {:d} hits, {:d} misses'.format(
+            self.dbaCache.hits, self.dbaCache.misses))
+        self.dbaCache.clear()
+
+        # record the last profile id and keep status.json current
+        # (Explorer only runs produce no DAC files to record)
+        if self.manifest is not None and not self.outputFileWriter.inMemory:
+            if self.startProfileId > 0:
+                self.manifest.next_profile_id = self.outputFileWriter.profileId
+            self.manifest.write()
+            self.manifest.export_status_json(
+                os.path.join(self.cfgPath, 'status.json'))
 
         # if output format is OOI Data Explorer, convert DAC output to OOI
+        # (held in memory for Explorer only)
 
-        if self.targetHost == cc.OOI_EXPLORER_TARGET:
+        if self.targetHost in cc.EXPLORER_TARGETS:
             if len(output_nc_files) > 0:
                 deWriter = dataExplorerNetCDFWriter()
                 deWriter.outputPath = self.outputPath
                 deWriter.overwriteExistingFiles = self.replaceOutputFiles
                 deWriter.outputCompressionLevel = self.outputCompression
                 deWriter.writeFormat = self.outputFormat
+                deWriter.engine = self.outputEngine
+                deWriter.layout = self.explorerLayout
                 deWriter.deploymentId = 'R' + \
                     self.deploymentDefs['global_attributes']['deployment_number']
                 deWriter.trajectoryName = self.deploymentDefs['trajectory_name']
                 deWriter.trajectoryDateTime = self.deploymentDefs['trajectory_datetime']
                 deWriter.inputFiles = output_nc_files
+                deWriter.inputBuffers = output_nc_buffers
                 deWriter.sourceFile = longestSourceFile
 
                 deWriter.setupOutput()
@@ -417,8 +729,72 @@ class slocum20Platform( gliderPlatform ) :
                 logging.warning("No valid NetCDF files produced, skip coversion to OOI format.")
                 ret = -1
 
+        # if Parquet is also targeted, write the same profiles to the
+        # partitioned Parquet dataset
+
+        if cc.PARQUET_TARGET in self.targetHosts:
+            if len(output_nc_files) > 0:
+                pqWriter = parquetWriter()
+                pqWriter.outputPath = self.outputPath
+                pqWriter.overwriteExistingFiles = self.replaceOutputFiles
+                pqWriter.deploymentId = 'R' + \
+                    self.deploymentDefs['global_attributes']['deployment_number']
+                pqWriter.trajectoryName = self.deploymentDefs['trajectory_name']
+                pqWriter.inputFiles = output_nc_files
+                pqWriter.inputBuffers = output_nc_buffers
+
+                pqWriter.setupOutput()
+                pqWriter.writeOutput()
+                pqWriter.cleanupOutput()
+            else:
+                logging.warning("No valid NetCDF files produced, skip conversion to Parquet.")
+                ret = -1
+
+        # if Zarr is also targeted, append the profiles to the trajectory
+        # Zarr store
+
+        if cc.ZARR_TARGET in self.targetHosts:
+            if len(output_nc_files) > 0:
+                zWriter = dataExplorerZarrWriter()
+                zWriter.outputPath = self.outputPath
+                zWriter.overwriteExistingFiles = self.replaceOutputFiles
+                zWriter.deploymentId = 'R' + \
+                    self.deploymentDefs['global_attributes']['deployment_number']
+                zWriter.trajectoryName = self.deploymentDefs['trajectory_name']
+                zWriter.trajectoryDateTime = self.deploymentDefs['trajectory_datetime']
+                zWriter.inputFiles = output_nc_files
+                zWriter.inputBuffers = output_nc_buffers
+                zWriter.sourceFile = longestSourceFile
+
+                zWriter.setupOutput()
+                zWriter.writeOutput()
+                zWriter.cleanupOutput()
+            else:
+                logging.warning("No valid NetCDF files produced, skip conversion to Zarr.")
+                ret = -1
+
         return ret
 
+    def _writeProfile(self, profile, scalars, sensors, dimensionSensor):
+        """
+        Write a profile with the output file writer, on the background
+        writer thread, which alone uses the writer while profiles are queued
+        :param profile: processed GliderData profile
+        :param scalars: scalar variables of the profile's data file
+        :param sensors: merged sensor definitions of the profile
+        :param dimensionSensor: sensor dimensioning the profile's variables
+        :return: (output file, contents if in memory) or None if skipped
+        """
+
+        self.outputFileWriter.sensors = sensors
+        self.outputFileWriter.dimensionSensor = dimensionSensor
+        out_nc_file = self.outputFileWriter.write_profile(profile, scalars)
+        if not out_nc_file:
+            return None
+        if self.outputFileWriter.inMemory:
+            return out_nc_file, self.outputFileWriter.memoryBuffer
+        return out_nc_file, None
+
     # post processing cleanup
     def cleanupFormatting(self):
         """
@@ -426,6 +802,10 @@ class slocum20Platform( gliderPlatform ) :
         :return:
         """
         self.outputFileWriter.cleanup()
+        self.closeCatalog()
+        if self.manifest is not None:
+            self.manifest.close()
+            self.manifest = None
 
     # *** internal helper methods ***
 
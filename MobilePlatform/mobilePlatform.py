@@ -10,6 +10,7 @@ history:
 import common.constants as constants
 import os
 import logging
+from FileWriter.profileCatalog import profileCatalog
 
 
 class mobilePlatform( ) :
@@ -26,10 +27,16 @@ class mobilePlatform( ) :
         self._cfgPath = "."
         self._dataFiles = []
         self._targetHost = 'IOOS-DAC'
+        self._targetHosts = ['IOOS-DAC']
+        self._explorerLayout = constants.EXPLORER_PADDED_LAYOUT
         self._platformArgs = {}
         self._outputPath = "."
         self._replaceOutputFiles = True
         self._outputFormat = 'NETCDF4_CLASSIC'
+        self._outputEngine = constants.NETCDF4_ENGINE
+        self._writeQueue = 2
+        self._skipUnchanged = False
+        self._catalogPath = None
         self._outputCompression = 1
         self._suppressOutput = False
 
@@ -39,6 +46,9 @@ class mobilePlatform( ) :
         self._instrumentsCfg = {}
         self._sensorsCfg = {}
 
+        # profile catalog, open while formatting
+        self.catalog = None
+
 
     @property
     def cfgReader(self):
@@ -96,6 +106,22 @@ class mobilePlatform( ) :
     def targetHost(self, newhost):
         self._targetHost = newhost
 
+    @property
+    def targetHosts(self):
+        return self._targetHosts
+
+    @targetHosts.setter
+    def targetHosts(self, hosts):
+        self._targetHosts = hosts
+
+    @property
+    def explorerLayout(self):
+        return self._explorerLayout
+
+    @explorerLayout.setter
+    def explorerLayout(self, layout):
+        self._explorerLayout = layout
+
     @property
     def platformArgs(self):
         return self._platformArgs
@@ -128,6 +154,38 @@ class mobilePlatform( ) :
     def outputFormat(self, newformat):
         self._outputFormat = newformat
 
+    @property
+    def outputEngine(self):
+        return self._outputEngine
+
+    @outputEngine.setter
+    def outputEngine(self, engine):
+        self._outputEngine = engine
+
+    @property
+    def writeQueue(self):
+        return self._writeQueue
+
+    @writeQueue.setter
+    def writeQueue(self, size):
+        self._writeQueue = size
+
+    @property
+    def skipUnchanged(self):
+        return self._skipUnchanged
+
+    @skipUnchanged.setter
+    def skipUnchanged(self, skip):
+        self._skipUnchanged = skip
+
+    @property
+    def catalogPath(self):
+        return self._catalogPath
+
+    @catalogPath.setter
+    def catalogPath(self, path):
+        self._catalogPath = path
+
     @property
     def outputCompression(self):
         return self._outputCompression
@@ -215,4 +273,24 @@ class mobilePlatform( ) :
                 'Error parsing config file {:s}'.format( cfgFile ))
             raise e
 
+    def openCatalog(self):
+        """
+        Open the profile catalog at catalogPath, if set, and have the
+        output file writer add the profiles it writes
+        :return: None
+        """
+
+        if self.catalogPath is not None:
+            self.catalog = profileCatalog( self.catalogPath )
+            self.outputFileWriter.catalog = self.catalog
+
+    def closeCatalog(self):
+        """
+        Commit and close the profile catalog, if open
+        :return: None
+        """
 
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
+            self.outputFileWriter.catalog = None
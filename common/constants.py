@@ -13,10 +13,46 @@ SUPPORTED_PLATFORMS = [ SLOCUM_20_PLATFORM, REMUS_600_PLATFORM ]
 
 IOOS_DAC_TARGET = 'IOOS-DAC'
 OOI_EXPLORER_TARGET = 'OOI-EXPLORER'
-OUTPUT_TARGETS = [ IOOS_DAC_TARGET, OOI_EXPLORER_TARGET ]
+OOI_EXPLORER_ONLY_TARGET = 'OOI-EXPLORER-ONLY'
+PARQUET_TARGET = 'PARQUET'
+ZARR_TARGET = 'ZARR'
+OUTPUT_TARGETS = [ IOOS_DAC_TARGET, OOI_EXPLORER_TARGET, OOI_EXPLORER_ONLY_TARGET,
+                   PARQUET_TARGET, ZARR_TARGET ]
+NETCDF_TARGETS = [ IOOS_DAC_TARGET, OOI_EXPLORER_TARGET, OOI_EXPLORER_ONLY_TARGET ]
+EXPLORER_TARGETS = [ OOI_EXPLORER_TARGET, OOI_EXPLORER_ONLY_TARGET ]
+DAC_FILE_TARGETS = [ IOOS_DAC_TARGET, OOI_EXPLORER_TARGET ]
+
+EXPLORER_PADDED_LAYOUT = 'padded'
+EXPLORER_RAGGED_LAYOUT = 'ragged'
+EXPLORER_LAYOUTS = [ EXPLORER_PADDED_LAYOUT, EXPLORER_RAGGED_LAYOUT ]
+
+# OOI Explorer trajectory files are named {trajectory}.nc, with trajectory
+# names {glider}-{yyyymmddTHHMM} unless configured, DAC profile files
+# {glider}_{yyyymmddTHHMM}_{mode}.nc
+EXPLORER_TRAJECTORY_FILE_PATTERN = r'^.+-\d{8}T\d{4}\.nc$'
 
 OUTPUT_FORMATS = lgoc.NETCDF_FORMATS
 
+# NetCDF library engines of the NetCDF writers, auto picks the engine
+# measured fastest for the output format (tests/benchmarks/bench_netcdf_engines.py)
+NETCDF4_ENGINE = 'netcdf4'
+H5NETCDF_ENGINE = 'h5netcdf'
+SCIPY_ENGINE = 'scipy'
+AUTO_ENGINE = 'auto'
+NETCDF_ENGINES = [ NETCDF4_ENGINE, H5NETCDF_ENGINE, SCIPY_ENGINE, AUTO_ENGINE ]
+AUTO_ENGINES = { 'NETCDF3_CLASSIC': SCIPY_ENGINE,
+                 'NETCDF4_CLASSIC': NETCDF4_ENGINE,
+                 'NETCDF4': H5NETCDF_ENGINE }
+
+# Global attributes stamped anew on every run, left out of the profile
+# content hashes of the skip unchanged output mode
+VOLATILE_ATTRIBUTES = [ 'date_created', 'date_modified', 'date_issued',
+                        'history', 'uuid' ]
+
+# Profile variables of the geospatial and temporal extents accumulated by
+# the writers (FileWriter.extentAccumulator)
+EXTENT_VARIABLES = [ 'time', 'lat', 'lon', 'depth' ]
+
 INPUT_FORMATS = lgoc.SLOCUM_DELAYED_MODE_EXTENSIONS + \
                 lgoc.SLOCUM_REALTIME_MODE_EXTENSIONS + \
                 farc.REMUS_DATA_FILE_EXTENSIONS
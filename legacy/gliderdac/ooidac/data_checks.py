@@ -1,6 +1,5 @@
 import os
 import logging
-import numpy as np
 
 from configuration import DATA_CONFIG_LIST, REQUIRED_SENSORS
 from configuration import MIN_DATA_VALS, MIN_DIVE_DEPTH
@@ -63,30 +62,34 @@ def check_for_dav_sensors(gldata):
 
 def check_if_dive(gldata):
     diving_segment = False
-    depth = gldata.getdata(DEPTH_SENSOR)
-    max_depth = np.nanmax(depth)
+    max_depth = gldata.stats[DEPTH_SENSOR].max
     if max_depth > MIN_DIVE_DEPTH:
         diving_segment = True
     return diving_segment
 
 
+def _sci_stats(gldata):
+    """SensorStats of the available DATA_CONFIG_LIST sensors, computed in
+    one pass over their block of data"""
+    stats = gldata.stats
+    stats.prefetch(
+        [s for s in DATA_CONFIG_LIST if s in gldata.sensor_names])
+    return stats
+
+
 def check_for_any_sci_data(gldata):
-    data_exists = False
-    for sensor in DATA_CONFIG_LIST:
-        if sensor in gldata.sensor_names:
-            data = gldata.getdata(sensor)
-            if len(np.flatnonzero(np.isfinite(data))) > MIN_DATA_VALS:
-                data_exists = True
-                break
-    return data_exists
+    stats = _sci_stats(gldata)
+    return any(
+        stats[sensor].count > MIN_DATA_VALS
+        for sensor in DATA_CONFIG_LIST if sensor in gldata.sensor_names)
 
 
 def sci_data_available(gldata):
     sci_sensors = []
+    stats = _sci_stats(gldata)
     for sensor in DATA_CONFIG_LIST:
         if sensor in gldata.sensor_names:
-            data = gldata.getdata(sensor)
-            if len(np.flatnonzero(np.isfinite(data))) > MIN_DATA_VALS:
+            if stats[sensor].count > MIN_DATA_VALS:
                 # config
                 sci_sensors.append(sensor)
             else:
@@ -1,5 +1,6 @@
 import os
 import logging
+from copy import deepcopy
 import numpy as np
 from ooidac.readers.slocum import parse_dba
 from ooidac.utilities import cluster_index
@@ -12,6 +13,93 @@ class GliderDataParticle(object):
         pass
 
 
+class SensorStat(object):
+    """Summary statistics of one sensor's data"""
+    __slots__ = ('count', 'min', 'max', 'first', 'last')
+
+    def __init__(self, count, min_, max_, first, last):
+        self.count = count
+        self.min = min_
+        self.max = max_
+        self.first = first
+        self.last = last
+
+    @property
+    def all_nan(self):
+        return self.count == 0
+
+    def __repr__(self):
+        return "<SensorStat(count={:d}, min={}, max={})>".format(
+            self.count, self.min, self.max)
+
+
+def _read_only(array):
+    """Read-only view of a data array, so that the data is only changed
+    through GliderData.update_data, keeping the SensorStats current"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class SensorStats(object):
+    """Lazily computed, cached SensorStat summaries of the sensors of a
+    GliderData instance: the finite value count, nan-ignoring min and max,
+    the first and last finite record index (None if all NaN) and an all-NaN
+    flag.  Each sensor is scanned once.  Sensor data only changes through
+    GliderData.update_data and add_data, which invalidate the affected
+    sensors: the arrays returned by getdata are read-only views.
+    """
+    def __init__(self, gldata):
+        self._gldata = gldata
+        self._stats = {}
+
+    def __getitem__(self, sensor):
+        if sensor not in self._stats:
+            self.prefetch([sensor])
+        return self._stats[sensor]
+
+    def __contains__(self, sensor):
+        return sensor in self._stats
+
+    def prefetch(self, sensors):
+        """Compute the statistics of the uncached `sensors` in one pass over
+        their 2-D block of data"""
+        sensors = [s for s in dict.fromkeys(sensors) if s not in self._stats]
+        if not sensors:
+            return
+        n = len(self._gldata)
+        block = self._gldata.getdataslice(sensors).reshape(
+            (n, len(sensors)))
+        finite = np.isfinite(block)
+        counts = finite.sum(axis=0)
+        if n > 0:
+            with np.errstate(invalid='ignore'):
+                mins = np.fmin.reduce(block, axis=0)
+                maxs = np.fmax.reduce(block, axis=0)
+            firsts = finite.argmax(axis=0)
+            lasts = n - 1 - finite[::-1].argmax(axis=0)
+        else:
+            mins = maxs = np.full(len(sensors), np.nan)
+            firsts = lasts = np.zeros(len(sensors), dtype=np.int64)
+        for ii, sensor in enumerate(sensors):
+            count = int(counts[ii])
+            if count == 0:
+                self._stats[sensor] = SensorStat(0, np.nan, np.nan, None, None)
+            else:
+                self._stats[sensor] = SensorStat(
+                    count, mins[ii], maxs[ii], int(firsts[ii]), int(lasts[ii]))
+
+    def invalidate(self, sensors=None):
+        """Drop the cached statistics of `sensors` (default all)"""
+        if sensors is None:
+            self._stats.clear()
+            return
+        if isinstance(sensors, str):
+            sensors = [sensors]
+        for sensor in sensors:
+            self._stats.pop(sensor, None)
+
+
 class GliderData(object):
     """
 
@@ -39,6 +127,7 @@ class GliderData(object):
         self.scitimesensorname = None
         self.depth = None
         self.ts = None
+        self._stats = None
         if self.N > 0:
             self.set_ts()
             self.set_depth()
@@ -74,6 +163,13 @@ class GliderData(object):
         """Return value when the repr function is called"""
         return "<GliderData({:d} x {:d})>".format(self.m, self.N)
 
+    @property
+    def stats(self):
+        """SensorStats summaries of the sensor data, computed on demand"""
+        if self._stats is None:
+            self._stats = SensorStats(self)
+        return self._stats
+
     @property
     def m(self):
         return len(self.sensor_names)
@@ -129,11 +225,13 @@ class GliderData(object):
         self._data = np.append(self._data, data.reshape((self.N, 1)), axis=1)
         self.sensors[key] = sensor_particle
         self._sensor_names.append(key)
+        if self._stats is not None:
+            self._stats.invalidate(key)
 
     def getdata(self, item):
         if item in self._sensor_names:
             idx = self._sensor_names.index(item)
-            return self._data[:, idx]
+            return _read_only(self._data[:, idx])
         else:
             raise SensorError("Sensor {:s} is not available".format(item))
 
@@ -149,7 +247,7 @@ class GliderData(object):
                 raise SensorError("Sensor {:s} is not available".format(item))
         if len(idxs) == 1:
             idxs = idxs[0]
-        return self._data[:, idxs]
+        return _read_only(self._data[:, idxs])
 
     def update_data(self, items, row_indices, values):
         row_indices = np.atleast_1d(row_indices)
@@ -161,15 +259,21 @@ class GliderData(object):
             else:
                 raise SensorError("Sensor {:s} is not available".format(item))
         col_idxs = np.atleast_1d(col_idxs)
+        # data tables shared with a DbaCache are read-only, copy on the first
+        # change
+        if not self._data.flags.writeable:
+            self._data = self._data.copy()
         # Don't want a try statement here, I want the np.array error to raise
         # if `values` does not fit into the indices given
         self._data[row_indices.reshape(len(row_indices), 1), col_idxs] = values
+        if self._stats is not None:
+            self._stats.invalidate(items)
 
     def _get_dataparticle(self, item):
         if item in self._sensor_names:
             data_particle = self.sensors[item].copy()
             idx = self._sensor_names.index(item)
-            data_particle['data'] = self._data[:, idx]
+            data_particle['data'] = _read_only(self._data[:, idx])
             return_item = data_particle
         else:
             # return_item = None
@@ -269,17 +373,23 @@ class DbaData(GliderData):
     """
 
     """
-    def __init__(self, dba_file):
+    def __init__(self, dba_file, cache=None):
         # self.file_metadata = None
         # self._data = np.array([])
-        dba = parse_dba(dba_file)
+        dba = parse_dba(dba_file, cache=cache)
         if dba is None:
             return
         else:
+            sensor_names = dba['sensor_names']
+            sensor_defs = dba['sensor_defs']
+            if cache is not None:
+                # processing adds sensors and changes their attributes in
+                # place, keep the cached parse as it was read
+                sensor_names = list(sensor_names)
+                sensor_defs = deepcopy(sensor_defs)
             GliderData.__init__(
                 self,
-                dba['header'], dba['sensor_names'],
-                dba['sensor_defs'], dba['data']
+                dba['header'], sensor_names, sensor_defs, dba['data']
             )
         self.underwater_indices = None
         self.pre_dive_indices = None
@@ -0,0 +1,173 @@
+"""Batched gap filling of 2-D blocks of sensor data.
+
+Each column of a block (samples x sensors) is filled independently, but all
+the columns sharing a fill method are filled together in one pass.  The
+index of the previous (next) finite value of every sample is found for the
+whole block with np.maximum.accumulate (np.minimum.accumulate in reverse),
+and the forward and back fills are a single gather on those indices.
+
+Fill methods, selectable per sensor with a "fill" entry in the sensor's
+"processing" block of sensor_defs.json:
+
+    'fwd fill':  the previous finite value, leading NaNs take the first
+                 finite value (as utilities.fwd_fill)
+    'back fill': the next finite value, trailing NaNs take the last finite
+                 value
+    'interp':    linear interpolation in time between finite values, ends
+                 held at the first/last finite value (as np.interp)
+    'none':      left as is
+"""
+import numpy as np
+
+FWD_FILL = 'fwd fill'
+BACK_FILL = 'back fill'
+INTERP = 'interp'
+NO_FILL = 'none'
+FILL_METHODS = (FWD_FILL, BACK_FILL, INTERP, NO_FILL)
+
+
+def _neighbours(columns):
+    """Index of the previous and next finite value of every sample of each
+    row of a (columns x samples) array, at the sample itself where finite.
+    previous is -1 before the first finite value, next is the number of
+    samples after the last.
+    """
+    n = columns.shape[1]
+    finite = np.isfinite(columns)
+    ones = np.arange(1, n + 1)
+    previous = np.multiply(finite, ones)
+    np.maximum.accumulate(previous, axis=1, out=previous)
+    previous -= 1
+    following = np.where(finite, ones - 1, n)
+    np.minimum.accumulate(
+        following[:, ::-1], axis=1, out=following[:, ::-1])
+    return previous, following
+
+
+def _take(columns, indices):
+    """Values of each row of a (columns x samples) array at indices, one
+    flat gather"""
+    m, n = columns.shape
+    flat = np.clip(indices, 0, n - 1)
+    flat += (np.arange(m) * n)[:, np.newaxis]
+    return np.take(columns.ravel(), flat)
+
+
+def _columns(block):
+    """Contiguous (columns x samples) float copy of a 2-D block"""
+    return np.ascontiguousarray(np.asarray(block, dtype=np.float64).T)
+
+
+def fwd_fill_block(block, init_nan_fill=None):
+    """Forward fill the NaNs of each column of a 2-D block
+
+    :param block: 2-D array (samples x columns)
+    :param init_nan_fill: value for leading NaNs, defaults to back filling
+        with the first finite value of the column
+    :return: filled copy of block, all NaN columns stay NaN
+    """
+    columns = _columns(block)
+    if columns.size == 0:
+        return columns.T
+    previous, following = _neighbours(columns)
+    leading = previous < 0
+    filled = _take(columns, np.where(leading, following, previous))
+    if init_nan_fill is not None:
+        filled[leading] = init_nan_fill
+    return filled.T
+
+
+def back_fill_block(block):
+    """Back fill the NaNs of each column of a 2-D block
+
+    :param block: 2-D array (samples x columns)
+    :return: filled copy of block, trailing NaNs take the last finite value
+        and all NaN columns stay NaN
+    """
+    columns = _columns(block)
+    if columns.size == 0:
+        return columns.T
+    previous, following = _neighbours(columns)
+    filled = _take(columns, np.where(
+        following >= columns.shape[1], previous, following))
+    return filled.T
+
+
+def interp_fill_block(block, x):
+    """Fill the NaNs of each column of a 2-D block by linear interpolation
+    in x between the finite values, holding the first and last finite values
+    at the ends, i.e. np.interp(x, x[finite], column[finite]).
+
+    np.interp is a single C pass per column, faster than gathering the
+    neighbouring values with the accumulated indices, so the block is only
+    transposed to contiguous columns.
+
+    :param block: 2-D array (samples x columns)
+    :param x: 1-D increasing coordinate (e.g. time) of the samples
+    :return: filled copy of block, all NaN columns stay NaN
+    """
+    columns = _columns(block)
+    x = np.asarray(x, dtype=np.float64)
+    for column in columns:
+        finite = np.isfinite(column)
+        if finite.any():
+            column[:] = np.interp(x, x[finite], column[finite])
+    return columns.T
+
+
+def fill_block(block, methods, x=None):
+    """Fill each column of a 2-D block with its fill method, one batched
+    pass per method
+
+    :param block: 2-D array (samples x columns)
+    :param methods: a fill method for all columns or a sequence of one per
+        column, see FILL_METHODS
+    :param x: 1-D coordinate of the samples, required for 'interp'
+    :return: filled copy of block
+    """
+    block = np.asarray(block, dtype=np.float64)
+    if isinstance(methods, str):
+        methods = [methods] * block.shape[1]
+    methods = list(methods)
+    unknown = set(methods).difference(FILL_METHODS)
+    if unknown:
+        raise ValueError('Unknown fill method(s) {}, use one of {}'.format(
+            sorted(unknown), FILL_METHODS))
+    if len(methods) != block.shape[1]:
+        raise ValueError('{:d} fill methods for {:d} columns'.format(
+            len(methods), block.shape[1]))
+
+    filled = block.copy()
+    for method in set(methods):
+        if method == NO_FILL:
+            continue
+        cols = [ii for ii, m in enumerate(methods) if m == method]
+        if method == FWD_FILL:
+            filled[:, cols] = fwd_fill_block(block[:, cols])
+        elif method == BACK_FILL:
+            filled[:, cols] = back_fill_block(block[:, cols])
+        else:
+            if x is None:
+                raise ValueError("The 'interp' fill requires x")
+            filled[:, cols] = interp_fill_block(block[:, cols], x)
+    return filled
+
+
+def configured_fills(var_processing):
+    """Take the per sensor fill methods out of the sensor_defs.json
+    processing blocks, dropping blocks left empty
+
+    :param var_processing: dictionary of sensor name to processing block
+    :return: dictionary of sensor name to fill method
+    """
+    fills = {}
+    for sensor in list(var_processing):
+        if 'fill' in var_processing[sensor]:
+            fills[sensor] = var_processing[sensor].pop('fill')
+            if fills[sensor] not in FILL_METHODS:
+                raise ValueError(
+                    'Unknown fill method {} for {:s}, use one of {}'.format(
+                        fills[sensor], sensor, FILL_METHODS))
+            if not var_processing[sensor]:
+                del var_processing[sensor]
+    return fills
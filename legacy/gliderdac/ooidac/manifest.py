@@ -0,0 +1,385 @@
+import os
+import json
+import sqlite3
+from collections.abc import MutableMapping
+from datetime import datetime as dt
+
+from ooidac.status import create_uuid
+
+# status.json list entries and the manifest tables holding them
+_LIST_TABLES = {
+    'files_processed': 'source_files',
+    'profiles_created': 'profiles',
+    'profiles_uploaded': 'uploads',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS source_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS profile_sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profile_sources_profile
+    ON profile_sources (profile);
+CREATE INDEX IF NOT EXISTS profile_sources_source
+    ON profile_sources (source);
+"""
+
+
+class Manifest(object):
+    """A run status keeping object backed by a local SQLite database.
+
+    A drop in replacement for ooidac.status.Status: source files, created
+    profiles, uploads and the profile to source file map are kept in
+    indexed tables, so membership checks do not scan lists and each
+    addition does not rewrite the whole status.  Changes are committed in
+    batches of `batch_size` and on `write`, `close` or leaving a `with`
+    block.  `import_status_json` and `export_status_json` convert to and
+    from the status.json format.
+    """
+    def __init__(self, manifest_path, batch_size=500):
+        self.path = manifest_path
+        self.batch_size = batch_size
+        self._pending = 0
+        self._conn = sqlite3.connect(manifest_path)
+        self._conn.executescript(_SCHEMA)
+        if self._get_meta('date_created') is None:
+            now_tstr = dt.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+            self._set_meta({
+                "trajectory_name": "",
+                "history": "{:s}: dataset created.".format(now_tstr),
+                "date_created": now_tstr,
+                "date_modified": now_tstr,
+                "date_issued": now_tstr,
+                "version": "1.0",
+                "uuid": "",
+                "next_profile_id": None
+            })
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # --- batched transactions ---
+
+    def _changed(self, count=1):
+        """counts pending changes, committing once a batch is full"""
+        self._pending += count
+        if self._pending >= self.batch_size:
+            self.write()
+
+    def write(self):
+        """commit any pending changes to the manifest"""
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        """commit pending changes and close the database"""
+        if self._conn is not None:
+            self.write()
+            self._conn.close()
+            self._conn = None
+
+    # --- key/value metadata ---
+
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute(
+            'SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def _set_meta(self, items):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            [(key, json.dumps(value)) for key, value in items.items()])
+        self._changed(len(items))
+
+    # --- tables ---
+
+    def _contains(self, table, path):
+        return self._conn.execute(
+            'SELECT 1 FROM {:s} WHERE path = ?'.format(table),
+            (path,)).fetchone() is not None
+
+    def _paths(self, table):
+        return [row[0] for row in self._conn.execute(
+            'SELECT path FROM {:s} ORDER BY id'.format(table))]
+
+    def _add_path(self, table, path, overwrite):
+        """add path to table; with overwrite it moves to the end as with
+        the list remove and append in Status"""
+        if overwrite:
+            self._conn.execute(
+                'DELETE FROM {:s} WHERE path = ?'.format(table), (path,))
+        cursor = self._conn.execute(
+            'INSERT OR IGNORE INTO {:s} (path) VALUES (?)'.format(table),
+            (path,))
+        self._changed()
+        return cursor.rowcount > 0
+
+    def add_nc(self, nc_file, src_file, overwrite=False):
+        """adds created profile nc files to status"""
+        if overwrite:
+            self._conn.execute('DELETE FROM profiles WHERE path = ?',
+                               (nc_file,))
+            self._conn.execute(
+                'DELETE FROM profile_sources WHERE profile = ? AND source = ?',
+                (nc_file, src_file))
+        if os.path.exists(nc_file):
+            if self._add_path('profiles', nc_file, False):
+                self._conn.execute(
+                    'INSERT INTO profile_sources (profile, source) '
+                    'VALUES (?, ?)', (nc_file, src_file))
+
+    def add_src(self, src_file, overwrite=False):
+        """adds processed source data files to status"""
+        if os.path.exists(src_file):
+            self._add_path('source_files', src_file, overwrite)
+        elif overwrite:
+            self._conn.execute('DELETE FROM source_files WHERE path = ?',
+                               (src_file,))
+            self._changed()
+
+    def add_upload(self, nc_file, overwrite=False):
+        """adds uploaded nc data files to status"""
+        self._add_path('uploads', nc_file, overwrite)
+
+    def is_processed(self, src_file):
+        """True if the source file has been processed"""
+        return self._contains('source_files', src_file)
+
+    def is_created(self, nc_file):
+        """True if the profile nc file has been created"""
+        return self._contains('profiles', nc_file)
+
+    def is_uploaded(self, nc_file):
+        """True if the profile nc file has been uploaded"""
+        return self._contains('uploads', nc_file)
+
+    def profiles_from(self, src_file):
+        """a list of the profile nc files created from a source file"""
+        return [row[0] for row in self._conn.execute(
+            'SELECT profile FROM profile_sources WHERE source = ? '
+            'ORDER BY id', (src_file,))]
+
+    # --- Status compatible interface ---
+
+    @property
+    def info(self):
+        """the status as a status.json style dictionary view"""
+        return ManifestInfo(self)
+
+    def update_history(self, addtl_msg):
+        """updates the history message in the manifest"""
+        now_tstr = dt.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._set_meta({
+            'history': self._get_meta('history', '') +
+            "\n{:s} {:s}".format(now_tstr, addtl_msg),
+            'date_modified': now_tstr
+        })
+        self.write()
+
+    @property
+    def processed(self):
+        """a list of the basenames of the processed source files"""
+        return list(map(os.path.basename, self._paths('source_files')))
+
+    @property
+    def created(self):
+        """a list of the basenames of the profile nc files created"""
+        return list(map(os.path.basename, self._paths('profiles')))
+
+    @property
+    def uploaded(self):
+        """a list of the basenames of the profile nc files uploaded"""
+        return list(map(os.path.basename, self._paths('uploads')))
+
+    @property
+    def data_map(self):
+        """a list of the mapped basenames of profile nc files to source data files"""
+        return [
+            [os.path.basename(profile), os.path.basename(source)]
+            for profile, source in self._conn.execute(
+                'SELECT profile, source FROM profile_sources ORDER BY id')]
+
+    @property
+    def next_profile_id(self):
+        """the last used profile ID"""
+        return self._get_meta('next_profile_id')
+
+    @next_profile_id.setter
+    def next_profile_id(self, value):
+        self._set_meta({'next_profile_id': value})
+
+    def update_major_version(self):
+        """steps major version to a higher number and updates the uuid"""
+        maj_ver = int(self.version.split('.')[0])
+        maj_ver += 1
+        self.version = "{:d}.0".format(maj_ver)
+
+    def update_minor_version(self):
+        """steps minor version to a higher number and updates the uuid"""
+        maj_ver = self.version.split('.')[0]
+        min_ver = int(self.version.split('.')[1])
+        min_ver += 1
+        self.version = "{:s}.{:d}".format(maj_ver, min_ver)
+
+    def update_modified_date(self):
+        """updates the modified date to the current date and time"""
+        now_tstr = dt.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._set_meta({'date_modified': now_tstr})
+        self.write()
+
+    @property
+    def version(self):
+        return self._get_meta('version')
+
+    @version.setter
+    def version(self, value):
+        self._set_meta({
+            'version': value,
+            'uuid': create_uuid(self.trajectory, value)})
+        self.write()
+
+    @property
+    def trajectory(self):
+        """returns the trajectory ID"""
+        return self._get_meta('trajectory_name')
+
+    @trajectory.setter
+    def trajectory(self, value):
+        """sets the trajectory ID"""
+        self._set_meta({
+            'trajectory_name': value,
+            'uuid': create_uuid(value, self.version)})
+        self.write()
+
+    # --- status.json bridge ---
+
+    def import_status_json(self, status_path):
+        """replace the manifest contents with a status.json file in a
+        single transaction"""
+        with open(status_path, 'r') as fid:
+            info = json.load(fid)
+        with self._conn:
+            self._conn.execute('DELETE FROM meta')
+            for table in list(_LIST_TABLES.values()) + ['profile_sources']:
+                self._conn.execute('DELETE FROM {:s}'.format(table))
+            for key, value in info.items():
+                if key in _LIST_TABLES:
+                    self._conn.executemany(
+                        'INSERT OR IGNORE INTO {:s} (path) VALUES (?)'.format(
+                            _LIST_TABLES[key]), [(path,) for path in value])
+                elif key == 'profile_to_data_map':
+                    self._conn.executemany(
+                        'INSERT INTO profile_sources (profile, source) '
+                        'VALUES (?, ?)', [tuple(pair) for pair in value])
+                else:
+                    self._conn.execute(
+                        'INSERT INTO meta (key, value) VALUES (?, ?)',
+                        (key, json.dumps(value)))
+        self._pending = 0
+
+    def export_status_json(self, status_path):
+        """write the manifest contents out as a status.json file"""
+        info = dict(self.info)
+        with open(status_path, 'w') as fid:
+            json.dump(info, fid, indent=2)
+
+
+class ManifestInfo(MutableMapping):
+    """status.json style dictionary access to a Manifest.  List entries
+    are read from and written to their tables, all others to metadata"""
+    def __init__(self, manifest):
+        self._manifest = manifest
+
+    def __getitem__(self, key):
+        manifest = self._manifest
+        if key in _LIST_TABLES:
+            return manifest._paths(_LIST_TABLES[key])
+        if key == 'profile_to_data_map':
+            return [list(row) for row in manifest._conn.execute(
+                'SELECT profile, source FROM profile_sources ORDER BY id')]
+        missing = object()
+        value = manifest._get_meta(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        manifest = self._manifest
+        if key in _LIST_TABLES:
+            table = _LIST_TABLES[key]
+            manifest._conn.execute('DELETE FROM {:s}'.format(table))
+            manifest._conn.executemany(
+                'INSERT OR IGNORE INTO {:s} (path) VALUES (?)'.format(table),
+                [(path,) for path in value])
+            manifest._changed(len(value))
+        elif key == 'profile_to_data_map':
+            manifest._conn.execute('DELETE FROM profile_sources')
+            manifest._conn.executemany(
+                'INSERT INTO profile_sources (profile, source) '
+                'VALUES (?, ?)', [tuple(pair) for pair in value])
+            manifest._changed(len(value))
+        else:
+            manifest._set_meta({key: value})
+
+    def __delitem__(self, key):
+        if key in _LIST_TABLES or key == 'profile_to_data_map':
+            self[key] = []
+        else:
+            self._manifest._conn.execute(
+                'DELETE FROM meta WHERE key = ?', (key,))
+            self._manifest._changed()
+
+    def _keys(self):
+        keys = [row[0] for row in self._manifest._conn.execute(
+            'SELECT key FROM meta ORDER BY rowid')]
+        return keys + list(_LIST_TABLES) + ['profile_to_data_map']
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+
+def open_status(config_path, use_manifest=False):
+    """Open the run status kept in config_path: status.json through
+    Status, or with use_manifest the SQLite manifest status.db, which is
+    seeded from an existing status.json the first time it is created.
+    :param config_path: deployment configuration directory
+    :param use_manifest: keep the status in the SQLite manifest
+    :return: Status or Manifest
+    """
+    status_path = os.path.join(config_path, 'status.json')
+    if not use_manifest:
+        from ooidac.status import Status
+        return Status(status_path)
+
+    manifest_path = os.path.join(config_path, 'status.db')
+    seed = not os.path.exists(manifest_path) and os.path.exists(status_path)
+    manifest = Manifest(manifest_path)
+    if seed:
+        manifest.import_status_json(status_path)
+    return manifest
@@ -16,7 +16,7 @@ logger = logging.getLogger(os.path.basename(__name__))
 
 def create_llat_sensors(
         dba, timesensor=None, pressuresensor=None,
-        depthsensor=None, z_from_p=True):
+        depthsensor=None, z_from_p=True, dr_correction=False):
 
     # List of available dba sensors
     dba_sensors = dba.sensor_names
@@ -44,7 +44,8 @@ def create_llat_sensors(
         )
         return
 
-    lat_sensor, lon_sensor = lat_and_lon_coordinates(dba, time_sensor)
+    lat_sensor, lon_sensor = lat_and_lon_coordinates(
+        dba, time_sensor, dr_correction=dr_correction)
 
     # If no depth_sensor was selected, use llat_latitude, llat_longitude
     # and llat_pressure to calculate
@@ -222,18 +223,59 @@ def reduce_to_sci_data(gldata):
     return reduced_gldata
 
 
-def all_sci_indices(gldata):
+class SciBlock(object):
+    """Masks and counts over a block of science data columns.
+
+    sensors: the sensor names of the block columns
+    finite: N x len(sensors) boolean array of finite values
+    any_finite: records with any finite science value
+    all_zero: records where every science sensor is 0.0
+
+    Per sensor counts are kept by GliderData.stats only.
+    """
+    def __init__(self, sensors, finite, any_finite, all_zero):
+        self.sensors = sensors
+        self.finite = finite
+        self.any_finite = any_finite
+        self.all_zero = all_zero
+
+
+def sci_block(gldata, sensors=None, missing_ok=False):
+    """Pulls the science columns out of a GliderData instance once as a 2-D
+    block and computes the row masks needed by all_sci_indices,
+    remove_sci_init_zeros and the profile filters in a single vectorized
+    pass.
+
+    :param gldata: A GliderData instance
+    :param sensors: list of science sensors, default DATA_CONFIG_LIST
+    :param missing_ok: leave out sensors not in gldata instead of raising
+        SensorError
+    :return: SciBlock instance
     """
+    if sensors is None:
+        sensors = DATA_CONFIG_LIST
+    if missing_ok:
+        sensors = [s for s in sensors if s in gldata.sensor_names]
+    sensors = list(sensors)
+    if len(sensors) == 0:
+        no_rows = np.zeros(len(gldata), dtype=bool)
+        return SciBlock(
+            sensors, np.zeros((len(gldata), 0), dtype=bool),
+            no_rows, no_rows.copy())
+
+    block = gldata.getdataslice(sensors).reshape((len(gldata), len(sensors)))
+    finite = np.isfinite(block)
+    return SciBlock(
+        sensors, finite, finite.any(axis=1), (block == 0.0).all(axis=1))
+
+
+def all_sci_indices(gldata):
+    """Indices of records with any science data (DATA_CONFIG_LIST)
 
     :param gldata: A GliderData instance
-    :return:
+    :return: sorted array of record indices
     """
-    sci_indices = np.array([], dtype=np.int64)
-    for sci_sensor in DATA_CONFIG_LIST:
-        sci_data = gldata.getdata(sci_sensor)
-        sci_ii = np.flatnonzero(np.isfinite(sci_data))
-        sci_indices = np.union1d(sci_indices, sci_ii)
-    return sci_indices
+    return np.flatnonzero(sci_block(gldata).any_finite)
 
 
 def remove_sci_init_zeros(gldata, available_sensors):
@@ -250,18 +292,8 @@ def remove_sci_init_zeros(gldata, available_sensors):
     :return: The same GliderData instance with any initialization zeros
     changed to NaNs
     """
-    zeros_ii = np.array([])
-    for sensor in available_sensors:
-        var = gldata.getdata(sensor)
-        if sensor == available_sensors[0]:
-            # get the zeros from the first sensor differently to start the
-            # set intersection below
-            zeros_ii = np.flatnonzero(var == 0.0)
-        else:
-            var_zero_ii = np.flatnonzero(var == 0.0)
-            # intersection will find the timestamp where all of the science
-            # sensors are zero
-            zeros_ii = np.intersect1d(zeros_ii, var_zero_ii)
+    # timestamps where all of the science sensors are zero
+    zeros_ii = np.flatnonzero(sci_block(gldata, available_sensors).all_zero)
     if len(zeros_ii) > 0:
         gldata.update_data(available_sensors, zeros_ii, np.nan)
     return gldata
@@ -1,41 +1,42 @@
 import numpy as np
-from ooidac.utilities import fwd_fill
+from ooidac.fill import fill_block, FWD_FILL
 
+FILL_COMMENTS = {
+    'fwd fill': ' and forward filled',
+    'back fill': ' and back filled',
+    'interp': ' and interpolated',
+    'none': ''
+}
 
-def pitch_and_roll(dba, fill='fwd fill'):
+
+def pitch_and_roll(dba, fill=FWD_FILL):
     """adds new sensors `pitch` and `roll` to a GliderData instance from
-    `m_pitch` and `m_roll` converted to degrees from radians.
+    `m_pitch` and `m_roll` converted to degrees from radians.  Both are
+    converted and gap filled together as one 2-D block.
 
     :param dba:  A GliderData or DbaData instance
-    :param fill:
+    :param fill: fill method for both ('fwd fill', 'back fill', 'interp' or
+        'none'), or a dictionary of fill method by sensor name (`pitch`,
+        `roll`) defaulting to 'fwd fill', see ooidac.fill
     :return: dba:  The same GliderData instance with `pitch` and `roll` added
     """
-    if fill == 'fwd fill':
-        fill_function = fwd_fill
-    elif fill == 'interp':
-        def fill_function(param):
-            filled_param = np.interp(
-                dba.ts, dba.ts[np.isfinite(param)], param[np.isfinite(param)])
-            return filled_param
+    names = ['pitch', 'roll']
+    if isinstance(fill, dict):
+        methods = [fill.get(name, FWD_FILL) for name in names]
     else:
-        def fill_function(param):
-            return param
-
-    pitch = dba['m_pitch']
-    pitch['sensor_name'] = 'pitch'
-    pitch['attrs']['units'] = 'degrees'
-    pitch['attrs']['comment'] = (
-        'm_pitch converted to degrees and forward filled')
-    pitch['data'] = fill_function(np.degrees(pitch['data']))
+        methods = [fill] * len(names)
 
-    roll = dba['m_roll']
-    roll['sensor_name'] = 'roll'
-    roll['attrs']['units'] = 'degrees'
-    roll['attrs']['comment'] = (
-        'm_roll converted to degrees and forward filled')
-    roll['data'] = fwd_fill(np.degrees(roll['data']))
+    block = fill_block(
+        np.degrees(dba.getdataslice(['m_pitch', 'm_roll'])), methods,
+        x=dba.ts)
 
-    dba.add_data(pitch)
-    dba.add_data(roll)
+    for ii, name in enumerate(names):
+        sensor = dba['m_' + name]
+        sensor['sensor_name'] = name
+        sensor['attrs']['units'] = 'degrees'
+        sensor['attrs']['comment'] = 'm_{:s} converted to degrees{:s}'.format(
+            name, FILL_COMMENTS[methods[ii]])
+        sensor['data'] = block[:, ii]
+        dba.add_data(sensor)
 
-    return dba
\ No newline at end of file
+    return dba
@@ -6,14 +6,16 @@
 @brief Module containing Fluorometer Three Wavelength (FLORT) and Fluorometer
     Two Wavelength (FLORD) instrument family related functions
 """
+import os
 from copy import deepcopy
+from hashlib import md5
 
 import numpy as np
 import numexpr as ne
 from ooidac.processing import logger, _add_nan_variable
 
 
-def flo_bback_total(beta, degC, psu, theta, wlngth, xfactor):
+def flo_bback_total(beta, degC, psu, theta, wlngth, xfactor, lut=None):
     """
     Description:
 
@@ -48,6 +50,8 @@ def flo_bback_total(beta, degC, psu, theta, wlngth, xfactor):
         xfactor = X (Chi) factor which scales the particulate scattering value at a particular
             backwards angle to the total particulate backscattering coefficient integrated
             over all backwards angles. See Notes.
+        lut = optional SeawaterScatterLUT for theta and wlngth. If given, the seawater
+            terms are interpolated from it instead of computed exactly per sample.
 
     Notes:
 
@@ -104,7 +108,10 @@ def flo_bback_total(beta, degC, psu, theta, wlngth, xfactor):
     #         scattering coefficient for seawater (also with no particulate contribution)
     #         at wavelength wlngth [m-1].
     # Values below are computed using provided code from Zhang et al 2009.
-    betasw, bsw = flo_zhang_scatter_coeffs(degC, psu, theta, wlngth)
+    if lut is not None:
+        betasw, bsw = lut(degC, psu)
+    else:
+        betasw, bsw = flo_zhang_scatter_coeffs(degC, psu, theta, wlngth)
 
     # calculate the volume scattering at angle theta of particles only, betap.
     #     beta = scattering measured at angle theta for seawater + particulates
@@ -270,6 +277,160 @@ def flo_zhang_scatter_coeffs(degC, psu, theta, wlngth, delta=0.039):
     return betasw, bsw
 
 
+class SeawaterScatterLUT(object):
+    """Lookup table of the Zhang et al 2009 seawater scattering coefficients
+    (betasw, bsw from flo_zhang_scatter_coeffs) on a regular temperature,
+    salinity grid for one theta, wavelength and depolarization ratio.
+
+    Samples are evaluated by bilinear interpolation between the 4 grid
+    points around them.  On the default 0.1 degC x 0.1 psu grid over
+    -2.5 to 40 degC and 0 to 42 psu the relative error of both
+    coefficients is below LUT_MAX_REL_ERROR (largest at salinities near 0
+    where the psu**0.5 term curves most; below 5e-7 for salinities over 2
+    psu).  Samples outside the grid, or not finite, are computed exactly.
+    """
+    def __init__(self, theta, wlngth, delta=0.039,
+                 t_range=(-2.5, 40.0), s_range=(0.0, 42.0), step=0.1):
+        self.key = (float(theta), float(wlngth), float(delta),
+                    tuple(map(float, t_range)), tuple(map(float, s_range)),
+                    float(step))
+        self.theta = theta
+        self.wlngth = wlngth
+        self.delta = delta
+        self.step = step
+        self.t0 = t_range[0]
+        self.s0 = s_range[0]
+        self.nt = int(round((t_range[1] - t_range[0]) / step)) + 1
+        self.ns = int(round((s_range[1] - s_range[0]) / step)) + 1
+        self.betasw = None
+        self.bsw = None
+        self._padded = None
+
+    def build(self):
+        """Evaluate the exact coefficients on the grid"""
+        degC, psu = np.meshgrid(
+            self.t0 + self.step * np.arange(self.nt),
+            self.s0 + self.step * np.arange(self.ns), indexing='ij')
+        betasw, bsw = flo_zhang_scatter_coeffs(
+            degC.ravel(), psu.ravel(), self.theta, self.wlngth, self.delta)
+        self.betasw = betasw.reshape((self.nt, self.ns))
+        self.bsw = bsw.reshape((self.nt, self.ns))
+        self._padded = None
+        return self
+
+    def _cache_file(self, cache_dir):
+        key_hash = md5(repr(self.key).encode('utf-8')).hexdigest()
+        return os.path.join(
+            cache_dir, 'seawater_scatter_lut_{:s}.npz'.format(key_hash[:12]))
+
+    def load(self, cache_dir):
+        """Load the tables from cache_dir, True if found for this key"""
+        cache_file = self._cache_file(cache_dir)
+        if not os.path.isfile(cache_file):
+            return False
+        try:
+            with np.load(cache_file) as cached:
+                if str(cached['key']) != repr(self.key):
+                    return False
+                self.betasw = cached['betasw']
+                self.bsw = cached['bsw']
+                self._padded = None
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning('Unreadable seawater scattering table {:s}: '
+                           '{}'.format(cache_file, e))
+            return False
+        return True
+
+    def save(self, cache_dir):
+        """Save the tables to cache_dir"""
+        cache_file = self._cache_file(cache_dir)
+        tmp_file = cache_file + '.tmp.npz'
+        try:
+            np.savez(tmp_file, key=repr(self.key),
+                     betasw=self.betasw, bsw=self.bsw)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning('Unable to save seawater scattering table {:s}: '
+                           '{}'.format(cache_file, e))
+
+    def __call__(self, degC, psu):
+        """Interpolated betasw, bsw for the temperature and salinity samples"""
+        degC = np.asarray(degC, dtype=np.float64)
+        psu = np.asarray(psu, dtype=np.float64)
+        t0, s0, step = self.t0, self.s0, self.step
+        ti = ne.evaluate('(degC - t0) / step')
+        si = ne.evaluate('(psu - s0) / step')
+        tmax = self.nt - 1
+        smax = self.ns - 1
+        inside = ne.evaluate(
+            '(ti >= 0) & (ti <= tmax) & (si >= 0) & (si <= smax)')
+        all_inside = bool(inside.all())
+        if not all_inside:
+            ti = np.where(inside, ti, 0.)
+            si = np.where(inside, si, 0.)
+
+        # lower left grid point and the weights of the upper neighbours;
+        # the tables are padded with an edge copy so the grid maximum
+        # needs no special case
+        it = ti.astype(np.intp)
+        js = si.astype(np.intp)
+        wt = ti - it
+        ws = si - js
+
+        if self._padded is None:
+            self._padded = [
+                np.pad(table, ((0, 1), (0, 1)), mode='edge').ravel()
+                for table in (self.betasw, self.bsw)]
+        ns = self.ns + 1
+        corner = it * ns + js
+        coeffs = []
+        for table in self._padded:
+            c00 = np.take(table, corner)
+            c01 = np.take(table, corner + 1)
+            c10 = np.take(table, corner + ns)
+            c11 = np.take(table, corner + (ns + 1))
+            coeffs.append(ne.evaluate(
+                '(1 - wt) * ((1 - ws) * c00 + ws * c01)'
+                '+ wt * ((1 - ws) * c10 + ws * c11)'))
+        betasw, bsw = coeffs
+
+        if not all_inside:
+            outside = ~inside
+            betasw[outside], bsw[outside] = flo_zhang_scatter_coeffs(
+                degC[outside], psu[outside],
+                self.theta, self.wlngth, self.delta)
+        return betasw, bsw
+
+
+# largest relative interpolation error of SeawaterScatterLUT on the default grid
+LUT_MAX_REL_ERROR = 3e-6
+
+# tables built in this process, by SeawaterScatterLUT.key
+_scatter_luts = {}
+
+
+def seawater_scatter_lut(theta, wlngth, delta=0.039, cache_dir=None):
+    """Returns the SeawaterScatterLUT for theta and wlngth, built once per
+    process and, if `cache_dir` is given, saved there and reused by later
+    runs.
+
+    :param theta: optical backscatter angle [degrees]
+    :param wlngth: optical backscatter measurement wavelength [nm]
+    :param delta: depolarization ratio
+    :param cache_dir: optional directory to keep the tables between runs
+    :return: SeawaterScatterLUT instance
+    """
+    lut = SeawaterScatterLUT(theta, wlngth, delta)
+    if lut.key in _scatter_luts:
+        return _scatter_luts[lut.key]
+    if cache_dir is None or not lut.load(cache_dir):
+        lut.build()
+        if cache_dir is not None and os.path.isdir(cache_dir):
+            lut.save(cache_dir)
+    _scatter_luts[lut.key] = lut
+    return lut
+
+
 def flo_refractive_index(wlngth, degC, psu):
     """
     Helper function for flo_zhang_scatter_coeffs
@@ -646,9 +807,17 @@ def backscatter_total(gldata, src_sensor, var_name, **kwargs):
         scale_factor: The wet scale factor for the sensor from the calibration
             information for the appropriate end units. Must be included with
             `dark_counts` otherwise ignored
+        seawater_lut: if True, interpolate the seawater scattering terms
+            from a SeawaterScatterLUT instead of computing them per sample
+            (relative error below LUT_MAX_REL_ERROR). Default is False
+        lut_cache_dir: optional directory where the lookup tables are kept
+            between runs
 
     :return: The GliderData instance with the backscatter variable added.
     """
+    use_lut = kwargs.pop('seawater_lut', False)
+    lut_cache_dir = kwargs.pop('lut_cache_dir', None)
+
     # set defaults if these arguments are not included in the kwargs
     required_args = ['theta', 'wlngth', 'xfactor']
     if (
@@ -708,7 +877,11 @@ def backscatter_total(gldata, src_sensor, var_name, **kwargs):
     theta = kwargs['theta']
     wlngth = kwargs['wlngth']
     xfactor = kwargs['xfactor']
-    bback = flo_bback_total(beta, temp_bt, salt_bt, theta, wlngth, xfactor)
+    lut = None
+    if use_lut:
+        lut = seawater_scatter_lut(theta, wlngth, cache_dir=lut_cache_dir)
+    bback = flo_bback_total(
+        beta, temp_bt, salt_bt, theta, wlngth, xfactor, lut=lut)
 
     backscatter_particle['data'][beta_ii] = bback
     backscatter_particle['sensor_name'] = var_name
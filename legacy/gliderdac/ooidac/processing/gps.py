@@ -4,6 +4,8 @@ import numpy as np
 import logging
 import os
 
+from ooidac.fill import interp_fill_block
+
 logger = logging.getLogger(os.path.basename(__file__))
 
 
@@ -17,45 +19,28 @@ def interpolate_gps(timestamps, latitude, longitude):
     Returns interpolated gps dataset over entire time domain of dataset
     """
 
-    dataset = np.column_stack((
-        timestamps,
-        latitude,
-        longitude
-    ))
-
-    est_lat = np.empty((len(dataset))) * np.nan
-    est_lon = np.empty((len(dataset))) * np.nan
-    
-    dataset = dataset[~np.isnan(dataset).any(axis=1), :]
-    
-    if len(dataset) == 0:
+    positions = np.column_stack((latitude, longitude)).astype(np.float64)
+
+    # only complete time, lat, lon fixes are used
+    valid = np.logical_and(
+        np.isfinite(timestamps), ~np.isnan(positions).any(axis=1))
+    n_fixes = np.count_nonzero(valid)
+    positions[~valid, :] = np.nan
+
+    if n_fixes == 0:
         logger.debug(
             'GPS time-series contains no valid GPS fixes for interpolation')
-        return est_lat, est_lon
+        return positions[:, 0], positions[:, 1]
 
     # If only one GPS point, make it the same for the entire dataset
-    if len(dataset) == 1:
+    if n_fixes == 1:
         logger.info('Only one GPS fix, setting all records to the single fix')
-        est_lat[:] = dataset[0, 1]
-        est_lon[:] = dataset[0, 2]
+        positions[:] = positions[valid][0]
     else:
-        # Interpolate data
-        est_lat = np.interp(
-            timestamps,
-            dataset[:, 0],
-            dataset[:, 1],
-            left=dataset[0, 1],
-            right=dataset[-1, 1]
-        )
-        est_lon = np.interp(
-            timestamps,
-            dataset[:, 0],
-            dataset[:, 2],
-            left=dataset[0, 2],
-            right=dataset[-1, 2]
-        )
+        # Interpolate lat and lon together
+        positions = interp_fill_block(positions, timestamps)
 
-    return est_lat, est_lon
+    return positions[:, 0], positions[:, 1]
 
 
 def iso2deg(iso_pos_element):
@@ -71,131 +56,130 @@ def iso2deg(iso_pos_element):
     return degrees
 
 
-def correct_uw_dr_pos(dba):
-    """ Algorithm incomplete at this time
-    A good file to test this for that has fixes in the middle of the dive is
-    ce_311_2019_123_1_0.full.mrg from 311_R00007
-    :param dba:
-    :return:
+def dr_corrected_positions(
+        timestamps, gps_lat, gps_lon, dr_lat, dr_lon, depth=None,
+        surface_depth=2.0):
+    """Corrects the glider's underwater dead-reckoned (DR) positions for the
+    drift accumulated over each dive, for all dives of a segment at once.
+
+    Each dive lies between two consecutive surface GPS fixes with DR
+    positions in between.  The DR track between the first and last DR
+    positions of the dive is offset so that both ends lie on the straight
+    line between the pre-dive and post-dive fixes, with the offset varying
+    linearly in time between them, i.e. the drift is spread evenly over the
+    dive and the shape of the DR track is kept.  DR positions after the last
+    fix (a dive in progress) are kept as they are, since the glider dead-
+    reckons from that fix.  Positions between the fixes and the DR positions
+    are then linearly interpolated.
+
+    Parameters:
+        timestamps: sample times, increasing
+        gps_lat, gps_lon: GPS fixes in decimal degrees, NaN if no fix
+        dr_lat, dr_lon: dead-reckoned positions in decimal degrees
+        depth: optional depth (m). Fixes deeper than surface_depth
+            (accidental mid-dive fixes) are dropped, and only DR positions
+            deeper than it are used
+        surface_depth: depth (m) above which the glider is at the surface
+
+    Returns corrected lat and lon arrays over the entire time domain,
+    interpolate_gps results if there are no dives with DR positions
+    """
+    finite_ts = np.isfinite(timestamps)
+    fixes = np.flatnonzero(
+        finite_ts & np.isfinite(gps_lat) & np.isfinite(gps_lon))
+    dr_ok = finite_ts & np.isfinite(dr_lat) & np.isfinite(dr_lon)
+    if depth is not None:
+        underwater = depth > surface_depth
+        fixes = fixes[~underwater[fixes]]
+        dr_ok &= underwater
+    dr_ok[fixes] = False
+
+    # the dive of each DR position is the one after the preceding fix, and
+    # DR positions before the first or after the last fix are not in a dive
+    dr_indices = np.flatnonzero(dr_ok)
+    dives = np.searchsorted(fixes, dr_indices) - 1
+    trailing = dr_indices[dives == len(fixes) - 1] if len(fixes) else []
+    in_dive = np.logical_and(dives >= 0, dives < len(fixes) - 1)
+    dr_indices = dr_indices[in_dive]
+    dives = dives[in_dive]
+    if len(dr_indices) == 0 and len(trailing) == 0:
+        logger.debug('No DR positions between GPS fixes to correct')
+        return interpolate_gps(timestamps, gps_lat, gps_lon)
+
+    # first and last DR positions of each dive, dives are in time order
+    new_dive = np.diff(dives, prepend=-1) != 0
+    firsts = np.flatnonzero(new_dive)
+    lasts = np.append(firsts[1:] - 1, len(dives) - 1)
+    dive_of = np.cumsum(new_dive) - 1
+    pre_fix = fixes[dives[firsts]]
+    post_fix = fixes[dives[firsts] + 1]
+    dr_start = dr_indices[firsts]
+    dr_end = dr_indices[lasts]
+
+    fix_dt = timestamps[post_fix] - timestamps[pre_fix]
+    dr_dt = timestamps[dr_end] - timestamps[dr_start]
+    # fraction of each DR position through its dive's DR track
+    fraction = np.zeros(len(dr_indices))
+    spanned = dr_dt[dive_of] > 0
+    fraction[spanned] = (
+        (timestamps[dr_indices[spanned]]
+         - timestamps[dr_start[dive_of[spanned]]])
+        / dr_dt[dive_of[spanned]])
+
+    positions = np.union1d(np.union1d(fixes, dr_indices), trailing)
+    corrected = []
+    for gps, dr in ((gps_lat, dr_lat), (gps_lon, dr_lon)):
+        # straight line between the pre and post dive fixes at the DR ends
+        rate = (gps[post_fix] - gps[pre_fix]) / fix_dt
+        line_start = gps[pre_fix] + rate * (
+            timestamps[dr_start] - timestamps[pre_fix])
+        line_end = gps[pre_fix] + rate * (
+            timestamps[dr_end] - timestamps[pre_fix])
+        offset_start = dr[dr_start] - line_start
+        offset_end = dr[dr_end] - line_end
+
+        values = np.full(len(timestamps), np.nan)
+        values[fixes] = gps[fixes]
+        values[trailing] = dr[trailing]
+        values[dr_indices] = dr[dr_indices] - (
+            offset_start[dive_of]
+            + (offset_end - offset_start)[dive_of] * fraction)
+        corrected.append(np.interp(
+            timestamps, timestamps[positions], values[positions],
+            left=values[positions[0]], right=values[positions[-1]]))
+
+    logger.debug('Corrected DR positions for {:d} dives'.format(len(firsts)))
+    return corrected[0], corrected[1]
+
+
+def correct_uw_dr_pos(dba, surface_depth=2.0):
+    """Underwater positions from the glider dead-reckoned m_lat/m_lon
+    corrected for drift between the surface GPS fixes m_gps_lat/m_gps_lon.
+    See dr_corrected_positions.
+
+    :param dba: GliderData instance
+    :param surface_depth: depth (m) above which the glider is at the surface
+    :return: lats, lons in decimal degrees
     """
-    # correct lat and lon
-    gps_lon = iso2deg(dba.getdata('m_gps_lon'))
-    gps_lat = iso2deg(dba.getdata('m_gps_lat'))
-
-    dr_lat = iso2deg(dba.getdata('m_lat'))
-    dr_lon = iso2deg(dba.getdata('m_lon'))
-    gps_indices = np.flatnonzero(np.isfinite(gps_lon))
-    gps_times = dba.ts[gps_indices]
-
-    # this is to fix any mid segement accidental gps fixes if the glider comes
-    # too close to the surface.  As these are very unlikely, i think I will have
-    # to make a test data set to try this.  but I think this would work
-    # ToDo: This doesn't fully work because of potential gaps during the
-    #  surface times.  So I should get a segment_dive start time and a
-    #  segment_dive end time and only look at gps fixes that might occur
-    #  between those times for mid segment accidental fixes
-    gps_dt = np.diff(gps_times)
-    median_gpsdt = np.median(gps_dt)
-    gaps = np.flatnonzero(gps_dt > median_gpsdt * 3)
-    if len(gaps) > 1:
-        logger.info("Possible mid-dive GPS fixes, attempting to remove")
-        for ii in range(len(gaps) - 1):
-            mid_seg_fix = gps_indices[gaps[ii] + 1:gaps[ii + 1] + 1]
-            for jj in mid_seg_fix:
-                if dr_lat[jj] == gps_lat[jj]:
-                    lat_offset = dr_lat[jj] - dr_lat[jj - 1]  # Doesn't work
-                    lon_offset = dr_lon[jj] - dr_lon[jj - 1]  # ToDo: fix this
-                    next_gap_section = np.arange(gps_indices[gaps[ii + 1]] + 1,
-                                                 gps_indices[gaps[ii + 1] + 1])
-                    dr_lat[next_gap_section] -= lat_offset
-                    dr_lon[next_gap_section] -= lon_offset
-            np.delete(gps_indices, slice(gaps[ii] + 1, gaps[ii + 1] + 1))
-
-    # now remove the remaining dr_lat/lon points that have been set to the
-    # gps_fixes and any dr points that are on the surface
-    dr_lat[gps_indices] = np.nan
-    dr_lon[gps_indices] = np.nan
-    dr_lon[dba.surface_indices] = np.nan
-    dr_lat[dba.surface_indices] = np.nan
-
-    # remove any gps indices that are underwater ( > 2 meters)
-    gps_uw_ii = np.intersect1d(
-        gps_indices, dba.underwater_indices,
-        assume_unique=True, return_indices=True)[1]
-    gps_indices = np.delete(gps_indices, gps_uw_ii)
-
-    # remove any remaining fixes that are half a meter deeper than the median
-    # fix depth
-    gps_depths = dba.depth[gps_indices]
-    median_gpsdepth = np.median(gps_depths)  # nans fille with interp use median
-    uw_gps = np.flatnonzero(gps_depths > median_gpsdepth + 0.5)
-    if len(uw_gps) > 0:
-        gps_indices = np.delete(gps_indices, uw_gps)
-
-    # all below was just pasted from the terminal, but is the basis for
-    # correcting lats and lons after the above adjustments.
-    pre_dive_fixes = np.intersect1d(gps_indices, dba.pre_dive_indices)
-    post_dive_fixes = np.intersect1d(gps_indices, dba.post_dive_indices)
-
-    x = [dba.ts[pre_dive_fixes[-1]], dba.ts[post_dive_fixes[0]]]
-    y_lat = [gps_lat[pre_dive_fixes[-1]], gps_lat[post_dive_fixes[0]]]
-    y_lon = [gps_lon[pre_dive_fixes[-1]], gps_lon[post_dive_fixes[0]]]
-    p_lon = np.poly1d(np.polyfit(x, y_lon, 1))
-    p_lat = np.poly1d(np.polyfit(x, y_lat, 1))
-
-    dr_indices = np.flatnonzero(np.isfinite(dr_lon))
-    dr_times = dba.ts[dr_indices]
-
-    # method B
-    new_lat = np.empty(len(dr_times))
-    new_lon = np.empty(len(dr_times))
-    initial_new_lat = p_lat(dr_times[0])
-    initial_new_lon = p_lon(dr_times[0])
-    final_new_lat = p_lat(dr_times[-1])
-    final_new_lon = p_lon(dr_times[-1])
-    new_lat[0] = initial_new_lat
-    new_lon[0] = initial_new_lon
-    new_lat[-1] = final_new_lat
-    new_lon[-1] = final_new_lon
-
-    init_offset_lat = dr_lat[dr_indices[0]] - initial_new_lat
-    init_offset_lon = dr_lon[dr_indices[0]] - initial_new_lon
-    final_offset_lat = dr_lat[dr_indices[-1]] - final_new_lat
-    final_offset_lon = dr_lon[dr_indices[-1]] - final_new_lon
-
-    p_offset_lat = np.poly1d(np.polyfit(
-        [dr_times[0], dr_times[-1]],
-        [init_offset_lat, final_offset_lat],
-        1))
-    p_offset_lon = np.poly1d(np.polyfit(
-        [dr_times[0], dr_times[-1]],
-        [init_offset_lon, final_offset_lon],
-        1))
-
-    lat_offsets = p_offset_lat(dr_times[1:-1])
-    lon_offsets = p_offset_lon(dr_times[1:-1])
-
-    new_lat[1:-1] = dr_lat[dr_indices[1:-1]] - lat_offsets
-    new_lon[1:-1] = dr_lon[dr_indices[1:-1]] - lon_offsets
-
-    lats = np.empty(len(dba.ts))
-    lons = np.empty(len(dba.ts))
-    lats[dr_indices] = new_lat
-    lons[dr_indices] = new_lon
-    lats[gps_indices] = gps_lat[gps_indices]
-    lons[gps_indices] = gps_lon[gps_indices]
-
-    positions_ii = np.union1d(gps_indices, dr_indices)
-    lats = np.interp(
-        dba.ts, dba.ts[positions_ii], lats[positions_ii],
-        left=lats[positions_ii[0]], right=lats[positions_ii[-1]])
-    lons = np.interp(
-        dba.ts, dba.ts[positions_ii], lons[positions_ii],
-        left=lons[positions_ii[0]], right=lons[positions_ii[-1]])
-    return lats, lons
-
-
-def lat_and_lon_coordinates(dba, time_sensor):
+    gps_lat = _valid_iso_positions(dba.getdata('m_gps_lat'), 9000.0)
+    gps_lon = _valid_iso_positions(dba.getdata('m_gps_lon'), 18000.0)
+    dr_lat = _valid_iso_positions(dba.getdata('m_lat'), 9000.0)
+    dr_lon = _valid_iso_positions(dba.getdata('m_lon'), 18000.0)
+
+    return dr_corrected_positions(
+        dba.ts, gps_lat, gps_lon, dr_lat, dr_lon,
+        depth=getattr(dba, 'depth', None), surface_depth=surface_depth)
+
+
+def _valid_iso_positions(iso_positions, limit):
+    """Decimal degrees from iso positions, with default values (69696969)
+    set to NaN"""
+    positions = iso_positions.copy()
+    positions[np.fabs(positions) > limit] = np.nan
+    return iso2deg(positions)
+
+
+def lat_and_lon_coordinates(dba, time_sensor, dr_correction=False):
     # Convert m_gps_lat to decimal degrees and create the new sensor
     # definition
     lat_sensor = deepcopy(dba['m_gps_lat'])
@@ -228,6 +212,30 @@ def lat_and_lon_coordinates(dba, time_sensor):
     # lon_sensor['data'][lon_sensor['data'] > 18000] = np.nan
     # lon_sensor['data'] = gps.iso2deg(lon_sensor['data'])
 
+    if dr_correction and 'm_lat' in dba.sensor_names and (
+            'm_lon' in dba.sensor_names):
+        logging.info('Filling lat and lon coordinates from drift corrected '
+                     'dead-reckoned positions between GPS fixes')
+        lat_sensor['data'], lon_sensor['data'] = dr_corrected_positions(
+            time_sensor['data'], lat_sensor['data'], lon_sensor['data'],
+            _valid_iso_positions(dba.getdata('m_lat'), 9000.0),
+            _valid_iso_positions(dba.getdata('m_lon'), 18000.0),
+            depth=getattr(dba, 'depth', None)
+        )
+        lat_sensor['attrs']['source_sensor'] = u'm_gps_lat,m_lat'
+        lon_sensor['attrs']['source_sensor'] = u'm_gps_lon,m_lon'
+        lat_sensor['attrs']['comment'] = (
+            u'm_gps_lat converted to decimal degrees, with underwater '
+            u'positions from m_lat corrected for drift between fixes'
+        )
+        lon_sensor['attrs']['comment'] = (
+            u'm_gps_lon converted to decimal degrees, with underwater '
+            u'positions from m_lon corrected for drift between fixes'
+        )
+        return lat_sensor, lon_sensor
+
+    if dr_correction:
+        logging.warning('m_lat/m_lon not found for dead-reckoning correction')
     logging.info('Filling lat and lon coordinates by interpolation '
                  'between GPS fixes')
     # Interpolate llat_latitude and llat_longitude
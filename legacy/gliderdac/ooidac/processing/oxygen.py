@@ -17,15 +17,19 @@ Revision History
     2019-03-07: Stuart Pearce. Broke out the calculation steps into individual
         functions to use separately, and rewrote the main function in terms of
         the sub-functions.
+    2026-10-19: The concentration, partial pressure and salinity and pressure
+        compensation calculations are evaluated by the fused kernels in
+        ooidac.processing.oxygen_kernels, shared with the Remus 600.
 """
 from copy import deepcopy
 
 import numpy as np
-import gsw
 
 # Global definitions
 from configuration import SCITIMESENSOR
 from ooidac.processing import logger, _add_nan_variable
+from ooidac.processing import oxygen_kernels
+from ooidac.fill import fill_block, INTERP
 
 KELVIN_OFFSET = 273.15  # The offset to convert temperature Celsius to Kelvin
 ST_K = 298.15  # Standard Temperature in Kelvin. 25.0 deg C = 298.15 deg K
@@ -104,31 +108,13 @@ def calc_o2(cph, tmp, C, M, N, cc=(0, 1), S=0.0,
         2019-02-27: Stuart Pearce. Initial Code.
         2019-03-06: Stuart Pearce. Added ConcCoef adjustment parameter inputs
     """
-    # O2 partial pressure
-    partialpres = partial_pressure(cph, tmp, C, M, N)
+    # partial pressure, vapour pressure, air saturation, Garcia and Gordon
+    # solubility and the ConcCoef adjustment fused into two passes
+    o2Conc, airsaturation = oxygen_kernels.mkii_concentration(
+        cph, tmp, C, M, N, cc=cc, S=S, NomAirPress=NomAirPress,
+        NomAirMix=NomAirMix, idealgc=idealgc)
 
-    # vapour pressure pvapor(t)
-    pvapor = vapor_pressure(tmp)
-
-    # air saturation percentage
-    airsaturation = air_saturation(
-            partialpres, pvapor, NomAirPress=NomAirPress, NomAirMix=NomAirMix)
-
-    if idealgc:
-        gas_const = 44.615
-    else:
-        gas_const = 44.659
-
-    # Oxygen solubility (cm3/dm3) from Garcia and Gordon (1992)
-    oxysol = oxygen_solubility(tmp, S=S) * gas_const
-
-    # O2 concentration calculated as micro-mole/L
-    o2Conc = oxysol * airsaturation / 100.
-
-    # Calibration adjustment using the ConcCoef calibration coefficents
-    o2Conc = cc[0] + o2Conc*cc[1]
-
-    return o2Conc, airsaturation
+    return np.atleast_1d(o2Conc), np.atleast_1d(airsaturation)
 
 
 def calphase_from_rph(c1rph, c2rph, phaseCoefs):
@@ -157,14 +143,7 @@ def calphase_from_rph(c1rph, c2rph, phaseCoefs):
         https://www.aanderaa.com/media/pdfs/
             oxygen-optode-4330-4835-and-4831.pdf
     """
-    tcphase = c1rph - c2rph
-    calphase = (
-            phaseCoefs[0]
-            + phaseCoefs[1] * tcphase
-            + phaseCoefs[2] * tcphase**2
-            + phaseCoefs[3] * tcphase**3
-            )
-    return calphase
+    return oxygen_kernels.calphase_from_rph(c1rph, c2rph, phaseCoefs)
 
 
 def temp_from_rawtemp(rawtemp, tempCoefs):
@@ -241,15 +220,8 @@ def partial_pressure(cph, tmp, C, M, N):
     ----------------
         2019-03-07: Stuart Pearce. Initial Code.
     """
-    C = np.atleast_1d(C)
-    M = np.atleast_1d(M)
-    N = np.atleast_1d(N)
-    # initialize container to be the same size as calphase
-    partialpress = np.zeros_like(cph)
-    # Partial pressure is a polynomial summation calculated here in a for loop
-    for ii in range(len(C)):
-        partialpress = partialpress + C[ii] * tmp**M[ii] * cph**N[ii]
-    return partialpress
+    # Partial pressure is a polynomial summation, evaluated in nested form
+    return oxygen_kernels.partial_pressure(cph, tmp, C, M, N)
 
 
 def vapor_pressure(temp):
@@ -515,6 +487,12 @@ def do2_SVU(calphase, temp, csv, conc_coef=np.array([0.0, 1.0]), salt=0):
     # this will work for both old and new CI implementations of cal coeffs.
     csv = np.atleast_2d(csv)
 
+    # a single set of coefficients (the glider case) runs as one fused pass,
+    # time-vectorized coefficients fall through to the broadcast calculation
+    if len(csv) == 1 and len(conc_coef) == 1 and np.ndim(salt) == 0:
+        return np.atleast_1d(oxygen_kernels.svu_concentration(
+            calphase, temp, csv[0], conc_coef[0], salt=salt))
+
     # Calculate DO using Stern-Volmer:
     Ksv = csv[:, 0] + csv[:, 1]*temp + csv[:, 2]*(temp**2)
     P0 = csv[:, 3] + csv[:, 4]*temp
@@ -596,28 +574,11 @@ def do2_salinity_correction(DO, P, T, SP, lat, lon, pref=0):
         Table 1, 5th column.
     """
 
-    # density calculation from GSW toolbox
-    SA = gsw.SA_from_SP(SP, P, lon, lat)
-    CT = gsw.CT_from_t(SA, T, P)
-    pdens = gsw.rho(SA, CT, pref)  # potential referenced to p=0
-
-    # Convert from volume to mass units:
-    DO = 1000*DO/pdens
-
-    # Pressure correction:
-    DO = (1 + (0.032*P)/1000) * DO
-
-    # Salinity correction (Garcia and Gordon, 1992, combined fit):
-    S0 = 0
-    ts = np.log((298.15-T)/(273.15+T))
-    B0 = -6.24097e-3
-    B1 = -6.93498e-3
-    B2 = -6.90358e-3
-    B3 = -4.29155e-3
-    C0 = -3.11680e-7
-    Bts = B0 + B1*ts + B2*ts**2 + B3*ts**3
-    DO = np.exp((SP-S0)*Bts + C0*(SP**2-S0**2)) * DO
-    return DO
+    # density calculation from GSW toolbox, then the volume to mass units
+    # conversion, pressure correction and salinity correction (Garcia and
+    # Gordon, 1992, combined fit) in one fused pass
+    return oxygen_kernels.s_and_p_compensation(
+        DO, SP, P, T, lat, lon, pref=pref)
 
 
 def check_and_recalc_o2(dba, calc_type, cal_dict):
@@ -642,9 +603,10 @@ def check_and_recalc_o2(dba, calc_type, cal_dict):
         return _add_nan_variable(dba, 'corrected_oxygen', 'sci_oxy4_oxygen')
     calphase = dba.getdata('sci_oxy4_calphase')
     oxytemp = dba.getdata('sci_oxy4_temp')
-    bads = calphase == 0.0
-    calphase[bads] = np.nan
-    oxytemp[bads] = np.nan
+    dba.update_data(['sci_oxy4_calphase', 'sci_oxy4_temp'],
+                    np.flatnonzero(calphase == 0.0), np.nan)
+    calphase = dba.getdata('sci_oxy4_calphase')
+    oxytemp = dba.getdata('sci_oxy4_temp')
     if calc_type == 'SVU':
         csv = cal_dict['SVUFoilCoef']
         conc_coef = cal_dict['ConcCoef']
@@ -674,7 +636,17 @@ def check_and_recalc_o2(dba, calc_type, cal_dict):
     return dba
 
 
-def o2_s_and_p_comp(dba, o2sensor='sci_oxy4_oxygen'):
+def o2_s_and_p_comp(dba, o2sensor='sci_oxy4_oxygen', fills=None):
+    """Oxygen compensated for salinity and pressure from the co-located CTD
+    data, added to the GliderData instance as `oxygen`.
+
+    :param dba: GliderData instance
+    :param o2sensor: uncorrected oxygen concentration sensor name
+    :param fills: optional dictionary of fill method by sensor name for the
+        CTD `salinity`, `llat_pressure` and `sci_water_temp` onto the oxygen
+        samples, defaulting to 'interp', see ooidac.fill
+    :return: The GliderData instance with `oxygen` added
+    """
     if o2sensor not in dba.sensor_names:
         logger.warning(
             'Oxygen data not found in data file {:s}'.format(dba.source_file)
@@ -684,42 +656,27 @@ def o2_s_and_p_comp(dba, o2sensor='sci_oxy4_oxygen'):
     oxygen = dba[o2sensor]
     oxy = oxygen['data'].copy()
     timestamps = dba.getdata(SCITIMESENSOR)
-    sp = dba.getdata('salinity')
-    p = dba.getdata('llat_pressure')
-    t = dba.getdata('sci_water_temp')
+    ctd_sensors = ['salinity', 'llat_pressure', 'sci_water_temp']
+    fills = fills or {}
 
     oxy_ii = np.isfinite(oxy)
     oxy = oxy[oxy_ii]
-    oxy_ts = timestamps[oxy_ii]
 
-    sp = np.interp(oxy_ts, timestamps[np.isfinite(sp)], sp[np.isfinite(sp)])
-    p = np.interp(oxy_ts, timestamps[np.isfinite(p)], p[np.isfinite(p)])
-    t = np.interp(oxy_ts, timestamps[np.isfinite(t)], t[np.isfinite(t)])
+    # fill the CTD data onto the oxygen samples as one block
+    ctd = fill_block(
+        dba.getdataslice(ctd_sensors),
+        [fills.get(sensor, INTERP) for sensor in ctd_sensors],
+        x=timestamps)[oxy_ii]
+    sp = ctd[:, 0]
+    p = ctd[:, 1]
+    t = ctd[:, 2]
 
     lon = dba.getdata('llat_longitude')[oxy_ii]  # should already be interp'ed
     lat = dba.getdata('llat_latitude')[oxy_ii]
 
-    # density calculation from GSW toolbox
-    sa = gsw.SA_from_SP(sp, p, lon, lat)
-    ct = gsw.CT_from_t(sa, t, p)
-    pdens = gsw.rho(sa, ct, 0.0)  # potential referenced to p=0
-
-    # Convert from volume to mass units:
-    do = 1000*oxy/pdens
-
-    # Pressure correction:
-    do = (1 + (0.032*p)/1000) * do
-
-    # Salinity correction (Garcia and Gordon, 1992, combined fit):
-    s0 = 0
-    ts = np.log((298.15-t)/(273.15+t))
-    b0 = -6.24097e-3
-    b1 = -6.93498e-3
-    b2 = -6.90358e-3
-    b3 = -4.29155e-3
-    c0 = -3.11680e-7
-    bts = b0 + b1*ts + b2*ts**2 + b3*ts**3
-    do = np.exp((sp-s0)*bts + c0*(sp**2-s0**2)) * do
+    # density from the GSW toolbox (potential referenced to p=0), volume to
+    # mass units, pressure and salinity corrections
+    do = oxygen_kernels.s_and_p_compensation(oxy, sp, p, t, lat, lon, 0.0)
 
     oxygen['sensor_name'] = 'oxygen'
     oxygen['data'] = np.full(len(oxy_ii), np.nan)
@@ -0,0 +1,277 @@
+"""oxygen_kernels
+Fused, vectorized kernels for the Aanderaa 4831 optode oxygen chain,
+shared by the Slocum glider processing (ooidac.processing.oxygen) and the
+Remus 600 data processor.
+
+Each stage of the calphase -> partial pressure -> concentration -> salinity
+and pressure compensation chain is evaluated as a single numexpr expression.
+The calibration polynomials are expanded once per coefficient set into
+nested (Horner) form with the coefficients inlined, so the powers of
+temperature and phase are never materialized as full arrays and no
+temporary array is allocated per coefficient.  Only the GSW density
+calculation runs outside of numexpr.
+
+References
+----------
+AADI(2017). TD 269 OPERATING MANUAL: OXYGEN OPTODE 4330, 4831, 4835.
+    https://www.aanderaa.com/media/pdfs/oxygen-optode-4330-4835-and-4831.pdf
+Garcia, H.E. and Gordon, L.I. (1992). "Oxygen solubility in seawater:
+    Better fitting equations". Limnol. Oceanogr. 37(6) 1307-1312.
+
+Revision History
+----------------
+    2026-10-19: Initial Code, from the ooidac.processing.oxygen functions.
+"""
+import numpy as np
+import numexpr as ne
+import gsw
+
+KELVIN_OFFSET = 273.15  # The offset to convert temperature Celsius to Kelvin
+ST_K = 298.15  # Standard Temperature in Kelvin. 25.0 deg C = 298.15 deg K
+
+# Garcia and Gordon (1992) combined fit coefficients, Table 1, 5th column
+GG_A = (2.00856, 3.22400, 3.99063, 4.80299, 9.78188e-1, 1.71069)
+GG_B = (-6.24097e-3, -6.93498e-3, -6.90358e-3, -4.29155e-3)
+GG_C0 = -3.11680e-7
+
+# scaled temperature of Garcia and Gordon, for a temperature variable `t`
+_SCALED_TEMP = 'log(({!r} - t) / ({!r} + t))'.format(ST_K, KELVIN_OFFSET)
+# vapour pressure [hPa] for a temperature variable `t`
+_VAPOR_PRESSURE = 'exp(52.57 - 6690.9 / (t + {k!r}) - 4.6810 * log(t + {k!r}))'
+
+
+def _num(value):
+    """A float literal for a numexpr expression"""
+    return '({!r})'.format(float(value))
+
+
+def _horner(var, coefs):
+    """Nested form of the polynomial sum(coefs[k] * var**k) as a numexpr
+    expression string, with the coefficients inlined.
+
+    Parameters
+    ----------
+    var : str
+        Name of the variable (or a parenthesized sub-expression)
+    coefs : sequence of float
+        Coefficients from the constant term upwards
+
+    Returns
+    -------
+    str
+    """
+    coefs = list(coefs)
+    while len(coefs) > 1 and coefs[-1] == 0:
+        coefs.pop()
+    expr = _num(coefs[-1])
+    for coef in reversed(coefs[:-1]):
+        expr = '({} + {} * {})'.format(_num(coef), var, expr)
+    return expr
+
+
+def _foil_polynomial(C, M, N):
+    """Expression for the foil partial pressure polynomial
+    sum(C[i] * t**M[i] * cph**N[i]), grouped by phase degree and nested in
+    both temperature and phase.  Non-integer or negative exponents are kept
+    as explicit powers.
+
+    Parameters
+    ----------
+    C : array-like.
+        Optode calibration coefficients FoilCoefA and FoilCoefB concatenated
+    M : array-like.
+        Optode calibration coefficient FoilPolyDegT
+    N : array-like.
+        Optode calibration coefficient FoilPolyDegO
+
+    Returns
+    -------
+    str expression in the variables `t` and `cph`
+    """
+    C = np.atleast_1d(np.asarray(C, dtype=np.float64))
+    M = np.atleast_1d(np.asarray(M, dtype=np.float64))
+    N = np.atleast_1d(np.asarray(N, dtype=np.float64))
+    if len(C) == 0:
+        return '(0.0 * t * cph)'
+
+    integral = (np.all(M == np.round(M)) and np.all(N == np.round(N))
+                and M.min() >= 0 and N.min() >= 0)
+    if not integral:
+        terms = ['{} * t**{} * cph**{}'.format(_num(c), _num(m), _num(n))
+                 for c, m, n in zip(C, M, N)]
+        return '(' + ' + '.join(terms) + ')'
+
+    M = M.astype(int)
+    N = N.astype(int)
+    # coefficient table indexed [phase degree, temperature degree]
+    table = np.zeros((N.max() + 1, M.max() + 1))
+    np.add.at(table, (N, M), C)
+    phase_coefs = [_horner('t', row) for row in table]
+
+    expr = phase_coefs[-1]
+    for coef in reversed(phase_coefs[:-1]):
+        expr = '({} + cph * {})'.format(coef, expr)
+    return expr
+
+
+def _as_float(value):
+    return np.asarray(value, dtype=np.float64)
+
+
+def _scalar(value):
+    return np.ndim(value) == 0
+
+
+def calphase_from_rph(c1rph, c2rph, phase_coefs):
+    """Calibrated phase [deg] from the blue and red excitation light phases
+    in one pass.  See ooidac.processing.oxygen.calphase_from_rph.
+
+    Parameters
+    ----------
+    c1rph : Blue excitation light phase, Array/Scalar. [deg]
+    c2rph : Red excitation light phase, Array/Scalar. [deg]
+    phase_coefs : Optode calibration parameter PHASECOEFS. List.
+
+    Returns
+    -------
+    calphase : Array. [deg]
+    """
+    c1rph = _as_float(c1rph)
+    c2rph = _as_float(c2rph)
+    return ne.evaluate(_horner('(c1rph - c2rph)', phase_coefs[:4]))
+
+
+def partial_pressure(cph, tmp, C, M, N):
+    """O2 partial pressure [hPa] from calphase and optode temperature in one
+    pass.  See ooidac.processing.oxygen.partial_pressure.
+
+    Parameters
+    ----------
+    cph : calphase, Array/Scalar. [deg]
+    tmp : optode temperature, Array/Scalar. [deg C]
+    C, M, N : foil coefficients and their temperature and phase exponents
+
+    Returns
+    -------
+    partial pressure, Array. [hPa]
+    """
+    cph = _as_float(cph)
+    t = _as_float(tmp)
+    return ne.evaluate(_foil_polynomial(C, M, N))
+
+
+def mkii_concentration(cph, tmp, C, M, N, cc=(0, 1), S=0.0,
+                       NomAirPress=1013.25, NomAirMix=0.20946, idealgc=False):
+    """Oxygen concentration (uncorrected for salinity or pressure) and air
+    saturation from calphase and optode temperature using the MkII
+    calculation, in two fused passes.  See ooidac.processing.oxygen.calc_o2
+    for the parameter descriptions.
+
+    Returns
+    -------
+    A tuple of o2conc [micro-moles/L] and airsat [%] arrays.
+    """
+    cph = _as_float(cph)
+    t = _as_float(tmp)
+    gas_const = 44.615 if idealgc else 44.659
+
+    airsat = ne.evaluate(
+        '{pp} * 100. / (({nap} - {pv}) * {nam})'.format(
+            pp=_foil_polynomial(C, M, N),
+            nap=_num(NomAirPress),
+            pv=_VAPOR_PRESSURE.format(k=KELVIN_OFFSET),
+            nam=_num(NomAirMix)))
+
+    if _scalar(S):
+        # the salinity terms fold into the solubility polynomial
+        S = float(S)
+        coefs = list(GG_A)
+        for ii, b in enumerate(GG_B):
+            coefs[ii] += S * b
+        exponent = '{} + {}'.format(
+            _horner('ts', coefs), _num(GG_C0 * S ** 2))
+    else:
+        S = _as_float(S)
+        exponent = '{} + S * {} + {} * S * S'.format(
+            _horner('ts', GG_A), _horner('ts', GG_B), _num(GG_C0))
+
+    # numexpr has no temporaries, so the scaled temperature used at every
+    # level of the nested polynomial is evaluated once up front
+    ts = ne.evaluate(_SCALED_TEMP)
+    o2conc = ne.evaluate(
+        '{cc0} + {cc1} * (exp({exponent}) * {gc} * airsat / 100.)'.format(
+            cc0=_num(cc[0]), cc1=_num(cc[1]), exponent=exponent,
+            gc=_num(gas_const)))
+    return o2conc, airsat
+
+
+def svu_concentration(cph, tmp, csv, conc_coef=(0.0, 1.0), salt=0.0):
+    """Oxygen concentration [micro-moles/L] (uncorrected for salinity or
+    pressure) from calphase and optode temperature using the
+    Stern-Volmer-Uchida equation in one pass.  See
+    ooidac.processing.oxygen.do2_SVU.
+
+    Parameters
+    ----------
+    cph : calphase, Array/Scalar. [deg]
+    tmp : optode temperature, Array/Scalar. [deg C]
+    csv : the 7 Stern-Volmer-Uchida calibration coefficients
+    conc_coef : offset and slope refurbishment coefficients
+    salt : preset salinity parameter on the optode, scalar
+
+    Returns
+    -------
+    o2conc, Array. [micro-moles/L]
+    """
+    cph = _as_float(cph)
+    t = _as_float(tmp)
+    csv = np.ravel(csv)
+    conc_coef = np.ravel(conc_coef)
+
+    do = '((({p0} / {pc}) - 1.) / {ksv})'.format(
+        ksv=_horner('t', csv[0:3]),
+        p0=_horner('t', csv[3:5]),
+        pc=_horner('cph', csv[5:7]))
+    salt = float(salt)
+    if salt != 0.0:
+        ts = ne.evaluate(_SCALED_TEMP)
+        do = '({} * exp({} * {} + {}))'.format(
+            do, _num(salt), _horner('ts', GG_B), _num(GG_C0 * salt ** 2))
+    return ne.evaluate('{} + {} * {}'.format(
+        _num(conc_coef[0]), _num(conc_coef[1]), do))
+
+
+def s_and_p_compensation(o2conc, sp, p, t, lat, lon, pref=0.0):
+    """Oxygen [micro-mole/kg] compensated for salinity and pressure from the
+    uncorrected concentration [micro-mole/L].  The potential density comes
+    from GSW; the unit conversion, pressure correction and Garcia and Gordon
+    salinity correction are one fused pass.  See
+    ooidac.processing.oxygen.do2_salinity_correction.
+
+    Parameters
+    ----------
+    o2conc : uncorrected dissolved oxygen, Array. [micro-mole/L]
+    sp : practical salinity, Array.
+    p : pressure, Array. [dbar]
+    t : temperature, Array. [deg C]
+    lat, lon : latitude and longitude, Array/Scalar. [degrees]
+    pref : pressure reference level for potential density [dbar]
+
+    Returns
+    -------
+    Array. [micro-mole/kg]
+    """
+    o2conc = _as_float(o2conc)
+    sp = _as_float(sp)
+    p = _as_float(p)
+    t = _as_float(t)
+
+    sa = gsw.SA_from_SP(sp, p, lon, lat)
+    ct = gsw.CT_from_t(sa, t, p)
+    pdens = gsw.rho(sa, ct, pref)
+
+    ts = ne.evaluate(_SCALED_TEMP)
+    return ne.evaluate(
+        'exp(sp * {bts} + {c0} * sp * sp) * (1. + 0.032 * p / 1000.)'
+        ' * (1000. * o2conc / pdens)'.format(
+            bts=_horner('ts', GG_B), c0=_num(GG_C0)))
@@ -25,7 +25,9 @@ def recalc_par(dba, sensor_dark, scale_factor):
         return _add_nan_variable(dba, "corrected_par", "sci_bsipar_par")
     par_volts = dba.getdata('sci_bsipar_sensor_volts')
     # remove the initialization where sensor volts == 0.0
-    par_volts[par_volts == 0.0] = np.nan
+    dba.update_data(['sci_bsipar_sensor_volts'],
+                    np.flatnonzero(par_volts == 0.0), np.nan)
+    par_volts = dba.getdata('sci_bsipar_sensor_volts')
     par_units = deepcopy(dba['sci_bsipar_par'])
     new_par = (par_volts - sensor_dark) / scale_factor
     par_units['data'] = new_par
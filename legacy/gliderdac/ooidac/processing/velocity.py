@@ -1,16 +1,19 @@
+from copy import deepcopy
 import numpy as np
-from ooidac.data_classes import DbaData
 from ooidac.processing import logger
-from ooidac.readers.slocum import parse_dba_header
+from ooidac.readers.slocum import parse_dba, parse_dba_header
 
+# the only columns the look ahead needs from the following segment files
+FINAL_UV_SENSORS = ['m_final_water_vx', 'm_final_water_vy']
 
-def get_u_and_v(dba, check_files=None):
+
+def get_u_and_v(dba, check_files=None, cache=None):
     if (
             dba.file_metadata['filename_extension'] == 'dbd'
             and check_files
             and 'm_final_water_vx' in dba.sensor_names
     ):
-        vx, vy = _get_final_uv(dba, check_files)
+        vx, vy = _get_final_uv(dba, check_files, cache=cache)
     else:
         vx, vy = _get_initial_uv(dba)
 
@@ -54,15 +57,17 @@ def _get_initial_uv(dba):
     return vx, vy
 
 
-def _get_final_uv(dba, check_files):
+def _get_final_uv(dba, check_files, cache=None):
     """return Eastward velocity `u` and Northward velocity `v` from looking
     ahead of the main glider data file into the next 2 data files given in
     the `check_files` list to retrieve `u` and `v` from the
     m_final_water_vx/vy parameter calculated 1 or 2 files/segments later.
+    Only the m_final_water_vx/vy columns of the next files are parsed.
 
     :param dba:
     :param check_files: sorted list of the next 2 sorted data files following
         the file being processed from the script input list.
+    :param cache: optional DbaCache shared with the rest of the run
     :return: u, v; Eastward velocity and Northward velocity in m/s as data
         particle dictionaries with metadata attributes
     """
@@ -100,17 +105,23 @@ def _get_final_uv(dba, check_files):
                 'next 2 segments'.format(next_dba_file)
             )
             continue
-        next_dba = DbaData(next_dba_file)
-        if next_dba is None or next_dba.N == 0:
+        next_dba = parse_dba(
+            next_dba_file, sensors=FINAL_UV_SENSORS, cache=cache)
+        if next_dba is None or next_dba['data'] is None:
+            continue
+        if len(next_dba['data']) == 0:
             continue
-        if 'm_final_water_vx' not in next_dba.sensor_names:
+        next_names = next_dba['sensor_names']
+        if ('m_final_water_vx' not in next_names
+                or 'm_final_water_vy' not in next_names):
             continue
 
         # get m_final_water_vx/vy from the next file
-        vx = next_dba['m_final_water_vx']
-        vy = next_dba['m_final_water_vy']
-        vx_data = vx['data']
-        vy_data = vy['data']
+        # the cached definitions are shared, copy before changing them
+        vx = deepcopy(next_dba['sensor_defs']['m_final_water_vx'])
+        vy = deepcopy(next_dba['sensor_defs']['m_final_water_vy'])
+        vx_data = next_dba['data'][:, next_names.index('m_final_water_vx')]
+        vy_data = next_dba['data'][:, next_names.index('m_final_water_vy')]
         next_ii = np.isfinite(vx_data)
         vx_data = vx_data[next_ii]
         vy_data = vy_data[next_ii]
@@ -129,12 +140,12 @@ def _get_final_uv(dba, check_files):
                 vx.pop('sensor_name')
                 vx['nc_var_name'] = 'u'
                 vx['attrs']['source_sensor'] = 'm_final_water_vx'
-                vx['attrs']['source_file'] = next_dba.source_file
+                vx['attrs']['source_file'] = next_dba['header']['source_file']
                 vy['data'] = vy_data
                 vy.pop('sensor_name')
                 vy['nc_var_name'] = 'v'
                 vy['attrs']['source_sensor'] = 'm_final_water_vy'
-                vy['attrs']['source_file'] = next_dba.source_file
+                vy['attrs']['source_file'] = next_dba['header']['source_file']
                 return vx, vy
 
     # if vx/vy not found here, return from _get_initial_uv
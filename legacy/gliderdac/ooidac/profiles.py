@@ -7,8 +7,10 @@ import os
 from ooidac import boxcar_smooth_dataset
 
 from ooidac.utilities import fwd_fill
-from ooidac.processing import all_sci_indices
+from ooidac.processing import all_sci_indices, sci_block
 import profile_filters
+from ooidac.segmentation import (
+    find_inflection_times, clean_inflections, time_ranges_to_indices)
 # import pdb
 
 # ToDo: fix the imports above
@@ -49,6 +51,10 @@ class Profiles(object):
     def indices(self):
         return self._indices
 
+    @indices.setter
+    def indices(self, indices):
+        self._indices = indices
+
     def get_profile(self, index):
         try:
             return self.dba.slicedata(indices=self._indices[index])
@@ -60,7 +66,7 @@ class Profiles(object):
     #  list, when they could just say "return" alone.
 
     def find_profiles_by_depth(
-            self, depth_sensor='m_depth', tsint=2, winsize=10):
+            self, depth_sensor='m_depth', tsint=2, winsize=10, segmenter=None):
         """Discovery of profiles in a glider segment using depth and time.
 
         Profiles are discovered by smoothing the depth timeseries and using the
@@ -75,6 +81,7 @@ class Profiles(object):
         usually still returns similar profiles.  After profiles are discovered,
         they should be filtered with the `filter_profiles` method of this
         class, which removes profiles that are not true profiles.
+        The inflections are found with the ooidac.segmentation kernels.
 
         :param depth_sensor: The Depth sensor to use for profile discovery.
         Should be either m_depth, sci_water_pressure, or a derivative of
@@ -82,6 +89,10 @@ class Profiles(object):
         :param tsint: Time interval in seconds for filtered depth.
         This affects filtering.  Default is 2.
         :param winsize: Window size for boxcar smoothing filter.
+        :param segmenter: optional segmenter object (such as the
+            application's profileSegmenter) providing findInflectionTimes and
+            the minProfileDepth inflection wiggle threshold, used instead of
+            the kernels with `winsize` and the default 2 m.
         :return: output is a list of profile indices in self.indices
         """
         self._indices = []
@@ -92,16 +103,18 @@ class Profiles(object):
         # warnings from < when nans are in the array
         depth_ii = np.flatnonzero(np.isfinite(depth))  # non-nan indices
         neg_depths = np.flatnonzero(depth[depth_ii] <= 0)  # indices to depth_ii
-        depth[depth_ii[neg_depths]] = np.nan
+        self.dba.update_data([depth_sensor], depth_ii[neg_depths], np.nan)
+        depth = self.dba.getdata(depth_sensor)
 
         # Remove NaN depths and truncate to when science data begins being
         # recorded and ends
         depth_ii = np.flatnonzero(np.isfinite(depth))
 
-        sci_indices = all_sci_indices(self.dba)  # from ooidac.processing
-        if len(sci_indices) > 0:
-            starting_index = sci_indices[0]
-            ending_index = sci_indices[-1]
+        # only the first and last science records are needed here, not the
+        # full set of science indices
+        sci_bounds = sci_data_bounds(self.dba)
+        if sci_bounds is not None:
+            starting_index, ending_index = sci_bounds
         else:
             return  # no science_indices, then we don't care to finish
 
@@ -111,69 +124,28 @@ class Profiles(object):
                 depth_ii <= ending_index)
         ]
 
-        # ---Create a smoothed depth timeseries for finding inflections ------#
-
-        # Find start and end times first adding winsize * tsint timesteps
-        # onto the start and end to account for filter edge effects
-        itime_start = np.ceil(time_[depth_ii].min()) - winsize * tsint
-        itime_end = np.floor(time_[depth_ii].max()) + (winsize + 1) * tsint
-
-        itime = np.arange(itime_start, itime_end, tsint)
-        idepth = np.interp(itime, time_[depth_ii], depth[depth_ii],
-                           left=depth[depth_ii[0]], right=depth[depth_ii[-1]])
-        fz = boxcar_smooth_dataset(idepth, winsize)
-
-        # remove the extra points with filter edge effects
-        fz = fz[winsize:-winsize]
-        itime = itime[winsize:-winsize]
-        idepth = idepth[winsize:-winsize]
-
-        # Zero crossings of the time derivative of filtered depth are the
-        # inflection points.  Differential time is midway between the
-        # filtered timestamps.
-        # Originally, this used scipy's fsolver to locate the exact zero
-        # crossing, but only the timestamp before the zero crossing is needed
-        # to be the last in a profile and the timestamp after the zero
-        # crossing to be the first in the next profile.
-
-        dz_dt = np.diff(fz) / np.diff(itime)
-        dtime = itime[:-1] + np.diff(itime) / 2  # differential time
-
-        # Get the time point just after a zero crossing.  The flatnonzero
-        # statement below gets the point before a zero crossing.
-        zero_crossings_ii = np.flatnonzero(abs(np.diff(np.sign(dz_dt))))
-        zc_times = dtime[zero_crossings_ii] + (
-                dtime[zero_crossings_ii + 1] - dtime[zero_crossings_ii]) / 2.
-
-        profile_switch_times = zc_times[np.logical_and(
-            zc_times > time_[starting_index],
-            zc_times < time_[ending_index]
-        )]
-        # insert the timestamp of the first science data point at the start
-        # and the last data point at the end.
-        profile_switch_times = np.insert(
-            profile_switch_times, [0, len(profile_switch_times)],
-            [time_[starting_index],
-             time_[ending_index]])
-
-        self.inflection_times = profile_switch_times
+        # Inflections are the zero crossings of the rate of the smoothed,
+        # regularly gridded depth, between the first and last science data
+        # points, which are inserted at the start and end.
+        if segmenter is None:
+            self.inflection_times = find_inflection_times(
+                time_[depth_ii], depth[depth_ii],
+                time_[starting_index], time_[ending_index], winsize, tsint)
+            threshold = 2
+        else:
+            self.inflection_times = segmenter.findInflectionTimes(
+                time_[depth_ii], depth[depth_ii],
+                time_[starting_index], time_[ending_index], tsint)
+            threshold = segmenter.minProfileDepth
 
-        # profile_switch_times = self.adjust_inflections(depth, time_)
-        profile_switch_times = self.adjust_inflections(depth, time_)
+        profile_switch_times = self.adjust_inflections(
+            depth, time_, threshold)
 
         # use the time range to gather indices for each profile
-        for ii in range(len(profile_switch_times)-1):
-            pstart = profile_switch_times[ii]
-            pend = profile_switch_times[ii+1]
-            profile_ii = np.flatnonzero(
-                np.logical_and(
-                    time_ >= pstart,
-                    time_ <= pend))  # inclusive since before the inflection
-            if len(profile_ii) == 0:
-                continue
-            self._indices.append(profile_ii)
+        self._indices = time_ranges_to_indices(
+            time_, profile_switch_times[:-1], profile_switch_times[1:])
 
-    def adjust_inflections(self, depth, time_):
+    def adjust_inflections(self, depth, time_, threshold=2):
         """Filters out bad inflection points.
 
         Bad inflection points are small surface, bottom of dive, or mid-profile
@@ -183,46 +155,13 @@ class Profiles(object):
 
         :param depth:
         :param time_:
+        :param threshold: minimum depth change between kept inflections
         :return:
         """
-        inflections = self.inflection_times
-        inflection_depths = np.interp(
-            inflections, time_[np.isfinite(depth)],
-            depth[np.isfinite(depth)]
-        )
+        self.inflection_times = clean_inflections(
+            self.inflection_times, time_, depth, threshold)
 
-        # First remove the false diving inflections (i.e. the small wiggles) by
-        # taking the good inflection and looking ahead until an inflection depth
-        # difference greater than 2m is found
-        inflx_ii = 0
-        fwd_counter = 1
-        inflx_to_keep = np.full(len(inflections), True)
-        while inflx_ii < len(inflections):
-            ii_depth = inflection_depths[inflx_ii]  # depth of current inflection
-            # look ahead for the next true inflection change
-            if inflx_ii + fwd_counter >= len(inflections):
-                break
-            while abs(inflection_depths[inflx_ii + fwd_counter] - ii_depth) < 2:
-                inflx_to_keep[inflx_ii + fwd_counter] = False
-                fwd_counter += 1
-                if inflx_ii + fwd_counter >= len(inflections):
-                    break
-            inflx_ii = inflx_ii + fwd_counter
-            fwd_counter = 1
-
-        # afterwards we may be left with mid profile direction changes that were
-        # greater than 2 m.  But now they can identified by not changing trend,
-        # since any of our good  inflection points left will change trend sign.
-        good_inflx_ii = np.flatnonzero(inflx_to_keep)
-        trends = np.diff(inflection_depths[good_inflx_ii])
-        # find where the trends are the same by getting the diff of the sign of
-        # the trend (which is also a diff).  Must add one because diff always
-        # results in N-1
-        same_trends = np.flatnonzero(np.diff(np.sign(trends)) == 0) + 1
-        good_inflx_ii = np.delete(good_inflx_ii, same_trends)
-        self.inflection_times = inflections[good_inflx_ii]
-
-        return inflections[good_inflx_ii]
+        return self.inflection_times
 
     def adjust_inflections_old(self, depth, time_):
         """Filters out bad inflection points.
@@ -350,7 +289,8 @@ class Profiles(object):
         # warnings from < when nans are in the array
         depth_ii = np.flatnonzero(np.isfinite(depth))  # non-nan indices
         neg_depths = np.flatnonzero(depth[depth_ii] <= 0)  # indices to depth_ii
-        depth[depth_ii[neg_depths]] = np.nan
+        self.dba.update_data([depth_sensor], depth_ii[neg_depths], np.nan)
+        depth = self.dba.getdata(depth_sensor)
 
         # Remove NaN depths and truncate to when science data begins being
         # recorded and ends
@@ -462,9 +402,10 @@ class Profiles(object):
                     self.dba.source_file)
                 )
                 return
-            depth = self.dba['llat_depth']['data']
+            depth_sensor = 'llat_depth'
         else:
-            depth = self.dba['m_depth']['data']
+            depth_sensor = 'm_depth'
+        depth = self.dba.getdata(depth_sensor)
 
         # validate_glider_args(timestamps, depth)
 
@@ -472,7 +413,8 @@ class Profiles(object):
         # warnings from < when nans are in the array
         depth_ii = np.flatnonzero(np.isfinite(depth))  # non-nan indices
         neg_depths = np.flatnonzero(depth[depth_ii] <= 0)  # indices to depth_ii
-        depth[depth_ii[neg_depths]] = np.nan
+        self.dba.update_data([depth_sensor], depth_ii[neg_depths], np.nan)
+        depth = self.dba.getdata(depth_sensor)
 
         # Remove NaN depths and truncate to when science data begins being
         # recorded and ends
@@ -598,7 +540,7 @@ class Profiles(object):
             logging.debug('Thought there was depth state, but not')
             return profile_indexes
 
-        depth_state = self.dba.getdata('m_depth_state')
+        depth_state = self.dba.getdata('m_depth_state').copy()
 
         # remove any negative numbers or values greater than 3 since they are
         # not dive/climb/hover states and then fill the NaNs with the
@@ -643,6 +585,29 @@ class Profiles(object):
         self._indices = profile_indexes
 
     def filter_profiles(self):
+        """Removes the profiles rejected by any of the `filter*` functions in
+        profile_filters.py.  The filters are evaluated for all profiles at
+        once on the segment data (see profile_filters.batch_filter_profiles)
+        unless a profile is not a contiguous block of rows, in which case
+        each profile is sliced and filtered separately.
+        """
+        if not self.indices:
+            return
+        if not profile_filters.contiguous_profiles(self.indices):
+            return self._filter_profiles_by_slice()
+
+        keep, reasons = profile_filters.batch_filter_profiles(
+            self.dba, self.indices)
+        for ii in np.flatnonzero(~keep):
+            # report the first filter in name order, as the per profile
+            # filtering did
+            name = min(
+                name for name in reasons if reasons[name][ii])
+            logger.debug('Profile {:d} removed by {:s}'.format(ii, name))
+        self._indices = [
+            self._indices[ii] for ii in np.flatnonzero(keep)]
+
+    def _filter_profiles_by_slice(self):
         """
         """
         filters = [getattr(profile_filters, func) for func in dir(
@@ -668,6 +633,22 @@ class Profiles(object):
             self.indices.pop(index)
 
 
+def sci_data_bounds(gldata):
+    """First and last record index with any science data (DATA_CONFIG_LIST),
+    i.e. all_sci_indices(gldata)[[0, -1]] without building the full index
+    set.
+
+    :param gldata: GliderData instance
+    :return: (first, last) tuple, or None if there is no science data
+    """
+    sci_mask = sci_block(gldata).any_finite
+    if not sci_mask.any():
+        return None
+    first = int(np.argmax(sci_mask))
+    last = len(sci_mask) - 1 - int(np.argmax(sci_mask[::-1]))
+    return first, last
+
+
 def binarize_diff(data):
     data[data <= 0] = -1
     data[data >= 0] = 1
@@ -5,6 +5,8 @@ dba2_glider_data"""
 
 import os
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 import time
 
@@ -12,11 +14,19 @@ logger = logging.getLogger(os.path.basename(__name__))
 
 
 # ToDo: bring comments up to date if necessary
-def parse_dba(dba_file, fast=False):
+def parse_dba(dba_file, fast=False, sensors=None, cache=None):
     """Parse a Slocum dba ascii table file.
 
     Args:
         dba_file: dba file to parse
+        fast: use the line by line loader instead of numpy.loadtxt
+        sensors: optional list of sensor names.  If given, only these
+            columns of the data table are loaded; requested sensors not
+            present in the file are ignored.
+        cache: optional DbaCache instance.  Parsed files are looked up in
+            and stored to the cache so a file is only read once per run.
+            The returned data table is then read-only and the sensor
+            definitions are shared with the cache.
 
     Returns: A dictionary containing the file metadata, sensor defintions
     and data
@@ -24,13 +34,20 @@ def parse_dba(dba_file, fast=False):
     if not os.path.isfile(dba_file):
         logging.error('Invalid dba file: {:s}'.format(dba_file))
         return
+
+    if cache is not None:
+        dba = cache.get(dba_file, sensors)
+        if dba is not None:
+            logger.debug('Using cached parse of {:s}'.format(dba_file))
+            return dba
+
     t0 = time.time()
     try:
         with open(dba_file, 'r') as dbafid:
             # Parse the dba header
             dba_headers = _parse_dba_header(dbafid)
             # Parse the dba sensor definitions
-            sensors, sensor_defs = _parse_dba_sensor_defs(dbafid)
+            all_sensors, sensor_defs = _parse_dba_sensor_defs(dbafid)
 
     except IOError as e:
         logging.error('Error opening {:s} dba file: {}'.format(
@@ -52,11 +69,25 @@ def parse_dba(dba_file, fast=False):
     # Total number of header lines before the data matrix starts
     total_header_lines = num_header_lines + num_label_lines
 
+    # Select the columns to load, keeping the file's column order
+    usecols = None
+    sensor_names = all_sensors
+    if sensors is not None:
+        usecols = [ii for ii, name in enumerate(all_sensors)
+                   if name in sensors]
+        sensor_names = [all_sensors[ii] for ii in usecols]
+        sensor_defs = {name: sensor_defs[name] for name in sensor_names}
+        num_columns = len(usecols)
+
     # Parse the ascii table portion of the dba file
-    if fast:
+    if usecols is not None and len(usecols) == 0:
+        data = np.empty((0, 0))
+    elif fast:
         data = _fast_load_dba_data(dba_file, total_header_lines)
+        if data is not None and usecols is not None and len(data) > 0:
+            data = data[:, usecols]
     else:
-        data = _load_dba_data(dba_file, total_header_lines)
+        data = _load_dba_data(dba_file, total_header_lines, usecols=usecols)
 
     if data is None or len(data) == 0:
         logger.warning('Data length is 0 in dba file: {:s}'.format(
@@ -71,11 +102,130 @@ def parse_dba(dba_file, fast=False):
     t1 = time.time()
     logger.debug("Time elapsed for parser, {:0.0f}".format(t1 - t0))
 
-    dba = {'header': dba_headers, 'sensor_names': sensors,
+    dba = {'header': dba_headers, 'sensor_names': sensor_names,
            'sensor_defs': sensor_defs, 'data': data}
+    if cache is not None:
+        cache.put(dba_file, dba, sensors=sensors)
     return dba
 
 
+class DbaCache(object):
+    """Run-level cache of parsed dba files.
+
+    Slocum processing reads each segment file once for itself and again for
+    up to two earlier segments looking ahead for m_final_water_vx/vy.  The
+    cache keeps the most recent parses, keyed on the real path and
+    invalidated when the file size or modification time changes.  Entries
+    may hold the complete sensor table or a column subset; a subset entry
+    only satisfies requests for sensors it holds.  Entries are shared, not
+    copied: the data table of a stored parse is made read-only and the sensor
+    definitions must not be modified, so callers that change them copy first
+    (GliderData copies its data table on the first update_data, DbaData and
+    the velocity look ahead copy the sensor definitions they change).  The
+    cache is safe to share between a prefetching reader thread and the
+    processing thread.
+    """
+    def __init__(self, max_segments=4):
+        self.max_segments = max_segments
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, dba_file):
+        with self._lock:
+            return self._key(dba_file) in self._entries
+
+    @staticmethod
+    def _key(dba_file):
+        return os.path.realpath(dba_file)
+
+    @staticmethod
+    def _stamp(dba_file):
+        stat = os.stat(dba_file)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, dba_file, sensors=None):
+        """Return the read-only cached parse of `dba_file` restricted to
+        `sensors`, or None if the cache cannot satisfy the request."""
+        with self._lock:
+            return self._get(dba_file, sensors)
+
+    def _get(self, dba_file, sensors):
+        key = self._key(dba_file)
+        entry = self._entries.get(key)
+        if entry is None or entry['stamp'] != self._stamp(dba_file):
+            self.misses += 1
+            return
+        dba = entry['dba']
+        if sensors is None:
+            if not entry['complete']:
+                self.misses += 1
+                return
+            cols = slice(None)
+            sensor_names = list(dba['sensor_names'])
+        else:
+            # a subset entry can only answer for the sensors it was asked
+            # for, since missing sensors may simply not have been loaded
+            if not entry['complete'] and not set(sensors).issubset(
+                    entry['requested']):
+                self.misses += 1
+                return
+            cols = [ii for ii, name in enumerate(dba['sensor_names'])
+                    if name in sensors]
+            sensor_names = [dba['sensor_names'][ii] for ii in cols]
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        data = dba['data']
+        if (data is not None and data.ndim == 2
+                and len(sensor_names) < len(dba['sensor_names'])):
+            data = data[:, cols]
+            data.flags.writeable = False
+        return {
+            'header': dict(dba['header']),
+            'sensor_names': sensor_names,
+            'sensor_defs': {
+                name: dba['sensor_defs'][name] for name in sensor_names},
+            'data': data}
+
+    def put(self, dba_file, dba, sensors=None):
+        """Store a parse result without copying it.  Its data table is made
+        read-only.  `sensors` is the list the parse was restricted to, None
+        for a complete parse.  A subset parse never replaces a complete one
+        for the same file."""
+        with self._lock:
+            self._put(dba_file, dba, sensors)
+
+    def _put(self, dba_file, dba, sensors):
+        complete = sensors is None
+        key = self._key(dba_file)
+        stamp = self._stamp(dba_file)
+        entry = self._entries.get(key)
+        if (entry is not None and entry['complete'] and not complete
+                and entry['stamp'] == stamp):
+            return
+        if dba['data'] is not None:
+            dba['data'].flags.writeable = False
+        self._entries[key] = {
+            'stamp': stamp,
+            'complete': complete,
+            'requested': set(sensors) if sensors is not None else None,
+            'dba': dba
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_segments:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
 def _parse_dba_header(fid):
     """Parse the header information in a Slocum dba ascii table file.
     All header lines of the format 'key: value' are parsed.
@@ -174,14 +324,15 @@ def _parse_dba_sensor_defs(fid):
     return sensors, sensor_defs
 
 
-def _load_dba_data(dba_file, num_header_lines=17):
+def _load_dba_data(dba_file, num_header_lines=17, usecols=None):
 
     # Use numpy.loadtxt to load the ascii table, skipping header rows and
-    # requiring a 2-D output array
+    # requiring a 2-D output array.  `usecols` limits the conversion to the
+    # selected columns.
     try:
         t0 = time.time()
         data_table = np.loadtxt(dba_file, skiprows=num_header_lines,
-                                ndmin=2)
+                                ndmin=2, usecols=usecols)
         t1 = time.time()
         elapsed_time = t1 - t0
         logger.debug('DBD parsed in {:0.0f} seconds'.format(
@@ -224,12 +375,40 @@ def _fast_load_dba_data(dba_file, num_header_lines=17):
     return data_array
 
 
-def parse_dba_header(dba_file):
+def _has_data_rows(fid, dba_headers):
+    """Check for a data row after the sensor label lines without parsing
+    the ascii table.  fid must be positioned after the header lines."""
+    num_label_lines = int(dba_headers.get('num_label_lines', 3))
+    try:
+        for ii in range(num_label_lines):
+            if not fid.readline():
+                return False
+        for line in fid:
+            if line.strip():
+                return True
+    except (IOError, UnicodeDecodeError) as e:
+        logging.error('Error reading {:s} dba data: {}'.format(fid.name, e))
+    return False
+
+
+def parse_dba_header(dba_file, check_data=False):
+    """Parse only the header of a Slocum dba ascii table file.
+
+    Args:
+        dba_file: dba file to parse
+        check_data: also look for a first data row, adding the 'has_data'
+            key to the returned header
+
+    Returns:
+        A dictionary containing the file metadata, None if unreadable
+    """
     if not os.path.isfile(dba_file):
         logging.error('Invalid dba file: {:s}'.format(dba_file))
         return
     with open(dba_file, 'r') as dba_fid:
         dba_header = _parse_dba_header(dba_fid)
+        if dba_header and check_data:
+            dba_header['has_data'] = _has_data_rows(dba_fid, dba_header)
     return dba_header
 
 
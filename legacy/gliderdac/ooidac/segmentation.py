@@ -0,0 +1,145 @@
+"""Vectorized profile segmentation kernels.
+
+These are the single implementation of the depth inflection search used by
+Profiles.find_profiles_by_depth.  The application's profileSegmenter
+(DataProcessor/profileSegmenter.py) wraps them, so this module must not
+import anything outside of the legacy gliderdac package.
+"""
+import numpy as np
+
+from ooidac import boxcar_smooth_dataset
+
+
+def find_inflection_times(times, depths, start_time, end_time, winsize=10,
+                          tsint=2):
+    """Profile switch times from the zero crossings of the rate of the
+    smoothed depth interpolated onto a regular time grid, bounded by
+    `start_time` and `end_time`.
+
+    :param times: times (secs) of the finite depths to use
+    :param depths: meters
+    :param start_time: time of the first profile start
+    :param end_time: time of the last profile end
+    :param winsize: boxcar smoothing window (grid points)
+    :param tsint: regular grid interval (secs)
+    :return: array of profile switch times, including start and end
+    """
+    # Find start and end times first adding winsize * tsint timesteps onto
+    # the start and end to account for filter edge effects
+    grid_start = np.ceil(times.min()) - winsize * tsint
+    grid_end = np.floor(times.max()) + (winsize + 1) * tsint
+
+    grid_times = np.arange(grid_start, grid_end, tsint)
+    grid_depths = np.interp(grid_times, times, depths,
+                            left=depths[0], right=depths[-1])
+    smoothed_depths = boxcar_smooth_dataset(grid_depths, winsize)
+
+    # remove the extra points with filter edge effects
+    smoothed_depths = smoothed_depths[winsize:-winsize]
+    grid_times = grid_times[winsize:-winsize]
+
+    # Zero crossings of the rate of smoothed depth are the inflections,
+    # placed midway between the rate samples either side of the crossing
+    dzdt = np.diff(smoothed_depths) / np.diff(grid_times)
+    rate_times = grid_times[:-1] + np.diff(grid_times) / 2
+
+    crossings = np.flatnonzero(np.abs(np.diff(np.sign(dzdt))))
+    crossing_times = rate_times[crossings] + (
+        rate_times[crossings + 1] - rate_times[crossings]) / 2.
+
+    switch_times = crossing_times[np.logical_and(
+        crossing_times > start_time, crossing_times < end_time)]
+    return np.concatenate(([start_time], switch_times, [end_time]))
+
+
+def clean_inflections(inflection_times, times, depths, threshold=2):
+    """Remove false inflections: wiggles with less than `threshold` depth
+    change from the previous kept inflection, then mid profile breaks that
+    do not change the vertical direction.
+
+    :param inflection_times:
+    :param times: sample times (secs)
+    :param depths: meters, may contain NaNs
+    :param threshold: minimum depth change between kept inflections
+    :return: kept inflection times
+    """
+    finite = np.isfinite(depths)
+    inflection_depths = np.interp(
+        inflection_times, times[finite], depths[finite])
+
+    kept = depth_change_chain(inflection_depths, threshold)
+
+    # left with mid profile direction changes greater than the threshold,
+    # identified by the trend not changing sign
+    trends = np.diff(inflection_depths[kept])
+    same_trends = np.flatnonzero(np.diff(np.sign(trends)) == 0) + 1
+    kept = np.delete(kept, same_trends)
+
+    return inflection_times[kept]
+
+
+def depth_change_chain(depths, threshold):
+    """Indices of the chain of values where each is the first after the
+    previous at least `threshold` away, starting from the first.  Each link
+    depends on the one before, so the loop runs once per kept value; the
+    look ahead searches windows doubling in size so total work stays linear.
+
+    :param depths:
+    :param threshold:
+    :return: array of kept indices
+    """
+    n = len(depths)
+    if n == 0:
+        return np.array([], dtype=np.int64)
+    chain = [0]
+    anchor = 0
+    while True:
+        window = 16
+        start = anchor + 1
+        next_anchor = None
+        while start < n:
+            stop = min(start + window, n)
+            far = np.flatnonzero(
+                ~(np.abs(depths[start:stop] - depths[anchor]) < threshold))
+            if len(far) > 0:
+                next_anchor = start + far[0]
+                break
+            start = stop
+            window *= 2
+        if next_anchor is None:
+            break
+        chain.append(next_anchor)
+        anchor = next_anchor
+    return np.array(chain, dtype=np.int64)
+
+
+def time_ranges_to_indices(times, starts, ends):
+    """Sample indices falling in each inclusive [start, end] time range,
+    from one sort (skipped for increasing times) and a searchsorted per
+    bound.  Empty ranges are skipped, NaN times never included.
+
+    :param times:
+    :param starts: range start times
+    :param ends: range end times
+    :return: list of sorted index arrays
+    """
+    finite = np.isfinite(times)
+    if np.all(finite) and np.all(np.diff(times) >= 0):
+        order = None
+        sorted_times = times
+    else:
+        order = np.flatnonzero(finite)
+        order = order[np.argsort(times[order], kind='stable')]
+        sorted_times = times[order]
+    lo = np.searchsorted(sorted_times, starts, side='left')
+    hi = np.searchsorted(sorted_times, ends, side='right')
+
+    indices = []
+    for first, last in zip(lo, hi):
+        if last <= first:
+            continue
+        if order is None:
+            indices.append(np.arange(first, last))
+        else:
+            indices.append(np.sort(order[first:last]))
+    return indices
@@ -21,10 +21,12 @@ from ooidac.validate import validate_sensors, validate_ngdac_var_names
 
 import ooidac.processing as processing
 from ooidac.data_classes import DbaData
+from ooidac.readers.slocum import DbaCache
 from ooidac.profiles import Profiles
 from ooidac.data_checks import check_file_goodness
 from ooidac.constants import SCI_CTD_SENSORS
-from ooidac.status import Status
+from ooidac.manifest import open_status
+from ooidac.fill import configured_fills
 from dba_file_sorter import sort_function
 
 
@@ -93,8 +95,8 @@ def main(args):
         logging.error('No Slocum dba files specified')
         return 1
 
-    # Create a status.json file in the config directory given to hold
-    # information from the latest run
+    # Create a status.json file (or with --manifest a SQLite status.db) in
+    # the config directory given to hold information from the latest run
     status_path = os.path.join(config_path, 'status.json')
 
     # if not os.path.exists(status_path):
@@ -110,7 +112,7 @@ def main(args):
     # else:
     #     with open(status_path, 'r') as fid:
     #         status = json.load(fid)
-    status = Status(status_path)
+    status = open_status(config_path, args.manifest)
 
     # eliminate files that have already run
     if clobber:
@@ -125,6 +127,7 @@ def main(args):
         # save a list of profiles created basenames for printout at the end
         already_processed = list(map(
             os.path.basename, status.info['profiles_created']))
+    already_processed = set(already_processed)
 
     if files_to_run:
         n_skipped = len(files_to_run) - len(dba_files)
@@ -201,6 +204,13 @@ def main(args):
     # to be added:
     # var_processing = processing.init_processing_dict(var_processing)
 
+    # per sensor gap fill methods (attitude, CTD), the "fill" entries of the
+    # processing blocks
+    fills = configured_fills(var_processing)
+
+    # run-level cache of parsed segments, shared with the velocity look ahead
+    dba_cache = DbaCache()
+
     for dba_file in files_to_run:
         # change to non-indented log format (see above)
         logmanager.update_format(start_log_format)
@@ -215,7 +225,7 @@ def main(args):
         logmanager.update_format(run_log_format)
 
         # Parse the dba file
-        dba = DbaData(dba_file)
+        dba = DbaData(dba_file, cache=dba_cache)
 
         if dba is None or dba.N == 0:
             logging.warning('Skipping empty data file: {:s}'.format(dba_file))
@@ -267,14 +277,15 @@ def main(args):
         # `sci_water_pressure` to dbar, and llat_depth is derived from
         # `llat_pressure` converted to depth using the Python TEOS-10 GSW
         # package
-        dba = processing.create_llat_sensors(dba)
+        dba = processing.create_llat_sensors(
+            dba, dr_correction=args.dr_correction)
         if dba is None:
             continue
 
         # Convert m_pitch and m_roll variables to degrees, and add back to
         # the data instance with metadata attributes
         if 'm_pitch' in dba.sensor_names and 'm_roll' in dba.sensor_names:
-            dba = ooidac.processing.attitude.pitch_and_roll(dba)
+            dba = ooidac.processing.attitude.pitch_and_roll(dba, fill=fills)
             if dba is None:
                 continue
 
@@ -295,12 +306,13 @@ def main(args):
                     'calculation_type'],
                 cal_dict=var_processing['corrected_oxygen']['cal_coefs']
             )
-            dba = ooidac.processing.oxygen.o2_s_and_p_comp(dba, 'temp_corrected_oxygen')
+            dba = ooidac.processing.oxygen.o2_s_and_p_comp(
+                dba, 'temp_corrected_oxygen', fills=fills)
             oxy = dba['oxygen']
             oxy['sensor_name'] = 'corrected_oxygen'
             dba['corrected_oxygen'] = oxy
         elif 'sci_oxy4_oxygen' in dba.sensor_names:
-            dba = ooidac.processing.oxygen.o2_s_and_p_comp(dba)
+            dba = ooidac.processing.oxygen.o2_s_and_p_comp(dba, fills=fills)
             if dba is None:
                 continue
 
@@ -408,7 +420,8 @@ def main(args):
             # segement file.
             dba_index = dba_files.index(dba_file)
             next2files = dba_files[dba_index + 1:dba_index + 3]
-            vx, vy = ooidac.processing.velocity.get_u_and_v(dba, check_files=next2files)
+            vx, vy = ooidac.processing.velocity.get_u_and_v(
+                dba, check_files=next2files, cache=dba_cache)
 
             scalars.extend([seg_time, seg_lat, seg_lon, vx, vy])
 
@@ -474,6 +487,9 @@ def main(args):
     if start_profile_id > 0:
         status.info['next_profile_id'] = ncw.profile_id
         status.write()
+    if args.manifest:
+        # keep status.json current for tools reading it
+        status.export_status_json(status_path)
     # already_processed = set(status['files_processed'])
     # set_processed_dbas = set(processed_dbas)
     # processed_dbas = list(set_processed_dbas.difference(already_processed))
@@ -558,6 +574,22 @@ if __name__ == '__main__':
                             choices=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
                             default=1)
 
+    arg_parser.add_argument('-m', '--manifest',
+                            help=(
+                                'Keep the run status in a SQLite status.db '
+                                'in config_path instead of status.json, '
+                                'importing an existing status.json on first '
+                                'use and exporting it after each run'),
+                            action='store_true')
+
+    arg_parser.add_argument('-d', '--dr_correction',
+                            help=(
+                                'Fill underwater positions from the dead-'
+                                'reckoned m_lat/m_lon corrected for drift '
+                                'between GPS fixes instead of interpolating '
+                                'between the fixes'),
+                            action='store_true')
+
     arg_parser.add_argument('-x', '--debug',
                             help=(
                                 'Check configuration and create NetCDF file '
@@ -21,10 +21,11 @@ def filter_no_data(profile_data):
     """
     remove_profile = False
     allbad_scidata = []
+    stats = profile_data.stats
+    stats.prefetch(DATA_CONFIG_LIST)
 
     for scidata_sensor in DATA_CONFIG_LIST:
-        data = profile_data.getdata(scidata_sensor)
-        any_data = np.all(np.isnan(data))
+        any_data = stats[scidata_sensor].all_nan
         # if there isn't any CTD pressure data at all, we don't want the profile
         if scidata_sensor == 'sci_water_pressure' and any_data:
             remove_profile = True
@@ -141,10 +142,14 @@ def filter_no_data_at_profile_start(profile_data, threshold=1):
     # ToDo: change explicit pressure here to a PRESSURESENSOR variable
     pres = profile_data.getdata('sci_water_pressure')
     first_portion_of_dive = list(range(int(len(timestamps)/10)))
-    time_len = (
-            timestamps[first_portion_of_dive][-1]
-            - timestamps[first_portion_of_dive][0]
-    )
+    # profiles shorter than 10 records have no 10% portion and always use the
+    # `threshold` minutes
+    time_len = 0.
+    if len(first_portion_of_dive) > 0:
+        time_len = (
+                timestamps[first_portion_of_dive][-1]
+                - timestamps[first_portion_of_dive][0]
+        )
     # use the amount of time that is greater, the first 10% of the dive,
     # or at least `threshold` minutes
     if time_len/60. < threshold:
@@ -177,7 +182,7 @@ def filter_small_data_depth_ratio(
     pres = profile_data.getdata('llat_pressure')
 
     if (
-            np.count_nonzero(np.isfinite(pres)) > data_pts_threshold
+            profile_data.stats['llat_pressure'].count > data_pts_threshold
             and total_profile_depth > 0):
         sum_pres_depth = abs(cum_depth_sum(pres))
 
@@ -221,3 +226,278 @@ def cum_depth_sum(pressure):
 
     cum_depth = np.sum(diff_pres[no_gaps])
     return cum_depth
+
+
+# ---------------------------------------------------------------------------
+# Batch filters
+#
+# The functions below evaluate the profile filters above for every profile of
+# a segment at once, working on the segment level arrays and the profile
+# index ranges instead of a sliced GliderData copy per profile.  A
+# `batch_<filter name>` function must return the same removal decision as
+# its per profile counterpart, as a boolean array with one entry per profile.
+# Filters added above without a batch counterpart still work;
+# batch_filter_profiles runs them per profile on the profiles that survive
+# the batch filters.
+#
+# All batch filters take a _ProfileGroups instance, which holds the rows of
+# every profile gathered end to end (`rows`), the profile number of each
+# gathered row (`groups`) and the offset of each profile in the gathered
+# arrays (`offsets`), so per profile sums are np.add.reduceat(x, offsets).
+# ---------------------------------------------------------------------------
+
+
+class _ProfileGroups(object):
+    def __init__(self, gldata, profile_indices):
+        self.gldata = gldata
+        self.n = len(profile_indices)
+        self.lengths = np.array(
+            [len(ii) for ii in profile_indices], dtype=np.int64)
+        self.starts = np.array(
+            [ii[0] for ii in profile_indices], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.lengths)[:-1]))
+        self.groups = np.repeat(np.arange(self.n), self.lengths)
+        # position of each gathered row within its profile
+        self.position = np.arange(len(self.groups)) - self.offsets[self.groups]
+        self.rows = self.starts[self.groups] + self.position
+        self.firsts = self.rows[self.offsets]
+        self.lasts = self.rows[self.offsets + self.lengths - 1]
+        self._sci = None
+
+    @property
+    def sci(self):
+        """processing.sci_block of the whole segment, computed once"""
+        if self._sci is None:
+            self._sci = processing.sci_block(self.gldata)
+        return self._sci
+
+    def getdata(self, sensor):
+        return self.gldata.getdata(sensor)[self.rows]
+
+    def sum(self, values):
+        return np.add.reduceat(values, self.offsets)
+
+    def count(self, mask):
+        return self.sum(mask.astype(np.int64))
+
+
+def contiguous_profiles(profile_indices):
+    """True if every profile is a contiguous, ascending range of rows, the
+    layout the batch filters require."""
+    for profile_ii in profile_indices:
+        if (len(profile_ii) == 0
+                or profile_ii[-1] - profile_ii[0] + 1 != len(profile_ii)):
+            return False
+    return True
+
+
+def _group_median(values, groups, n_groups):
+    """Median of `values` per group, NaN for groups without values"""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    median = np.full(n_groups, np.nan)
+    has = counts > 0
+    lo = starts[has] + (counts[has] - 1) // 2
+    hi = starts[has] + counts[has] // 2
+    median[has] = (sorted_values[lo] + sorted_values[hi]) / 2.
+    return median
+
+
+def batch_cum_data_time_sum(timestamps, groups, n_groups, mask):
+    """Batch version of cum_data_time_sum.  `timestamps` and `groups` are the
+    gathered timestamps and profile numbers, `mask` selects the science data
+    records.
+
+    :return: array of the cumulative data time of each profile
+    """
+    selected = np.flatnonzero(mask)
+    sci_ts = timestamps[selected]
+    sci_groups = groups[selected]
+    same_profile = sci_groups[1:] == sci_groups[:-1]
+    sci_dt = np.diff(sci_ts)[same_profile]
+    dt_groups = sci_groups[1:][same_profile]
+    finite = np.isfinite(sci_dt)
+    sci_dt_median = _group_median(
+        sci_dt[finite], dt_groups[finite], n_groups)
+    with np.errstate(invalid='ignore'):
+        no_gaps_ii = sci_dt < 3 * sci_dt_median[dt_groups]
+    return np.bincount(
+        dt_groups[no_gaps_ii], weights=sci_dt[no_gaps_ii], minlength=n_groups)
+
+
+def batch_cum_depth_sum(pressure, groups, n_groups):
+    """Batch version of cum_depth_sum over the gathered pressure of all
+    profiles.
+
+    :return: array of the cumulative depth of each profile
+    """
+    finite = np.flatnonzero(np.isfinite(pressure))
+    pres = pressure[finite]
+    pres_groups = groups[finite]
+    same_profile = pres_groups[1:] == pres_groups[:-1]
+    diff_pres = np.diff(pres)[same_profile]
+    diff_groups = pres_groups[1:][same_profile]
+    non_zero = np.flatnonzero(abs(diff_pres) > 0.0)
+    diff_pres = diff_pres[non_zero]
+    diff_groups = diff_groups[non_zero]
+
+    counts = np.bincount(diff_groups, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(
+            diff_groups, weights=diff_pres, minlength=n_groups) / counts
+        std = np.sqrt(np.bincount(
+            diff_groups, weights=(diff_pres - mean[diff_groups])**2,
+            minlength=n_groups) / counts)
+
+        # exclude any large jumps in depth which are considered gaps
+        no_gaps = (
+            abs(diff_pres)
+            < abs(mean[diff_groups]) + 3*std[diff_groups])
+    return np.bincount(
+        diff_groups[no_gaps], weights=diff_pres[no_gaps], minlength=n_groups)
+
+
+def _batch_sci_mask(profiles):
+    """Gathered mask of records with any DATA_CONFIG_LIST data, the batch
+    equivalent of processing.all_sci_indices"""
+    return profiles.sci.any_finite[profiles.rows]
+
+
+def batch_filter_no_data(profiles):
+    # profiles x sensors counts of finite science values
+    finite = profiles.sci.finite[profiles.rows].astype(np.int64)
+    all_bad = list((np.add.reduceat(finite, profiles.offsets, axis=0) == 0).T)
+    remove_profile = np.all(all_bad, axis=0)
+    # if there isn't any CTD pressure data at all, we don't want the profile
+    if 'sci_water_pressure' in DATA_CONFIG_LIST:
+        remove_profile |= all_bad[
+            DATA_CONFIG_LIST.index('sci_water_pressure')]
+    return remove_profile
+
+
+def batch_filter_small_data_ratio(
+        profiles, threshold=.1, data_pts_threshold=4):
+    timestamps = profiles.getdata(TIMESENSOR)
+    total_profile_time = (
+        timestamps[profiles.offsets + profiles.lengths - 1]
+        - timestamps[profiles.offsets])
+
+    remove_profile = np.ones(profiles.n, dtype=bool)
+    for scidata_sensor in DATA_CONFIG_LIST:
+        finites = np.isfinite(profiles.getdata(scidata_sensor))
+        good_data_length = batch_cum_data_time_sum(
+            timestamps, profiles.groups, profiles.n, finites)
+        good_data_length[profiles.count(finites) < data_pts_threshold] = 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            data_ratio = good_data_length / total_profile_time
+            remove_profile &= data_ratio < threshold
+    return remove_profile
+
+
+def batch_filter_time_lessthan(profiles, threshold=1):
+    timestamps = profiles.gldata.getdata(TIMESENSOR)
+    minutes_of_profile = (
+        timestamps[profiles.lasts] - timestamps[profiles.firsts]) / 60.
+    return minutes_of_profile < threshold
+
+
+def batch_filter_datatime_lessthan(
+        profiles, threshold=1, data_pts_threshold=4):
+    timestamps = profiles.getdata(TIMESENSOR)
+    sci_mask = _batch_sci_mask(profiles)
+    remove_profile = profiles.count(sci_mask) < data_pts_threshold
+
+    minutes_of_data = batch_cum_data_time_sum(
+        timestamps, profiles.groups, profiles.n, sci_mask) / 60.
+    remove_profile |= minutes_of_data < threshold
+    return remove_profile
+
+
+def batch_filter_no_data_at_profile_start(profiles, threshold=1):
+    remove_profile = np.zeros(profiles.n, dtype=bool)
+    if 'rtime' in profiles.gldata.source_file:
+        return remove_profile
+    timestamps = profiles.getdata(TIMESENSOR)
+    pres = profiles.getdata('sci_water_pressure')
+
+    # the first 10% of the dive, or at least `threshold` minutes.  Profiles
+    # shorter than 10 records always use the `threshold` minutes.
+    portion_len = profiles.lengths // 10
+    has_portion = portion_len > 0
+    last_of_portion = profiles.offsets + np.maximum(portion_len, 1) - 1
+    time_len = np.where(
+        has_portion,
+        timestamps[last_of_portion] - timestamps[profiles.offsets], 0.)
+    use_minutes = time_len / 60. < threshold
+    group_start_time = timestamps[profiles.offsets][profiles.groups]
+    first_portion_of_dive = np.where(
+        use_minutes[profiles.groups],
+        timestamps < group_start_time + 60*threshold,
+        profiles.position < portion_len[profiles.groups])
+
+    sci_mask = _batch_sci_mask(profiles)
+    remove_profile |= profiles.count(
+        first_portion_of_dive & np.isfinite(pres)) == 0
+    remove_profile |= profiles.count(first_portion_of_dive & sci_mask) == 0
+    return remove_profile
+
+
+def batch_filter_small_data_depth_ratio(
+        profiles, threshold=.1, data_pts_threshold=4):
+    depth = profiles.gldata.depth[profiles.rows]
+    with np.errstate(invalid='ignore'):
+        total_profile_depth = (
+            np.fmax.reduceat(depth, profiles.offsets)
+            - np.fmin.reduceat(depth, profiles.offsets))
+    pres = profiles.getdata('llat_pressure')
+
+    enough_data = np.logical_and(
+        profiles.count(np.isfinite(pres)) > data_pts_threshold,
+        total_profile_depth > 0)
+    sum_pres_depth = abs(
+        batch_cum_depth_sum(pres, profiles.groups, profiles.n))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        depth_ratio = sum_pres_depth / total_profile_depth
+    return np.logical_or(~enough_data, depth_ratio < threshold)
+
+
+def batch_filter_profiles(gldata, profile_indices):
+    """Evaluate every `filter*` function of this module over all profiles of
+    a segment at once.
+
+    :param gldata: GliderData instance of the full segment
+    :param profile_indices: list of contiguous row index arrays, one per
+        profile (Profiles.indices)
+    :return: keep, reasons; `keep` is a boolean array, True for profiles
+        that pass all of the filters, and `reasons` maps each filter name to
+        a boolean array that is True where that filter rejects the profile.
+        Filters without a batch version are only run on the profiles that
+        pass the batch filters.
+    """
+    module = globals()
+    filter_names = [name for name in sorted(module)
+                    if name.startswith('filter')]
+    profiles = _ProfileGroups(gldata, profile_indices)
+
+    keep = np.ones(profiles.n, dtype=bool)
+    reasons = {}
+    unbatched = []
+    for name in filter_names:
+        batch_func = module.get('batch_' + name)
+        if batch_func is None:
+            unbatched.append(name)
+            continue
+        reasons[name] = np.asarray(batch_func(profiles), dtype=bool)
+        keep &= ~reasons[name]
+
+    for name in unbatched:
+        reasons[name] = np.zeros(profiles.n, dtype=bool)
+        for ii in np.flatnonzero(keep):
+            profile = gldata.slicedata(indices=profile_indices[ii])
+            if module[name](profile):
+                reasons[name][ii] = True
+                keep[ii] = False
+
+    return keep, reasons
@@ -14,6 +14,7 @@ import argparse
 import json
 import glob
 from common.constants import SUPPORTED_PLATFORMS, OUTPUT_TARGETS, OUTPUT_FORMATS
+from common.constants import EXPLORER_LAYOUTS, NETCDF_TARGETS, NETCDF_ENGINES
 from common.constants import LOG_HEADER_FORMAT
 import MobilePlatform.GliderPlatform.slocum20Platform as slocum20
 import MobilePlatform.AuvPlatform.remus600Platform as remus600
@@ -43,10 +44,34 @@ def validateCommonArguments( args ) :
         logging.error( "Unsupported mobile platform passed")
         ret = -1
 
-    # Host target for NetCDF output must be in supported list
+    # Host targets must be in supported list, with at most one NetCDF target
 
-    if args.target_repository not in OUTPUT_TARGETS:
-        logging.error( "Unsupported host target passed")
+    for target in args.target_repository:
+        if target not in OUTPUT_TARGETS:
+            logging.error( "Unsupported host target passed")
+            ret = -1
+
+    if len( netcdfTargets( args.target_repository )) > 1:
+        logging.error( "Only one NetCDF host target may be passed")
+        ret = -1
+
+    # Explorer layout must be in supported layouts
+
+    if args.explorer_layout not in EXPLORER_LAYOUTS:
+        logging.error( "Unsupported OOI Explorer layout passed")
+        ret = -1
+
+    # Write queue size must be non-negative (0 writes in the processing thread)
+
+    if args.write_queue < 0:
+        logging.error( "Write queue size must be 0 or more")
+        ret = -1
+
+    # Profile catalog must be in an existing directory
+
+    if args.catalog is not None and \
+            not os.path.isdir( os.path.dirname( os.path.abspath( args.catalog ))):
+        logging.error( "Profile catalog directory must be a valid path" )
         ret = -1
 
     # Output format must be in supported formats
@@ -58,6 +83,17 @@ def validateCommonArguments( args ) :
     return ret
 
 
+def netcdfTargets( targets ) :
+    """
+    NetCDF host targets of the host target list, the other targets (PARQUET,
+    ZARR) are written in addition to the NetCDF output
+    :param targets: list of host targets
+    :return: list of NetCDF host targets
+    """
+
+    return [ target for target in targets if target in NETCDF_TARGETS ]
+
+
 def dataFilelistWildcardExpansion( args ) :
     """
     Support glob expansion of file list arguments containing wildcards
@@ -143,13 +179,20 @@ def main( args ) :
                 # Insert cmdline args into platform settings
                 platform.cfgPath = args.config_path
                 platform.dataFiles = args.data_files
-                platform.targetHost = args.target_repository
+                ncTargets = netcdfTargets( args.target_repository )
+                platform.targetHost = ncTargets[0] if len(ncTargets) > 0 else None
+                platform.targetHosts = args.target_repository
+                platform.explorerLayout = args.explorer_layout
                 if args.platform_args is not None:
                     cleanString = args.platform_args.replace('\'', "\"")
                     platform.platformArgs = platformArgsStringToDict( cleanString )
                 platform.outputPath = args.output_path
                 platform.replaceOutputFiles = args.clobber
+                platform.skipUnchanged = args.skip_unchanged
+                platform.catalogPath = args.catalog
                 platform.outputFormat = args.nc_format
+                platform.outputEngine = args.engine
+                platform.writeQueue = args.write_queue
                 platform.outputCompression = args.compression_level
                 platform.suppressOutput = args.suppress_output
 
@@ -207,9 +250,19 @@ if __name__ == "__main__" :
                             )
 
     arg_parser.add_argument('-t', '--target_repository',
-                            help='Target host repository type for formatted data',
+                            help=('Target host repository types for formatted data, '
+                                  'at most one NetCDF target, optionally with PARQUET '
+                                  'and/or ZARR'),
                             choices=OUTPUT_TARGETS,
-                            default='IOOS-DAC')
+                            nargs='+',
+                            default=['IOOS-DAC'])
+
+    arg_parser.add_argument('-e', '--explorer_layout',
+                            help=('Layout of the OOI Explorer trajectory file, '
+                                  'observations padded to the longest profile '
+                                  'or a contiguous ragged array'),
+                            choices=EXPLORER_LAYOUTS,
+                            default='padded')
 
     arg_parser.add_argument('-p', '--platform_args',
                             help=('Platform specific arguments formatted as '
@@ -226,17 +279,41 @@ if __name__ == "__main__" :
                             help='Clobber existing output files if they exist',
                             action='store_true')
 
+    arg_parser.add_argument('-u', '--skip_unchanged',
+                            help=('With -k, keep existing DAC profile files whose '
+                                  'content, other than creation dates, history '
+                                  'and uuid, is unchanged'),
+                            action='store_true')
+
+    arg_parser.add_argument('-a', '--catalog',
+                            help=('SQLite profile catalog to add the profile files '
+                                  'written to, created if it does not exist, see '
+                                  'queryProfileCatalog.py'))
+
     arg_parser.add_argument('-f', '--format',
                             dest='nc_format',
                             help='NetCDF file format',
                             choices=OUTPUT_FORMATS,
                             default='NETCDF4_CLASSIC')
 
+    arg_parser.add_argument('-g', '--engine',
+                            help=('NetCDF library engine used to write files, '
+                                  'auto selects the fastest for the format'),
+                            choices=NETCDF_ENGINES,
+                            default='netcdf4')
+
     arg_parser.add_argument('-cl', '--compression_level',
                             help='NetCDF4 compression level',
                             choices=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
                             default=1)
 
+    arg_parser.add_argument('-w', '--write_queue',
+                            help=('Formatted profiles waiting to be written by '
+                                  'the background writer thread, 0 writes each '
+                                  'profile before formatting the next'),
+                            type=int,
+                            default=2)
+
     arg_parser.add_argument('-s', '--suppress_output',
                             help=(
                                 'Check configuration and create output file '
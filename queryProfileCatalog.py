@@ -0,0 +1,153 @@
+"""
+class: queryProfileCatalog.py
+description: Lists the profile files of a profile catalog (see
+profileDataFormatter.py --catalog) covering a time window and/or a
+latitude/longitude/depth box, from the catalog indexes alone, without
+opening any profile file. Profiles overlapping the window and box match.
+history:
+10/19/2026 created
+"""
+import os
+import sys
+import logging
+import argparse
+import datetime
+from dateutil import parser
+from FileWriter.profileCatalog import profileCatalog
+
+
+def parseTime( timeString ) :
+    """
+    Seconds since 1970-01-01 of an ISO 8601 date/time (UTC unless a zone
+    is given) or of a number of seconds
+    :param timeString:
+    :return: seconds since 1970-01-01
+    """
+
+    try:
+        return float( timeString )
+    except ValueError:
+        dt = parser.isoparse( timeString )
+        if dt.tzinfo is None:
+            dt = dt.replace( tzinfo=datetime.timezone.utc )
+        return dt.timestamp()
+
+
+def isoTime( seconds ) :
+    """
+    :param seconds: seconds since 1970-01-01, or None
+    :return: ISO 8601 UTC date/time string, blank if None
+    """
+
+    if seconds is None:
+        return ''
+    return datetime.datetime.fromtimestamp( seconds, datetime.timezone.utc ). \
+        strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def main( args ) :
+    """
+    Print the catalog profile files matching the query
+    :param args: Namespace, from argparse
+    :return: 0: success, -1 failure
+    """
+
+    logging.basicConfig( level=getattr( logging, args.log_level.upper() ))
+
+    if not os.path.isfile( args.catalog ):
+        logging.error( "No profile catalog " + args.catalog )
+        return -1
+
+    try:
+        startTime = None if args.start_time is None else parseTime( args.start_time )
+        endTime = None if args.end_time is None else parseTime( args.end_time )
+    except ValueError as e:
+        logging.error( "Invalid time: " + str(e) )
+        return -1
+
+    latRange = lonRange = None
+    if args.region is not None:
+        latRange = tuple( args.region[0:2] )
+        lonRange = tuple( args.region[2:4] )
+
+    with profileCatalog( args.catalog ) as catalog:
+        rows = catalog.query( startTime=startTime, endTime=endTime,
+                              latRange=latRange, lonRange=lonRange,
+                              depthRange=args.depth_range,
+                              trajectory=args.trajectory_name,
+                              variables=args.variables,
+                              directory=args.dac_path )
+
+    for row in rows:
+        if args.details:
+            print( '\t'.join( str(value) for value in (
+                row['path'], row['trajectory'], row['profile_id'],
+                isoTime( row['start_time'] ), isoTime( row['end_time'] ),
+                row['lat_min'], row['lat_max'], row['lon_min'], row['lon_max'],
+                row['depth_min'], row['depth_max'], row['source_file'] )))
+        else:
+            print( row['path'] )
+
+    return 0
+
+
+if __name__ == "__main__" :
+    """
+    queryProfileCatalog entry point
+    """
+
+    arg_parser = argparse.ArgumentParser(
+        description=str( __doc__ ),
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    arg_parser.add_argument('-a', '--catalog',
+                            help='SQLite profile catalog',
+                            required=True )
+
+    arg_parser.add_argument('-b', '--start_time',
+                            help=('Start of the time window, ISO 8601 (UTC unless '
+                                  'a zone is given) or seconds since 1970-01-01'))
+
+    arg_parser.add_argument('-e', '--end_time',
+                            help='End of the time window, as the start')
+
+    arg_parser.add_argument('-r', '--region',
+                            help='Bounding box, in degrees north and east',
+                            nargs=4,
+                            type=float,
+                            metavar=('LAT_MIN', 'LAT_MAX', 'LON_MIN', 'LON_MAX'))
+
+    arg_parser.add_argument('-z', '--depth_range',
+                            help='Depth range, in meters',
+                            nargs=2,
+                            type=float,
+                            metavar=('DEPTH_MIN', 'DEPTH_MAX'))
+
+    arg_parser.add_argument('-n', '--trajectory_name',
+                            help='Profiles of this trajectory only')
+
+    arg_parser.add_argument('-v', '--variables',
+                            help='Profiles holding all of these variables only',
+                            nargs='+')
+
+    arg_parser.add_argument('-i', '--dac_path',
+                            help='Profile files in this directory only')
+
+    arg_parser.add_argument('-d', '--details',
+                            help=('Print the trajectory, profile id, time, '
+                                  'lat/lon/depth extents and source file of '
+                                  'each profile file, tab separated'),
+                            action='store_true')
+
+    arg_parser.add_argument('-l', '--log_level',
+                            help='Verbosity level',
+                            type=str,
+                            choices=[
+                                'debug', 'info', 'warning',
+                                'error', 'critical'],
+                            default='warning')
+
+    parsed_args = arg_parser.parse_args()
+
+    sys.exit( main( parsed_args ))
@@ -0,0 +1,198 @@
+"""
+class: rebuildExplorerTrajectory.py
+description: Rebuilds the OOI Data Explorer trajectory file of a deployment
+from an existing directory of IOOS-DAC profile NetCDF files, without
+reprocessing the platform data files. The profile files are read
+concurrently a block of profiles at a time, each once, and the trajectory
+file is assembled from the in memory copies of the block, which are then
+released. Trajectory files in the directory, named as such, are skipped. With a profile catalog, the profile files are those the
+catalog holds for the directory, instead of those found in the directory.
+history:
+10/19/2026 created
+10/19/2026 added profile file lists from the profile catalog
+10/19/2026 profile files read a block at a time, trajectory files skipped by name
+"""
+import os
+import re
+import sys
+import glob
+import fnmatch
+import logging
+import argparse
+from common.constants import OUTPUT_FORMATS, EXPLORER_LAYOUTS
+from common.constants import LOG_HEADER_FORMAT, EXPLORER_TRAJECTORY_FILE_PATTERN
+from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import DEFAULT_READ_WORKERS
+from FileWriter.profileCatalog import profileCatalog
+
+
+def catalogProfileFiles( args ) :
+    """
+    Names of the profile files the catalog holds for the DAC directory,
+    of the trajectory if passed, matching the file name pattern, which
+    still exist
+    :param args: Namespace, from argparse
+    :return: list of file names
+    """
+
+    if not os.path.isfile( args.catalog ):
+        return []
+
+    with profileCatalog( args.catalog ) as catalog:
+        rows = catalog.query( trajectory=args.trajectory_name,
+                              directory=args.dac_path )
+
+    return [ os.path.basename( row['path'] ) for row in rows
+             if fnmatch.fnmatch( os.path.basename( row['path'] ), args.pattern )
+             and os.path.isfile( row['path'] ) ]
+
+
+def main( args ) :
+    """
+    Rebuild the OOI Explorer trajectory file from a DAC profile directory
+    :param args: Namespace, from argparse
+    :return: 0: success, -1 failure
+    """
+    ret = 0
+
+    try:
+
+        # Set up logging
+        logging.basicConfig(filename='./profileDataFormatter.log', level= getattr( logging, args.log_level.upper() ))
+        formatter = logging.Formatter( LOG_HEADER_FORMAT )
+        logging.getLogger().handlers[0].setFormatter( formatter )
+        logging.info('----- starting rebuildExplorerTrajectory -----')
+        logargs = ' '.join(str(k)+":"+str(v) for k, v in vars( args ).items())
+        logging.info( logargs )
+
+        if args.catalog is not None:
+            inputFiles = sorted( catalogProfileFiles( args ))
+        else:
+            inputFiles = sorted( os.path.basename(f) for f in
+                                 glob.glob( os.path.join( args.dac_path, args.pattern )))
+
+        # Skip previously built trajectory files, by name, which setupOutput
+        # would otherwise open to find they are not profiles
+        inputFiles = [ f for f in inputFiles
+                       if not re.match( EXPLORER_TRAJECTORY_FILE_PATTERN, f ) ]
+        if args.trajectory_name is not None:
+            inputFiles = [ f for f in inputFiles if f != args.trajectory_name + '.nc' ]
+
+        if not os.path.isdir( args.dac_path ) or not os.path.isdir( args.output_path ):
+            logging.error( "DAC and output paths must be valid paths" )
+            ret = -1
+
+        elif args.catalog is not None and not os.path.isfile( args.catalog ):
+            logging.error( "No profile catalog " + args.catalog )
+            ret = -1
+
+        elif len(inputFiles) == 0:
+            logging.error( "No DAC profile files found in " + args.dac_path )
+            ret = -1
+
+        else:
+
+            deWriter = dataExplorerNetCDFWriter()
+            deWriter.inputPath = args.dac_path
+            deWriter.outputPath = args.output_path
+            deWriter.overwriteExistingFiles = args.clobber
+            deWriter.writeFormat = args.nc_format
+            deWriter.layout = args.explorer_layout
+            deWriter.inputFiles = inputFiles
+            deWriter.readWorkers = args.workers
+            if args.trajectory_name is not None:
+                deWriter.trajectoryName = args.trajectory_name
+
+            # The trajectory and source file names, unless passed, are found
+            # in the metadata pass of setupOutput over the file headers. The
+            # files of each block of profiles are then read concurrently, and
+            # released once the block is written
+
+            deWriter.setupOutput()
+
+            if deWriter.nc is None:
+                ret = -1
+
+            else:
+                logging.info( 'Rebuilding ' + deWriter.trajectoryName + ' from ' +
+                              str(len(deWriter.profileFiles)) + ' profile files' )
+                deWriter.writeOutput()
+                deWriter.cleanupOutput()
+
+    except Exception as e:
+        logging.error( "Uncaught exception: " + str(e))
+        ret = -1
+
+    if ret == 0:
+        print('rebuild completed successfully')
+    else:
+        print('Errors encountered, see log file for details')
+
+    return ret
+
+
+if __name__ == "__main__" :
+    """
+    rebuildExplorerTrajectory entry point
+    """
+
+    arg_parser = argparse.ArgumentParser(
+        description=str( __doc__ ),
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    arg_parser.add_argument('-i', '--dac_path',
+                            help='Directory of DAC profile NetCDF files',
+                            required=True )
+
+    arg_parser.add_argument('-o', '--output_path',
+                            help=(
+                                'Trajectory file destination directory, which must '
+                                'exist. Current directory if not specified'),
+                            default='.' )
+
+    arg_parser.add_argument('-n', '--trajectory_name',
+                            help=('Trajectory name, default is the trajectory '
+                                  'of the profile files'))
+
+    arg_parser.add_argument('-p', '--pattern',
+                            help='Glob pattern of the DAC profile file names',
+                            default='*.nc')
+
+    arg_parser.add_argument('-a', '--catalog',
+                            help=('SQLite profile catalog listing the profile files, '
+                                  'instead of listing the DAC directory'))
+
+    arg_parser.add_argument('-w', '--workers',
+                            help='Number of threads reading profile files',
+                            type=int,
+                            default=DEFAULT_READ_WORKERS)
+
+    arg_parser.add_argument('-e', '--explorer_layout',
+                            help=('Layout of the OOI Explorer trajectory file, '
+                                  'observations padded to the longest profile '
+                                  'or a contiguous ragged array'),
+                            choices=EXPLORER_LAYOUTS,
+                            default='padded')
+
+    arg_parser.add_argument('-k', '--clobber',
+                            help='Clobber existing output files if they exist',
+                            action='store_true')
+
+    arg_parser.add_argument('-f', '--format',
+                            dest='nc_format',
+                            help='NetCDF file format',
+                            choices=OUTPUT_FORMATS,
+                            default='NETCDF4_CLASSIC')
+
+    arg_parser.add_argument('-l', '--log_level',
+                            help='Verbosity level',
+                            type=str,
+                            choices=[
+                                'debug', 'info', 'warning',
+                                'error', 'critical'],
+                            default='info')
+
+    parsed_args = arg_parser.parse_args()
+
+    sys.exit( main( parsed_args ))
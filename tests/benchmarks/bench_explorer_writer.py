@@ -0,0 +1,124 @@
+"""
+Benchmark: Explorer trajectory assembly, per profile writes against blocks
+
+Builds the OOI Explorer trajectory file from synthetic DAC profile files
+(in memory, so only the trajectory file assembly is timed) for increasing
+numbers of profiles, in both layouts, with dataExplorerNetCDFWriter and
+with a subclass restoring the per variable, per profile hyperslab writes
+it replaced.
+
+    python tests/benchmarks/bench_explorer_writer.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+from netCDF4 import Dataset, stringtoarr
+import common.constants as cc
+from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+
+TRAJECTORY = 'cp_379-20210903T0000'
+SOURCE_FILE = 'cp_379-2021-246-1-33.mrg'
+SENSORS = ['temperature', 'conductivity', 'salinity', 'density', 'pressure',
+           'chlorophyll_a', 'backscatter', 'cdom', 'oxygen', 'par']
+
+
+class perProfileWriter( dataExplorerNetCDFWriter ):
+    """The per profile insert, one write per variable per profile"""
+
+    def insertVariableValues(self):
+        for profileIndex, filename in enumerate(self.profileFiles):
+            ds = self.openInputFile(filename)
+            obsOffset = self.profileObsOffsets[profileIndex]
+            for inVarName, inVar in ds.variables.items():
+                if inVarName == 'trajectory':
+                    continue
+                for outVarName, outVar in self.nc.variables.items():
+                    if outVarName == self.dacVarNameToOoiVarName(inVarName):
+                        if outVar.dtype == 'S1':
+                            strlen = min(outVar.size, inVar.size)
+                            outVar[0, profileIndex, 0:strlen] = \
+                                stringtoarr(inVar[0:strlen], strlen)
+                        elif outVar.dimensions == ('obs',):
+                            outVar[obsOffset:obsOffset + inVar.size] = inVar[:]
+                        elif outVar.ndim == 3:
+                            outVar[0, profileIndex, 0:inVar.size] = inVar[:]
+                        elif outVar.ndim == 2:
+                            outVar[0, profileIndex] = inVar[:]
+                        else:
+                            outVar.assignValue(inVar.getValue())
+                        break
+                if inVarName in ('time', 'lat', 'lon', 'depth'):
+                    self.updateExtents(inVarName, inVar[:])
+            ds.close()
+            self.extents.endProfile(int(self.profileIdList[profileIndex]))
+
+
+def syntheticProfile(profileId, startTime, obsCount, rng):
+    """In-memory DAC profile dataset contents"""
+    nc = Dataset('profile.nc', mode='w', format='NETCDF4_CLASSIC', memory=1)
+    nc.createDimension('time', obsCount)
+    nc.createDimension('traj_strlen', len(TRAJECTORY))
+    nc.createDimension('source_file_strlen', len(SOURCE_FILE))
+    nc.createVariable('trajectory', 'S1', ('traj_strlen',))[:] = \
+        stringtoarr(TRAJECTORY, len(TRAJECTORY))
+    nc.createVariable('source_file', 'S1', ('source_file_strlen',))[:] = \
+        stringtoarr(SOURCE_FILE, len(SOURCE_FILE))
+    nc.createVariable('profile_id', 'i4', ())[...] = profileId
+    nc.createVariable('profile_time', 'f8', ())[...] = startTime
+    nc.createVariable('platform', 'i4', ()).setncattr('type', 'platform')
+    nc.createVariable('time', 'f8', ('time',))[:] = \
+        startTime + 0.1 * np.arange(obsCount)
+    for name in ['lat', 'lon', 'depth'] + SENSORS:
+        nc.createVariable(name, 'f8', ('time',), fill_value=-999.0)[:] = \
+            rng.normal(size=obsCount)
+    return bytes(nc.close())
+
+
+def timedBuild(writerClass, buffers, layout, outputPath):
+    deWriter = writerClass()
+    deWriter.outputPath = outputPath
+    deWriter.overwriteExistingFiles = True
+    deWriter.layout = layout
+    deWriter.inputFiles = sorted(buffers)
+    deWriter.inputBuffers = buffers
+    t0 = time.perf_counter()
+    deWriter.setupOutput()
+    deWriter.writeOutput()
+    deWriter.cleanupOutput()
+    return time.perf_counter() - t0
+
+
+def bench(profiles, outputPath):
+    rng = np.random.default_rng(0)
+    obsCounts = rng.integers(200, 1200, profiles)
+    buffers = {}
+    startTime = 1630627200.0
+    for ii, obsCount in enumerate(obsCounts):
+        buffers['p{:05d}.nc'.format(ii)] = syntheticProfile(
+            ii + 1, startTime, obsCount, rng)
+        startTime += obsCount / 10. + 60.
+
+    for layout in cc.EXPLORER_LAYOUTS:
+        oldElapsed = timedBuild(perProfileWriter, buffers, layout, outputPath)
+        newElapsed = timedBuild(dataExplorerNetCDFWriter, buffers, layout,
+                                outputPath)
+        print('{:>7s} {:>9d} {:>12.3f} {:>10.3f} {:>8.2f}'.format(
+            layout, profiles, oldElapsed, newElapsed,
+            oldElapsed / newElapsed))
+
+
+if __name__ == '__main__':
+
+    outputPath = tempfile.mkdtemp()
+    try:
+        print('{:>7s} {:>9s} {:>12s} {:>10s} {:>8s}'.format(
+            'layout', 'profiles', 'per prof s', 'blocks s', 'speedup'))
+        for profiles in (100, 500, 1500):
+            bench(profiles, outputPath)
+    finally:
+        shutil.rmtree(outputPath)
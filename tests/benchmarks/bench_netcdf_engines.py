@@ -0,0 +1,111 @@
+"""
+Benchmark: NetCDF library engines, per profile write latency and file size
+
+Writes synthetic DAC profiles (a REMUS 600 sized set of profile scalars,
+strings and time series) with dacNetCDFWriter, to files and in memory, for
+each NetCDF engine and each output format it writes. Reports the mean write
+latency per profile and the mean file size, the measurements behind the
+common.constants.AUTO_ENGINES table.
+
+    python tests/benchmarks/bench_netcdf_engines.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+import common.constants as cc
+from FileWriter.NetCDFWriter import netCDFEngines
+from FileWriter.NetCDFWriter.dacNetCDFWriter import dacNetCDFWriter
+
+TRAJECTORY = 'R00005-20210903T0000'
+SOURCE_FILE = '20210903_R00005.csv'
+SENSORS = ['lat', 'lon', 'depth', 'pressure', 'temperature', 'conductivity',
+           'salinity', 'density', 'oxygen', 'chlorophyll_a', 'backscatter',
+           'cdom', 'par', 'heading', 'pitch', 'roll']
+SCALARS = ['profile_time', 'profile_lat', 'profile_lon', 'time_uv', 'lat_uv',
+           'lon_uv', 'u', 'v']
+ATTRS = {'units': '1', 'long_name': 'variable', 'observation_type': 'measured',
+         '_FillValue': -999.0}
+
+
+def syntheticProfile(ncWriter, profileId, startTime, obsCount, rng):
+    """Load a profile's variables and attributes into the writer"""
+    ncWriter.resetAll()
+    ncWriter.fileName = 'p{:05d}.nc'.format(profileId)
+    ncWriter.profileId = profileId
+    ncWriter.profileStartTime = startTime
+    ncWriter.profileEndTime = startTime + 0.1 * obsCount
+    ncWriter.trajectory = TRAJECTORY
+    ncWriter.sourceFile = SOURCE_FILE
+    for ii in range(30):
+        ncWriter.addGlobalAttr('attribute_{:02d}'.format(ii), 'value')
+
+    times = startTime + 0.1 * np.arange(obsCount)
+    ncWriter.addVariable('time', 'f8', 'time', {'units': 'seconds since 1970-01-01'},
+                         times, times)
+    for name in SENSORS:
+        ncWriter.addVariable(name, 'f8', 'time', ATTRS, rng.normal(size=obsCount),
+                             times)
+    ncWriter.addVariable('profile_id', 'i4', None,
+                         {'_FillValue': -999, 'long_name': 'Profile ID'},
+                         profileId, None)
+    for name in SCALARS:
+        ncWriter.addVariable(name, 'f8', None, ATTRS, None, None)
+    for name in ('platform', 'instrument_ctd'):
+        ncWriter.addVariable(name, 'i4', None, {'type': name}, None, None)
+
+
+def timedProfiles(engine, writeFormat, inMemory, profiles, outputPath):
+    ncWriter = dacNetCDFWriter()
+    ncWriter.outputPath = outputPath
+    ncWriter.overwriteExistingFiles = True
+    ncWriter.engine = engine
+    ncWriter.writeFormat = writeFormat
+    ncWriter.inMemory = inMemory
+
+    rng = np.random.default_rng(0)
+    elapsed = 0.0
+    size = 0
+    startTime = 1630627200.0
+    for profileId in range(1, profiles + 1):
+        obsCount = int(rng.integers(200, 1200))
+        syntheticProfile(ncWriter, profileId, startTime, obsCount, rng)
+        startTime += obsCount / 10. + 60.
+
+        t0 = time.perf_counter()
+        ncWriter.setupOutput()
+        ncWriter.writeOutput()
+        ncWriter.cleanupOutput()
+        elapsed += time.perf_counter() - t0
+
+        if inMemory:
+            size += len(ncWriter.memoryBuffer)
+        else:
+            size += os.path.getsize(os.path.join(outputPath, ncWriter.fileName))
+
+    return 1000. * elapsed / profiles, size / profiles
+
+
+if __name__ == '__main__':
+
+    profiles = 50
+    outputPath = tempfile.mkdtemp()
+    try:
+        print('{:>16s} {:>9s} {:>7s} {:>12s} {:>10s}'.format(
+            'format', 'engine', 'memory', 'ms/profile', 'bytes'))
+        for writeFormat in cc.OUTPUT_FORMATS:
+            for engine in (cc.NETCDF4_ENGINE, cc.H5NETCDF_ENGINE, cc.SCIPY_ENGINE):
+                if not netCDFEngines.engineAvailable(engine) or \
+                        writeFormat not in netCDFEngines.ENGINE_FORMATS[engine]:
+                    continue
+                for inMemory in (False, True):
+                    latency, size = timedProfiles(engine, writeFormat, inMemory,
+                                                  profiles, outputPath)
+                    print('{:>16s} {:>9s} {:>7s} {:>12.2f} {:>10.0f}'.format(
+                        writeFormat, engine, str(inMemory), latency, size))
+    finally:
+        shutil.rmtree(outputPath)
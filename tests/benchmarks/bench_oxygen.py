@@ -0,0 +1,134 @@
+"""
+Benchmark: fused optode oxygen kernels against the per stage NumPy path
+
+Times the calphase -> partial pressure -> concentration -> salinity and
+pressure compensation chain on synthetic optode and CTD records of
+increasing length, for the MkII (28 term foil polynomial) and SVU
+calculations, using ooidac.processing.oxygen_kernels and the per
+coefficient, per stage NumPy implementation it replaced.  The largest
+relative difference between the two is reported alongside.
+
+    python tests/benchmarks/bench_oxygen.py
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+import gsw
+from legacy.gliderdac.ooidac.processing import oxygen_kernels
+
+# a typical 4831 MkII foil calibration: FoilCoefA/B, FoilPolyDegT/O
+FOIL_C = np.array([
+    2.79e-03, 1.15e-04, 2.07e-06, 2.30e+02, -3.08e-01, -5.58e+01, 4.52e+00,
+    -2.59e-02, -9.05e-05, 1.86e-07, -1.13e-05, 5.61e-08, 1.99e-12, -4.07e-08,
+    4.02e-14, 1.40e-10, -3.50e-14, -1.70e-13, 1.00e-17, -2.00e-16, 3.40e-19,
+    -8.10e-19, 1.20e-21, -1.40e-21, 2.00e-25, 1.90e-26, -1.20e-27, 3.80e-30])
+FOIL_M = np.array([1, 0, 0, 0, 1, 2, 0, 1, 2, 3, 0, 1, 2, 3, 4, 0, 1, 2, 3, 4,
+                   5, 0, 1, 2, 3, 4, 5, 6])
+FOIL_N = np.array([1, 1, 2, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 5, 6, 6, 6, 6, 6,
+                   6, 7, 7, 7, 7, 7, 7, 7])
+SVU_COEFS = np.array([0.002848, 0.000114, 1.51e-6, 70.42301, -0.10302,
+                      -12.9462, 1.265377])
+PHASE_COEFS = [-0.5, 1.02, 0.0, 0.0]
+CONC_COEF = [1.5, 1.02]
+GG_A = [2.00856, 3.22400, 3.99063, 4.80299, 9.78188e-1, 1.71069]
+GG_B = [-6.24097e-3, -6.93498e-3, -6.90358e-3, -4.29155e-3]
+GG_C0 = -3.11680e-7
+
+
+def syntheticRecord(samples, seed=0):
+    rng = np.random.default_rng(seed)
+    record = {
+        'c1rph': rng.uniform(30., 50., samples),
+        'c2rph': rng.uniform(3., 8., samples),
+        'oxytemp': rng.uniform(0., 25., samples),
+        'salinity': rng.uniform(30., 37., samples),
+        'pressure': rng.uniform(0., 1000., samples),
+        'lat': np.full(samples, 44.6),
+        'lon': np.full(samples, -124.9)}
+    record['temp'] = record['oxytemp'] + rng.normal(0., .05, samples)
+    return record
+
+
+def stagedCompensation(do, sp, p, t, lat, lon):
+    sa = gsw.SA_from_SP(sp, p, lon, lat)
+    ct = gsw.CT_from_t(sa, t, p)
+    pdens = gsw.rho(sa, ct, 0.0)
+    do = 1000 * do / pdens
+    do = (1 + (0.032 * p) / 1000) * do
+    ts = np.log((298.15 - t) / (273.15 + t))
+    bts = GG_B[0] + GG_B[1] * ts + GG_B[2] * ts**2 + GG_B[3] * ts**3
+    return np.exp(sp * bts + GG_C0 * sp**2) * do
+
+
+def stagedMkII(r):
+    """The per coefficient loop and per stage passes replaced by the kernels"""
+    tcphase = r['c1rph'] - r['c2rph']
+    cph = (PHASE_COEFS[0] + PHASE_COEFS[1] * tcphase +
+           PHASE_COEFS[2] * tcphase**2 + PHASE_COEFS[3] * tcphase**3)
+    tmp = r['oxytemp']
+    pp = np.zeros_like(cph)
+    for ii in range(len(FOIL_C)):
+        pp = pp + FOIL_C[ii] * tmp**FOIL_M[ii] * cph**FOIL_N[ii]
+    pvapor = np.exp(52.57 - (6690.9 / (tmp + 273.15)) -
+                    4.6810 * np.log(tmp + 273.15))
+    airsat = (pp * 100.) / ((1013.25 - pvapor) * 0.20946)
+    ts = np.log((298.15 - tmp) / (273.15 + tmp))
+    oxysol = np.exp(GG_A[0] + GG_A[1] * ts + GG_A[2] * ts**2 +
+                    GG_A[3] * ts**3 + GG_A[4] * ts**4 + GG_A[5] * ts**5)
+    o2 = CONC_COEF[0] + CONC_COEF[1] * (oxysol * 44.659 * airsat / 100.)
+    return stagedCompensation(o2, r['salinity'], r['pressure'], r['temp'],
+                              r['lat'], r['lon'])
+
+
+def stagedSVU(r):
+    tcphase = r['c1rph'] - r['c2rph']
+    cph = (PHASE_COEFS[0] + PHASE_COEFS[1] * tcphase +
+           PHASE_COEFS[2] * tcphase**2 + PHASE_COEFS[3] * tcphase**3)
+    tmp = r['oxytemp']
+    csv = np.atleast_2d(SVU_COEFS)
+    ksv = csv[:, 0] + csv[:, 1] * tmp + csv[:, 2] * (tmp**2)
+    p0 = csv[:, 3] + csv[:, 4] * tmp
+    pc = csv[:, 5] + csv[:, 6] * cph
+    o2 = CONC_COEF[0] + CONC_COEF[1] * (((p0 / pc) - 1) / ksv)
+    return stagedCompensation(o2, r['salinity'], r['pressure'], r['temp'],
+                              r['lat'], r['lon'])
+
+
+def fusedChain(r, calcType):
+    cph = oxygen_kernels.calphase_from_rph(r['c1rph'], r['c2rph'], PHASE_COEFS)
+    if calcType == 'MkII':
+        o2 = oxygen_kernels.mkii_concentration(
+            cph, r['oxytemp'], FOIL_C, FOIL_M, FOIL_N, cc=CONC_COEF)[0]
+    else:
+        o2 = oxygen_kernels.svu_concentration(
+            cph, r['oxytemp'], SVU_COEFS, CONC_COEF)
+    return oxygen_kernels.s_and_p_compensation(
+        o2, r['salinity'], r['pressure'], r['temp'], r['lat'], r['lon'])
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+
+def bench(samples):
+    record = syntheticRecord(samples)
+    for calcType, staged in (('MkII', stagedMkII), ('SVU', stagedSVU)):
+        old, oldElapsed = timed(staged, record)
+        new, newElapsed = timed(fusedChain, record, calcType)
+        relDiff = np.max(np.abs(new - old) / np.abs(old))
+        print('{:>6s} {:>10d} {:>10.3f} {:>10.3f} {:>8.2f} {:>12.2e}'.format(
+            calcType, samples, oldElapsed, newElapsed,
+            oldElapsed / newElapsed, relDiff))
+
+
+if __name__ == '__main__':
+
+    print('{:>6s} {:>10s} {:>10s} {:>10s} {:>8s} {:>12s}'.format(
+        'calc', 'samples', 'staged s', 'fused s', 'speedup', 'max rel diff'))
+    for samples in (100000, 1000000, 4000000):
+        bench(samples)
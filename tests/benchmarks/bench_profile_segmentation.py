@@ -0,0 +1,132 @@
+"""
+Benchmark: Profiles.find_profiles_by_depth on long multi-day merged data
+
+Builds synthetic Slocum yo segments of increasing length (default 1, 2, 4
+and 8 days at 4 s sampling) and times profile discovery, comparing the
+searchsorted index gathering against the per profile full array scan it
+replaced.  Time per sample should stay flat as the record grows, i.e.
+segmentation scales linearly.
+
+The shared profileSegmenter run segmentation used for the Remus 600 is
+also timed on multi-million sample missions.
+
+Real merged files may be passed instead; they are concatenated in the
+given order and timed as one segment:
+
+    python tests/benchmarks/bench_profile_segmentation.py [file.mrg ...]
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+from DataProcessor.profileSegmenter import profileSegmenter
+from legacy.gliderdac.ooidac.data_classes import GliderData
+from legacy.gliderdac.ooidac.readers.slocum import parse_dba
+from legacy.gliderdac.ooidac.profiles import Profiles
+from configuration import DATA_CONFIG_LIST, TIMESENSOR
+
+
+def syntheticSegment(days, dt=4.0, seed=0):
+    """
+    Sawtooth yos to 200 m at ~0.2 m/s with science sampled every other record
+    :return: GliderData
+    """
+    rng = np.random.default_rng(seed)
+    ts = 1.6e9 + np.arange(0, days * 86400., dt)
+    period = 2 * 200. / 0.2
+    phase = (ts - ts[0]) % period / period
+    depth = 200. * (1 - abs(2 * phase - 1)) + 1 + rng.normal(0, 0.05, len(ts))
+
+    names = [TIMESENSOR, 'm_depth'] + DATA_CONFIG_LIST
+    data = np.full((len(ts), len(names)), np.nan)
+    data[:, 0] = ts
+    data[:, 1] = depth
+    data[::2, 2:] = depth[::2, np.newaxis]
+    sensors = {name: {'sensor_name': name, 'attrs': {}} for name in names}
+    return GliderData({'source_file': 'synthetic'}, names, sensors, data)
+
+
+def mergedSegment(files):
+    """
+    Concatenate the common columns of the passed dba files
+    :return: GliderData
+    """
+    dbas = [parse_dba(f) for f in files]
+    names = [n for n in dbas[0]['sensor_names']
+             if all(n in d['sensor_names'] for d in dbas)]
+    data = np.concatenate(
+        [d['data'][:, [d['sensor_names'].index(n) for n in names]]
+         for d in dbas])
+    return GliderData(dbas[0]['header'], names,
+                      dbas[0]['sensor_defs'], data)
+
+
+def scanGather(time_, switchTimes):
+    """
+    The per profile full array scan replaced by time_ranges_to_indices
+    """
+    indices = []
+    for pstart, pend in zip(switchTimes[:-1], switchTimes[1:]):
+        profile_ii = np.flatnonzero(
+            np.logical_and(time_ >= pstart, time_ <= pend))
+        if len(profile_ii) > 0:
+            indices.append(profile_ii)
+    return indices
+
+
+def bench(gldata, label):
+
+    profiles = Profiles(gldata)
+    t0 = time.perf_counter()
+    profiles.find_profiles_by_depth()
+    elapsed = time.perf_counter() - t0
+
+    switchTimes = np.concatenate((
+        [gldata.getdata(TIMESENSOR)[profiles.indices[0][0]]],
+        profiles.inflection_times[1:-1],
+        [gldata.getdata(TIMESENSOR)[profiles.indices[-1][-1]]]))
+    t0 = time.perf_counter()
+    scanGather(gldata.getdata(TIMESENSOR), switchTimes)
+    scanElapsed = time.perf_counter() - t0
+
+    print('{:>12s} {:>10d} {:>8d} {:>10.3f} {:>12.3f} {:>14.3f}'.format(
+        label, len(gldata), len(profiles.indices), elapsed,
+        1e6 * elapsed / len(gldata), scanElapsed))
+
+
+def benchRuns(samples, dt=0.1, seed=0):
+    """
+    Remus style segmentation: yos to 50 m at 10 Hz with ms times and
+    occasional gaps
+    """
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(np.full(samples, 1000 * dt))
+    times[rng.choice(samples, samples // 100000 + 1)] += 60000
+    period = 2 * 50. / 0.25
+    phase = (np.arange(samples) * dt) % period / period
+    depths = 50. * (1 - abs(2 * phase - 1)) + 1
+
+    segmenter = profileSegmenter(timeUnitsPerSecond=1000)
+    t0 = time.perf_counter()
+    timesOut, smoothed = segmenter.smoothDepths(times, depths)
+    starts, ends = segmenter.findProfileRuns(timesOut, smoothed)
+    elapsed = time.perf_counter() - t0
+
+    print('{:>12s} {:>10d} {:>8d} {:>10.3f} {:>12.3f}'.format(
+        'runs', samples, len(starts), elapsed, 1e6 * elapsed / samples))
+
+
+if __name__ == '__main__':
+
+    print('{:>12s} {:>10s} {:>8s} {:>10s} {:>12s} {:>14s}'.format(
+        'segment', 'samples', 'profiles', 'total s', 'us/sample',
+        'old gather s'))
+    if len(sys.argv) > 1:
+        bench(mergedSegment(sys.argv[1:]), 'merged')
+    else:
+        for days in (1, 2, 4, 8):
+            bench(syntheticSegment(days), '{:d} days'.format(days))
+        for samples in (1000000, 4000000):
+            benchRuns(samples)
@@ -0,0 +1,102 @@
+"""
+Shared fixture for the trajectory writer tests: synthetic GliderDAC profile
+files and the Explorer trajectory file written from them
+"""
+import os
+import shutil
+import tempfile
+import numpy as np
+from netCDF4 import stringtoarr
+from FileWriter.NetCDFWriter.dacNetCDFWriter import dacNetCDFWriter
+from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+
+
+class DacProfileFixture(object):
+    """
+    Mixin for unittest.TestCase classes, writes the DAC profile files to a
+    temporary directory in setUp and removes them in tearDown
+    """
+
+    trajectoryName = 'cp_379-20210903T0000'
+    sourceFile = 'cp_379-2021-246-1-33.mrg'
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.obsCounts = [40, 7, 120, 1, 15]
+        self.inputFiles = ['profile_{:d}.nc'.format(ii + 1)
+                           for ii in range(len(self.obsCounts))]
+        self.inputBuffers = {}
+        self.writeDacProfiles()
+
+    def writeDacProfiles(self, inMemory=False):
+        startTime = 1630627200
+        for ii, obsCount in enumerate(self.obsCounts):
+            buffer = self.writeDacProfile(self.inputFiles[ii], ii + 1,
+                                          startTime, obsCount, inMemory)
+            if inMemory:
+                self.inputBuffers[self.inputFiles[ii]] = buffer
+            startTime += obsCount + 60
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def writeDacProfile(self, filename, profileId, startTime, obsCount,
+                        inMemory=False):
+        """
+        Minimal GliderDAC profile file: time dimensioned lat, lon, depth
+        and temperature, and profile scalars and strings
+        :return: the dataset contents if inMemory, else None
+        """
+        rng = np.random.default_rng(profileId)
+        dacWriter = dacNetCDFWriter()
+        dacWriter.inMemory = inMemory
+        dacWriter.nc = dacWriter.createDataset(
+            os.path.join(self.tmpDir, filename))
+        nc = dacWriter.nc
+        nc.setncattr('featureType', 'trajectory')
+        nc.createDimension('time', obsCount)
+        nc.createDimension('traj_strlen', len(self.trajectoryName))
+
+        trajVar = nc.createVariable('trajectory', 'S1', ('traj_strlen',))
+        trajVar[:] = stringtoarr(self.trajectoryName, len(self.trajectoryName))
+        nc.createDimension('source_file_strlen', len(self.sourceFile))
+        sourceVar = nc.createVariable('source_file', 'S1', ('source_file_strlen',))
+        sourceVar[:] = stringtoarr(self.sourceFile, len(self.sourceFile))
+        nc.createVariable('profile_id', 'i4', ())[...] = profileId
+        nc.createVariable('profile_time', 'f8', ())[...] = startTime
+        platformVar = nc.createVariable('platform', 'i4', ())
+        platformVar.setncattr('type', 'platform')
+
+        nc.createVariable('time', 'f8', ('time',))[:] = \
+            startTime + np.arange(obsCount)
+        for name, low, high in (('lat', 40.0, 40.1), ('lon', -70.1, -70.0),
+                                ('depth', 0.0, 200.0)):
+            nc.createVariable(name, 'f8', ('time',), fill_value=-999.0)[:] = \
+                rng.uniform(low, high, obsCount)
+        tempVar = nc.createVariable('temperature', 'f8', ('time',),
+                                    fill_value=-999.0)
+        tempVar.setncattr('ancillary_variables', 'lat, lon')
+        tempVar[:] = rng.uniform(5.0, 20.0, obsCount)
+        dacWriter.closeDataset()
+        return dacWriter.memoryBuffer
+
+    def writeTrajectory(self, layout, suffix='', maxCubeBytes=None):
+        deWriter = dataExplorerNetCDFWriter()
+        if maxCubeBytes is not None:
+            deWriter.maxCubeBytes = maxCubeBytes
+        deWriter.outputPath = self.tmpDir
+        deWriter.overwriteExistingFiles = True
+        deWriter.layout = layout
+        deWriter.trajectoryName = self.trajectoryName
+        deWriter.trajectoryDateTime = '20210903T0000'
+        deWriter.sourceFile = self.sourceFile
+        deWriter.inputFiles = self.inputFiles
+        deWriter.inputBuffers = self.inputBuffers
+        deWriter.setupOutput()
+        deWriter.writeOutput()
+        deWriter.cleanupOutput()
+
+        filePath = os.path.join(self.tmpDir, self.trajectoryName + '.nc')
+        renamed = filePath.replace('.nc', '_' + layout + suffix + '.nc')
+        os.rename(filePath, renamed)
+        return renamed
@@ -0,0 +1,78 @@
+"""
+Shared helper for the DAC profile writer tests: dacNetCDFWriter profiles of
+a synthetic R00005 deployment
+"""
+import numpy as np
+from FileWriter.NetCDFWriter.dacNetCDFWriter import dacNetCDFWriter
+
+TRAJECTORY = 'R00005-20210903T0000'
+SOURCE_FILE = '20210903_R00005.csv'
+PROFILE_START_TIME = 1630627200.0
+
+
+def dacProfileWriter(outputPath, **settings):
+    """
+    dacNetCDFWriter for the synthetic deployment
+    :param outputPath: directory of the profile files
+    :param settings: other writer properties, such as skipUnchanged
+    :return: dacNetCDFWriter
+    """
+    dacWriter = dacNetCDFWriter()
+    dacWriter.outputPath = outputPath
+    dacWriter.trajectory = TRAJECTORY
+    dacWriter.sourceFile = SOURCE_FILE
+    for name, value in settings.items():
+        setattr(dacWriter, name, value)
+    return dacWriter
+
+
+def seriesProfile(profileId):
+    """
+    Start time and depths of a profile of the synthetic series, profiles
+    100 secs apart, each deeper than the one before
+    :param profileId:
+    :return: start time, depths
+    """
+    return (PROFILE_START_TIME + 100.0 * profileId,
+            np.array([1.0, 2.0, 10.0, 3.0]) * profileId)
+
+
+def addProfile(dacWriter, fileName, variables, startTime=PROFILE_START_TIME,
+               offsets=(0.0, 1.0, 2.0, 3.0), duration=4.0, profileId=None,
+               attrs=None):
+    """
+    Set up dacWriter for one profile with time dimensioned variables
+    :param dacWriter:
+    :param fileName: profile file name
+    :param variables: dictionary of variable name to values at the times
+    :param startTime: profile start time
+    :param offsets: times of the values (secs from startTime)
+    :param duration: profile end time (secs from startTime)
+    :param profileId: optional profile_id
+    :param attrs: variable attributes, default -999.0 fill values
+    :return: dacWriter
+    """
+    if attrs is None:
+        attrs = {'_FillValue': -999.0}
+    dacWriter.fileName = fileName
+    if profileId is not None:
+        dacWriter.profileId = profileId
+    dacWriter.profileStartTime = startTime
+    dacWriter.profileEndTime = startTime + duration
+    times = startTime + np.array(offsets)
+    for name, values in variables.items():
+        dacWriter.addVariable(name, 'f8', 'time', dict(attrs), values, times)
+    return dacWriter
+
+
+def writeProfile(dacWriter):
+    """
+    Write the profile set up in dacWriter, leaving it ready for the next
+    :param dacWriter:
+    :return: dacWriter
+    """
+    dacWriter.setupOutput()
+    dacWriter.writeOutput()
+    dacWriter.cleanupOutput()
+    dacWriter.vars.clear()
+    return dacWriter
@@ -0,0 +1,58 @@
+"""
+Unit test for the background profile writer
+"""
+import sys
+sys.path.append("..")
+import threading
+import unittest
+from FileWriter.backgroundWriter import backgroundWriter
+
+
+class TestBackgroundWriter(unittest.TestCase):
+
+    def writeProfile(self, profileId, written):
+        if profileId == 3:
+            raise ValueError('bad profile')
+        written.append( (profileId, threading.current_thread().name) )
+        return 'profile_{:d}.nc'.format(profileId)
+
+    def test_background_writes(self):
+
+        written = []
+        release = threading.Event()
+        with backgroundWriter( queueSize=2 ) as profileWriter:
+
+            # the writer thread holds the first profile, two are queued
+            profileWriter.submit( 0, release.wait )
+            for profileId in (1, 2):
+                profileWriter.submit( profileId, self.writeProfile, profileId, written )
+            self.assertEqual(written, [])
+            release.set()
+
+            for profileId in (3, 4):
+                profileWriter.submit( profileId, self.writeProfile, profileId, written )
+            completions = profileWriter.wait()
+
+        # in order, each with its result or error
+        self.assertEqual([key for key, result, error in completions], [0, 1, 2, 3, 4])
+        self.assertEqual(completions[2][1], 'profile_2.nc')
+        self.assertIsInstance(completions[3][2], ValueError)
+        self.assertIsNone(completions[3][1])
+        self.assertEqual([profileId for profileId, thread in written], [1, 2, 4])
+        self.assertTrue(all(thread == 'profileWriter' for profileId, thread in written))
+
+    def test_no_queue(self):
+
+        written = []
+        with backgroundWriter( queueSize=0 ) as profileWriter:
+            profileWriter.submit( 1, self.writeProfile, 1, written )
+            self.assertEqual(written, [(1, threading.current_thread().name)])
+            profileWriter.submit( 3, self.writeProfile, 3, written )
+            completions = profileWriter.completed()
+
+        self.assertEqual(completions[0], (1, 'profile_1.nc', None))
+        self.assertIsInstance(completions[1][2], ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Unit test for the diskless and skip unchanged DAC profile output
+"""
+import sys
+sys.path.append("..")
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+from tests.dacProfileWriter import dacProfileWriter, addProfile, writeProfile
+
+
+class TestDacNetCDFWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def profileWriter(self, temperature):
+        dacWriter = dacProfileWriter(self.tmpDir, overwriteExistingFiles=True)
+        return addProfile(dacWriter, 'R00005_20210903T0000_delayed.nc',
+                          {'temperature': temperature})
+
+    def test_diskless_profile(self):
+
+        filePath = os.path.join(self.tmpDir, 'R00005_20210903T0000_delayed.nc')
+        dacWriter = self.profileWriter(np.arange(4.0))
+        dacWriter.setupOutput()
+        dacWriter.writeOutput()
+
+        # nothing on disk until the profile is complete
+        self.assertEqual(os.listdir(self.tmpDir), [])
+        dacWriter.cleanupOutput()
+        self.assertEqual(os.listdir(self.tmpDir), [os.path.basename(filePath)])
+
+        # a profile failing to write leaves the previous file as it was
+        dacWriter = self.profileWriter(np.array(['bad'] * 4))
+        dacWriter.setupOutput()
+        with self.assertRaises(Exception):
+            dacWriter.writeOutput()
+        self.assertEqual(os.listdir(self.tmpDir), [os.path.basename(filePath)])
+
+        nc = Dataset(filePath)
+        np.testing.assert_array_equal(nc['temperature'][:].compressed(), np.arange(4.0))
+        nc.close()
+
+        with self.assertRaises(FileExistsError):
+            dacWriter.createDataset(filePath, clobber=False)
+
+    def test_skip_unchanged(self):
+
+        filePath = os.path.join(self.tmpDir, 'R00005_20210903T0000_delayed.nc')
+
+        def writeTemperature(temperature, created):
+            dacWriter = self.profileWriter(temperature)
+            dacWriter.skipUnchanged = True
+            dacWriter.addGlobalAttr('date_created', created)
+            dacWriter.addGlobalAttr('title', 'R00005')
+            writeProfile(dacWriter)
+            return dacWriter.outputUnchanged, os.stat(filePath).st_ino
+
+        unchanged, inode = writeTemperature(np.arange(4.0), '2021-09-03T00:00:00Z')
+        self.assertFalse(unchanged)
+        self.assertEqual(sorted(os.listdir(self.tmpDir)),
+                         ['.' + os.path.basename(filePath) + '.sha256',
+                          os.path.basename(filePath)])
+
+        # a rerun only stamping new dates keeps the file
+        self.assertEqual(writeTemperature(np.arange(4.0), '2026-10-19T00:00:00Z'),
+                         (True, inode))
+
+        # changed data is written
+        unchanged, newInode = writeTemperature(np.arange(4.0) + 1, '2026-10-19T00:00:00Z')
+        self.assertFalse(unchanged)
+        self.assertNotEqual(newInode, inode)
+        nc = Dataset(filePath)
+        np.testing.assert_array_equal(nc['temperature'][:].compressed(), np.arange(4.0) + 1)
+        nc.close()
+
+    def test_skip_after_rewrite(self):
+
+        filePath = os.path.join(self.tmpDir, 'R00005_20210903T0000_delayed.nc')
+
+        def writeTemperature(temperature, skip):
+            dacWriter = self.profileWriter(temperature)
+            dacWriter.skipUnchanged = skip
+            writeProfile(dacWriter)
+            return dacWriter.outputUnchanged
+
+        self.assertFalse(writeTemperature(np.arange(4.0), True))
+
+        # a rewrite without skip unchanged drops the stored hash
+        self.assertFalse(writeTemperature(np.arange(4.0) + 1, False))
+        self.assertEqual(os.listdir(self.tmpDir), [os.path.basename(filePath)])
+
+        # so the first content is written again
+        self.assertFalse(writeTemperature(np.arange(4.0), True))
+        nc = Dataset(filePath)
+        np.testing.assert_array_equal(nc['temperature'][:].compressed(), np.arange(4.0))
+        nc.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
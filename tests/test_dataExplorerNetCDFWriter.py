@@ -0,0 +1,127 @@
+"""
+Unit test for the OOI Data Explorer trajectory file writer
+"""
+import sys
+sys.path.append("..")
+import os
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+import common.constants as cc
+from FileWriter.NetCDFWriter.dataExplorerNetCDFWriter import dataExplorerNetCDFWriter
+from tests.dacProfileFixture import DacProfileFixture
+
+
+class TestDataExplorerNetCDFWriter(DacProfileFixture, unittest.TestCase):
+
+    def test_ragged_layout(self):
+
+        padded = Dataset(self.writeTrajectory(cc.EXPLORER_PADDED_LAYOUT))
+        ragged = Dataset(self.writeTrajectory(cc.EXPLORER_RAGGED_LAYOUT))
+
+        self.assertEqual(padded.dimensions['obs'].size, max(self.obsCounts))
+        self.assertEqual(ragged.dimensions['obs'].size, sum(self.obsCounts))
+        self.assertEqual(ragged.featureType, 'trajectoryProfile')
+        self.assertEqual(ragged['rowSize'].sample_dimension, 'obs')
+        np.testing.assert_array_equal(ragged['rowSize'][:], self.obsCounts)
+        self.assertEqual(ragged['temperature'].ancillary_variables,
+                         'precise_lat, precise_lon')
+
+        # every time variable holds the same observations, end to end
+        offsets = np.cumsum([0] + self.obsCounts)
+        for name in ('time', 'precise_lat', 'precise_lon', 'depth',
+                     'temperature'):
+            self.assertEqual(ragged[name].dimensions, ('obs',))
+            for ii, obsCount in enumerate(self.obsCounts):
+                np.testing.assert_array_equal(
+                    ragged[name][offsets[ii]:offsets[ii + 1]],
+                    padded[name][0, ii, :obsCount])
+
+        # profile variables and extents are unchanged
+        for name in ('profile_id', 'profile_time'):
+            np.testing.assert_array_equal(ragged[name][:], padded[name][:])
+        for attrName in ('geospatial_lat_min', 'geospatial_lat_max',
+                         'geospatial_vertical_max', 'time_coverage_start',
+                         'time_coverage_end'):
+            self.assertEqual(ragged.getncattr(attrName),
+                             padded.getncattr(attrName))
+
+        padded.close()
+        ragged.close()
+
+    def test_profile_blocks(self):
+
+        for layout in cc.EXPLORER_LAYOUTS:
+            oneBlock = Dataset(self.writeTrajectory(layout))
+            # one profile per block
+            blocks = Dataset(self.writeTrajectory(layout, suffix='_blocks',
+                                                  maxCubeBytes=1))
+            for name, var in oneBlock.variables.items():
+                np.testing.assert_array_equal(blocks[name][:], var[:])
+                self.assertEqual(blocks[name].chunking(), var.chunking())
+            oneBlock.close()
+            blocks.close()
+
+    def test_in_memory_profiles(self):
+
+        fromFiles = Dataset(self.writeTrajectory(cc.EXPLORER_RAGGED_LAYOUT))
+
+        # same profiles, never written to disk
+        for filename in self.inputFiles:
+            os.remove(os.path.join(self.tmpDir, filename))
+        self.writeDacProfiles(inMemory=True)
+        for filename in self.inputFiles:
+            self.assertFalse(os.path.exists(os.path.join(self.tmpDir, filename)))
+
+        fromMemory = Dataset(self.writeTrajectory(
+            cc.EXPLORER_RAGGED_LAYOUT, suffix='_memory'))
+
+        self.assertEqual(fromMemory.dimensions['obs'].size, sum(self.obsCounts))
+        for name, var in fromFiles.variables.items():
+            np.testing.assert_array_equal(fromMemory[name][:], var[:])
+        self.assertEqual(fromMemory.time_coverage_end, fromFiles.time_coverage_end)
+
+        fromFiles.close()
+        fromMemory.close()
+
+    def test_rebuild_from_dac_directory(self):
+
+        # a previous trajectory file in the DAC directory is not a profile
+        fromFiles = Dataset(self.writeTrajectory(cc.EXPLORER_PADDED_LAYOUT))
+
+        outputPath = os.path.join(self.tmpDir, 'rebuilt')
+        os.mkdir(outputPath)
+        deWriter = dataExplorerNetCDFWriter()
+        deWriter.inputPath = self.tmpDir
+        deWriter.outputPath = outputPath
+        deWriter.inputFiles = sorted(f for f in os.listdir(self.tmpDir)
+                                     if f.endswith('.nc'))
+
+        # profile files are read a profile block at a time, here of one
+        # profile, and released after
+        deWriter.readWorkers = 3
+        deWriter.maxCubeBytes = 1
+        deWriter.profileChunkSize = lambda: 1
+        blocksRead = []
+        readInputFiles = deWriter.readInputFiles
+        deWriter.readInputFiles = lambda filenames, workers: \
+            blocksRead.append(list(filenames)) or readInputFiles(filenames, workers)
+        deWriter.setupOutput()
+        deWriter.writeOutput()
+        deWriter.cleanupOutput()
+        self.assertEqual(blocksRead, [[f] for f in self.inputFiles])
+        self.assertEqual(deWriter.inputBuffers, {})
+
+        self.assertEqual(deWriter.profileFiles, self.inputFiles)
+        self.assertEqual(deWriter.trajectoryName, self.trajectoryName)
+        self.assertEqual(deWriter.sourceFile, self.sourceFile)
+        rebuilt = Dataset(os.path.join(outputPath, self.trajectoryName + '.nc'))
+        for name, var in fromFiles.variables.items():
+            np.testing.assert_array_equal(rebuilt[name][:], var[:])
+
+        fromFiles.close()
+        rebuilt.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
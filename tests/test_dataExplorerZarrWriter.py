@@ -0,0 +1,75 @@
+"""
+Unit test for the appendable Zarr trajectory store writer
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+import common.constants as cc
+from FileWriter.ZarrWriter.dataExplorerZarrWriter import dataExplorerZarrWriter, zarr
+from tests.dacProfileFixture import DacProfileFixture
+
+
+@unittest.skipIf(zarr is None, 'zarr not installed')
+class TestDataExplorerZarrWriter(DacProfileFixture, unittest.TestCase):
+
+    def writeStore(self, inputFiles, overwrite=False):
+        zWriter = dataExplorerZarrWriter()
+        zWriter.outputPath = self.tmpDir
+        zWriter.overwriteExistingFiles = overwrite
+        zWriter.workers = 3
+        zWriter.obsChunkSize = 16
+        zWriter.inputFiles = inputFiles
+        zWriter.setupOutput()
+        zWriter.writeOutput()
+        zWriter.cleanupOutput()
+        return zWriter
+
+    def test_appended_profiles(self):
+
+        padded = Dataset(self.writeTrajectory(cc.EXPLORER_PADDED_LAYOUT))
+
+        # two runs, the second appending to the store of the first
+        self.assertEqual(self.writeStore(self.inputFiles[:2]).writtenCount, 2)
+        zWriter = self.writeStore(self.inputFiles)
+        self.assertEqual(zWriter.writtenCount, len(self.inputFiles) - 2)
+        self.assertEqual(zWriter.profileCount, len(self.inputFiles))
+
+        store = zarr.open_consolidated(zWriter.storePath, mode='r')
+        self.assertEqual(store['temperature'].shape,
+                         (1, len(self.obsCounts), max(self.obsCounts)))
+        self.assertEqual(store['temperature'].attrs['_ARRAY_DIMENSIONS'],
+                         ['trajectory', 'profile', 'obs'])
+        self.assertEqual(store['temperature'].attrs['ancillary_variables'],
+                         'precise_lat, precise_lon')
+
+        # same values and extents as the Explorer trajectory file
+        for name, var in padded.variables.items():
+            if name != 'trajectory' and var.ndim > 0:
+                np.testing.assert_array_equal(
+                    store[name][:], np.ma.filled(var[:], store[name].fill_value))
+        for attrName in ('geospatial_lat_min', 'geospatial_lat_max',
+                         'geospatial_vertical_max', 'time_coverage_start',
+                         'time_coverage_end'):
+            self.assertEqual(store.attrs[attrName], padded.getncattr(attrName))
+        self.assertEqual(bytes(store['trajectory'][0].tobytes()).decode(),
+                         self.trajectoryName)
+
+        # a rewritten profile replaces the stored one, and only that one
+        self.obsCounts[0] = 3
+        self.writeDacProfiles()
+        zWriter = self.writeStore(self.inputFiles[:1], overwrite=True)
+        self.assertEqual(zWriter.writtenCount, 1)
+        store = zarr.open_consolidated(zWriter.storePath, mode='r')
+        self.assertEqual(store['profile_id'].shape, (1, len(self.inputFiles)))
+        temperature = store['temperature'][0, 0, :]
+        self.assertTrue((temperature[3:] == store['temperature'].fill_value).all())
+        np.testing.assert_array_equal(store['temperature'][0, 1:, :],
+                                      np.ma.filled(padded['temperature'][0, 1:, :], -999.0))
+
+        padded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit test for the vectorized dead-reckoning position correction
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.processing.gps import (
+    dr_corrected_positions, interpolate_gps)
+
+
+class TestDrCorrection(unittest.TestCase):
+
+    def syntheticSegment(self, dives=4, seed=6):
+        """
+        Dives to 50 m with zig-zag headings in a constant current that the
+        dead-reckoning does not know about, GPS fixes at the surface
+        """
+        rng = np.random.default_rng(seed)
+        ts, depth, underwater = [], [], []
+        t = 0.
+        for dive in range(dives):
+            surface = rng.integers(5, 10)
+            diveLength = rng.integers(300, 400)
+            ts.extend(t + 10. * np.arange(surface + diveLength))
+            t = ts[-1] + 10.
+            depth.extend([0.] * surface)
+            depth.extend(50. * np.sin(
+                np.linspace(0, np.pi, diveLength + 2)[1:-1]) + 2.5)
+        ts = np.array(ts)
+        depth = np.array(depth)
+        heading = np.cumsum(rng.normal(0., .2, len(ts)))
+        step = 1e-5 * np.column_stack((np.cos(heading), np.sin(heading)))
+        current = np.array([3e-7, -2e-7])
+        track = 44. + np.cumsum(step, axis=0)
+        truth = track + current * (ts - ts[0])[:, np.newaxis]
+
+        gps = np.full(truth.shape, np.nan)
+        atSurface = depth < 2.
+        gps[atSurface] = truth[atSurface]
+        # the glider dead-reckons from the last fix before each dive
+        lastFix = np.maximum.accumulate(
+            np.where(atSurface, np.arange(len(ts)), 0))
+        dr = truth[lastFix] + track - track[lastFix]
+        return ts, depth, gps, dr, truth
+
+    def loopCorrection(self, ts, depth, gps, dr):
+        fixes = [ii for ii in range(len(ts)) if np.isfinite(gps[ii, 0])]
+        points = {ii: gps[ii] for ii in fixes}
+        for pre, post in zip(fixes[:-1], fixes[1:]):
+            drIndices = [ii for ii in range(pre + 1, post) if depth[ii] > 2.]
+            if not drIndices:
+                continue
+            s, e = drIndices[0], drIndices[-1]
+            line = lambda t: gps[pre] + (gps[post] - gps[pre]) * (
+                t - ts[pre]) / (ts[post] - ts[pre])
+            offS, offE = dr[s] - line(ts[s]), dr[e] - line(ts[e])
+            for ii in drIndices:
+                frac = (ts[ii] - ts[s]) / (ts[e] - ts[s])
+                points[ii] = dr[ii] - (offS + (offE - offS) * frac)
+        for ii in range(fixes[-1] + 1, len(ts)):
+            if depth[ii] > 2.:
+                points[ii] = dr[ii]
+        keys = sorted(points)
+        return [np.interp(ts, ts[keys], [points[k][jj] for k in keys])
+                for jj in (0, 1)]
+
+    def test_dr_corrected_positions(self):
+
+        ts, depth, gps, dr, truth = self.syntheticSegment()
+        lats, lons = dr_corrected_positions(
+            ts, gps[:, 0], gps[:, 1], dr[:, 0], dr[:, 1], depth=depth)
+
+        expected = self.loopCorrection(ts, depth, gps, dr)
+        np.testing.assert_allclose(lats, expected[0], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(lons, expected[1], rtol=0, atol=1e-12)
+
+        # over the completed dives, closer to the true track than straight
+        # lines between the fixes
+        interpLats, interpLons = interpolate_gps(ts, gps[:, 0], gps[:, 1])
+        done = slice(0, np.flatnonzero(np.isfinite(gps[:, 0]))[-1])
+        self.assertLess(
+            np.max(np.hypot(lats - truth[:, 0], lons - truth[:, 1])[done]),
+            0.2 * np.max(np.hypot(interpLats - truth[:, 0],
+                                  interpLons - truth[:, 1])[done]))
+
+        # an underwater fix is dropped, no DR falls back to interpolation
+        gps[200] = truth[200] + 1e-3
+        np.testing.assert_allclose(dr_corrected_positions(
+            ts, gps[:, 0], gps[:, 1], dr[:, 0], dr[:, 1], depth=depth)[0],
+            lats, rtol=0, atol=1e-12)
+        noDr = np.full(len(ts), np.nan)
+        np.testing.assert_array_equal(
+            dr_corrected_positions(ts, gps[:, 0], gps[:, 1], noDr, noDr)[0],
+            interpolate_gps(ts, gps[:, 0], gps[:, 1])[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Unit test for the running geospatial and temporal extent accumulator
+"""
+import sys
+sys.path.append("..")
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from FileWriter.extentAccumulator import extentAccumulator
+from tests.dacProfileWriter import (
+    dacProfileWriter, seriesProfile, addProfile, writeProfile)
+
+
+class TestExtentAccumulator(unittest.TestCase):
+
+    def test_extents(self):
+
+        extents = extentAccumulator()
+
+        # NaN, masked, fill and out of range values are ignored
+        lat = np.ma.masked_array([40.5, np.nan, 39.0, -999.0, 95.0, 40.0],
+                                 mask=[0, 0, 1, 0, 0, 0])
+        extents.update('lat', lat, fillValue=-999.0, validMax=90.0)
+        extents.update('lon', np.array([-70.5, -70.25], dtype=np.float32))
+        extents.update('depth', np.full(3, np.nan))
+        lat = extents.profileExtent('lat')
+        self.assertEqual((lat.count, lat.min, lat.max), (2, 40.0, 40.5))
+        self.assertTrue(extents.profileExtent('depth').empty)
+
+        first = extents.endProfile(1)
+        self.assertIsNone(extents.profileExtent('lat'))
+        extents.update('lat', np.array([41.0, 40.75]))
+        extents.update('depth', np.array([5.0, 150.0]))
+        extents.endProfile(2)
+
+        self.assertEqual(extents.profileExtents[1], first)
+        lat = extents.trajectoryExtent('lat')
+        self.assertEqual((lat.count, lat.min, lat.max), (4, 40.0, 41.0))
+        depth = extents.trajectoryExtent('depth')
+        self.assertEqual((depth.count, depth.min, depth.max), (2, 5.0, 150.0))
+        self.assertEqual(extents.trajectoryExtent('lon').min.dtype, np.float32)
+
+        self.assertEqual(extents.wktBounds(),
+                         'POLYGON ((40.0 -70.5, 41.0 -70.5, 41.0 -70.25, '
+                         '40.0 -70.25, 40.0 -70.5))')
+        self.assertIsNone(extents.wktBounds(extents.profileExtents[2]))
+
+    def test_dac_profile_extents(self):
+
+        tmpDir = tempfile.mkdtemp()
+        try:
+            dacWriter = dacProfileWriter(tmpDir)
+            for profileId in (1, 2):
+                startTime, depths = seriesProfile(profileId)
+                depths[1] = -999.0
+                addProfile(dacWriter, 'p{:d}.nc'.format(profileId),
+                           {'depth': depths}, startTime=startTime,
+                           profileId=profileId)
+                writeProfile(dacWriter)
+        finally:
+            shutil.rmtree(tmpDir)
+
+        extents = dacWriter.extents
+        self.assertEqual(extents.profileExtents[2]['depth'].max, 20.0)
+        depth = extents.trajectoryExtent('depth')
+        self.assertEqual((depth.count, depth.min, depth.max), (6, 1.0, 20.0))
+        time = extents.trajectoryExtent('time')
+        self.assertEqual(time.min, 1630627300.0)
+        self.assertAlmostEqual(time.max, 1630627403.9, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Unit test for the batched gap fill kernels
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.fill import (
+    fill_block, configured_fills, FWD_FILL, BACK_FILL, INTERP, NO_FILL)
+
+
+class TestFill(unittest.TestCase):
+
+    def loopFwdFill(self, column):
+        filled = column.copy()
+        finite = np.flatnonzero(np.isfinite(column))
+        last = column[finite[0]] if len(finite) else np.nan
+        for ii, value in enumerate(column):
+            if np.isfinite(value):
+                last = value
+            filled[ii] = last
+        return filled
+
+    def test_fill_block(self):
+
+        rng = np.random.default_rng(8)
+        block = rng.normal(size=(1000, 5))
+        block[rng.random(block.shape) < .8] = np.nan
+        block[:4, 0] = np.nan
+        block[-4:, 1] = np.nan
+        block[:, 4] = np.nan
+        x = np.cumsum(rng.uniform(.5, 2., 1000))
+
+        filled = fill_block(
+            block, [FWD_FILL, BACK_FILL, INTERP, NO_FILL, FWD_FILL], x=x)
+
+        np.testing.assert_array_equal(filled[:, 0],
+                                      self.loopFwdFill(block[:, 0]))
+        np.testing.assert_array_equal(filled[:, 1],
+                                      self.loopFwdFill(block[::-1, 1])[::-1])
+        finite = np.isfinite(block[:, 2])
+        np.testing.assert_array_equal(
+            filled[:, 2], np.interp(x, x[finite], block[finite, 2]))
+        np.testing.assert_array_equal(filled[:, 3], block[:, 3])
+        self.assertTrue(np.all(np.isnan(filled[:, 4])))
+
+        with self.assertRaises(ValueError):
+            fill_block(block, 'nearest')
+
+    def test_configured_fills(self):
+
+        varProcessing = {'pitch': {'fill': 'interp'},
+                         'corrected_chlor': {'dark_offset': 48, 'fill': 'none'}}
+        self.assertEqual(configured_fills(varProcessing),
+                         {'pitch': 'interp', 'corrected_chlor': 'none'})
+        self.assertEqual(varProcessing, {'corrected_chlor': {'dark_offset': 48}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit test for the NetCDF library engines of the NetCDF writers
+"""
+import sys
+sys.path.append("..")
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+import common.constants as cc
+from FileWriter.NetCDFWriter import netCDFEngines
+from tests.dacProfileWriter import dacProfileWriter, addProfile, writeProfile
+
+
+class TestNetCDFEngines(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def writeProfile(self, engine, writeFormat, inMemory=False):
+        """
+        DAC profile with a gap in the temperature cadence, written with
+        dacNetCDFWriter
+        :return: netCDF4.Dataset of the written profile
+        """
+        dacWriter = dacProfileWriter(self.tmpDir, engine=engine,
+                                     writeFormat=writeFormat, inMemory=inMemory)
+        dacWriter.addGlobalAttr('title', 'R00005')
+        addProfile(dacWriter, engine + '_' + writeFormat + '.nc',
+                   {'temperature': np.array([10.0, 10.5, 11.0, 11.5])},
+                   offsets=(0.0, 0.2, 0.3, 0.7), duration=1.0,
+                   attrs={'_FillValue': -999.0, 'units': 'Celsius'})
+        dacWriter.addVariable('profile_id', 'i4', None, {'_FillValue': -999},
+                              5, None)
+        dacWriter.addVariable('platform', 'i4', None, {'type': 'platform'},
+                              None, None)
+        writeProfile(dacWriter)
+
+        if inMemory:
+            return Dataset('profile', memory=dacWriter.memoryBuffer)
+        return Dataset(os.path.join(self.tmpDir, dacWriter.fileName))
+
+    def assertSameProfile(self, expected, actual):
+        self.assertEqual(actual.ncattrs(), expected.ncattrs())
+        self.assertEqual(set(actual.variables), set(expected.variables))
+        for name, var in expected.variables.items():
+            self.assertEqual(actual[name].dimensions, var.dimensions)
+            self.assertEqual(actual[name].dtype, var.dtype)
+            np.testing.assert_array_equal(actual[name][:], var[:])
+
+    @unittest.skipIf(netCDFEngines.netcdf_file is None, 'scipy not installed')
+    def test_scipy_engine(self):
+
+        expected = self.writeProfile(cc.NETCDF4_ENGINE, 'NETCDF3_CLASSIC')
+        self.assertTrue(np.ma.is_masked(expected['temperature'][1]))
+        for inMemory in (False, True):
+            actual = self.writeProfile(cc.SCIPY_ENGINE, 'NETCDF3_CLASSIC', inMemory)
+            self.assertEqual(actual.data_model, 'NETCDF3_CLASSIC')
+            self.assertSameProfile(expected, actual)
+            actual.close()
+        expected.close()
+
+    @unittest.skipIf(netCDFEngines.h5legacy is None, 'h5netcdf not installed')
+    def test_h5netcdf_engine(self):
+
+        expected = self.writeProfile(cc.NETCDF4_ENGINE, 'NETCDF4')
+        for inMemory in (False, True):
+            actual = self.writeProfile(cc.H5NETCDF_ENGINE, 'NETCDF4', inMemory)
+            self.assertEqual(actual.data_model, 'NETCDF4')
+            self.assertTrue(actual.dimensions['time'].isunlimited())
+            self.assertSameProfile(expected, actual)
+            actual.close()
+        expected.close()
+
+        # NETCDF4 only, other formats fall back to netcdf4
+        self.assertEqual(netCDFEngines.resolveEngine(cc.H5NETCDF_ENGINE,
+                                                     'NETCDF4_CLASSIC'),
+                         cc.NETCDF4_ENGINE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Unit test for the fused optode oxygen kernels shared by the Slocum and
+Remus 600 processing
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+import gsw
+from legacy.gliderdac.ooidac.processing import oxygen_kernels
+
+
+class TestOxygenKernels(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.cph = rng.uniform(20., 45., 5000)
+        self.tmp = rng.uniform(-1., 30., 5000)
+        self.cph[::50] = np.nan
+
+    def test_partial_pressure(self):
+
+        C = [2.79e-03, 1.15e-04, 2.30e+02, -3.08e-01, -5.58e+01, 4.52e+00]
+        M = [1, 0, 0, 1, 2, 0]
+        N = [1, 1, 3, 3, 3, 4]
+        expected = np.zeros_like(self.cph)
+        for c, m, n in zip(C, M, N):
+            expected = expected + c * self.tmp**m * self.cph**n
+
+        np.testing.assert_allclose(
+            oxygen_kernels.partial_pressure(self.cph, self.tmp, C, M, N),
+            expected, rtol=1e-12)
+        # non-integer exponents fall back to explicit powers
+        np.testing.assert_allclose(
+            oxygen_kernels.partial_pressure(self.cph, self.tmp, C, M,
+                                            np.array(N) + .5),
+            sum(c * self.tmp**m * self.cph**(n + .5)
+                for c, m, n in zip(C, M, N)), rtol=1e-12)
+
+    def test_svu_and_compensation(self):
+
+        csv = [0.002848, 0.000114, 1.51e-6, 70.42301, -0.10302, -12.9462,
+               1.265377]
+        self.assertAlmostEqual(
+            float(oxygen_kernels.svu_concentration(27.799, 19.841, csv)),
+            363.931199, places=5)
+
+        o2 = oxygen_kernels.svu_concentration(self.cph, self.tmp, csv,
+                                              [1., 1.02], salt=35.)
+        ts = np.log((298.15 - self.tmp) / (273.15 + self.tmp))
+        bts = (-6.24097e-3 - 6.93498e-3 * ts - 6.90358e-3 * ts**2
+               - 4.29155e-3 * ts**3)
+        ksv = csv[0] + csv[1] * self.tmp + csv[2] * self.tmp**2
+        expected = 1. + 1.02 * (
+            ((csv[3] + csv[4] * self.tmp) / (csv[5] + csv[6] * self.cph) - 1)
+            / ksv * np.exp(35. * bts - 3.11680e-7 * 35.**2))
+        np.testing.assert_allclose(o2, expected, rtol=1e-12)
+
+        sp = np.full(len(o2), 33.7)
+        p = np.linspace(0., 500., len(o2))
+        sa = gsw.SA_from_SP(sp, p, -124.9, 44.6)
+        pdens = gsw.rho(sa, gsw.CT_from_t(sa, self.tmp, p), 0.)
+        expected = (np.exp(sp * bts - 3.11680e-7 * sp**2) *
+                    (1 + 0.032 * p / 1000) * 1000 * o2 / pdens)
+        np.testing.assert_allclose(
+            oxygen_kernels.s_and_p_compensation(
+                o2, sp, p, self.tmp, 44.6, -124.9),
+            expected, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Unit test for the partitioned Parquet profile writer
+"""
+import sys
+sys.path.append("..")
+import os
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+from FileWriter.ParquetWriter.parquetWriter import parquetWriter, pa, pq
+from tests.dacProfileFixture import DacProfileFixture
+
+
+@unittest.skipIf(pa is None, 'pyarrow not installed')
+class TestParquetWriter(DacProfileFixture, unittest.TestCase):
+
+    def writeParquet(self):
+        pqWriter = parquetWriter()
+        pqWriter.outputPath = self.tmpDir
+        pqWriter.deploymentId = 'R00005'
+        pqWriter.trajectoryName = self.trajectoryName
+        pqWriter.inputFiles = self.inputFiles
+        pqWriter.inputBuffers = self.inputBuffers
+        pqWriter.setupOutput()
+        pqWriter.writeOutput()
+        pqWriter.cleanupOutput()
+        return pqWriter
+
+    def test_partitioned_profiles(self):
+
+        pqWriter = self.writeParquet()
+        self.assertEqual(pqWriter.profileCount, len(self.inputFiles))
+
+        table = pq.read_table(pqWriter.datasetPath)
+        self.assertEqual(table.num_rows, sum(self.obsCounts))
+        self.assertEqual(table.schema.field('temperature').metadata[
+            b'ancillary_variables'], b'lat, lon')
+        self.assertTrue(pa.types.is_dictionary(table.schema.field('trajectory').type))
+
+        frame = table.to_pandas()
+        self.assertEqual(set(frame['deployment'].astype(str)), {'R00005'})
+        for ii, filename in enumerate(self.inputFiles):
+            profile = frame[frame['profile_id'].astype(int) == ii + 1]
+            profile = profile.sort_values('time')
+            nc = Dataset(os.path.join(self.tmpDir, filename))
+            for name in ('time', 'lat', 'lon', 'depth', 'temperature'):
+                np.testing.assert_array_equal(profile[name].values, nc[name][:])
+            self.assertTrue((profile['profile_time'] == nc['profile_time'][...]).all())
+            self.assertTrue((profile['source_file'] == self.sourceFile).all())
+            nc.close()
+
+        # existing profiles are kept unless overwriting
+        self.assertEqual(self.writeParquet().profileCount, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
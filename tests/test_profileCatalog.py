@@ -0,0 +1,109 @@
+"""
+Unit test for the profile catalog kept by the DAC profile writer
+"""
+import sys
+sys.path.append("..")
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+from FileWriter.profileCatalog import profileCatalog
+from tests.dacProfileWriter import (
+    TRAJECTORY, dacProfileWriter, seriesProfile, addProfile, writeProfile)
+
+
+class TestProfileCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.catalogPath = os.path.join(self.tmpDir, 'catalog.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def writeSeriesProfile(self, dacWriter, profileId, lat):
+        startTime, depths = seriesProfile(profileId)
+        addProfile(dacWriter, 'p{:d}.nc'.format(profileId),
+                   {'lat': np.full(4, lat), 'lon': np.full(4, -70.0),
+                    'depth': depths},
+                   startTime=startTime, profileId=profileId)
+        writeProfile(dacWriter)
+
+    def writeProfiles(self, catalog):
+        dacWriter = dacProfileWriter(self.tmpDir, overwriteExistingFiles=True,
+                                     catalog=catalog)
+        for profileId in (1, 2, 3):
+            self.writeSeriesProfile(dacWriter, profileId, 40.0 + profileId)
+        return dacWriter
+
+    def test_query(self):
+
+        with profileCatalog(self.catalogPath) as catalog:
+            self.writeProfiles(catalog)
+
+        with profileCatalog(self.catalogPath) as catalog:
+            rows = catalog.query()
+            self.assertEqual([row['profile_id'] for row in rows], [1, 2, 3])
+            self.assertEqual(rows[1]['path'], os.path.join(self.tmpDir, 'p2.nc'))
+            self.assertEqual((rows[1]['depth_min'], rows[1]['depth_max']), (2.0, 20.0))
+            self.assertIn('depth', rows[1]['variables'].split(','))
+
+            # time window overlapping the end of profile 1 and all of profile 2
+            rows = catalog.query(startTime=1630627302.0, endTime=1630627450.0)
+            self.assertEqual([row['profile_id'] for row in rows], [1, 2])
+
+            rows = catalog.query(latRange=(41.5, 45.0), lonRange=(-71.0, -69.0))
+            self.assertEqual([row['profile_id'] for row in rows], [2, 3])
+            rows = catalog.query(depthRange=(15.0, 100.0), trajectory=TRAJECTORY)
+            self.assertEqual([row['profile_id'] for row in rows], [2, 3])
+            self.assertEqual(catalog.query(lonRange=(0.0, 10.0)), [])
+            self.assertEqual(catalog.query(variables=['salinity']), [])
+            self.assertEqual(len(catalog.query(directory=self.tmpDir)), 3)
+            self.assertEqual(catalog.query(directory=os.path.join(self.tmpDir, 'sub')), [])
+
+    def rewriteProfile(self, catalog, lat):
+        dacWriter = dacProfileWriter(self.tmpDir, overwriteExistingFiles=True,
+                                     skipUnchanged=True, catalog=catalog)
+        self.writeSeriesProfile(dacWriter, 1, lat)
+        return dacWriter.outputUnchanged
+
+    def test_catalog_hash(self):
+
+        filePath = os.path.join(self.tmpDir, 'p1.nc')
+
+        def sidecars():
+            return [name for name in os.listdir(self.tmpDir) if name.endswith('.sha256')]
+
+        with profileCatalog(self.catalogPath) as catalog:
+            self.writeProfiles(catalog)
+            self.assertIsNotNone(catalog.contentHash(filePath))
+
+            # with skip unchanged, the hash is found in the catalog alone and
+            # no sidecar file is written
+            inode = os.stat(filePath).st_ino
+            self.assertTrue(self.rewriteProfile(catalog, 41.0))
+            self.assertEqual(os.stat(filePath).st_ino, inode)
+            self.assertFalse(self.rewriteProfile(catalog, 42.0))
+            self.assertTrue(self.rewriteProfile(catalog, 42.0))
+            self.assertEqual(sidecars(), [])
+
+        # a rewrite without the catalog leaves its hash stale, so it is not used
+        self.assertFalse(self.rewriteProfile(None, 41.0))
+        self.assertEqual(len(sidecars()), 1)
+        with profileCatalog(self.catalogPath) as catalog:
+            self.assertIsNone(catalog.contentHash(filePath))
+            self.assertFalse(self.rewriteProfile(catalog, 42.0))
+            self.assertEqual(sidecars(), [])
+            nc = Dataset(filePath)
+            self.assertEqual(nc['lat'][0], 42.0)
+            nc.close()
+
+            catalog.removeProfile(filePath)
+            self.assertIsNone(catalog.contentHash(filePath))
+            self.assertEqual(len(catalog.query()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
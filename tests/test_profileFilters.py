@@ -0,0 +1,94 @@
+"""
+Unit test for the batch profile filters in profile_filters.py
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.data_classes import GliderData
+import profile_filters
+from configuration import DATA_CONFIG_LIST, TIMESENSOR
+
+
+class TestProfileFilters(unittest.TestCase):
+
+    def makeSegment(self, seed=0):
+        """
+        Build a synthetic segment of yos with science data gaps, short
+        profiles and profiles without CTD pressure
+        :return: GliderData, list of profile indices
+        """
+        rng = np.random.default_rng(seed)
+        lengths = rng.integers(4, 300, size=60)
+        nrows = int(lengths.sum())
+        ts = 1.6e9 + np.cumsum(rng.uniform(1., 8., nrows))
+        depth = np.concatenate(
+            [np.linspace(1., rng.uniform(1., 80.), n)[::(-1)**k]
+             for k, n in enumerate(lengths)])
+
+        names = [TIMESENSOR, 'm_depth', 'llat_pressure'] + DATA_CONFIG_LIST
+        data = np.full((nrows, len(names)), np.nan)
+        data[:, 0] = ts
+        data[:, 1] = depth
+        for col in range(2, len(names)):
+            sampled = rng.random(nrows) < rng.uniform(0.05, 0.6)
+            data[sampled, col] = depth[sampled] + rng.normal(0, 0.1, sampled.sum())
+
+        bounds = np.concatenate(([0], np.cumsum(lengths)))
+        indices = [np.arange(bounds[k], bounds[k+1]) for k in range(len(lengths))]
+        # knock out all science data or just pressure in some profiles
+        for k in rng.choice(len(lengths), 8, replace=False):
+            data[indices[k], 3:] = np.nan
+        pres_col = names.index('sci_water_pressure')
+        for k in rng.choice(len(lengths), 8, replace=False):
+            data[indices[k], pres_col] = np.nan
+
+        sensors = {name: {'sensor_name': name, 'attrs': {}} for name in names}
+        gldata = GliderData({'source_file': 'test_segment'}, names, sensors, data)
+        return gldata, indices
+
+    def test_batch_matches_per_profile(self):
+
+        for seed in range(3):
+            gldata, indices = self.makeSegment(seed)
+            keep, reasons = profile_filters.batch_filter_profiles(gldata, indices)
+            expectedKeep = np.ones(len(indices), dtype=bool)
+
+            for name in reasons:
+                func = getattr(profile_filters, name)
+                for ii, profile_ii in enumerate(indices):
+                    with np.errstate(all='ignore'):
+                        expected = bool(func(gldata.slicedata(indices=profile_ii)))
+                    self.assertEqual(expected, bool(reasons[name][ii]),
+                                     '{:s} profile {:d}'.format(name, ii))
+                    expectedKeep[ii] &= not expected
+
+            self.assertTrue(np.any(keep) and not np.all(keep))
+            np.testing.assert_array_equal(expectedKeep, keep)
+
+    def test_short_profile_start(self):
+
+        gldata, indices = self.makeSegment()
+        names = gldata.sensor_names
+        # profiles with fewer than 10 records use the `threshold` minutes
+        # window, so data in the first minute keeps them and data after it
+        # removes them
+        data = np.full((6, len(names)), np.nan)
+        data[:, 0] = 1.6e9 + 30. * np.arange(6)
+        data[:, 1] = np.arange(1., 7.)
+        sensors = {name: {'sensor_name': name, 'attrs': {}} for name in names}
+        for start, expected in ((0, False), (2, True)):
+            data[:, 2:] = np.nan
+            data[start:, 2:] = 5.
+            profile = GliderData(
+                {'source_file': 'test_short'}, list(names), sensors, data.copy())
+            self.assertEqual(
+                expected, profile_filters.filter_no_data_at_profile_start(profile))
+            _, reasons = profile_filters.batch_filter_profiles(
+                profile, [np.arange(6)])
+            self.assertEqual(
+                expected, bool(reasons['filter_no_data_at_profile_start'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
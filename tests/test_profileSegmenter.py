@@ -0,0 +1,62 @@
+"""
+Unit test for the shared profile segmentation engine
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from DataProcessor.profileSegmenter import profileSegmenter
+
+
+class TestProfileSegmenter(unittest.TestCase):
+
+    def loopRuns(self, times, depths, minDepth, minTime, maxGap):
+        # per sample direction tracking, as originally done for the Remus
+        dt = np.diff(times)
+        updownlevel = np.sign(np.diff(depths) / np.where(dt == 0, 1, dt))
+        runs = []
+        start = 0
+        for i in range(1, len(updownlevel)):
+            if dt[i - 1] > maxGap or (updownlevel[i] != 0 and
+                                      updownlevel[i] != updownlevel[i - 1]):
+                runs.append((start, i - 1))
+                start = i
+        runs.append((start, len(updownlevel) - 1))
+        return [(s, e) for s, e in runs
+                if abs(depths[e] - depths[s]) >= minDepth and
+                times[e] - times[s] >= minTime]
+
+    def test_findProfileRuns(self):
+
+        rng = np.random.default_rng(3)
+        times = np.cumsum(rng.choice([0., 1., 1., 2., 45.], 3000))
+        depths = np.round(np.cumsum(rng.normal(0, 1, 3000)), 1)
+
+        segmenter = profileSegmenter(minProfileDepth=3, minProfileTime=5,
+                                     maxTimeGap=30)
+        starts, ends = segmenter.findProfileRuns(times, depths)
+        self.assertEqual(self.loopRuns(times, depths, 3, 5, 30),
+                         list(zip(starts, ends)))
+
+    def test_findInflectionTimes(self):
+
+        # 3 dives and climbs to 100 m, with a small mid dive wiggle
+        times = np.arange(0., 6000., 4.)
+        depths = 100. * (1 - abs(2 * (times % 2000 / 2000) - 1)) + 1
+        depths[100:110] -= np.linspace(0, 1, 10)
+
+        segmenter = profileSegmenter(minProfileDepth=2, maxTimeGap=None)
+        switchTimes = segmenter.findInflectionTimes(
+            times, depths, times[0], times[-1])
+        switchTimes = segmenter.cleanInflections(switchTimes, times, depths)
+        self.assertEqual(len(switchTimes), 7)
+        np.testing.assert_allclose(
+            switchTimes[1:-1], [1000, 2000, 3000, 4000, 5000], atol=4)
+
+        indices = segmenter.timeRangesToIndices(
+            times, switchTimes[:-1], switchTimes[1:])
+        self.assertEqual(len(indices), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
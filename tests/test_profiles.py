@@ -0,0 +1,97 @@
+"""
+Unit test for profile segmentation helpers in ooidac/profiles.py
+"""
+import os
+import subprocess
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.data_classes import GliderData
+from legacy.gliderdac.ooidac.processing import all_sci_indices
+from legacy.gliderdac.ooidac.profiles import sci_data_bounds
+from legacy.gliderdac.ooidac.segmentation import (
+    time_ranges_to_indices, depth_change_chain)
+from configuration import DATA_CONFIG_LIST
+
+
+class TestProfiles(unittest.TestCase):
+
+    def test_time_ranges_to_indices(self):
+
+        rng = np.random.default_rng(1)
+        sortedTime = np.cumsum(rng.uniform(0.5, 4., 5000))
+        edges = np.sort(rng.uniform(sortedTime[0] - 10, sortedTime[-1] + 10, 40))
+
+        # unsorted timestamps with NaNs must give the same result as a scan
+        unsortedTime = sortedTime.copy()
+        unsortedTime[rng.choice(5000, 50, replace=False)] = np.nan
+        swap = rng.choice(4999, 30, replace=False)
+        unsortedTime[swap], unsortedTime[swap + 1] = unsortedTime[swap + 1], unsortedTime[swap]
+
+        for time_ in (sortedTime, unsortedTime):
+            expected = []
+            for pstart, pend in zip(edges[:-1], edges[1:]):
+                profile_ii = np.flatnonzero(
+                    np.logical_and(time_ >= pstart, time_ <= pend))
+                if len(profile_ii) > 0:
+                    expected.append(profile_ii)
+            result = time_ranges_to_indices(time_, edges[:-1], edges[1:])
+            self.assertEqual(len(expected), len(result))
+            for e, r in zip(expected, result):
+                np.testing.assert_array_equal(e, r)
+
+    def test_depth_change_chain(self):
+
+        rng = np.random.default_rng(2)
+        depths = np.cumsum(rng.normal(0, 1.5, 3000))
+        depths[rng.choice(3000, 10, replace=False)] = np.nan
+
+        # reference: the original look ahead loop of adjust_inflections
+        inflx_ii = 0
+        fwd_counter = 1
+        keep = np.full(len(depths), True)
+        while inflx_ii < len(depths):
+            ii_depth = depths[inflx_ii]
+            if inflx_ii + fwd_counter >= len(depths):
+                break
+            while abs(depths[inflx_ii + fwd_counter] - ii_depth) < 2:
+                keep[inflx_ii + fwd_counter] = False
+                fwd_counter += 1
+                if inflx_ii + fwd_counter >= len(depths):
+                    break
+            inflx_ii = inflx_ii + fwd_counter
+            fwd_counter = 1
+
+        np.testing.assert_array_equal(
+            np.flatnonzero(keep), depth_change_chain(depths, 2))
+
+    def test_sci_data_bounds(self):
+
+        data = np.full((100, len(DATA_CONFIG_LIST)), np.nan)
+        sensors = {name: {'sensor_name': name, 'attrs': {}} for name in DATA_CONFIG_LIST}
+        gldata = GliderData({}, list(DATA_CONFIG_LIST), sensors, data)
+        self.assertIsNone(sci_data_bounds(gldata))
+
+        data[[17, 40], 0] = 1.
+        data[[9, 61], -1] = 1.
+        sci_indices = all_sci_indices(gldata)
+        self.assertEqual((sci_indices[0], sci_indices[-1]), sci_data_bounds(gldata))
+
+    def test_standalone_import(self):
+
+        # the legacy package runs on its own, without the application packages
+        legacyPath = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            'legacy', 'gliderdac')
+        script = (
+            'import sys; sys.path.insert(0, {!r}); '
+            'import ooidac.profiles; '
+            'assert "DataProcessor" not in sys.modules'.format(legacyPath))
+        result = subprocess.run([sys.executable, '-I', '-c', script],
+                                cwd=legacyPath, capture_output=True, text=True)
+        self.assertEqual(0, result.returncode, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Unit test for the science block masks and counts (processing.sci_block),
+compared against the per-sensor loops they replaced
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.data_classes import GliderData
+from ooidac import processing, data_checks
+from configuration import DATA_CONFIG_LIST, MIN_DATA_VALS, TIMESENSOR
+
+
+def loopSciIndices(gldata, sensors):
+    sci_indices = np.array([], dtype=np.int64)
+    for sci_sensor in sensors:
+        sci_data = gldata.getdata(sci_sensor)
+        sci_ii = np.flatnonzero(np.isfinite(sci_data))
+        sci_indices = np.union1d(sci_indices, sci_ii)
+    return sci_indices
+
+
+def loopZeroIndices(gldata, sensors):
+    zeros_ii = np.array([])
+    for sensor in sensors:
+        var_zero_ii = np.flatnonzero(gldata.getdata(sensor) == 0.0)
+        if sensor == sensors[0]:
+            zeros_ii = var_zero_ii
+        else:
+            zeros_ii = np.intersect1d(zeros_ii, var_zero_ii)
+    return zeros_ii
+
+
+def loopFiniteCounts(gldata):
+    return {sensor: len(np.flatnonzero(np.isfinite(gldata.getdata(sensor))))
+            for sensor in DATA_CONFIG_LIST if sensor in gldata.sensor_names}
+
+
+class TestSciBlock(unittest.TestCase):
+
+    def getGliderData(self, seed, dropped):
+        """
+        Random science data with NaN gaps, all-zero records, a column of
+        fill values only and the `dropped` science sensors missing
+        :return: GliderData
+        """
+        rng = np.random.default_rng(seed)
+        names = [TIMESENSOR] + [s for s in DATA_CONFIG_LIST if s not in dropped]
+        nrows = 400
+        data = rng.normal(10, 5, (nrows, len(names)))
+        data[:, 0] = 1.6e9 + np.arange(nrows)
+        data[:, 1:][rng.random((nrows, len(names) - 1)) < .6] = np.nan
+        data[rng.choice(nrows, 20, replace=False), 1:] = 0.0
+        # zeros in some sensors only are not initialization zeros
+        data[rng.choice(nrows, 20, replace=False), 1:3] = 0.0
+        data[:, -1] = np.nan
+        # no science data at all in the first and last records
+        data[[0, -1], 1:] = np.nan
+        # barely enough and too few values for sci_data_available
+        data[:, 2] = np.nan
+        data[:MIN_DATA_VALS + 1, 2] = 1.0
+        data[:, 3] = np.nan
+        data[:MIN_DATA_VALS, 3] = 1.0
+        sensors = {name: {'sensor_name': name, 'attrs': {}} for name in names}
+        return GliderData({'source_file': 'test'}, list(names), sensors, data)
+
+    def test_matches_loops(self):
+
+        for seed, dropped in ((0, []), (1, ['sci_bsipar_par']),
+                              (2, ['sci_oxy4_oxygen', 'sci_oxy4_saturation'])):
+            gldata = self.getGliderData(seed, dropped)
+            available = [s for s in DATA_CONFIG_LIST if s in gldata.sensor_names]
+
+            block = processing.sci_block(gldata, missing_ok=True)
+            self.assertEqual(available, block.sensors)
+            np.testing.assert_array_equal(
+                loopSciIndices(gldata, available), np.flatnonzero(block.any_finite))
+            np.testing.assert_array_equal(
+                loopZeroIndices(gldata, available), np.flatnonzero(block.all_zero))
+            if not dropped:
+                indices = processing.all_sci_indices(gldata)
+                np.testing.assert_array_equal(
+                    loopSciIndices(gldata, available), indices)
+                self.assertEqual(np.int64, indices.dtype)
+
+            counts = loopFiniteCounts(gldata)
+            for sensor in available:
+                self.assertEqual(counts[sensor], gldata.stats[sensor].count)
+            self.assertEqual(
+                [s for s in available if counts[s] > MIN_DATA_VALS],
+                data_checks.sci_data_available(gldata))
+            self.assertTrue(data_checks.check_for_any_sci_data(gldata))
+
+            zeros_ii = loopZeroIndices(gldata, available)
+            processing.remove_sci_init_zeros(gldata, available)
+            self.assertTrue(np.isnan(gldata.getdataslice(available)[zeros_ii]).all())
+            self.assertEqual(len(loopZeroIndices(gldata, available)), 0)
+
+    def test_no_sci_data(self):
+
+        gldata = self.getGliderData(3, [])
+        gldata.update_data(DATA_CONFIG_LIST, np.arange(len(gldata)), np.nan)
+        block = processing.sci_block(gldata)
+        self.assertFalse(block.any_finite.any())
+        self.assertFalse(block.all_zero.any())
+        self.assertEqual(len(processing.all_sci_indices(gldata)), 0)
+        self.assertFalse(data_checks.check_for_any_sci_data(gldata))
+        self.assertEqual([], data_checks.sci_data_available(gldata))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Unit test for the seawater scattering lookup table used by the backscatter
+processing
+"""
+import sys
+sys.path.append("..")
+import unittest
+import tempfile
+import numpy as np
+from legacy.gliderdac.ooidac.processing import fluorometer
+
+
+class TestSeawaterScatterLUT(unittest.TestCase):
+
+    def test_lut_error(self):
+
+        rng = np.random.default_rng(5)
+        degC = rng.uniform(-2.5, 40., 20000)
+        psu = rng.uniform(0., 42., 20000)
+        # grid edges, out of range and missing samples
+        degC[:4] = [-2.5, 40., 45., np.nan]
+        psu[:4] = [0., 42., 35., 35.]
+
+        lut = fluorometer.SeawaterScatterLUT(124., 700.)
+        lut.build()
+        betasw, bsw = lut(degC, psu)
+        exactBetasw, exactBsw = fluorometer.flo_zhang_scatter_coeffs(
+            degC, psu, 124., 700.)
+
+        np.testing.assert_allclose(
+            betasw, exactBetasw, rtol=fluorometer.LUT_MAX_REL_ERROR)
+        np.testing.assert_allclose(
+            bsw, exactBsw, rtol=fluorometer.LUT_MAX_REL_ERROR)
+        self.assertEqual(betasw[2], exactBetasw[2])
+        self.assertTrue(np.isnan(betasw[3]))
+
+        with tempfile.TemporaryDirectory() as cacheDir:
+            lut.save(cacheDir)
+            loaded = fluorometer.SeawaterScatterLUT(124., 700.)
+            self.assertTrue(loaded.load(cacheDir))
+            np.testing.assert_array_equal(loaded.betasw, lut.betasw)
+            other = fluorometer.SeawaterScatterLUT(117., 700.)
+            self.assertFalse(other.load(cacheDir))
+
+
+if __name__ == '__main__':
+    unittest.main()
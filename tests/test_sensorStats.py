@@ -0,0 +1,70 @@
+"""
+Unit test for the cached GliderData sensor statistics (SensorStats)
+"""
+import sys
+sys.path.append("..")
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.data_classes import GliderData
+
+
+class TestSensorStats(unittest.TestCase):
+
+    def getGliderData(self, data):
+        names = ['m_present_time', 'm_depth', 'sci_water_temp']
+        sensors = {name: {'sensor_name': name, 'attrs': {}} for name in names}
+        return GliderData({'source_file': 'test'}, list(names), sensors, data)
+
+    def test_stats(self):
+
+        rng = np.random.default_rng(2)
+        data = rng.normal(10, 5, (500, 3))
+        data[:, 0] = np.arange(500.)
+        data[rng.random(500) < .3, 1] = np.nan
+        data[:, 2] = np.nan
+        gldata = self.getGliderData(data.copy())
+
+        gldata.stats.prefetch(gldata.sensor_names)
+        for ii, name in enumerate(gldata.sensor_names):
+            stat = gldata.stats[name]
+            finite = np.flatnonzero(np.isfinite(data[:, ii]))
+            self.assertEqual(len(finite), stat.count)
+            self.assertEqual(len(finite) == 0, stat.all_nan)
+            if len(finite) > 0:
+                self.assertEqual(np.nanmin(data[:, ii]), stat.min)
+                self.assertEqual(np.nanmax(data[:, ii]), stat.max)
+                self.assertEqual(finite[0], stat.first)
+                self.assertEqual(finite[-1], stat.last)
+            else:
+                self.assertTrue(np.isnan(stat.min))
+                self.assertIsNone(stat.first)
+
+    def test_invalidation(self):
+
+        data = np.column_stack((np.arange(10.), np.arange(10.), np.ones(10)))
+        gldata = self.getGliderData(data)
+        self.assertEqual(9, gldata.stats['m_depth'].max)
+
+        # update_data drops the updated sensors only
+        gldata.update_data(['m_depth'], np.arange(5, 10), np.nan)
+        self.assertNotIn('m_depth', gldata.stats)
+        self.assertEqual(4, gldata.stats['m_depth'].max)
+        self.assertEqual(5, gldata.stats['m_depth'].count)
+
+        # in-place edits of getdata arrays, which would leave the stats
+        # stale, are refused
+        with self.assertRaises(ValueError):
+            gldata.getdata('m_depth')[0] = 100.
+        with self.assertRaises(ValueError):
+            gldata['m_depth']['data'][0] = 100.
+        self.assertEqual(4, gldata.stats['m_depth'].max)
+
+        # added data is summarized on first use
+        gldata.add_data({'sensor_name': 'llat_depth', 'attrs': {},
+                         'data': np.full(10, 2.)})
+        self.assertEqual(10, gldata.stats['llat_depth'].count)
+        self.assertEqual(2, gldata.stats['llat_depth'].min)
+
+
+if __name__ == '__main__':
+    unittest.main()
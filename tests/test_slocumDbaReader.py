@@ -0,0 +1,185 @@
+"""
+Unit test for the legacy Slocum dba reader (ooidac.readers.slocum)
+"""
+import os
+import sys
+sys.path.append("..")
+import inspect
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+from legacy.gliderdac.ooidac.readers.slocum import (
+    parse_dba, parse_dba_header, DbaCache)
+from legacy.gliderdac.ooidac.data_classes import DbaData
+from MobilePlatform.GliderPlatform.slocum20Platform import slocum20Platform
+
+
+class TestSlocumDbaReader(unittest.TestCase):
+
+    def getDataFilePath(self, dataFileName):
+
+        # Find the path of the current test module
+        # not cwd, as test can be run from anywhere
+        testsPath = os.path.abspath(os.path.dirname(inspect.stack()[0][1]))
+        dataPath = os.path.join( testsPath, "data", dataFileName)
+        return dataPath
+
+    def test_parse_sensor_subset(self):
+
+        infilePath = self.getDataFilePath('cp_379-2021-246-1-33.mrg')
+        full = parse_dba( infilePath )
+        sensors = ['m_depth', 'm_present_time', 'not_a_sensor']
+        subset = parse_dba( infilePath, sensors=sensors )
+
+        # columns keep the file order, missing sensors are dropped
+        expected = [s for s in full['sensor_names'] if s in sensors]
+        self.assertEqual(expected, subset['sensor_names'])
+        self.assertEqual(sorted(expected), sorted(subset['sensor_defs']))
+        self.assertEqual((len(full['data']), 2), subset['data'].shape)
+        for ii, name in enumerate(expected):
+            col = full['sensor_names'].index(name)
+            np.testing.assert_array_equal(
+                full['data'][:, col], subset['data'][:, ii])
+
+    def test_cache(self):
+
+        infilePath = self.getDataFilePath('cp_379-2021-246-1-33.mrg')
+        cache = DbaCache()
+        sensors = ['m_depth']
+
+        # a subset entry cannot answer a complete or wider request
+        parse_dba( infilePath, sensors=sensors, cache=cache )
+        self.assertIsNone( cache.get( infilePath ) )
+        self.assertIsNone( cache.get( infilePath, ['m_depth', 'm_lat'] ) )
+        self.assertIsNotNone( cache.get( infilePath, sensors ) )
+
+        full = parse_dba( infilePath, cache=cache )
+        hits = cache.hits
+        again = parse_dba( infilePath, cache=cache )
+        self.assertEqual( hits + 1, cache.hits )
+        np.testing.assert_array_equal( full['data'], again['data'] )
+
+        # cached results are shared without copies and read-only
+        self.assertIs( full['data'], again['data'] )
+        with self.assertRaises( ValueError ):
+            again['data'][0, 0] = -1
+        third = parse_dba( infilePath, sensors=sensors, cache=cache )
+        col = full['sensor_names'].index('m_depth')
+        np.testing.assert_array_equal(
+            full['data'][:, col], third['data'][:, 0] )
+        self.assertEqual( 1, len(cache) )
+
+        # GliderData copies the data table and sensor definitions it changes
+        dba = DbaData( infilePath, cache=cache )
+        units = full['sensor_defs']['m_depth']['attrs']['units']
+        dba.update_data( ['m_depth'], np.arange(len(dba)), -1. )
+        particle = dba['m_depth']
+        particle['attrs']['units'] = 'x'
+        particle['sensor_name'] = 'm_depth_x'
+        dba.add_data( particle )
+        self.assertTrue( np.all(dba.getdata('m_depth') == -1.) )
+        again = parse_dba( infilePath, cache=cache )
+        np.testing.assert_array_equal( full['data'], again['data'] )
+        self.assertFalse( np.any(again['data'][:, col] == -1.) )
+        self.assertEqual( units, again['sensor_defs']['m_depth']['attrs']['units'] )
+        self.assertNotIn( 'm_depth_x', again['sensor_names'] )
+
+    def test_prescan(self):
+
+        infilePath = self.getDataFilePath('cp_379-2021-246-1-33.mrg')
+        with open(infilePath) as fid:
+            lines = fid.readlines()
+        tmpDir = tempfile.mkdtemp()
+        try:
+            # header and label lines only, a status mission, a copy of the
+            # same segment and a missing file
+            empty = os.path.join(tmpDir, 'empty.mrg')
+            with open(empty, 'w') as fid:
+                fid.writelines(lines[:17] + ['\n'])
+            status = os.path.join(tmpDir, 'status.mrg')
+            with open(status, 'w') as fid:
+                fid.writelines([line.replace('CPDEEP.MI', 'STATUS.MI')
+                                for line in lines])
+            copy = os.path.join(tmpDir, 'copy.mrg')
+            shutil.copy(infilePath, copy)
+            missing = os.path.join(tmpDir, 'missing.mrg')
+
+            self.assertTrue(parse_dba_header(infilePath, check_data=True)['has_data'])
+            self.assertFalse(parse_dba_header(empty, check_data=True)['has_data'])
+
+            platform = slocum20Platform()
+            platform.prescanWorkers = 2
+            keep, skipped = platform._prescanDataFiles(
+                [infilePath, empty, status, copy, missing])
+            self.assertEqual([infilePath], keep)
+            self.assertEqual(
+                [(empty, 'empty'), (status, 'STATUS.MI'),
+                 (copy, 'duplicate'), (missing, 'missing')], skipped)
+        finally:
+            shutil.rmtree(tmpDir)
+
+    def test_prefetch(self):
+
+        class fileReader(object):
+            """Stands in for slocum20DataReader, returns the file name after
+            a varying delay so parses finish out of order"""
+            def __init__(self, failOn=None):
+                self.failOn = failOn
+                self.read = []
+
+            def readIntoDbaData(self, dataFile):
+                time.sleep(0.01 * (hash(dataFile) % 3))
+                self.read.append(dataFile)
+                if dataFile == self.failOn:
+                    raise IOError('cannot read ' + dataFile)
+                return os.path.basename(dataFile)
+
+        def prefetchThreads():
+            return [t for t in threading.enumerate() if t.name == 'dbaPrefetch']
+
+        tmpDir = tempfile.mkdtemp()
+        try:
+            dataFiles = []
+            for ii in range(12):
+                dataFiles.append(os.path.join(tmpDir, 'seg_{:02d}.mrg'.format(ii)))
+                open(dataFiles[-1], 'w').close()
+            dataFiles.insert(5, os.path.join(tmpDir, 'missing.mrg'))
+            platform = slocum20Platform()
+
+            # files come back in input order, missing ones with dba None
+            for prefetch in (0, 2):
+                platform.prefetchSegments = prefetch
+                platform.dataFileReader = fileReader()
+                items = list(platform._readDataFiles(dataFiles))
+                self.assertEqual(dataFiles, [dataFile for dataFile, _ in items])
+                self.assertEqual(
+                    [None if 'missing' in f else os.path.basename(f)
+                     for f in dataFiles], [dba for _, dba in items])
+
+            # a reader error reaches the caller after the earlier files
+            platform.dataFileReader = fileReader(failOn=dataFiles[3])
+            items = []
+            with self.assertRaises(IOError):
+                for item in platform._readDataFiles(dataFiles):
+                    items.append(item[0])
+            self.assertEqual(dataFiles[:3], items)
+            self.assertEqual([], prefetchThreads())
+
+            # stopping early releases and joins the reader thread, which has
+            # read no more than the prefetched segments
+            platform.dataFileReader = fileReader()
+            files = platform._readDataFiles(dataFiles)
+            next(files)
+            self.assertEqual(1, len(prefetchThreads()))
+            files.close()
+            self.assertEqual([], prefetchThreads())
+            self.assertLessEqual(len(platform.dataFileReader.read), 4)
+        finally:
+            shutil.rmtree(tmpDir)
+
+
+if __name__ == '__main__':
+    unittest.main()
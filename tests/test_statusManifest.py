@@ -0,0 +1,87 @@
+"""
+Unit test for the SQLite run manifest in ooidac/manifest.py
+"""
+import sys
+sys.path.append("..")
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from legacy.gliderdac.ooidac.status import Status
+from legacy.gliderdac.ooidac.manifest import Manifest
+
+
+class TestStatusManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.files = []
+        for name in ['a.dba', 'b.dba', 'p1.nc', 'p2.nc', 'p3.nc']:
+            path = os.path.join(self.tmpDir, name)
+            open(path, 'w').close()
+            self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def record(self, status):
+        a, b, p1, p2, p3 = self.files
+        status.add_nc(p1, a)
+        status.add_nc(p2, a)
+        status.add_nc(p2, a)
+        status.add_src(a)
+        status.add_nc(p3, b)
+        status.add_nc(p1, a, overwrite=True)
+        status.add_nc(os.path.join(self.tmpDir, 'missing.nc'), b)
+        status.add_src(b)
+        status.add_src(a, overwrite=True)
+        status.add_upload(p2)
+        status.add_upload(p2)
+        status.info['next_profile_id'] = 42
+        status.write()
+
+    def test_matches_status_json(self):
+
+        status = Status(os.path.join(self.tmpDir, 'status.json'))
+        self.record(status)
+
+        with Manifest(os.path.join(self.tmpDir, 'status.db'),
+                      batch_size=3) as manifest:
+            self.record(manifest)
+            for key in ['files_processed', 'profiles_created',
+                        'profiles_uploaded', 'profile_to_data_map',
+                        'next_profile_id']:
+                self.assertEqual(status.info[key], manifest.info[key])
+            self.assertEqual(status.data_map, manifest.data_map)
+            self.assertTrue(manifest.is_processed(self.files[0]))
+            self.assertEqual(manifest.profiles_from(self.files[0]),
+                             [self.files[3], self.files[2]])
+
+    def test_status_json_round_trip(self):
+
+        statusPath = os.path.join(self.tmpDir, 'status.json')
+        status = Status(statusPath)
+        status.trajectory = 'ce_311-20211019T0000'
+        self.record(status)
+
+        manifest = Manifest(os.path.join(self.tmpDir, 'status.db'))
+        manifest.import_status_json(statusPath)
+        exportPath = os.path.join(self.tmpDir, 'export.json')
+        manifest.export_status_json(exportPath)
+        manifest.close()
+
+        with open(statusPath) as fid:
+            expected = json.load(fid)
+        with open(exportPath) as fid:
+            self.assertEqual(expected, json.load(fid))
+
+        # changes persist after reopening
+        manifest = Manifest(os.path.join(self.tmpDir, 'status.db'))
+        self.assertEqual(manifest.trajectory, 'ce_311-20211019T0000')
+        self.assertEqual(manifest.next_profile_id, 42)
+        manifest.close()
+
+
+if __name__ == '__main__':
+    unittest.main()